@@ -0,0 +1,67 @@
+# benchmarks/bench_analytics.py
+"""
+Per-sample cost of the online analytics stage over a multi-hour stream
+
+Run from the repository root:
+    python -m benchmarks.bench_analytics
+"""
+import math
+import struct
+import time
+from typing import Dict, Iterator
+
+from src.core.analytics import OnlineAnalytics
+from src.core.samples import Sample
+from src.devices.whoop.data_parser import WhoopDataParser
+from src.devices.whoop.protocol import WhoopProtocol
+
+ACCEL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"]
+HR_UUID = WhoopProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"]
+
+
+def _hour(hour: int, accel_hz: int = 50) -> Iterator:
+    """One hour of 50 Hz movement and 1 Hz heart rate Samples"""
+    accel = [
+        WhoopDataParser.parse_sample(ACCEL_UUID, struct.pack('<hhh', n * 7 % 2000, -n % 900, 16384), 0)
+        for n in range(accel_hz)
+    ]
+    base_ns = hour * 3600 * 10**9
+    for second in range(3600):
+        rr = 800 + int(60 * math.sin(second / 10))
+        heart_rate = WhoopDataParser.parse_sample(
+            HR_UUID, bytes([0x16, 60_000 // rr]) + struct.pack('<H', rr * 1024 // 1000), 0
+        )
+        heart_rate.timestamp_ns = base_ns + second * 10**9
+        yield heart_rate
+        for n, sample in enumerate(accel):
+            timestamp_ns = base_ns + second * 10**9 + n * (10**9 // accel_hz)
+            yield Sample(timestamp_ns, sample.char_id, sample.raw, sample.value)
+
+
+def bench_analytics(hours: int = 3) -> Dict[str, float]:
+    """ns per sample for each hour of the stream; flat numbers mean O(1) updates"""
+    summaries = 0
+
+    def on_summary(summary):
+        nonlocal summaries
+        summaries += 1
+
+    analytics = OnlineAnalytics(on_summary=on_summary)
+    results = {}
+    for hour in range(hours):
+        samples = list(_hour(hour))
+        start = time.perf_counter()
+        for sample in samples:
+            analytics("whoop_data", sample)
+        elapsed = time.perf_counter() - start
+        results[f"hour_{hour + 1}_ns_per_sample"] = elapsed / len(samples) * 1e9
+    results["summaries"] = summaries
+    latest = analytics.latest[60.0]
+    results["rmssd_60s"] = latest.rmssd
+    results["sdnn_60s"] = latest.sdnn
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in bench_analytics().items():
+        print(f"{name}: {value:.1f}")
@@ -0,0 +1,141 @@
+# benchmarks/bench_ant.py
+"""
+ANT framing, burst reassembly and multi-channel ingest over the loopback transport
+
+The ingest benchmarks drive an AntNode from a FakeAntStick with every
+channel period divided by a speedup, so the aggregate message rate is
+far above what real sensors send (~4 Hz each). CPU time per message
+includes the fake stick, which shares the process with the node.
+
+Run from the repository root:
+    python -m benchmarks.bench_ant
+"""
+import asyncio
+import random
+import time
+import timeit
+from typing import Dict
+
+from src.core.metrics import LatencyHistogram
+from src.protocols.ant import messages, pages
+from src.protocols.ant.channel import ChannelConfig
+from src.protocols.ant.fake import FakeAntSensor, FakeAntStick
+from src.protocols.ant.framing import BurstAssembler, FrameParser, burst_packets
+from src.protocols.ant.node import AntNode
+from src.protocols.ant.transport import LoopbackTransport
+
+DEVICE_TYPES = tuple(pages.DEVICE_PROFILES)
+# USB full speed bulk packet size
+USB_PACKET = 64
+
+
+def _best_ns(func, calls: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat)) / calls * 1e9
+
+
+def _stream(frames: int, corrupt_every: int = 0) -> bytes:
+    rng = random.Random(22)
+    out = bytearray()
+    for n in range(frames):
+        frame = bytearray(messages.encode_data(messages.BROADCAST_DATA, n % 8, rng.randbytes(8)))
+        if corrupt_every and n % corrupt_every == 0:
+            frame[5] ^= 0xFF
+        out += frame
+    return bytes(out)
+
+
+def bench_framing(frames: int = 20_000) -> Dict[str, float]:
+    """FrameParser per frame, fed in 64-byte chunks, clean and with 1 in 100 frames corrupted"""
+    results = {}
+    for label, corrupt_every in (("clean", 0), ("corrupt", 100)):
+        stream = _stream(frames, corrupt_every)
+        chunks = [stream[i:i + USB_PACKET] for i in range(0, len(stream), USB_PACKET)]
+        parser = FrameParser(lambda msg_id, payload: None)
+
+        def run():
+            feed = parser.feed
+            for chunk in chunks:
+                feed(chunk)
+
+        results[f"{label}_frame_ns"] = _best_ns(run, frames)
+    encoded = [(n % 8, bytes(8)) for n in range(frames)]
+    results["encode_ns"] = _best_ns(
+        lambda: [messages.encode_data(messages.BROADCAST_DATA, c, d) for c, d in encoded], frames
+    )
+    return results
+
+
+def bench_bursts(size: int = 4096, transfers: int = 200) -> Dict[str, float]:
+    """BurstAssembler throughput in MB/s over transfers of `size` bytes"""
+    packets = list(burst_packets(1, bytes(range(256)) * (size // 256)))
+    assembler = BurstAssembler(size)
+
+    def run():
+        add = assembler.add
+        for _ in range(transfers):
+            for sequence, data in packets:
+                add(sequence, data)
+
+    seconds = min(timeit.repeat(run, number=1, repeat=5))
+    return {"reassembly_mb_per_s": size * transfers / seconds / 1e6}
+
+
+async def _ingest(channels: int, speedup: float, seconds: float, scan: bool = False) -> Dict[str, float]:
+    host, device = LoopbackTransport.pair(USB_PACKET)
+    sensors = [FakeAntSensor(1000 + n, DEVICE_TYPES[n % len(DEVICE_TYPES)]) for n in range(channels)]
+    if scan:
+        sensors = [FakeAntSensor(1000 + n, pages.HEART_RATE) for n in range(channels)]
+    stick = FakeAntStick(device, sensors, max_channels=max(channels, 8), speedup=speedup, seed=22)
+    node = AntNode(host, max_channels=max(channels, 8))
+    histogram = LatencyHistogram()
+    decoded = [0]
+    decode = pages.PAGE_DECODERS
+
+    def on_data(channel, timestamp_ns, data, channel_id):
+        device_type = channel_id.device_type if channel_id is not None else channel.config.device_type
+        if decode[device_type](data) is not None:
+            decoded[0] += 1
+        histogram.record(time.monotonic_ns() - timestamp_ns)
+
+    await stick.start()
+    await node.start()
+    if scan:
+        await node.open_scan_mode(ChannelConfig(pages.HEART_RATE), on_data)
+    else:
+        for sensor in sensors:
+            await node.open_channel(ChannelConfig(sensor.channel_id.device_type, sensor.channel_id.device_number), on_data)
+    start_messages = node.stats.broadcasts
+    decoded[0] = 0
+    cpu_start = time.process_time()
+    await asyncio.sleep(seconds)
+    cpu_s = time.process_time() - cpu_start
+    received = node.stats.broadcasts - start_messages
+    offered = sum(32768 / s.period * speedup for s in sensors)
+    await node.stop()
+    await stick.stop()
+    return {
+        "offered_per_s": offered,
+        "messages_per_s": received / seconds,
+        "decoded_per_s": decoded[0] / seconds,
+        "cpu_per_message_us": cpu_s / max(received, 1) * 1e6,
+        "latency_p99_us": (histogram.percentile(0.99) or 0) / 1e3,
+    }
+
+
+def bench_ingest(seconds: float = 2.0) -> Dict[str, float]:
+    """One node ingesting 8 and 32 channels, and 64 sensors in scan mode, through the fake stick"""
+    results = {}
+    for label, channels, speedup, scan in (
+        ("channels_8", 8, 50, False),
+        ("channels_32", 32, 25, False),
+        ("scan_64", 64, 12, True),
+    ):
+        for metric, value in asyncio.run(_ingest(channels, speedup, seconds, scan)).items():
+            results[f"{label}_{metric}"] = value
+    return results
+
+
+if __name__ == "__main__":
+    for bench in (bench_framing, bench_bursts, bench_ingest):
+        for name, value in bench().items():
+            print(f"{bench.__name__}.{name}: {value:.2f}")
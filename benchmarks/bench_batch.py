@@ -0,0 +1,82 @@
+# benchmarks/bench_batch.py
+"""
+Per-packet versus batch decoding of accelerometer, HRV and heart rate streams
+
+Run from the repository root:
+    python -m benchmarks.bench_batch
+"""
+import random
+import struct
+import timeit
+from typing import Dict, List
+
+from src.devices.whoop.data_parser import WhoopDataParser, np
+
+
+def _accel_payloads(count: int) -> List[bytes]:
+    rng = random.Random(1)
+    return [
+        struct.pack('<hhh', *(rng.randint(-32768, 32767) for _ in range(3)))
+        for _ in range(count)
+    ]
+
+
+def _hrv_payloads(count: int) -> List[bytes]:
+    rng = random.Random(2)
+    return [struct.pack('<H', rng.randint(200, 1500)) for _ in range(count)]
+
+
+def _heart_rate_payloads(count: int) -> List[bytes]:
+    """Heart Rate Measurements with sensor contact and one or two RR intervals"""
+    rng = random.Random(3)
+    payloads = []
+    for _ in range(count):
+        rr = [rng.randint(600, 1100) for _ in range(rng.randint(1, 2))]
+        payloads.append(bytes([0x16, rng.randint(50, 180)]) + struct.pack(f'<{len(rr)}H', *rr))
+    return payloads
+
+
+def _ns_per_sample(func, samples: int, number: int = 5) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number / samples * 1e9
+
+
+def bench_batch_decoding(samples: int = 50_000) -> Dict[str, float]:
+    """Decode cost per sample for the per-packet and batch paths"""
+    accel = _accel_payloads(samples)
+    accel_buffer = b"".join(accel)
+    hrv = _hrv_payloads(samples)
+    heart_rate = _heart_rate_payloads(samples)
+
+    results = {
+        "accel_per_packet_ns": _ns_per_sample(
+            lambda: [WhoopDataParser.parse_accelerometer(p) for p in accel], samples
+        ),
+        "accel_batch_payloads_ns": _ns_per_sample(
+            lambda: WhoopDataParser.parse_accelerometer_batch(accel), samples
+        ),
+        "accel_batch_buffer_ns": _ns_per_sample(
+            lambda: WhoopDataParser.parse_accelerometer_batch(accel_buffer), samples
+        ),
+        "hrv_per_packet_ns": _ns_per_sample(
+            lambda: [WhoopDataParser.parse_hrv(p) for p in hrv], samples
+        ),
+        "hrv_batch_payloads_ns": _ns_per_sample(
+            lambda: WhoopDataParser.parse_hrv_batch(hrv), samples
+        ),
+        "heart_rate_per_packet_ns": _ns_per_sample(
+            lambda: [WhoopDataParser.parse_heart_rate_measurement(p) for p in heart_rate], samples
+        ),
+        "heart_rate_batch_ns": _ns_per_sample(
+            lambda: WhoopDataParser.parse_heart_rate_batch(heart_rate), samples
+        ),
+    }
+    if np is not None:
+        results["accel_batch_numpy_ns"] = _ns_per_sample(
+            lambda: WhoopDataParser.parse_accelerometer_batch(accel_buffer, use_numpy=True), samples
+        )
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in bench_batch_decoding().items():
+        print(f"{name}: {value:.1f}")
@@ -0,0 +1,114 @@
+# benchmarks/bench_fleet.py
+"""
+Scanning, discovery and multi-device collection against the fake adapter
+
+Run from the repository root:
+    python -m benchmarks.bench_fleet
+"""
+import asyncio
+import time
+from typing import Dict
+
+from src.core.metrics import MetricsRegistry
+from src.core.pool import CollectorPool
+from src.core.reconnect import ReconnectPolicy
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.protocol import WhoopProtocol
+from src.devices.whoop.fake import FakeWhoop
+from src.protocols.ble.fake import FakeAdapter
+from src.protocols.ble.scanner import BLEScanner, ScanFilter
+
+
+async def _scan(advertisers: int, duration: float) -> Dict[str, float]:
+    adapter = FakeAdapter(seed=20)
+    adapter.populate(advertisers, FakeWhoop.generate)
+    scanner = BLEScanner(scanner_factory=adapter.scanner_factory)
+    await scanner.start()
+    cpu_start = time.process_time()
+    await asyncio.sleep(duration)
+    cpu_s = time.process_time() - cpu_start
+    heard = scanner._continuous.advertisements_seen
+    start = time.perf_counter()
+    whoops = scanner.find(ScanFilter(name_prefix=WhoopProtocol.DEVICE_NAME_PREFIX))
+    find_s = time.perf_counter() - start
+    await scanner.stop()
+    return {
+        "advertisers": advertisers,
+        "indexed": len(scanner.devices),
+        "whoops_found": len(whoops),
+        "adverts_per_s": heard / duration,
+        "cpu_fraction": cpu_s / duration,
+        "find_ms": find_s * 1e3,
+    }
+
+
+def bench_scan(advertisers: int = 5_000, duration: float = 3.0) -> Dict[str, float]:
+    """Continuous scan of thousands of advertisers through BLEScanner"""
+    return asyncio.run(_scan(advertisers, duration))
+
+
+async def _fleet(straps: int, bystanders: int, duration: float, outages: int) -> Dict[str, float]:
+    adapter = FakeAdapter(seed=21, connect_latency=0.02, discovery_latency=0.005, gatt_latency=0.002)
+    adapter.populate(bystanders)
+    devices = adapter.populate(straps, FakeWhoop.generate, factory_every=1, notification_loss=0.01, connection_interval=0.0075)
+    scanner = BLEScanner(scanner_factory=adapter.scanner_factory)
+    await scanner.start()
+
+    registry = MetricsRegistry()
+    received = 0
+
+    def output(device_id: str, data_type: str, data):
+        nonlocal received
+        received += 1
+
+    pool = CollectorPool(output=output, max_concurrent_connects=8, connect_interval=0.005, metrics=registry)
+    for device in devices:
+        pool.add(device.address, WhoopCollector(
+            device_address=device.address,
+            client_factory=adapter.client_factory,
+            scanner=scanner,
+            compact_samples=True,
+            auto_reconnect=True,
+            reconnect_policy=ReconnectPolicy(base_delay=0.05, max_delay=0.5)
+        ))
+
+    start = time.perf_counter()
+    await pool.start()
+    connect_s = time.perf_counter() - start
+
+    # Take a few straps out of range for a moment while collection runs
+    received = 0
+    await asyncio.sleep(duration / 2)
+    for device in devices[:outages]:
+        adapter.remove(device.address)
+    await asyncio.sleep(0.3)
+    for device in devices[:outages]:
+        adapter.add(device)
+    await asyncio.sleep(duration / 2)
+
+    summary = pool.summary()
+    reconnects = sum(c.reconnect_stats.reconnects for c in pool.collectors.values())
+    sent_lost = sum(
+        c.client.notifications_lost for c in pool.collectors.values() if c.client is not None
+    )
+    await pool.stop()
+    await scanner.stop()
+    return {
+        "straps_collecting": summary["states"].get("collecting", 0),
+        "connect_all_s": connect_s,
+        "samples_per_s": received / (duration + 0.3),
+        "reconnects": reconnects,
+        "lost_on_air": sent_lost,
+        "parse_errors": sum(m["parse_errors"] for m in registry.snapshot().values()),
+    }
+
+
+def bench_fleet(straps: int = 50, bystanders: int = 2_000, duration: float = 4.0, outages: int = 5) -> Dict[str, float]:
+    """A pool of lossy straps among bystander advertisers, with some going out of range"""
+    return asyncio.run(_fleet(straps, bystanders, duration, outages))
+
+
+if __name__ == "__main__":
+    for bench in (bench_scan, bench_fleet):
+        for name, value in bench().items():
+            print(f"{bench.__name__}.{name}: {value:.2f}")
@@ -0,0 +1,102 @@
+# benchmarks/bench_garmin.py
+"""
+Garmin sport profile decoding and collection against the fake client
+
+None of the profiles caps the notification rate; sensors usually send
+1-4 Hz, and the link allows at most one notification per characteristic
+and connection event. Each profile is therefore driven at one
+notification per 7.5 ms, the shortest connection interval, which is the
+most a single sensor can push through the collector.
+
+Run from the repository root:
+    python -m benchmarks.bench_garmin
+"""
+import asyncio
+import time
+import timeit
+from typing import Dict, Iterable
+
+from benchmarks.synthetic import GARMIN_CHARS, payloads
+from src.core.metrics import LatencyHistogram
+from src.core.samples import Sample
+from src.devices.garmin.collector import GarminCollector
+from src.devices.garmin.data_parser import GarminDataParser
+from src.devices.garmin.protocol import GarminProtocol
+from src.devices.garmin.fake import FakeGarminSensor
+from src.protocols.ble.fake import FakeBleakClient
+
+# Shortest BLE connection interval, one notification per characteristic and event
+CONNECTION_INTERVAL_S = 0.0075
+MAX_RATE_HZ = 1 / CONNECTION_INTERVAL_S
+
+
+def _best_ns(func, calls: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat)) / calls * 1e9
+
+
+def bench_decoders(packets: int = 5_000) -> Dict[str, float]:
+    """parse_characteristic_data and parse_sample per packet for every profile measurement"""
+    results = {}
+    for profile, (_, name) in GarminProtocol.PROFILES.items():
+        uuid = GARMIN_CHARS[name]["uuid"]
+        data = [bytearray(p) for p in payloads(name, packets)]
+        parse = GarminDataParser.parse_characteristic_data
+        parse_sample = GarminDataParser.parse_sample
+        results[f"{profile}_dict_ns"] = _best_ns(lambda: [parse(uuid, d) for d in data], packets)
+        results[f"{profile}_sample_ns"] = _best_ns(lambda: [parse_sample(uuid, d, 0) for d in data], packets)
+    return results
+
+
+async def _collect(profiles: Iterable[str], seconds: float) -> Dict[str, float]:
+    profiles = tuple(profiles)
+    device = FakeGarminSensor(
+        "FA:KE:00:00:87:01",
+        profiles=profiles,
+        notify_rates={GarminProtocol.profile_measurement(p): MAX_RATE_HZ for p in profiles},
+        connection_interval=CONNECTION_INTERVAL_S,
+        seed=87
+    )
+    histogram = LatencyHistogram()
+
+    def on_data(data_type: str, sample: Sample):
+        histogram.record(time.monotonic_ns() - sample.timestamp_ns)
+
+    collector = GarminCollector(
+        device_address=device.address,
+        data_callback=on_data,
+        profiles=profiles,
+        compact_samples=True,
+        client_factory=lambda address, **kwargs: FakeBleakClient(device, **kwargs)
+    )
+    await collector.connect()
+    await collector.start_collection()
+    cpu_start = time.process_time()
+    await asyncio.sleep(seconds)
+    cpu_s = time.process_time() - cpu_start
+    await collector.stop_collection()
+    await collector.disconnect()
+    delivered = histogram.count
+    return {
+        "delivered_per_s": delivered / seconds,
+        "cpu_per_notification_us": cpu_s / max(delivered, 1) * 1e6,
+        "latency_p50_us": histogram.percentile(0.5) / 1e3,
+        "latency_p99_us": histogram.percentile(0.99) / 1e3,
+    }
+
+
+def bench_profiles(seconds: float = 2.0) -> Dict[str, float]:
+    """Each profile alone, then all of them at once, at the link-limited rate through the fake client"""
+    results = {}
+    for profile in GarminProtocol.PROFILES:
+        for metric, value in asyncio.run(_collect((profile,), seconds)).items():
+            results[f"{profile}_{metric}"] = value
+    for metric, value in asyncio.run(_collect(GarminProtocol.PROFILES, seconds)).items():
+        results[f"all_{metric}"] = value
+    return results
+
+
+if __name__ == "__main__":
+    print(f"Rate per profile: {MAX_RATE_HZ:.1f} Hz")
+    for bench in (bench_decoders, bench_profiles):
+        for name, value in bench().items():
+            print(f"{bench.__name__}.{name}: {value:.2f}")
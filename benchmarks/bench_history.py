@@ -0,0 +1,97 @@
+# benchmarks/bench_history.py
+"""
+History offload throughput against the fake history server
+
+The fake strap sends 6 notifications per 7.5 ms connection event, so
+throughput scales with the MTU, and serves READ requests one after the
+other, so a host that waits for each request to finish before sending
+the next loses a round trip per window.
+
+Run from the repository root:
+    python -m benchmarks.bench_history
+"""
+import asyncio
+import time
+from typing import Dict, Optional, List
+
+from benchmarks.synthetic import history_buffer, HISTORY_RECORD
+from src.devices.whoop.history import HistoryError, HistoryOffload
+from src.devices.whoop.fake import FakeHistoryServer, FakeWhoop
+from src.protocols.ble.fake import FakeBleakClient
+
+CONNECTION_INTERVAL = 0.0075
+
+
+async def _offload(
+    size: int,
+    mtu: int,
+    pipeline_depth: int,
+    window: int = 1024,
+    loss: float = 0.0,
+    drop_schedule: Optional[List[float]] = None
+) -> Dict[str, float]:
+    history = history_buffer(size // HISTORY_RECORD.size)
+    device = FakeWhoop(
+        "FA:KE:00:00:00:25",
+        notify_rates={},
+        mtu=mtu,
+        connection_interval=CONNECTION_INTERVAL,
+        notification_loss=loss,
+        drop_schedule=drop_schedule,
+        seed=25
+    )
+    FakeHistoryServer(history).attach(device)
+    received = bytearray()
+    resume = None
+    connections = 0
+    retries = 0
+    start = time.monotonic()
+    while True:
+        client = FakeBleakClient(device)
+        await client.connect()
+        connections += 1
+        try:
+            async with HistoryOffload(client, window=window, pipeline_depth=pipeline_depth, timeout=0.25) as offload:
+                await offload.download(resume, on_chunk=lambda offset, view: received.extend(view))
+                retries += offload.progress.retries
+            break
+        except HistoryError as e:
+            # Resume where the interrupted transfer stopped
+            resume = e.progress.next_offset
+            retries += e.progress.retries
+    seconds = time.monotonic() - start
+    return {
+        "bytes_per_s": len(received) / seconds,
+        "intact": float(bytes(received) == history),
+        "retries": float(retries),
+        "connections": float(connections),
+    }
+
+
+def _run(results: Dict[str, float], label: str, metrics: Dict[str, float], keys=("bytes_per_s",)):
+    for key in keys:
+        results[f"{label}_{key}"] = metrics[key]
+
+
+def bench_throughput() -> Dict[str, float]:
+    """Bytes per second by MTU, waiting for each request or pipelining four"""
+    results = {}
+    for mtu, size in ((23, 16_000), (247, 160_000)):
+        for depth in (1, 4):
+            _run(results, f"mtu_{mtu}_depth_{depth}", asyncio.run(_offload(size, mtu, depth)))
+    return results
+
+
+def bench_resilience() -> Dict[str, float]:
+    """Transfers with 2% notification loss and with the link dropping every 0.3 s"""
+    results = {}
+    keys = ("bytes_per_s", "intact", "retries", "connections")
+    _run(results, "loss_2pct", asyncio.run(_offload(160_000, 247, 4, loss=0.02)), keys)
+    _run(results, "drops", asyncio.run(_offload(160_000, 247, 4, drop_schedule=[0.3] * 10)), keys)
+    return results
+
+
+if __name__ == "__main__":
+    for bench in (bench_throughput, bench_resilience):
+        for name, value in bench().items():
+            print(f"{bench.__name__}.{name}: {value:.2f}")
@@ -0,0 +1,66 @@
+# benchmarks/bench_logging.py
+"""
+Per-packet cost of notification handling under different logging setups
+
+Run from the repository root:
+    python -m benchmarks.bench_logging
+"""
+import logging
+import struct
+import time
+from typing import Dict
+
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.protocol import WhoopProtocol
+from src.utils.hot_path_logging import HOT_PATH_LOGGER, install_queue_logging
+
+HR_UUID = WhoopProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"]
+
+
+def _packets(count: int):
+    return [bytearray(bytes([0x16, 60 + n % 60]) + struct.pack('<H', 800 + n % 200)) for n in range(count)]
+
+
+def _run(collector: WhoopCollector, packets, eager_debug: bool = False) -> float:
+    process = collector._process_notification
+    logger = collector.logger
+    start = time.perf_counter()
+    for n, data in enumerate(packets):
+        process(n, HR_UUID, data)
+        if eager_debug:
+            # What every packet used to pay: f-string plus a DEBUG record
+            logger.debug(f"Received data from {HR_UUID}: {data[:8].hex()}")
+    return (time.perf_counter() - start) / len(packets) * 1e6
+
+
+def bench_logging(count: int = 100_000) -> Dict[str, float]:
+    """Microseconds per packet, with log output going to a queue listener"""
+    packets = _packets(count)
+    results = {}
+
+    listener = install_queue_logging(HOT_PATH_LOGGER, [logging.NullHandler()])
+    eager_listener = install_queue_logging(WhoopCollector.__name__, [logging.NullHandler()])
+    try:
+        eager = WhoopCollector(device_address="FA:KE", data_callback=lambda *_: None)
+        eager.logger.setLevel(logging.DEBUG)
+        results["eager_debug_us"] = _run(eager, packets, eager_debug=True)
+
+        off = WhoopCollector(device_address="FA:KE", data_callback=lambda *_: None)
+        results["off_us"] = _run(off, packets)
+
+        sampled = WhoopCollector(device_address="FA:KE", data_callback=lambda *_: None,
+                                 packet_log_level=logging.WARNING, packet_log_every=100)
+        results["sampled_1_in_100_us"] = _run(sampled, packets)
+
+        every = WhoopCollector(device_address="FA:KE", data_callback=lambda *_: None,
+                               packet_log_level=logging.WARNING, packet_log_every=1)
+        results["every_packet_queued_us"] = _run(every, packets)
+    finally:
+        listener.stop()
+        eager_listener.stop()
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in bench_logging().items():
+        print(f"{name}: {value:.2f}")
@@ -0,0 +1,75 @@
+# benchmarks/bench_memory.py
+"""
+Memory held by an hour of 50 Hz movement data in each representation
+
+Run from the repository root:
+    python -m benchmarks.bench_memory
+"""
+import random
+import struct
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List
+
+from src.core.samples import SampleStore
+from src.devices.whoop.data_parser import WhoopDataParser
+from src.devices.whoop.protocol import WhoopProtocol
+
+ACCEL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"]
+
+
+def _payloads(count: int) -> List[bytearray]:
+    rng = random.Random(3)
+    return [
+        bytearray(struct.pack('<hhh', *(rng.randint(-32768, 32767) for _ in range(3))))
+        for _ in range(count)
+    ]
+
+
+def _measure(build) -> int:
+    tracemalloc.start()
+    retained = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    return current
+
+
+def _legacy_dicts(payloads: List[bytearray]):
+    """What DataLogger used to keep: parsed dicts plus ISO timestamps"""
+    start = datetime.now()
+    points = []
+    for data in payloads:
+        point = WhoopDataParser.parse_characteristic_data(ACCEL_UUID, data, include_raw=True)
+        now = datetime.now()
+        point["timestamp"] = now.isoformat()
+        point["elapsed_seconds"] = (now - start).total_seconds()
+        points.append(point)
+    return points
+
+
+def _samples(payloads: List[bytearray]):
+    return [WhoopDataParser.parse_sample(ACCEL_UUID, data, time.monotonic_ns()) for data in payloads]
+
+
+def _ring_buffers(payloads: List[bytearray]):
+    store = SampleStore(capacity=len(payloads))
+    for data in payloads:
+        store.add(WhoopDataParser.parse_sample(ACCEL_UUID, data, time.monotonic_ns()))
+    return store
+
+
+def bench_sample_memory(count: int = 50 * 3600) -> Dict[str, float]:
+    """Retained MB for dicts, Sample objects and typed ring buffers"""
+    payloads = _payloads(count)
+    return {
+        "legacy_dict_mb": _measure(lambda: _legacy_dicts(payloads)) / 1e6,
+        "sample_slots_mb": _measure(lambda: _samples(payloads)) / 1e6,
+        "ring_buffer_mb": _measure(lambda: _ring_buffers(payloads)) / 1e6,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in bench_sample_memory().items():
+        print(f"{name}: {value:.1f}")
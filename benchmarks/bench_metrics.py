@@ -0,0 +1,136 @@
+# benchmarks/bench_metrics.py
+"""
+Overhead of collector metrics and accuracy of the loss and latency estimates
+
+Run from the repository root:
+    python -m benchmarks.bench_metrics
+"""
+import asyncio
+import random
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.core.metrics import CollectorMetrics, LatencyHistogram, MetricsRegistry
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.protocol import WhoopProtocol
+
+HR_UUID = WhoopProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"]
+ACCEL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"]
+
+
+def _stream(count: int) -> List[Tuple[str, bytearray]]:
+    """50 Hz accelerometer interleaved with 1 Hz heart rate"""
+    stream = []
+    for n in range(count):
+        if n % 50 == 0:
+            stream.append((HR_UUID, bytearray(bytes([0x16, 60 + n % 40]) + struct.pack('<H', 800 + n % 200))))
+        else:
+            stream.append((ACCEL_UUID, bytearray(struct.pack('<hhh', n % 2000, -n % 2000, 16384))))
+    return stream
+
+
+def _direct_ns(stream, metrics: Optional[CollectorMetrics]) -> float:
+    collector = WhoopCollector(device_address="FA:KE", data_callback=lambda *_: None,
+                               queue_size=None, metrics=metrics)
+    handle = collector._handle_data
+    start = time.perf_counter_ns()
+    for char_uuid, data in stream:
+        handle(char_uuid, data)
+    return (time.perf_counter_ns() - start) / len(stream)
+
+
+async def _queued(stream, metrics: Optional[CollectorMetrics]) -> float:
+    collector = WhoopCollector(device_address="FA:KE", data_callback=lambda *_: None, metrics=metrics)
+    await collector.pipeline.start()
+    handle = collector._handle_data
+    start = time.perf_counter_ns()
+    for offset in range(0, len(stream), 32):
+        for char_uuid, data in stream[offset:offset + 32]:
+            handle(char_uuid, data)
+        # Let the consumer drain, as the BLE loop would between connection events
+        await asyncio.sleep(0)
+    await collector.pipeline.stop()
+    return (time.perf_counter_ns() - start) / len(stream)
+
+
+def _queued_ns(stream, metrics: Optional[CollectorMetrics]) -> float:
+    return asyncio.run(_queued(stream, metrics))
+
+
+def bench_overhead(count: int = 10_000, rounds: int = 15) -> Dict[str, float]:
+    """
+    Per-packet cost with and without metrics, direct and queued delivery
+
+    Runs are short and interleaved and the best of each is kept, so
+    scheduling noise on a busy machine does not swamp the difference.
+    """
+    stream = _stream(count)
+    results = {}
+    for mode, run in (("direct", _direct_ns), ("queued", _queued_ns)):
+        plain = []
+        instrumented = []
+        for _ in range(rounds):
+            # ABBA order cancels drift between the two configurations
+            plain.append(run(stream, None))
+            instrumented.append(run(stream, MetricsRegistry().device("bench")))
+            instrumented.append(run(stream, MetricsRegistry().device("bench")))
+            plain.append(run(stream, None))
+        base, measured = min(plain), min(instrumented)
+        results[f"{mode}_plain_ns"] = base
+        results[f"{mode}_metrics_ns"] = measured
+        results[f"{mode}_overhead_pct"] = (measured - base) / base * 100
+    return results
+
+
+def bench_loss_estimate(seconds: int = 600, rate_hz: int = 50, loss: float = 0.02) -> Dict[str, float]:
+    """Loss estimate for a jittery stream with random drops and short outages"""
+    rng = random.Random(18)
+    metrics = CollectorMetrics("bench")
+    period_ns = 10**9 // rate_hz
+    dropped = 0
+    n = 0
+    total = seconds * rate_hz
+    while n < total:
+        if rng.random() < 0.001:
+            # Outage of up to two seconds
+            outage = rng.randint(5, 2 * rate_hz)
+            dropped += min(outage, total - n)
+            n += outage
+            continue
+        if rng.random() < loss:
+            dropped += 1
+        else:
+            jitter = int(rng.gauss(0, period_ns * 0.05))
+            metrics.arrival(ACCEL_UUID, n * period_ns + jitter)
+        n += 1
+    stats = metrics.characteristics[ACCEL_UUID]
+    return {
+        "dropped": dropped,
+        "lost_estimate": stats.lost_estimate,
+        "estimate_error_pct": (stats.lost_estimate - dropped) / dropped * 100,
+        "jitter_us": stats.jitter_ns / 1e3,
+    }
+
+
+def bench_histogram(count: int = 200_000) -> Dict[str, float]:
+    """Worst relative error of histogram percentiles against exact ones"""
+    rng = random.Random(7)
+    values = [int(rng.lognormvariate(10, 1.5)) for _ in range(count)]
+    histogram = LatencyHistogram()
+    start = time.perf_counter_ns()
+    for value in values:
+        histogram.record(value)
+    record_ns = (time.perf_counter_ns() - start) / count
+    values.sort()
+    worst = 0.0
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = values[max(0, int(q * count + 0.5) - 1)]
+        worst = max(worst, abs(histogram.percentile(q) - exact) / exact)
+    return {"record_ns": record_ns, "worst_percentile_error_pct": worst * 100}
+
+
+if __name__ == "__main__":
+    for bench in (bench_overhead, bench_loss_estimate, bench_histogram):
+        for name, value in bench().items():
+            print(f"{bench.__name__}.{name}: {value:.2f}")
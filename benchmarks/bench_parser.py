@@ -0,0 +1,68 @@
+# benchmarks/bench_parser.py
+"""
+Per-packet cost of WhoopDataParser.parse_characteristic_data
+
+Run from the repository root:
+    python -m benchmarks.bench_parser
+"""
+import struct
+import timeit
+from typing import Dict, Any
+
+from src.devices.whoop.protocol import WhoopProtocol
+from src.devices.whoop.data_parser import WhoopDataParser
+
+ACCEL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"]
+ACCEL_PAYLOAD = struct.pack('<hhh', 1200, -3400, 16384)
+
+
+def legacy_parse_characteristic_data(characteristic_uuid: str, data: bytes) -> Dict[str, Any]:
+    """The if/elif implementation the dispatch table replaced"""
+    parsed_data = {
+        "raw": data.hex(),
+        "characteristic": characteristic_uuid
+    }
+    uuid = str(characteristic_uuid).lower()
+    chars = WhoopProtocol.CHARACTERISTICS
+    if uuid == chars["HEART_RATE"]["uuid"].lower():
+        parsed_data["heart_rate"] = WhoopDataParser.parse_heart_rate(data)
+    elif uuid == chars["BATTERY_LEVEL"]["uuid"].lower():
+        parsed_data["battery_level"] = WhoopDataParser.parse_battery_level(data)
+    elif uuid == chars["CUSTOM_NOTIFY_1"]["uuid"].lower():
+        parsed_data["hrv"] = WhoopDataParser.parse_hrv(data)
+    elif uuid == chars["CUSTOM_NOTIFY_2"]["uuid"].lower():
+        x = struct.unpack('<h', data[0:2])[0] / 16384.0
+        y = struct.unpack('<h', data[2:4])[0] / 16384.0
+        z = struct.unpack('<h', data[4:6])[0] / 16384.0
+        parsed_data["movement"] = [x, y, z]
+    elif uuid == chars["CUSTOM_NOTIFY_3"]["uuid"].lower():
+        parsed_data["custom_data_3"] = data.hex()
+    elif uuid == chars["CUSTOM_NOTIFY_4"]["uuid"].lower():
+        parsed_data["custom_data_4"] = data.hex()
+    return parsed_data
+
+
+def _ns_per_call(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e9
+
+
+def bench_parse_characteristic_data(number: int = 100_000) -> Dict[str, float]:
+    """Accelerometer packet cost before and after the dispatch table"""
+    decoder = WhoopDataParser.get_decoder(ACCEL_UUID)
+    return {
+        "legacy_ns_per_packet": _ns_per_call(
+            lambda: legacy_parse_characteristic_data(ACCEL_UUID, ACCEL_PAYLOAD), number
+        ),
+        "dispatch_ns_per_packet": _ns_per_call(
+            lambda: WhoopDataParser.parse_characteristic_data(ACCEL_UUID, ACCEL_PAYLOAD), number
+        ),
+        "dispatch_cached_ns_per_packet": _ns_per_call(
+            lambda: WhoopDataParser.parse_characteristic_data(ACCEL_UUID, ACCEL_PAYLOAD, decoder=decoder),
+            number
+        ),
+    }
+
+
+if __name__ == "__main__":
+    for name, value in bench_parse_characteristic_data().items():
+        print(f"{name}: {value:.1f}")
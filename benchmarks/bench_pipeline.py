@@ -0,0 +1,60 @@
+# benchmarks/bench_pipeline.py
+"""
+Time spent inside the notification callback with a slow consumer
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline
+"""
+import asyncio
+import struct
+import time
+from typing import Dict, Optional
+
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.protocol import WhoopProtocol
+
+ACCEL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"]
+ACCEL_PAYLOAD = struct.pack('<hhh', 1200, -3400, 16384)
+
+
+def _slow_consumer(data_type: str, data: dict):
+    """Stand-in for a consumer that writes every sample to disk"""
+    time.sleep(0.0002)
+
+
+async def _callback_cost(queue_size: Optional[int], packets: int) -> Dict[str, float]:
+    collector = WhoopCollector(data_callback=_slow_consumer, queue_size=queue_size)
+    if collector.pipeline is not None:
+        await collector.pipeline.start()
+
+    worst_ns = 0
+    total_ns = 0
+    for _ in range(packets):
+        start = time.perf_counter_ns()
+        collector._handle_data(ACCEL_UUID, bytearray(ACCEL_PAYLOAD))
+        elapsed = time.perf_counter_ns() - start
+        total_ns += elapsed
+        worst_ns = max(worst_ns, elapsed)
+        # Give the consumer task a chance to run, as the BLE loop would
+        await asyncio.sleep(0)
+
+    if collector.pipeline is not None:
+        await collector.pipeline.stop(drain=False)
+    return {"mean_ns": total_ns / packets, "max_ns": worst_ns}
+
+
+def bench_callback_cost(packets: int = 2_000) -> Dict[str, float]:
+    """Callback cost with synchronous delivery versus the ingest queue"""
+    direct = asyncio.run(_callback_cost(None, packets))
+    queued = asyncio.run(_callback_cost(1024, packets))
+    return {
+        "direct_mean_ns": direct["mean_ns"],
+        "direct_max_ns": direct["max_ns"],
+        "queued_mean_ns": queued["mean_ns"],
+        "queued_max_ns": queued["max_ns"],
+    }
+
+
+if __name__ == "__main__":
+    for name, value in bench_callback_cost().items():
+        print(f"{name}: {value:.1f}")
@@ -0,0 +1,55 @@
+# benchmarks/bench_pool.py
+"""
+Many simulated straps collected by one CollectorPool on one event loop
+
+Run from the repository root:
+    python -m benchmarks.bench_pool
+"""
+import asyncio
+import time
+from typing import Dict
+
+from src.core.pool import CollectorPool
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.fake import FakeWhoop
+from src.protocols.ble.fake import FakeBleakClient
+
+
+async def _run(devices: int, duration: float) -> Dict[str, float]:
+    received = 0
+
+    def output(device_id: str, data_type: str, data: dict):
+        nonlocal received
+        received += 1
+
+    pool = CollectorPool(output=output, max_concurrent_connects=8, connect_interval=0.005)
+    for n in range(devices):
+        address = f"FA:KE:00:00:{n // 256:02X}:{n % 256:02X}"
+        pool.add(address, WhoopCollector(
+            device_address=address,
+            client_factory=lambda a, **kw: FakeBleakClient(FakeWhoop(a), connect_latency=0.02, **kw)
+        ))
+
+    start = time.perf_counter()
+    await pool.start()
+    connect_s = time.perf_counter() - start
+
+    received = 0
+    await asyncio.sleep(duration)
+    summary = pool.summary()
+    await pool.stop()
+    return {
+        "devices_collecting": summary["states"].get("collecting", 0),
+        "connect_all_s": connect_s,
+        "samples_per_s": received / duration,
+    }
+
+
+def bench_pool(devices: int = 120, duration: float = 5.0) -> Dict[str, float]:
+    """Connect time and merged throughput for `devices` fake straps at 51 Hz each"""
+    return asyncio.run(_run(devices, duration))
+
+
+if __name__ == "__main__":
+    for name, value in bench_pool().items():
+        print(f"{name}: {value:.1f}")
@@ -0,0 +1,142 @@
+# benchmarks/bench_reassembly.py
+"""
+Frame reassembly of the CUSTOM_NOTIFY_3/4 streams
+
+Frames of 20 to 500 bytes are cut into notifications of the default
+(20 byte) and the largest (244 byte) payload, then reassembled into one
+record per frame. The hex_per_notification baseline is the record per
+notification with a hex payload the parser used to build for these
+streams. The collector benchmark streams framed notifications from the
+fake device, with 1% of them lost on air.
+
+Run from the repository root:
+    python -m benchmarks.bench_reassembly
+"""
+import asyncio
+import random
+import time
+import timeit
+import zlib
+from typing import Dict, List, Tuple
+
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.protocol import WhoopProtocol
+from src.devices.whoop.fake import FakeWhoop, FramedPayloads
+from src.protocols.ble.fake import FakeBleakClient
+from src.protocols.ble.reassembly import FrameFormat, FrameReassembler, Packetizer
+
+STREAM_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_3"]["uuid"]
+
+
+def _frames(count: int, seed: int = 24) -> List[Tuple[int, bytes]]:
+    rng = random.Random(seed)
+    return [(rng.randrange(4), rng.randbytes(rng.randint(20, 500))) for _ in range(count)]
+
+
+def _packets(frame_format: FrameFormat, frames: List[Tuple[int, bytes]], payload_size: int) -> List[bytes]:
+    stream = b"".join(frame_format.encode(frame_type, body) for frame_type, body in frames)
+    return Packetizer(frame_format, payload_size).packets(stream)
+
+
+def _record(frame_type: int, body: memoryview, value) -> dict:
+    """The record WhoopCollector builds per frame"""
+    raw = bytes(body)
+    return {"characteristic": STREAM_UUID, "custom_data_3": raw if value is None else value, "frame_type": frame_type}
+
+
+def bench_reassembly(frames: int = 2_000) -> Dict[str, float]:
+    """Stream throughput in MB/s per notification size, with and without CRC-32"""
+    results = {}
+    source = _frames(frames)
+    size = sum(len(body) for _, body in source)
+    formats = (("plain", FrameFormat()), ("crc32", FrameFormat(crc=zlib.crc32)))
+    for payload_size in (20, 244):
+        for label, frame_format in formats:
+            packets = _packets(frame_format, source, payload_size)
+            # Frame types 0 and 1 decoded, the rest kept as raw bytes
+            reassembler = FrameReassembler(frame_format, _record, {0: len, 1: len})
+
+            def run():
+                reassembler.reset()
+                feed = reassembler.feed
+                for packet in packets:
+                    feed(packet)
+
+            seconds = min(timeit.repeat(run, number=1, repeat=5))
+            results[f"mtu_{payload_size + 3}_{label}_mb_per_s"] = size / seconds / 1e6
+            results[f"mtu_{payload_size + 3}_{label}_frame_us"] = seconds / frames * 1e6
+        packets = _packets(FrameFormat(), source, payload_size)
+        seconds = min(timeit.repeat(
+            lambda: [{"characteristic": STREAM_UUID, "custom_data_3": p.hex()} for p in packets], number=1, repeat=5
+        ))
+        results[f"mtu_{payload_size + 3}_hex_per_notification_mb_per_s"] = size / seconds / 1e6
+    return results
+
+
+def bench_loss(frames: int = 2_000, loss: float = 0.01) -> Dict[str, float]:
+    """Share of frames delivered intact when notifications are lost, and corrupted frames delivered"""
+    frame_format = FrameFormat(crc=zlib.crc32)
+    source = _frames(frames)
+    packets = _packets(frame_format, source, 20)
+    rng = random.Random(24)
+    expected = set(source)
+    delivered = []
+    reassembler = FrameReassembler(frame_format, lambda t, body, value: delivered.append((t, bytes(body))))
+    for packet in packets:
+        if rng.random() >= loss:
+            reassembler.feed(packet)
+    intact = sum(frame in expected for frame in delivered)
+    return {
+        "delivered_share": intact / frames,
+        "corrupted_delivered": float(len(delivered) - intact),
+        "dropped_frames": float(reassembler.stats.dropped_frames),
+    }
+
+
+async def _collect(seconds: float, rate: float, loss: float) -> Dict[str, float]:
+    frame_format = FrameFormat(**WhoopProtocol.STREAM_FRAMING)
+    source = _frames(256)
+    device = FakeWhoop(
+        "FA:KE:00:00:00:24",
+        notify_rates={STREAM_UUID: rate},
+        payloads={STREAM_UUID: FramedPayloads(frame_format, lambda n: source[n % len(source)])},
+        notification_loss=loss,
+        seed=24
+    )
+    frames = [0]
+
+    def on_data(data_type, sample):
+        frames[0] += 1
+
+    collector = WhoopCollector(
+        device_address=device.address,
+        data_callback=on_data,
+        compact_samples=True,
+        reassemble_streams=True,
+        client_factory=lambda address, **kwargs: FakeBleakClient(device, **kwargs)
+    )
+    await collector.connect()
+    await collector.start_collection()
+    cpu_start = time.process_time()
+    await asyncio.sleep(seconds)
+    cpu_s = time.process_time() - cpu_start
+    await collector.stop_collection()
+    await collector.disconnect()
+    stats = collector.reassemblers[STREAM_UUID.lower()].stats
+    return {
+        "notifications_per_s": stats.packets / seconds,
+        "frames_per_s": frames[0] / seconds,
+        "cpu_per_notification_us": cpu_s / max(stats.packets, 1) * 1e6,
+        "dropped_frames": float(stats.dropped_frames),
+    }
+
+
+def bench_collector(seconds: float = 2.0, rate: float = 2000.0) -> Dict[str, float]:
+    """WhoopCollector reassembling a fast framed stream from the fake device, 1% notification loss"""
+    return asyncio.run(_collect(seconds, rate, 0.01))
+
+
+if __name__ == "__main__":
+    for bench in (bench_reassembly, bench_loss, bench_collector):
+        for name, value in bench().items():
+            print(f"{bench.__name__}.{name}: {value:.2f}")
@@ -0,0 +1,83 @@
+# benchmarks/bench_reconnect.py
+"""
+Time from connect until all streams flow, with and without the GATT profile cache
+
+Run from the repository root:
+    python -m benchmarks.bench_reconnect
+"""
+import asyncio
+import os
+import tempfile
+from typing import Dict, Optional
+
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.protocol import WhoopProtocol
+from src.devices.whoop.fake import FakeWhoop
+from src.protocols.ble.fake import FakeBleakClient
+from src.protocols.ble.gatt_cache import GattProfileCache
+
+ADDRESS = "FA:KE:00:00:00:01"
+NOTIFY_RATES = {
+    WhoopProtocol.CHARACTERISTICS[name]["uuid"]: 50.0
+    for name in ("CUSTOM_NOTIFY_1", "CUSTOM_NOTIFY_2", "CUSTOM_NOTIFY_3", "CUSTOM_NOTIFY_4", "HEART_RATE")
+}
+
+
+def _client_factory(device: FakeWhoop):
+    def factory(address: str, **kwargs):
+        # Discovery and GATT round trips roughly as slow as a real adapter
+        return FakeBleakClient(device, connect_latency=0.05, discovery_latency=0.1,
+                               gatt_latency=0.03, **kwargs)
+    return factory
+
+
+class SequentialSubscribeCollector(WhoopCollector):
+    """Subscribes one characteristic at a time, as start_collection used to"""
+
+    async def start_collection(self) -> bool:
+        if self.pipeline is not None:
+            await self.pipeline.start()
+        self.profile = self._discover_profile()
+        self._awaiting_first_sample = True
+        for _, handle in self.profile.notify_characteristics:
+            await self.client.start_notify(handle, self._handle_data)
+        return True
+
+
+async def _time_to_first_sample(cache: Optional[GattProfileCache], collector_class=WhoopCollector) -> float:
+    """Seconds from connect() until every notifying characteristic has delivered"""
+    device = FakeWhoop(ADDRESS, notify_rates=NOTIFY_RATES)
+    collector = collector_class(
+        device_address=ADDRESS,
+        client_factory=_client_factory(device),
+        gatt_cache=cache
+    )
+    seen = set()
+    collector.data_callback = lambda data_type, data: seen.add(data["characteristic"])
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await collector.connect()
+    await collector.start_collection()
+    while len(seen) < len(NOTIFY_RATES):
+        await asyncio.sleep(0.001)
+    elapsed = loop.time() - start
+    await collector.stop_collection()
+    await collector.disconnect()
+    return elapsed
+
+
+def bench_reconnect() -> Dict[str, float]:
+    """Seconds until all streams flow: sequential, concurrent, first cached connect, cached reconnect"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = GattProfileCache(os.path.join(directory, "gatt.json"))
+        return {
+            "sequential_s": asyncio.run(_time_to_first_sample(None, SequentialSubscribeCollector)),
+            "uncached_s": asyncio.run(_time_to_first_sample(None)),
+            "cache_cold_s": asyncio.run(_time_to_first_sample(cache)),
+            "cache_warm_s": asyncio.run(_time_to_first_sample(GattProfileCache(cache.path))),
+        }
+
+
+if __name__ == "__main__":
+    for name, value in bench_reconnect().items():
+        print(f"{name}: {value:.3f}")
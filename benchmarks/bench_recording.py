@@ -0,0 +1,50 @@
+# benchmarks/bench_recording.py
+"""
+Session recording write, replay and time-slice throughput
+
+Run from the repository root:
+    python -m benchmarks.bench_recording
+"""
+import os
+import struct
+import tempfile
+import time
+from typing import Dict
+
+from src.core.recording import SessionRecorder, RecordingReader
+from src.devices.whoop.protocol import WhoopProtocol
+
+ACCEL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"]
+HRV_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_1"]["uuid"]
+PERIOD_NS = 20_000_000  # 50 Hz
+
+
+def bench_recording(records: int = 500_000) -> Dict[str, float]:
+    """Records/sec for writing and replaying, and the cost of a 1 s slice"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.rec")
+        payload = struct.pack('<hhh', 100, 200, 16384)
+
+        start = time.perf_counter()
+        with SessionRecorder(path) as recorder:
+            for i in range(records):
+                recorder.record(i * PERIOD_NS, ACCEL_UUID if i % 10 else HRV_UUID, payload)
+        results["write_records_per_s"] = records / (time.perf_counter() - start)
+
+        with RecordingReader(path) as reader:
+            start = time.perf_counter()
+            count = sum(1 for _ in reader.replay())
+            results["replay_records_per_s"] = count / (time.perf_counter() - start)
+
+            middle_ns = records // 2 * PERIOD_NS
+            start = time.perf_counter()
+            sliced = sum(1 for _ in reader.records(middle_ns, middle_ns + 1_000_000_000))
+            results["slice_1s_ms"] = (time.perf_counter() - start) * 1e3
+            results["slice_1s_records"] = sliced
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in bench_recording().items():
+        print(f"{name}: {value:.1f}")
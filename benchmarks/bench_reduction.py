@@ -0,0 +1,71 @@
+# benchmarks/bench_reduction.py
+"""
+Callback CPU and output bytes with and without accelerometer reduction
+
+Run from the repository root:
+    python -m benchmarks.bench_reduction
+"""
+import json
+import random
+import struct
+import time
+from typing import Dict, List, Tuple
+
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.data_parser import WhoopDataParser
+from src.devices.whoop.protocol import WhoopProtocol
+from src.protocols.ble.collector import QueuedNotification
+
+ACCEL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"]
+
+
+def _stream(seconds: int, rate_hz: int = 50) -> List[QueuedNotification]:
+    rng = random.Random(4)
+    period_ns = 10**9 // rate_hz
+    decoder = WhoopDataParser.get_decoder(ACCEL_UUID)
+    return [
+        (n * period_ns, ACCEL_UUID, bytearray(struct.pack(
+            '<hhh', rng.randint(-2000, 2000), rng.randint(-2000, 2000), 16384 + rng.randint(-3000, 3000)
+        )), decoder)
+        for n in range(seconds * rate_hz)
+    ]
+
+
+def _run(stream, batch_size: int, **kwargs) -> Tuple[float, int, int]:
+    written = 0
+    records = 0
+
+    def sink(data_type: str, data: dict):
+        nonlocal written, records
+        records += 1
+        written += len(json.dumps(data))
+
+    collector = WhoopCollector(device_address="FA:KE", data_callback=sink, **kwargs)
+    start = time.perf_counter()
+    for offset in range(0, len(stream), batch_size):
+        collector._process_batch(stream[offset:offset + batch_size])
+    if collector.reducer is not None:
+        collector.reducer.flush()
+    return time.perf_counter() - start, records, written
+
+
+def bench_reduction(seconds: int = 600, batch_size: int = 64) -> Dict[str, float]:
+    """Ten minutes of 50 Hz movement through the full-rate and reduced paths"""
+    stream = _stream(seconds)
+    full_s, full_records, full_bytes = _run(stream, batch_size)
+    reduced_s, reduced_records, reduced_bytes = _run(stream, batch_size, reduce_movement=True)
+    return {
+        "full_cpu_s": full_s,
+        "full_records": full_records,
+        "full_bytes": full_bytes,
+        "reduced_cpu_s": reduced_s,
+        "reduced_records": reduced_records,
+        "reduced_bytes": reduced_bytes,
+        "cpu_ratio": full_s / reduced_s,
+        "bytes_ratio": full_bytes / reduced_bytes,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in bench_reduction().items():
+        print(f"{name}: {value:.2f}")
@@ -0,0 +1,49 @@
+# benchmarks/bench_replay.py
+"""
+Sustained throughput and latency of the collector pipeline via replay
+
+Run from the repository root:
+    python -m benchmarks.bench_replay
+"""
+import asyncio
+import struct
+from typing import Dict, Iterator
+
+from src.devices.whoop.protocol import WhoopProtocol
+from src.devices.whoop.replay import ReplayCollector, Notification
+
+ACCEL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"]
+HR_UUID = WhoopProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"]
+
+
+def _notifications(count: int) -> Iterator[Notification]:
+    accel = struct.pack('<hhh', 100, -200, 16384)
+    heart_rate = bytes([0x00, 62])
+    for i in range(count):
+        yield i * 20_000_000, HR_UUID if i % 50 == 0 else ACCEL_UUID, accel if i % 50 else heart_rate
+
+
+async def _run(count: int, **kwargs) -> Dict[str, float]:
+    collector = ReplayCollector(_notifications(count), speed=None, data_callback=lambda t, d: None, **kwargs)
+    await collector.connect()
+    await collector.start_collection()
+    stats = await collector.wait_finished()
+    await collector.disconnect()
+    return stats.as_dict()
+
+
+def bench_replay(count: int = 200_000) -> Dict[str, float]:
+    """Unpaced replay through the queued and synchronous delivery paths"""
+    queued = asyncio.run(_run(count))
+    direct = asyncio.run(_run(count, queue_size=None))
+    return {
+        "queued_packets_per_s": queued["packets_per_s"],
+        "queued_latency_p99_us": queued["latency_p99_us"],
+        "direct_packets_per_s": direct["packets_per_s"],
+        "direct_latency_p99_us": direct["latency_p99_us"],
+    }
+
+
+if __name__ == "__main__":
+    for name, value in bench_replay().items():
+        print(f"{name}: {value:.1f}")
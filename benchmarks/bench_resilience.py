@@ -0,0 +1,63 @@
+# benchmarks/bench_resilience.py
+"""
+Reconnect latency and data gaps against a fake strap that drops on a schedule
+
+Run from the repository root:
+    python -m benchmarks.bench_resilience
+"""
+import asyncio
+from typing import Dict
+
+from src.core.reconnect import ReconnectPolicy
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.fake import FakeWhoop
+from src.protocols.ble.fake import FakeBleakClient
+from src.protocols.ble.gatt_cache import GattProfileCache
+
+ADDRESS = "FA:KE:00:00:00:02"
+
+
+async def _run(drops: int, uptime: float) -> Dict[str, float]:
+    device = FakeWhoop(ADDRESS, drop_schedule=[uptime] * drops, connect_failures=0)
+    received = 0
+
+    def on_data(data_type: str, data: dict):
+        nonlocal received
+        received += 1
+
+    collector = WhoopCollector(
+        device_address=ADDRESS,
+        data_callback=on_data,
+        client_factory=lambda address, **kwargs: FakeBleakClient(
+            device, connect_latency=0.05, discovery_latency=0.05, gatt_latency=0.01, **kwargs
+        ),
+        gatt_cache=GattProfileCache(),
+        auto_reconnect=True,
+        reconnect_policy=ReconnectPolicy(base_delay=0.05, max_delay=1.0)
+    )
+    await collector.connect()
+    await collector.start_collection()
+    while collector.reconnect_stats.reconnects < drops:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(uptime)
+    await collector.stop_collection()
+    await collector.disconnect()
+
+    stats = collector.reconnect_stats
+    return {
+        "disconnects": stats.disconnects,
+        "reconnects": stats.reconnects,
+        "mean_reconnect_s": stats.total_gap_s / max(stats.reconnects, 1),
+        "max_reconnect_s": stats.max_reconnect_s,
+        "samples": received,
+    }
+
+
+def bench_resilience(drops: int = 5, uptime: float = 0.5) -> Dict[str, float]:
+    """Reconnect statistics over `drops` scheduled link losses"""
+    return asyncio.run(_run(drops, uptime))
+
+
+if __name__ == "__main__":
+    for name, value in bench_resilience().items():
+        print(f"{name}: {value:.3f}")
@@ -0,0 +1,96 @@
+# benchmarks/bench_scanner.py
+"""
+Device index upkeep and discovery latency of the continuous BLEScanner
+
+Run from the repository root:
+    python -m benchmarks.bench_scanner
+"""
+import asyncio
+import time
+from typing import Dict, List, Tuple
+
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+from src.devices.whoop.protocol import WhoopProtocol
+from src.protocols.ble.scanner import BLEScanner, ScanFilter
+
+
+class _SilentScanner:
+    """Stands in for BleakScanner; advertisements are injected directly"""
+
+    def __init__(self, detection_callback=None, **kwargs):
+        self.detection_callback = detection_callback
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+def _adverts(count: int, devices: int) -> List[Tuple[BLEDevice, AdvertisementData]]:
+    adverts = []
+    for n in range(count):
+        d = n % devices
+        name = f"WHOOP {d:08X}" if d % 10 == 0 else f"Other {d}"
+        address = f"AA:BB:CC:{d // 65536:02X}:{d // 256 % 256:02X}:{d % 256:02X}"
+        adv = AdvertisementData(
+            local_name=name,
+            manufacturer_data={0x0059: bytes([n % 256])},
+            service_data={},
+            service_uuids=[WhoopProtocol.SERVICES["HEART_RATE_SERVICE"]],
+            tx_power=None,
+            rssi=-60 - n % 20,
+            platform_data=(),
+        )
+        adverts.append((BLEDevice(address, name, None), adv))
+    return adverts
+
+
+def bench_index(count: int = 10000, devices: int = 500) -> Dict[str, float]:
+    """Cost of merging adverts into the index and of a filtered lookup"""
+    scanner = BLEScanner(scanner_factory=_SilentScanner)
+    adverts = _adverts(count, devices)
+
+    start = time.perf_counter()
+    for device, adv in adverts:
+        scanner._on_detection(device, adv)
+    index_s = time.perf_counter() - start
+
+    scan_filter = ScanFilter(name_prefix=WhoopProtocol.DEVICE_NAME_PREFIX)
+    rounds = 100
+    start = time.perf_counter()
+    for _ in range(rounds):
+        matches = scanner.find(scan_filter)
+    find_s = (time.perf_counter() - start) / rounds
+    return {
+        "indexed_devices": len(scanner.devices),
+        "matching_devices": len(matches),
+        "advert_us": index_s / count * 1e6,
+        "find_ms": find_s * 1e3,
+    }
+
+
+async def _discover_known() -> float:
+    scanner = BLEScanner(scanner_factory=_SilentScanner)
+    await scanner.start()
+    for device, adv in _adverts(500, 500):
+        scanner._on_detection(device, adv)
+    start = time.perf_counter()
+    found = await scanner.scan_for_device(name_prefix=WhoopProtocol.DEVICE_NAME_PREFIX, timeout=5)
+    elapsed = time.perf_counter() - start
+    await scanner.stop()
+    assert found
+    return elapsed
+
+
+def bench_discover_known() -> Dict[str, float]:
+    """scan_for_device latency when the index already holds a match"""
+    return {"discover_known_ms": asyncio.run(_discover_known()) * 1e3}
+
+
+if __name__ == "__main__":
+    for bench in (bench_index, bench_discover_known):
+        for name, value in bench().items():
+            print(f"{name}: {value:.3f}")
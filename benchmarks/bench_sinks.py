@@ -0,0 +1,90 @@
+# benchmarks/bench_sinks.py
+"""
+Write throughput of the batched sinks against the legacy text output
+
+Run from the repository root:
+    python -m benchmarks.bench_sinks
+"""
+import ast
+import asyncio
+import os
+import struct
+import tempfile
+import time
+from typing import Dict, List
+
+from src.core.samples import Sample
+from src.core.sinks import ColumnarFileSink, ColumnarReader, SQLiteSink
+from src.devices.whoop.data_parser import WhoopDataParser
+from src.devices.whoop.protocol import WhoopProtocol
+
+ACCEL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"]
+HRV_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_1"]["uuid"]
+HR_UUID = WhoopProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"]
+
+
+def _samples(count: int) -> List[Sample]:
+    """50 Hz movement with HRV and heart rate interleaved once a second"""
+    samples = []
+    for n in range(count):
+        timestamp_ns = n * 20_000_000
+        if n % 50 == 0:
+            samples.append(WhoopDataParser.parse_sample(
+                HR_UUID, bytes([0x16, 60 + n % 30]) + struct.pack('<H', 820), timestamp_ns))
+        elif n % 50 == 25:
+            samples.append(WhoopDataParser.parse_sample(HRV_UUID, struct.pack('<H', 450 + n % 90), timestamp_ns))
+        else:
+            samples.append(WhoopDataParser.parse_sample(
+                ACCEL_UUID, struct.pack('<hhh', n % 1000, -(n % 700), 16384), timestamp_ns))
+    return samples
+
+
+async def _write(sink, samples: List[Sample]) -> float:
+    start = time.perf_counter()
+    await sink.open()
+    for sample in samples:
+        sink("whoop_data", sample)
+    await sink.close()
+    return time.perf_counter() - start
+
+
+def bench_sinks(count: int = 200_000) -> Dict[str, float]:
+    """Samples per second written by each sink, plus read-back time of the columnar file"""
+    samples = _samples(count)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        # Legacy DataLogger format: str(dict) per line
+        legacy_path = os.path.join(directory, "legacy.txt")
+        start = time.perf_counter()
+        with open(legacy_path, "w") as f:
+            for sample in samples:
+                row = {k: v.as_dict() if hasattr(v, "as_dict") else v for k, v in sample.to_dict().items()}
+                f.write(f"{row}\n")
+        results["legacy_text_samples_per_s"] = count / (time.perf_counter() - start)
+
+        columnar_path = os.path.join(directory, "samples.col")
+        elapsed = asyncio.run(_write(ColumnarFileSink(columnar_path), samples))
+        results["columnar_samples_per_s"] = count / elapsed
+
+        sqlite_path = os.path.join(directory, "samples.db")
+        elapsed = asyncio.run(_write(SQLiteSink(sqlite_path), samples))
+        results["sqlite_samples_per_s"] = count / elapsed
+
+        results["legacy_bytes"] = os.path.getsize(legacy_path)
+        results["columnar_bytes"] = os.path.getsize(columnar_path)
+
+        start = time.perf_counter()
+        with open(legacy_path) as f:
+            for line in f:
+                ast.literal_eval(line)
+        results["legacy_read_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ColumnarReader(columnar_path).columns(ACCEL_UUID.lower())
+        results["columnar_read_accel_s"] = time.perf_counter() - start
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in bench_sinks().items():
+        print(f"{name}: {value:.2f}")
@@ -0,0 +1,215 @@
+# benchmarks/bench_suite.py
+"""
+Regression suite over the hot paths, fed by the synthetic generator
+
+Metric names carry their unit, which tells benchmarks.run whether lower
+(_ns, _us, _ms, _s) or higher (_per_s) is better. Run the suite and
+compare it against a stored baseline with benchmarks.run; it also runs
+standalone from the repository root:
+    python -m benchmarks.bench_suite
+"""
+import asyncio
+import os
+import tempfile
+import time
+import timeit
+from typing import Dict, List
+
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+from benchmarks.bench_scanner import _SilentScanner
+from benchmarks.synthetic import CHARS, notifications, payloads
+from src.core.metrics import LatencyHistogram
+from src.core.samples import Sample
+from src.core.sinks import ColumnarFileSink, SQLiteSink
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.data_parser import WhoopDataParser
+from src.devices.whoop.protocol import WhoopProtocol
+from src.devices.whoop.fake import FakeWhoop
+from src.protocols.ble.fake import FakeBleakClient
+from src.protocols.ble.scanner import BLEScanner, ScanFilter
+
+# Characteristics with a per-packet decoder, by WhoopProtocol name
+DECODED = ("HEART_RATE", "CUSTOM_NOTIFY_1", "CUSTOM_NOTIFY_2", "CUSTOM_NOTIFY_3", "CUSTOM_NOTIFY_4", "BATTERY_LEVEL")
+BATCHED = ("HEART_RATE", "CUSTOM_NOTIFY_1", "CUSTOM_NOTIFY_2")
+
+
+def _best_ns(func, calls: int, repeat: int = 5) -> float:
+    """Best-of-`repeat` wall time of `func`, in ns per call"""
+    return min(timeit.repeat(func, number=1, repeat=repeat)) / calls * 1e9
+
+
+def bench_parser_per_packet(packets: int = 5_000) -> Dict[str, float]:
+    """parse_characteristic_data and parse_sample per packet, for every decoded characteristic"""
+    results = {}
+    for name in DECODED:
+        uuid = CHARS[name]["uuid"]
+        data = [bytearray(p) for p in payloads(name, packets)]
+        parse = WhoopDataParser.parse_characteristic_data
+        parse_sample = WhoopDataParser.parse_sample
+        results[f"{name.lower()}_dict_ns"] = _best_ns(lambda: [parse(uuid, d) for d in data], packets)
+        results[f"{name.lower()}_sample_ns"] = _best_ns(lambda: [parse_sample(uuid, d, 0) for d in data], packets)
+    return results
+
+
+def bench_parser_batch(packets: int = 20_000) -> Dict[str, float]:
+    """Batch decoders per sample, and the per-packet decoder over the same payloads"""
+    results = {}
+    for name in BATCHED:
+        uuid = CHARS[name]["uuid"]
+        data = payloads(name, packets)
+        field, decode = WhoopDataParser.get_decoder(uuid)
+        results[f"{name.lower()}_batch_ns"] = _best_ns(lambda: WhoopDataParser.parse_batch(uuid, data), packets)
+        results[f"{name.lower()}_loop_ns"] = _best_ns(lambda: [decode(d) for d in data], packets)
+    return results
+
+
+def bench_handle_data(packets: int = 20_000) -> Dict[str, float]:
+    """_handle_data per notification over the synthetic mix, direct and queued delivery"""
+    stream = notifications(packets)
+
+    def direct():
+        collector = WhoopCollector(device_address="FA:KE", data_callback=lambda *_: None, queue_size=None)
+        handle = collector._handle_data
+        for _, uuid, data in stream:
+            handle(uuid, data)
+
+    async def queued():
+        collector = WhoopCollector(device_address="FA:KE", data_callback=lambda *_: None, compact_samples=True)
+        await collector.pipeline.start()
+        handle = collector._handle_data
+        for offset in range(0, len(stream), 32):
+            for _, uuid, data in stream[offset:offset + 32]:
+                handle(uuid, data)
+            await asyncio.sleep(0)
+        await collector.pipeline.stop()
+
+    return {
+        "direct_ns": _best_ns(direct, packets),
+        "queued_ns": _best_ns(lambda: asyncio.run(queued()), packets),
+    }
+
+
+async def _fake_client_latency(seconds: float, accel_hz: float) -> Dict[str, float]:
+    names = ("CUSTOM_NOTIFY_2", "HEART_RATE", "CUSTOM_NOTIFY_1", "CUSTOM_NOTIFY_3")
+    pools = {CHARS[name]["uuid"]: payloads(name, 256) for name in names}
+    device = FakeWhoop(
+        "FA:KE:00:00:00:19",
+        notify_rates={CHARS["CUSTOM_NOTIFY_2"]["uuid"]: accel_hz, CHARS["HEART_RATE"]["uuid"]: 1.0,
+                      CHARS["CUSTOM_NOTIFY_1"]["uuid"]: 1.0, CHARS["CUSTOM_NOTIFY_3"]["uuid"]: 2.0},
+        payloads={uuid: (lambda pool: lambda n: pool[n % len(pool)])(pool) for uuid, pool in pools.items()}
+    )
+    histogram = LatencyHistogram()
+
+    def on_data(data_type: str, sample: Sample):
+        histogram.record(time.monotonic_ns() - sample.timestamp_ns)
+
+    collector = WhoopCollector(
+        device_address=device.address,
+        data_callback=on_data,
+        compact_samples=True,
+        client_factory=lambda address, **kwargs: FakeBleakClient(device, **kwargs)
+    )
+    await collector.connect()
+    await collector.start_collection()
+    await asyncio.sleep(seconds)
+    await collector.stop_collection()
+    await collector.disconnect()
+    return {
+        "delivered_per_s": histogram.count / seconds,
+        "latency_p50_us": histogram.percentile(0.5) / 1e3,
+        "latency_p99_us": histogram.percentile(0.99) / 1e3,
+    }
+
+
+def bench_fake_client(seconds: float = 2.0, accel_hz: float = 500.0) -> Dict[str, float]:
+    """Arrival-to-callback latency with notifications produced by the fake BleakClient"""
+    return asyncio.run(_fake_client_latency(seconds, accel_hz))
+
+
+def _adverts(count: int) -> List[tuple]:
+    """Deterministic crowd: one in ten is a Whoop, the rest are other vendors"""
+    heart_rate_service = WhoopProtocol.SERVICES["HEART_RATE_SERVICE"]
+    adverts = []
+    for n in range(count):
+        address = f"AA:BB:{n // 65536:02X}:{n // 256 % 256:02X}:{n % 256:02X}:19"
+        if n % 10 == 0:
+            name, uuids, company = f"WHOOP {n:08X}", [heart_rate_service], 0x0059
+        elif n % 10 < 4:
+            name, uuids, company = f"Beacon {n}", [], 0x004C
+        else:
+            name, uuids, company = None, [f"0000{0x1800 + n % 64:04x}-0000-1000-8000-00805f9b34fb"], 0x0006
+        adv = AdvertisementData(
+            local_name=name,
+            manufacturer_data={company: bytes([n % 256, n // 256 % 256])},
+            service_data={},
+            service_uuids=uuids,
+            tx_power=None,
+            rssi=-40 - n % 50,
+            platform_data=(),
+        )
+        adverts.append((BLEDevice(address, name, None), adv))
+    return adverts
+
+
+def bench_scanner_filtering(count: int = 10_000) -> Dict[str, float]:
+    """Index upkeep and filter cost over 10k distinct advertisers"""
+    adverts = _adverts(count)
+
+    def index():
+        scanner = BLEScanner(scanner_factory=_SilentScanner)
+        for device, adv in adverts:
+            scanner._on_detection(device, adv)
+        return scanner
+
+    results = {"index_advert_ns": _best_ns(index, count, repeat=3)}
+    scanner = index()
+    filters = {
+        "name": ScanFilter(name_prefix=WhoopProtocol.DEVICE_NAME_PREFIX),
+        "service": ScanFilter(service_uuid=WhoopProtocol.SERVICES["HEART_RATE_SERVICE"]),
+        "company": ScanFilter(company_id=0x004C),
+    }
+    for label, scan_filter in filters.items():
+        results[f"find_{label}_us"] = _best_ns(lambda: scanner.find(scan_filter), 1) / 1e3
+    return results
+
+
+async def _write(sink, samples: List[Sample]):
+    await sink.open()
+    for sample in samples:
+        sink("whoop_data", sample)
+    await sink.close()
+
+
+def bench_sinks(count: int = 50_000) -> Dict[str, float]:
+    """Samples per second through the columnar and SQLite sinks"""
+    samples = [WhoopDataParser.parse_sample(uuid, data, timestamp_ns)
+               for timestamp_ns, uuid, data in notifications(count)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for label, factory in (("columnar", ColumnarFileSink), ("sqlite", SQLiteSink)):
+            best = float("inf")
+            for attempt in range(3):
+                path = os.path.join(directory, f"{label}{attempt}")
+                start = time.perf_counter()
+                asyncio.run(_write(factory(path), samples))
+                best = min(best, time.perf_counter() - start)
+            results[f"{label}_samples_per_s"] = count / best
+    return results
+
+
+BENCHMARKS = (
+    bench_parser_per_packet,
+    bench_parser_batch,
+    bench_handle_data,
+    bench_fake_client,
+    bench_scanner_filtering,
+    bench_sinks,
+)
+
+
+if __name__ == "__main__":
+    for bench in BENCHMARKS:
+        for name, value in bench().items():
+            print(f"{bench.__name__}.{name}: {value:.2f}")
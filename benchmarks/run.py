@@ -0,0 +1,168 @@
+# benchmarks/run.py
+"""
+Run benchmark modules, store results as baselines and compare runs
+
+Every `bench_*` function of the selected modules is run `--repeat`
+times and the best value of each metric is kept. Metric units come from
+their name suffix: _ns, _us, _ms and _s are times where lower is
+better, _per_s are rates where higher is better, anything else is
+reported but not compared.
+
+Run from the repository root:
+    python -m benchmarks.run                          # the regression suite
+    python -m benchmarks.run --save main              # store as baselines/main.json
+    python -m benchmarks.run --compare main           # diff against a baseline
+    python -m benchmarks.run -m bench_batch -k accel  # other modules, filtered
+"""
+import argparse
+import datetime
+import importlib
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+LOWER_IS_BETTER = ("_ns", "_us", "_ms", "_s")
+HIGHER_IS_BETTER = ("_per_s",)
+
+
+def direction(metric: str) -> int:
+    """+1 if higher is better, -1 if lower is better, 0 if not comparable"""
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def discover(module_names: List[str], keyword: Optional[str] = None) -> List[Callable[[], Dict[str, float]]]:
+    """The bench_* functions of the given benchmark modules, optionally filtered by name"""
+    benchmarks = []
+    for module_name in module_names:
+        module = importlib.import_module(f"benchmarks.{module_name}")
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith("bench_") and func.__module__ == module.__name__:
+                if keyword is None or keyword in f"{module_name}.{name}":
+                    benchmarks.append(func)
+    return benchmarks
+
+
+def run(benchmarks: List[Callable[[], Dict[str, float]]], repeat: int = 3) -> Dict[str, float]:
+    """Run every benchmark `repeat` times, keeping the best value of each metric"""
+    results: Dict[str, float] = {}
+    for bench in benchmarks:
+        prefix = f"{bench.__module__.rsplit('.', 1)[-1]}.{bench.__name__}"
+        for _ in range(repeat):
+            for metric, value in bench().items():
+                key = f"{prefix}.{metric}"
+                best = results.get(key)
+                sign = direction(metric)
+                if best is None or (sign > 0 and value > best) or (sign < 0 and value < best):
+                    results[key] = value
+        print(f"  {prefix}: done", file=sys.stderr)
+    return results
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save(name: str, results: Dict[str, float]) -> str:
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+    return path
+
+
+def load(name_or_path: str) -> Dict[str, Any]:
+    path = name_or_path if name_or_path.endswith(".json") else os.path.join(BASELINE_DIR, f"{name_or_path}.json")
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: Dict[str, float], results: Dict[str, float], threshold: float) -> List[str]:
+    """
+    Print the relative change of every metric and return the regressions
+
+    A change counts as a regression when the metric got worse by more
+    than `threshold` (a fraction, e.g. 0.1 for 10%).
+    """
+    regressions = []
+    width = max((len(k) for k in results), default=10)
+    print(f"{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}")
+    for key in sorted(results):
+        value = results[key]
+        old = baseline.get(key)
+        if old is None:
+            print(f"{key:<{width}}  {'-':>12}  {value:>12.2f}  {'new':>8}")
+            continue
+        change = (value - old) / old if old else 0.0
+        sign = direction(key)
+        mark = ""
+        if sign and -sign * change > threshold:
+            mark = "  REGRESSION"
+            regressions.append(key)
+        elif sign and sign * change > threshold:
+            mark = "  improved"
+        print(f"{key:<{width}}  {old:>12.2f}  {value:>12.2f}  {change:>+7.1%}{mark}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-m", "--module", action="append", dest="modules",
+                        help="Benchmark module to run, repeatable (default: bench_suite)")
+    parser.add_argument("-k", "--keyword", help="Only run benchmarks whose module.function name contains this")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark, the best value is kept")
+    parser.add_argument("--save", metavar="NAME", help="Store the results as baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against baselines/NAME.json or a JSON path")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown reported as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    benchmarks = discover(args.modules or ["bench_suite"], args.keyword)
+    if not benchmarks:
+        print("No benchmarks selected", file=sys.stderr)
+        return 2
+    results = run(benchmarks, args.repeat)
+
+    if args.compare:
+        baseline = load(args.compare)
+        print(f"Baseline {args.compare}: commit {baseline['environment'].get('commit')}, "
+              f"created {baseline['environment'].get('created')}")
+        regressions = compare(baseline["results"], results, args.threshold)
+    else:
+        for key, value in results.items():
+            print(f"{key}: {value:.2f}")
+        regressions = []
+
+    if args.save:
+        print(f"Saved {save(args.save, results)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+# benchmarks/synthetic.py
+"""
+Deterministic synthetic payloads for every Whoop and Garmin characteristic
+
+The same seed always produces the same byte stream, so benchmark runs on
+different commits decode identical input and their results can be
+compared. Payloads cover the variants the decoders handle, e.g. 8 and
+16 bit heart rates, energy expended and several RR intervals.
+"""
+import random
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from src.devices.garmin.protocol import GarminProtocol
+from src.devices.whoop.protocol import WhoopProtocol
+
+CHARS = WhoopProtocol.CHARACTERISTICS
+GARMIN_CHARS = GarminProtocol.CHARACTERISTICS
+
+# Notifications per second of a strap streaming everything
+DEFAULT_RATES: Dict[str, float] = {
+    "CUSTOM_NOTIFY_2": 50.0,
+    "HEART_RATE": 1.0,
+    "CUSTOM_NOTIFY_1": 1.0,
+    "CUSTOM_NOTIFY_3": 2.0,
+    "CUSTOM_NOTIFY_4": 2.0,
+    "BATTERY_LEVEL": 1 / 60,
+}
+
+# (timestamp_ns, characteristic UUID, payload) as passed to _handle_data
+Notification = Tuple[int, str, bytearray]
+
+
+class SyntheticPayloads:
+    """Payload generator keyed by WhoopProtocol or GarminProtocol characteristic name"""
+
+    _ACCEL = struct.Struct('<hhh')
+    _RSC = struct.Struct('<BHB')
+    _CSC_WHEEL = struct.Struct('<IH')
+    _CSC_CRANK = struct.Struct('<HH')
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+
+    def heart_rate(self) -> bytes:
+        rng = self.rng
+        wide = rng.random() < 0.1
+        energy = rng.random() < 0.05
+        rr_count = rng.choice((0, 1, 1, 1, 2, 3))
+        flags = 0x06 | (0x01 if wide else 0) | (0x08 if energy else 0) | (0x10 if rr_count else 0)
+        bpm = rng.randint(45, 185)
+        payload = bytes([flags]) + (struct.pack('<H', bpm) if wide else bytes([bpm]))
+        if energy:
+            payload += struct.pack('<H', rng.randint(0, 2000))
+        for _ in range(rr_count):
+            # RR intervals in 1/1024 s around the heart rate
+            payload += struct.pack('<H', int(60 / bpm * 1024 * rng.uniform(0.9, 1.1)))
+        return payload
+
+    def hrv(self) -> bytes:
+        return struct.pack('<H', self.rng.randint(200, 900))
+
+    def accelerometer(self) -> bytes:
+        rng = self.rng
+        return self._ACCEL.pack(
+            int(rng.gauss(0, 3000)), int(rng.gauss(0, 3000)), max(-32768, min(32767, int(rng.gauss(16384, 3000))))
+        )
+
+    def battery_level(self) -> bytes:
+        return bytes([self.rng.randint(5, 100)])
+
+    def opaque(self) -> bytes:
+        return bytes(self.rng.getrandbits(8) for _ in range(20))
+
+    def write_command(self) -> bytes:
+        return bytes([0xAA, self.rng.randint(0, 255)]) + bytes(6)
+
+    def manufacturer_name(self) -> bytes:
+        return b"WHOOP Inc."
+
+    def rsc_measurement(self) -> bytes:
+        rng = self.rng
+        flags = rng.choice((0x04, 0x05, 0x07, 0x07, 0x00))
+        payload = self._RSC.pack(flags, int(rng.uniform(1.0, 6.0) * 256), rng.randint(60, 200))
+        if flags & 0x01:
+            payload += struct.pack('<H', rng.randint(60, 180))
+        if flags & 0x02:
+            payload += struct.pack('<I', rng.randint(0, 420_000))
+        return payload
+
+    def csc_measurement(self) -> bytes:
+        rng = self.rng
+        flags = rng.choice((0x01, 0x02, 0x03, 0x03))
+        payload = bytes([flags])
+        if flags & 0x01:
+            payload += self._CSC_WHEEL.pack(rng.getrandbits(20), rng.getrandbits(16))
+        if flags & 0x02:
+            payload += self._CSC_CRANK.pack(rng.getrandbits(16), rng.getrandbits(16))
+        return payload
+
+    def cycling_power_measurement(self) -> bytes:
+        rng = self.rng
+        # Power only, with balance and crank data, and a dual-sided meter with extremes and energy
+        flags = rng.choice((0x0000, 0x0021, 0x0021, 0x0823 | 0x0040))
+        payload = struct.pack('<Hh', flags, rng.randint(0, 1200))
+        if flags & 0x0001:
+            payload += bytes([rng.randint(80, 120)])
+        if flags & 0x0020:
+            payload += self._CSC_CRANK.pack(rng.getrandbits(16), rng.getrandbits(16))
+        if flags & 0x0040:
+            payload += struct.pack('<hh', rng.randint(200, 900), rng.randint(-100, 100))
+        if flags & 0x0800:
+            payload += struct.pack('<H', rng.randint(0, 3000))
+        return payload
+
+    def payload(self, name: str) -> bytes:
+        """Next payload of the characteristic with WhoopProtocol name `name`"""
+        return self._generators[name](self)
+
+    _generators = {
+        "HEART_RATE": heart_rate,
+        "CUSTOM_NOTIFY_1": hrv,
+        "CUSTOM_NOTIFY_2": accelerometer,
+        "CUSTOM_NOTIFY_3": opaque,
+        "CUSTOM_NOTIFY_4": opaque,
+        "BATTERY_LEVEL": battery_level,
+        "CUSTOM_WRITE": write_command,
+        "MANUFACTURER_NAME": manufacturer_name,
+        "RSC_MEASUREMENT": rsc_measurement,
+        "CSC_MEASUREMENT": csc_measurement,
+        "CYCLING_POWER_MEASUREMENT": cycling_power_measurement,
+    }
+
+
+def payloads(name: str, count: int, seed: int = 0) -> List[bytes]:
+    """`count` payloads of one characteristic"""
+    generator = SyntheticPayloads(seed)
+    return [generator.payload(name) for _ in range(count)]
+
+
+def notifications(count: int, rates: Optional[Dict[str, float]] = None, seed: int = 0) -> List[Notification]:
+    """
+    Interleaved notification stream in arrival order
+
+    Each characteristic notifies at its rate from `rates` (DEFAULT_RATES
+    if omitted) with a deterministic phase and a little jitter.
+    """
+    rates = rates or DEFAULT_RATES
+    generator = SyntheticPayloads(seed)
+    rng = random.Random(seed + 1)
+    streams = []
+    for name, rate in rates.items():
+        period_ns = int(1e9 / rate)
+        streams.append([rng.randrange(period_ns), period_ns, name, CHARS[name]["uuid"]])
+    stream: List[Notification] = []
+    while len(stream) < count:
+        next_stream = min(streams, key=lambda s: s[0])
+        due_ns, period_ns, name, uuid = next_stream
+        jitter_ns = int(rng.gauss(0, period_ns * 0.02))
+        stream.append((max(0, due_ns + jitter_ns), uuid, bytearray(generator.payload(name))))
+        next_stream[0] = due_ns + period_ns
+    return stream
+
+
+# Stored history record: seconds since epoch, heart rate, HRV in 0.1 ms, accelerometer x, y, z
+HISTORY_RECORD = struct.Struct('<IBHhhh')
+
+
+def history_buffer(records: int, seed: int = 0, start_s: int = 1_700_000_000) -> bytes:
+    """History as a strap would store it, one record per second"""
+    generator = SyntheticPayloads(seed)
+    rng = generator.rng
+    out = bytearray()
+    for n in range(records):
+        x, y, z = SyntheticPayloads._ACCEL.unpack(generator.accelerometer())
+        out += HISTORY_RECORD.pack(start_s + n, rng.randint(45, 185), rng.randint(200, 900), x, y, z)
+    return bytes(out)
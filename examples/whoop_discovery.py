@@ -1,8 +1,11 @@
 # src/devices/whoop/whoop_discovery.py
 import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from src.core.samples import Sample, SampleStore
+from src.core.sinks import SampleSink, SQLiteSink
 from src.devices.whoop.collector import WhoopCollector
+from src.utils.hot_path_logging import install_queue_logging
 
 # Known Whoop device address
 WHOOP_ADDRESS = "A227FD08-E57B-7F61-90F7-5842B94F7AE9"
@@ -16,39 +19,48 @@ logger = logging.getLogger(__name__)
 class DataLogger:
     """Helper class to log and store received data"""
     
-    def __init__(self):
-        self.data_points = []
+    def __init__(self, sink: SampleSink = None):
+        self.samples = SampleStore()
+        self.sink = sink
+        self.start_ns = None
         self.start_time = None
     
-    def handle_data(self, data_type: str, data: dict):
+    def handle_data(self, data_type: str, sample: Sample):
         """Process and log received data"""
-        if not self.start_time:
+        if self.start_ns is None:
+            self.start_ns = sample.timestamp_ns
             self.start_time = datetime.now()
         
-        timestamp = datetime.now()
-        elapsed = (timestamp - self.start_time).total_seconds()
+        self.samples.add(sample)
+        if self.sink is not None:
+            self.sink(data_type, sample)
         
-        data["timestamp"] = timestamp.isoformat()
-        data["elapsed_seconds"] = elapsed
-        self.data_points.append(data)
-        
-        if "heart_rate" in data:
-            logger.info(f"Heart Rate: {data['heart_rate']} BPM")
-        elif "hrv" in data:
-            logger.info(f"HRV: {data['hrv']} ms")
-        elif "movement" in data:
-            logger.info(f"Movement: {data['movement']}")
-        elif "battery_level" in data:
-            logger.info(f"Battery Level: {data['battery_level']}%")
+        field = sample.field
+        if field == "heart_rate_measurement":
+            measurement = sample.value
+            if measurement is not None:
+                logger.info(f"Heart Rate: {measurement.heart_rate} BPM, RR: {measurement.rr_intervals} ms")
+            else:
+                logger.debug(f"Malformed heart rate measurement: {sample.raw.hex()}")
+        elif field == "hrv":
+            logger.info(f"HRV: {sample.value} ms")
+        elif field == "movement":
+            logger.info(f"Movement: {sample.value}")
+        elif field == "battery_level":
+            logger.info(f"Battery Level: {sample.value}%")
         else:
-            logger.debug(f"Other data received: {data}")
+            logger.debug(f"Other data received: {sample}")
     
     def save_to_file(self, filename: str = "whoop_data.txt"):
         """Save collected data to a file"""
         with open(filename, "w") as f:
             f.write(f"Whoop Data Collection - {datetime.now()}\n")
             f.write("-" * 50 + "\n")
-            for data_point in self.data_points:
+            for data_point in self.samples.to_dicts():
+                # Wall-clock timestamps are only derived when writing out
+                elapsed = (data_point["timestamp_ns"] - self.start_ns) / 1e9
+                data_point["timestamp"] = (self.start_time + timedelta(seconds=elapsed)).isoformat()
+                data_point["elapsed_seconds"] = elapsed
                 f.write(f"{data_point}\n")
 
 async def run_data_collection(collector: WhoopCollector, duration: int = 60):
@@ -63,11 +75,16 @@ async def run_data_collection(collector: WhoopCollector, duration: int = 60):
         raise
 
 async def main():
-    # Create data logger
-    data_logger = DataLogger()
+    # Format and write log records on a background thread
+    log_listener = install_queue_logging()
+
+    # Create data logger, persisting every sample to SQLite off the event loop
+    sink = SQLiteSink("whoop_data.db")
+    await sink.open()
+    data_logger = DataLogger(sink)
     
     # Initialize collector with data handler
-    collector = WhoopCollector(data_callback=data_logger.handle_data)
+    collector = WhoopCollector(data_callback=data_logger.handle_data, compact_samples=True)
     
     try:
         # Connect directly to the known Whoop device
@@ -91,6 +108,8 @@ async def main():
         # Ensure cleanup happens
         if collector.is_connected:
             await collector.disconnect()
+        await sink.close()
+        log_listener.stop()
 
 if __name__ == "__main__":
     try:
@@ -4,6 +4,8 @@ setup(
     name="device_collectors",
     version="0.1.0",
     packages=find_packages(),
+    # Device profiles loaded by src.protocols.ble.profiles
+    package_data={"": ["*.yaml"]},
     install_requires=[
         "bleak>=0.19.0",
         "asyncio>=3.4.3",
@@ -0,0 +1,292 @@
+# src/core/analytics.py
+from .samples import Sample
+from array import array
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, Callable, Sequence, Tuple
+import math
+import time
+
+class RunningWindow:
+    """
+    Time-based sliding window with O(1) mean and variance
+
+    Values live in a preallocated ring of typed arrays next to running
+    sums, so adding a value and evicting expired ones is amortized O(1)
+    and memory is fixed at `capacity` entries. Values are shifted by the
+    first value of the window to keep the running sums well conditioned,
+    and the sums are recomputed exactly once per `capacity` evictions so
+    rounding error cannot build up over long sessions.
+    """
+
+    __slots__ = ("span_ns", "capacity", "_times", "_values", "_head", "_count",
+                 "_sum", "_sumsq", "_shift", "_evictions")
+
+    def __init__(self, span_s: float, capacity: int):
+        if span_s <= 0 or capacity <= 0:
+            raise ValueError("span_s and capacity must be positive")
+        self.span_ns = int(span_s * 1e9)
+        self.capacity = capacity
+        self._times = array('q', bytes(8 * capacity))
+        self._values = array('d', bytes(8 * capacity))
+        self._head = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._shift = 0.0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, timestamp_ns: int, value: float):
+        """Add a value and evict everything older than the window span"""
+        # Hot path: the eviction loop is inlined and works on locals
+        times = self._times
+        values = self._values
+        capacity = self.capacity
+        head = self._head
+        count = self._count
+        total = self._sum
+        total_sq = self._sumsq
+        cutoff = timestamp_ns - self.span_ns
+        evicted = 0
+        while count and (count == capacity or times[head] < cutoff):
+            old = values[head]
+            total -= old
+            total_sq -= old * old
+            head += 1
+            if head == capacity:
+                head = 0
+            count -= 1
+            evicted += 1
+        if count == 0:
+            # Start from clean sums whenever the window empties
+            total = total_sq = 0.0
+            self._shift = value
+        value -= self._shift
+        index = head + count
+        if index >= capacity:
+            index -= capacity
+        times[index] = timestamp_ns
+        values[index] = value
+        self._head = head
+        self._count = count + 1
+        self._sum = total + value
+        self._sumsq = total_sq + value * value
+        if evicted:
+            self._evictions += evicted
+            if self._evictions >= capacity:
+                self._resum()
+
+    def expire(self, now_ns: int):
+        cutoff = now_ns - self.span_ns
+        times = self._times
+        while self._count and times[self._head] < cutoff:
+            self._evict()
+
+    def _evict(self):
+        value = self._values[self._head]
+        self._sum -= value
+        self._sumsq -= value * value
+        self._head = (self._head + 1) % self.capacity
+        self._count -= 1
+        self._evictions += 1
+        if self._evictions >= self.capacity:
+            self._resum()
+
+    def _resum(self):
+        """Recompute the running sums from the stored values"""
+        self._evictions = 0
+        total = total_sq = 0.0
+        values = self._values
+        for i in range(self._count):
+            value = values[(self._head + i) % self.capacity]
+            total += value
+            total_sq += value * value
+        self._sum = total
+        self._sumsq = total_sq
+
+    @property
+    def mean(self) -> Optional[float]:
+        if not self._count:
+            return None
+        return self._shift + self._sum / self._count
+
+    @property
+    def variance(self) -> Optional[float]:
+        """Sample variance, None with fewer than two values"""
+        n = self._count
+        if n < 2:
+            return None
+        return max(0.0, (self._sumsq - self._sum * self._sum / n) / (n - 1))
+
+    @property
+    def std(self) -> Optional[float]:
+        variance = self.variance
+        return math.sqrt(variance) if variance is not None else None
+
+@dataclass
+class WindowSummary:
+    """Aggregates over one sliding window, emitted once per window span"""
+    window_s: float
+    end_ns: int
+    mean_hr: Optional[float]
+    rmssd: Optional[float]
+    sdnn: Optional[float]
+    rr_count: int
+    movement_mean: Optional[float]
+    movement_std: Optional[float]
+    movement_count: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class _WindowSet:
+    """The windows kept for one span"""
+
+    __slots__ = ("span_s", "span_ns", "heart_rate", "rr", "rr_diff_sq", "movement", "next_emit_ns")
+
+    def __init__(self, span_s: float, max_rate_hz: float):
+        capacity = max(16, int(math.ceil(span_s * max_rate_hz)))
+        self.span_s = span_s
+        self.span_ns = int(span_s * 1e9)
+        self.heart_rate = RunningWindow(span_s, capacity)
+        self.rr = RunningWindow(span_s, capacity)
+        self.rr_diff_sq = RunningWindow(span_s, capacity)
+        self.movement = RunningWindow(span_s, capacity)
+        self.next_emit_ns: Optional[int] = None
+
+    def summary(self, end_ns: int) -> WindowSummary:
+        for window in (self.heart_rate, self.rr, self.rr_diff_sq, self.movement):
+            window.expire(end_ns)
+        # RMSSD is the root of the mean squared successive difference
+        mean_square = self.rr_diff_sq.mean
+        return WindowSummary(
+            window_s=self.span_s,
+            end_ns=end_ns,
+            mean_hr=self.heart_rate.mean,
+            rmssd=math.sqrt(mean_square) if mean_square is not None else None,
+            sdnn=self.rr.std,
+            rr_count=len(self.rr),
+            movement_mean=self.movement.mean,
+            movement_std=self.movement.std,
+            movement_count=len(self.movement)
+        )
+
+class OnlineAnalytics:
+    """
+    Rolling HRV, heart rate and movement statistics over the sample stream
+
+    Use an instance as (or chain it in front of) a collector's data
+    callback. Heart rate and RR intervals come from Heart Rate Measurement
+    samples and movement magnitude from accelerometer samples; every
+    update is O(1). For each configured window span a WindowSummary is
+    emitted once per span of sample time, so aggregates can be shipped
+    instead of raw samples.
+    """
+
+    def __init__(
+        self,
+        windows: Sequence[float] = (5.0, 60.0),
+        on_summary: Optional[Callable[[WindowSummary], None]] = None,
+        forward: Optional[Callable[[str, Any], None]] = None,
+        max_rate_hz: float = 100.0,
+        rr_range_ms: Tuple[float, float] = (300.0, 2000.0),
+        rr_gap_s: float = 3.0
+    ):
+        """
+        Args:
+            windows: Window spans in seconds
+            on_summary: Called with each WindowSummary
+            forward: Data callback every sample is passed on to
+            max_rate_hz: Highest per-stream sample rate, sizes the ring buffers
+            rr_range_ms: RR intervals outside this range are treated as
+                artifacts and skipped
+            rr_gap_s: Time without RR intervals after which the next one
+                starts a new series instead of being differenced against
+                the last
+        """
+        self.windows = [_WindowSet(span, max_rate_hz) for span in windows]
+        self.on_summary = on_summary
+        self.forward = forward
+        self.rr_min, self.rr_max = rr_range_ms
+        self.latest: Dict[float, WindowSummary] = {}
+        self.rr_artifacts = 0
+        self.rr_gap_ns = int(rr_gap_s * 1e9)
+        self._last_rr: Optional[float] = None
+        self._last_rr_ns = 0
+        self._last_ns: Optional[int] = None
+
+    def __call__(self, data_type: str, data: Any):
+        """Data callback entry point accepting Sample records or parser dicts"""
+        if isinstance(data, Sample):
+            self.add(data.field, data.value, data.timestamp_ns)
+        else:
+            timestamp_ns = data.get("timestamp_ns") or time.monotonic_ns()
+            # The full measurement carries RR intervals the bare heart rate lacks
+            for field in ("heart_rate_measurement" if "heart_rate_measurement" in data else "heart_rate", "movement"):
+                if field in data:
+                    self.add(field, data[field], timestamp_ns)
+        if self.forward is not None:
+            self.forward(data_type, data)
+
+    def add(self, field: Optional[str], value: Any, timestamp_ns: int):
+        """Feed one decoded value"""
+        if value is None:
+            return
+        if field == "movement":
+            x, y, z = value
+            magnitude = math.sqrt(x * x + y * y + z * z)
+            for windows in self.windows:
+                windows.movement.add(timestamp_ns, magnitude)
+        elif field == "heart_rate" or field == "heart_rate_measurement":
+            # HeartRateMeasurement, or a bare heart rate
+            heart_rate = getattr(value, "heart_rate", value)
+            for windows in self.windows:
+                windows.heart_rate.add(timestamp_ns, heart_rate)
+            for rr in getattr(value, "rr_intervals", ()):
+                self.add_rr(rr, timestamp_ns)
+        else:
+            return
+        self._last_ns = timestamp_ns
+        self._maybe_emit(timestamp_ns)
+
+    def add_rr(self, rr_ms: float, timestamp_ns: int):
+        """
+        Feed one RR interval
+
+        Successive differences are only taken between adjacent valid
+        intervals: an artifact or a gap longer than `rr_gap_s` breaks the
+        series, so the interval after it does not enter RMSSD.
+        """
+        if not self.rr_min <= rr_ms <= self.rr_max:
+            self.rr_artifacts += 1
+            self._last_rr = None
+            return
+        last = self._last_rr
+        if last is not None and timestamp_ns - self._last_rr_ns > self.rr_gap_ns:
+            last = None
+        for windows in self.windows:
+            windows.rr.add(timestamp_ns, rr_ms)
+            if last is not None:
+                diff = rr_ms - last
+                windows.rr_diff_sq.add(timestamp_ns, diff * diff)
+        self._last_rr = rr_ms
+        self._last_rr_ns = timestamp_ns
+
+    def _maybe_emit(self, timestamp_ns: int):
+        for windows in self.windows:
+            if windows.next_emit_ns is None:
+                windows.next_emit_ns = timestamp_ns + windows.span_ns
+            elif timestamp_ns >= windows.next_emit_ns:
+                summary = windows.summary(timestamp_ns)
+                self.latest[windows.span_s] = summary
+                # Skip spans without data instead of emitting empty summaries
+                windows.next_emit_ns += windows.span_ns * ((timestamp_ns - windows.next_emit_ns) // windows.span_ns + 1)
+                if self.on_summary is not None:
+                    self.on_summary(summary)
+
+    def snapshot(self) -> Dict[float, WindowSummary]:
+        """Current statistics of every window, independent of the emission schedule"""
+        now_ns = self._last_ns if self._last_ns is not None else time.monotonic_ns()
+        return {w.span_s: w.summary(now_ns) for w in self.windows}
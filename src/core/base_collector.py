@@ -1,3 +1,4 @@
+from .metrics import CollectorMetrics
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any, Callable
 import logging
@@ -8,6 +9,21 @@ class DeviceCollector(ABC):
         self.device_info: Dict[str, Any] = {}
         self.data_callback: Optional[Callable] = None
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.metrics: Optional[CollectorMetrics] = None
+        # Called with False when the link drops during collection and True once it is back
+        self.connection_callback: Optional[Callable[[bool], None]] = None
+
+    def attach_metrics(self, metrics: Optional[CollectorMetrics]):
+        """Record packet counts and latencies into `metrics`, None detaches"""
+        self.metrics = metrics
+
+    def _notify_connection(self, connected: bool):
+        if self.connection_callback is None:
+            return
+        try:
+            self.connection_callback(connected)
+        except Exception as e:
+            self.logger.error(f"Connection callback failed: {str(e)}")
     
     @abstractmethod
     async def discover(self) -> bool:
@@ -0,0 +1,422 @@
+# src/core/metrics.py
+from .pipeline import PipelineStats
+from array import array
+from collections import defaultdict
+from typing import Optional, List, Dict, Any, Tuple
+import asyncio
+import logging
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of nanosecond values in the style of HdrHistogram
+
+    Every power-of-two range is split into 2**sub_bits linear buckets, so
+    recorded values keep a relative precision of 2**-sub_bits across the
+    whole range while the counts live in one fixed-size typed array.
+    Values above the top of the range land in the last bucket.
+    """
+
+    __slots__ = ("sub_bits", "_counts", "_last", "count", "total", "min", "max")
+
+    def __init__(self, sub_bits: int = 5, max_bits: int = 36):
+        """
+        Args:
+            sub_bits: Linear buckets per power of two, as a power of two
+            max_bits: Bit length of the largest distinguished value,
+                36 bits is about 68 seconds
+        """
+        self.sub_bits = sub_bits
+        buckets = ((max_bits - sub_bits) << sub_bits) + (1 << sub_bits)
+        self._counts = array('Q', bytes(8 * buckets))
+        self._last = buckets - 1
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, value: int):
+        if value < 0:
+            value = 0
+        sub_bits = self.sub_bits
+        shift = value.bit_length() - sub_bits - 1
+        if shift <= 0:
+            index = value
+        else:
+            index = (shift << sub_bits) + (value >> shift)
+            if index > self._last:
+                index = self._last
+        self._counts[index] += 1
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def _bucket_high(self, index: int) -> int:
+        """Largest value that falls into a bucket"""
+        shift = (index >> self.sub_bits) - 1
+        if shift <= 0:
+            return index
+        mantissa = index - (shift << self.sub_bits)
+        return ((mantissa + 1) << shift) - 1
+
+    def percentile(self, q: float) -> Optional[int]:
+        """Value at or below which a fraction `q` of the recorded values fall"""
+        if not self.count:
+            return None
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            if count:
+                seen += count
+                if seen >= rank:
+                    return min(self._bucket_high(index), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add the counts of a histogram with the same layout"""
+        if other.sub_bits != self.sub_bits or len(other._counts) != len(self._counts):
+            raise ValueError("Histograms have different layouts")
+        if not other.count:
+            return
+        counts = self._counts
+        for index, count in enumerate(other._counts):
+            if count:
+                counts[index] += count
+        if not self.count or other.min < self.min:
+            self.min = other.min
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def summary(self, quantiles: Tuple[float, ...] = (0.5, 0.9, 0.99, 0.999)) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"count": self.count, "mean": self.mean, "min": self.min, "max": self.max}
+        for q in quantiles:
+            data[f"p{q * 100:g}"] = self.percentile(q)
+        return data
+
+class CharacteristicMetrics:
+    """
+    Statistics of the notifications of one characteristic
+
+    Fed with sampled packets only: every `sample_every`-th notification
+    and the one after it. Each such pair gives one inter-arrival interval,
+    from which the typical interval and the jitter are exponentially
+    smoothed with a gain of 1/16 as in RFC 3550. Intervals longer than
+    `gap_factor` typical intervals are gaps and stay out of the average.
+    Losses are estimated by comparing the packets counted between the
+    first and last sample with the number the typical interval predicts,
+    which assumes the characteristic notifies at a steady rate.
+    """
+
+    __slots__ = ("gap_factor", "first_ns", "last_ns", "last_count", "mean_interval_ns", "jitter_ns",
+                 "sampled_gaps", "interarrival", "parse", "delivery")
+
+    GAIN = 1.0 / 16
+
+    def __init__(self, gap_factor: float = 1.5):
+        self.gap_factor = gap_factor
+        self.first_ns = 0
+        self.last_ns = 0
+        # Packet count at the time of the last sample
+        self.last_count = 0
+        self.mean_interval_ns = 0.0
+        self.jitter_ns = 0.0
+        self.sampled_gaps = 0
+        self.interarrival = LatencyHistogram()
+        self.parse = LatencyHistogram()
+        self.delivery = LatencyHistogram()
+
+    def sample(self, timestamp_ns: int, count: int):
+        """Account the `count`-th notification, received at `timestamp_ns`"""
+        if count == 1 or not self.first_ns:
+            self.first_ns = timestamp_ns
+        elif count == self.last_count + 1:
+            interval = timestamp_ns - self.last_ns
+            self.interarrival.record(interval)
+            mean = self.mean_interval_ns
+            if not mean:
+                self.mean_interval_ns = float(interval)
+            elif interval > mean * self.gap_factor:
+                self.sampled_gaps += 1
+            else:
+                deviation = interval - mean
+                self.mean_interval_ns = mean + deviation * self.GAIN
+                self.jitter_ns += (abs(deviation) - self.jitter_ns) * self.GAIN
+        self.last_ns = timestamp_ns
+        self.last_count = count
+
+    @property
+    def rate_hz(self) -> float:
+        """Mean packet rate between the first and last sample"""
+        if self.last_count < 2 or self.last_ns <= self.first_ns:
+            return 0.0
+        return (self.last_count - 1) * 1e9 / (self.last_ns - self.first_ns)
+
+    @property
+    def lost_estimate(self) -> int:
+        """Packets missing between the first and last sample at the typical interval"""
+        if not self.mean_interval_ns or self.last_count < 2:
+            return 0
+        expected = int((self.last_ns - self.first_ns) / self.mean_interval_ns + 0.5) + 1
+        return max(0, expected - self.last_count)
+
+    def snapshot(self, packets: int) -> Dict[str, Any]:
+        return {
+            "packets": packets,
+            "rate_hz": self.rate_hz,
+            "mean_interval_ns": self.mean_interval_ns,
+            "jitter_ns": self.jitter_ns,
+            "sampled_gaps": self.sampled_gaps,
+            "lost_estimate": self.lost_estimate,
+            "interarrival_ns": self.interarrival.summary(),
+            "parse_ns": self.parse.summary(),
+            "delivery_ns": self.delivery.summary(),
+        }
+
+class CollectorMetrics:
+    """
+    Instrumentation of one collector
+
+    Every notification bumps a per-characteristic packet count, and two
+    consecutive packets in every `sample_every` of a characteristic feed
+    its inter-arrival statistics. Parse and delivery latency are timed
+    for one packet per `sample_every`, so the clock is read only on
+    sampled packets. Only the event loop thread writes, so the counters
+    are plain dicts and typed arrays without locks; a snapshot taken
+    from another thread may be a packet behind but never blocks the
+    notification path.
+    """
+
+    def __init__(self, device_id: str, sample_every: int = 64, gap_factor: float = 1.5):
+        """
+        Args:
+            device_id: Label of the device in snapshots and exports
+            sample_every: Sampling period in packets, a power of two
+            gap_factor: Inter-arrival interval, in typical intervals, that counts as a gap
+        """
+        if sample_every <= 0 or sample_every & (sample_every - 1):
+            raise ValueError("sample_every must be a power of two")
+        self.device_id = device_id
+        self.sample_every = sample_every
+        self.gap_factor = gap_factor
+        self.packets: Dict[str, int] = defaultdict(int)
+        self.characteristics: Dict[str, CharacteristicMetrics] = {}
+        self.parse_errors = 0
+        self.pipeline_stats: Optional[PipelineStats] = None
+        self._mask = sample_every - 1
+        self._countdown = sample_every
+
+    def characteristic(self, char_uuid: str) -> CharacteristicMetrics:
+        metrics = self.characteristics.get(char_uuid)
+        if metrics is None:
+            metrics = self.characteristics[char_uuid] = CharacteristicMetrics(self.gap_factor)
+        return metrics
+
+    def arrival(self, char_uuid: str, timestamp_ns: int) -> bool:
+        """
+        Hook for notifications delivered without a queue, called for every packet
+
+        Returns:
+            Whether the packet was sampled, callers may time its processing
+        """
+        packets = self.packets
+        count = packets[char_uuid] + 1
+        packets[char_uuid] = count
+        if count & self._mask > 1:
+            return False
+        self.characteristic(char_uuid).sample(timestamp_ns, count)
+        return True
+
+    def consume(self, batch: List[Tuple[int, str, Any, Any]]) -> bool:
+        """
+        Pipeline hook, called with every batch of (timestamp_ns, char_uuid, data, decoder)
+
+        Returns:
+            Whether the caller should time the first notification of the batch
+        """
+        packets = self.packets
+        mask = self._mask
+        for timestamp_ns, char_uuid, _, _ in batch:
+            count = packets[char_uuid] + 1
+            packets[char_uuid] = count
+            if count & mask < 2:
+                self.characteristic(char_uuid).sample(timestamp_ns, count)
+        self._countdown -= len(batch)
+        if self._countdown > 0:
+            return False
+        self._countdown = self.sample_every
+        return True
+
+    def record_parse(self, char_uuid: str, parse_ns: int, delivery_ns: int):
+        """
+        Record a timed packet
+
+        Args:
+            parse_ns: Time spent decoding the payload
+            delivery_ns: Time from arrival until the decoded value was ready,
+                including any time spent queued
+        """
+        metrics = self.characteristic(char_uuid)
+        metrics.parse.record(parse_ns)
+        metrics.delivery.record(delivery_ns)
+
+    def snapshot(self) -> Dict[str, Any]:
+        characteristics = {}
+        parse = LatencyHistogram()
+        delivery = LatencyHistogram()
+        lost = 0
+        for char_uuid, metrics in list(self.characteristics.items()):
+            characteristics[char_uuid] = metrics.snapshot(self.packets[char_uuid])
+            parse.merge(metrics.parse)
+            delivery.merge(metrics.delivery)
+            lost += metrics.lost_estimate
+        return {
+            "device_id": self.device_id,
+            "packets": sum(self.packets.values()),
+            "lost_estimate": lost,
+            "parse_errors": self.parse_errors,
+            "parse_ns": parse.summary(),
+            "delivery_ns": delivery.summary(),
+            "pipeline": self.pipeline_stats.as_dict() if self.pipeline_stats is not None else None,
+            "characteristics": characteristics,
+        }
+
+class MetricsRegistry:
+    """Collector metrics of every device, with snapshot and Prometheus text export"""
+
+    def __init__(self, sample_every: int = 16, gap_factor: float = 1.5):
+        self.sample_every = sample_every
+        self.gap_factor = gap_factor
+        self.devices: Dict[str, CollectorMetrics] = {}
+
+    def device(self, device_id: str) -> CollectorMetrics:
+        """Metrics of a device, created on first use"""
+        metrics = self.devices.get(device_id)
+        if metrics is None:
+            metrics = self.devices[device_id] = CollectorMetrics(device_id, self.sample_every, self.gap_factor)
+        return metrics
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {device_id: metrics.snapshot() for device_id, metrics in list(self.devices.items())}
+
+    def render_prometheus(self) -> str:
+        """Current metrics in the Prometheus text exposition format"""
+        return render_prometheus(self.snapshot())
+
+# (name, snapshot key, type, help) of the per-characteristic series
+_PROMETHEUS_SERIES = (
+    ("collector_packets_total", "packets", "counter", "Notifications received"),
+    ("collector_lost_packets_estimate", "lost_estimate", "gauge", "Packets estimated missing from the stream"),
+    ("collector_packet_rate_hz", "rate_hz", "gauge", "Mean notification rate"),
+    ("collector_jitter_seconds", "jitter_ns", "gauge", "Smoothed inter-arrival jitter"),
+)
+_PROMETHEUS_SUMMARIES = (
+    ("collector_interarrival_seconds", "interarrival_ns", "Sampled notification inter-arrival time"),
+    ("collector_parse_seconds", "parse_ns", "Sampled payload decode time"),
+    ("collector_delivery_seconds", "delivery_ns", "Sampled time from arrival to decoded value"),
+)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def render_prometheus(snapshot: Dict[str, Dict[str, Any]]) -> str:
+    """Render a MetricsRegistry snapshot in the Prometheus text exposition format"""
+    lines: List[str] = []
+    streams = [
+        (f'device="{_escape(device_id)}",characteristic="{_escape(char_uuid)}"', char)
+        for device_id, device in snapshot.items()
+        for char_uuid, char in device["characteristics"].items()
+    ]
+    for name, key, kind, help_text in _PROMETHEUS_SERIES:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        scale = 1e-9 if key.endswith("_ns") else 1
+        for labels, char in streams:
+            lines.append(f"{name}{{{labels}}} {char[key] * scale:g}")
+    for name, key, help_text in _PROMETHEUS_SUMMARIES:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} summary")
+        for labels, char in streams:
+            summary = char[key]
+            for q in ("0.5", "0.9", "0.99", "0.999"):
+                value = summary[f"p{float(q) * 100:g}"]
+                if value is not None:
+                    lines.append(f'{name}{{{labels},quantile="{q}"}} {value * 1e-9:g}')
+            total = (summary["mean"] or 0.0) * summary["count"]
+            lines.append(f"{name}_sum{{{labels}}} {total * 1e-9:g}")
+            lines.append(f"{name}_count{{{labels}}} {summary['count']}")
+
+    lines.append("# HELP collector_parse_errors_total Notifications that failed to decode")
+    lines.append("# TYPE collector_parse_errors_total counter")
+    for device_id, device in snapshot.items():
+        lines.append(f'collector_parse_errors_total{{device="{_escape(device_id)}"}} {device["parse_errors"]}')
+    lines.append("# HELP collector_pipeline_dropped_total Notifications dropped by the ingest pipeline")
+    lines.append("# TYPE collector_pipeline_dropped_total counter")
+    for device_id, device in snapshot.items():
+        if device["pipeline"] is not None:
+            lines.append(
+                f'collector_pipeline_dropped_total{{device="{_escape(device_id)}"}} {device["pipeline"]["dropped"]}'
+            )
+    return "\n".join(lines) + "\n"
+
+class MetricsServer:
+    """
+    Serves a MetricsRegistry as Prometheus text on a local HTTP port
+
+    Runs on the collector's event loop; every request renders a fresh
+    snapshot. Binds to the loopback interface unless told otherwise.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        # Pick up the actual port when 0 was requested
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "MetricsServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readline()
+            # Skip the request headers
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request.split()
+            if len(parts) >= 2 and parts[0] == b"GET" and parts[1].split(b"?")[0] in (b"/metrics", b"/"):
+                status, body = "200 OK", self.registry.render_prometheus().encode()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status, body, content_type = "404 Not Found", b"Not found\n", "text/plain"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except Exception as e:
+            self.logger.debug("Metrics request failed: %s", e)
+        finally:
+            writer.close()
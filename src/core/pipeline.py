@@ -0,0 +1,349 @@
+# src/core/pipeline.py
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict, Any, Callable, Awaitable, Union, BinaryIO
+import asyncio
+import inspect
+import logging
+import pickle
+import tempfile
+
+BatchConsumer = Callable[[List[Any]], Union[None, Awaitable[None]]]
+
+class BackpressurePolicy:
+    """
+    What the pipeline does with new items when the queue is full
+
+    DROP_OLDEST discards the oldest queued item. BLOCK makes `put` wait
+    for space, which only helps producers that can be paused, such as a
+    replay or a file import; a radio cannot be paused, so `submit` drops
+    the new item instead. SPILL writes the overflow to disk and reads it
+    back in order once the consumer catches up.
+    """
+
+    DROP_OLDEST = "drop_oldest"
+    BLOCK = "block"
+    SPILL = "spill"
+
+    ALL = (DROP_OLDEST, BLOCK, SPILL)
+
+@dataclass
+class PipelineStats:
+    """Counters describing pipeline throughput and loss"""
+    enqueued: int = 0
+    dropped: int = 0
+    spilled: int = 0
+    consumed: int = 0
+    batches: int = 0
+    max_depth: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+class IngestPipeline:
+    """
+    Bounded queue between a notification callback and a slow consumer
+
+    `submit` never blocks and does O(1) work, so it is safe to call from
+    bleak's notification callback. A consumer task drains the queue in
+    batches and hands each batch to the consumer callable, which may be a
+    regular function or a coroutine function. Spilled items are pickled
+    and written by one dedicated thread, so disk I/O never runs on the
+    event loop.
+    """
+
+    def __init__(
+        self,
+        consumer: BatchConsumer,
+        maxsize: int = 1024,
+        policy: str = BackpressurePolicy.DROP_OLDEST,
+        batch_size: int = 64,
+        spill_path: Optional[str] = None,
+        spill_encode: Optional[Callable[[Any], Any]] = None
+    ):
+        """
+        Args:
+            consumer: Called with every batch of items, in order
+            maxsize: Items held in memory
+            policy: BackpressurePolicy applied when the queue is full
+            batch_size: Maximum items handed to the consumer at once
+            spill_path: File used by the spill policy, a temporary file if omitted
+            spill_encode: Applied to items before they are pickled to the
+                spill file, e.g. to drop parts that cannot be pickled
+        """
+        if policy not in BackpressurePolicy.ALL:
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        if maxsize <= 0 or batch_size <= 0:
+            raise ValueError("maxsize and batch_size must be positive")
+
+        self.consumer = consumer
+        self.maxsize = maxsize
+        self.policy = policy
+        self.batch_size = batch_size
+        self.spill_path = spill_path
+        self.spill_encode = spill_encode
+        self.stats = PipelineStats()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._queue: deque = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._has_items: Optional[asyncio.Event] = None
+        self._not_full: Optional[asyncio.Event] = None
+        # Spilled items: pending counts those waiting to be written in
+        # _spill_buffer and those handed to the writer (_spill_on_disk)
+        self._spill_pending = 0
+        self._spill_buffer: List[Any] = []
+        self._spill_on_disk = 0
+        self._spill_scheduled = False
+        self._spill_executor: Optional[ThreadPoolExecutor] = None
+        # Only touched on the spill thread
+        self._spill_file: Optional[BinaryIO] = None
+        self._spill_read_offset = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of items waiting in memory and on disk"""
+        return len(self._queue) + self._spill_pending
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def submit(self, item: Any) -> bool:
+        """
+        Enqueue an item without blocking
+
+        Returns:
+            bool: False if the item was dropped
+        """
+        queue = self._queue
+        if self._spill_pending:
+            # Keep FIFO order: once items are on disk, newer items follow them
+            self._spill(item)
+            return True
+
+        if len(queue) >= self.maxsize:
+            if self.policy == BackpressurePolicy.DROP_OLDEST:
+                queue.popleft()
+                self.stats.dropped += 1
+            elif self.policy == BackpressurePolicy.SPILL:
+                self._spill(item)
+                return True
+            else:
+                # A synchronous caller cannot wait, use put() to block
+                self.stats.dropped += 1
+                return False
+
+        queue.append(item)
+        self.stats.enqueued += 1
+        if len(queue) > self.stats.max_depth:
+            self.stats.max_depth = len(queue)
+        if self._has_items is not None:
+            self._has_items.set()
+        return True
+
+    async def put(self, item: Any) -> bool:
+        """
+        Enqueue an item, waiting for space under the block policy
+
+        For producers that can be paused. Do not hand a coroutine calling
+        this to bleak as a notification callback: bleak runs every call in
+        a new task, so waiting callbacks would pile up without bound.
+
+        Returns:
+            bool: False if the item was dropped
+        """
+        if self.policy == BackpressurePolicy.BLOCK and self._not_full is not None:
+            while len(self._queue) >= self.maxsize and self.is_running:
+                self._not_full.clear()
+                await self._not_full.wait()
+        return self.submit(item)
+
+    async def start(self):
+        """Start the consumer task on the running event loop"""
+        if self.is_running:
+            return
+        self._stopping = False
+        self._has_items = asyncio.Event()
+        self._not_full = asyncio.Event()
+        if self._queue or self._spill_pending:
+            self._has_items.set()
+        if self._spill_buffer:
+            self._schedule_spill_write()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, drain: bool = True):
+        """
+        Stop the consumer task
+
+        Args:
+            drain: Deliver everything still queued before returning
+        """
+        task, self._task = self._task, None
+        if task is not None:
+            # Let the batch being consumed finish rather than losing it
+            self._stopping = True
+            self._has_items.set()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        if drain:
+            while self.depth:
+                await self._consume(await self._next_batch())
+        else:
+            self.stats.dropped += self.depth
+            self._queue.clear()
+            self._spill_buffer.clear()
+            self._spill_pending = 0
+            self._spill_on_disk = 0
+
+        if self._not_full is not None:
+            self._not_full.set()
+        await self._close_spill()
+
+    async def _run(self):
+        """Consumer loop: wait for items and deliver them in batches"""
+        while not self._stopping:
+            await self._has_items.wait()
+            if self._stopping:
+                break
+            batch = await self._next_batch()
+            if not batch:
+                self._has_items.clear()
+                continue
+            await self._consume(batch)
+            # Let the notification callbacks run between batches
+            await asyncio.sleep(0)
+
+    async def _next_batch(self) -> List[Any]:
+        """Pop up to batch_size items, refilling from disk when memory is empty"""
+        queue = self._queue
+        if not queue and self._spill_pending:
+            return await self._unspill(self.batch_size)
+
+        count = min(self.batch_size, len(queue))
+        batch = [queue.popleft() for _ in range(count)]
+        if self._not_full is not None and len(queue) < self.maxsize:
+            self._not_full.set()
+        return batch
+
+    async def _consume(self, batch: List[Any]):
+        if not batch:
+            return
+        try:
+            result = self.consumer(batch)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            self.logger.error(f"Consumer failed on batch of {len(batch)}: {str(e)}")
+        self.stats.consumed += len(batch)
+        self.stats.batches += 1
+
+    def _spill(self, item: Any):
+        """Queue an item for the spill file, written on the next loop iteration"""
+        self._spill_buffer.append(item)
+        self._spill_pending += 1
+        self.stats.spilled += 1
+        self.stats.enqueued += 1
+        if self.depth > self.stats.max_depth:
+            self.stats.max_depth = self.depth
+        if self._has_items is not None:
+            self._has_items.set()
+        if not self._spill_scheduled:
+            self._schedule_spill_write()
+
+    def _schedule_spill_write(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Written once the pipeline starts on a loop
+            return
+        self._spill_scheduled = True
+        loop.call_soon(self._write_spill_buffer)
+
+    def _write_spill_buffer(self):
+        """Hand everything spilled since the last call to the spill thread"""
+        self._spill_scheduled = False
+        items, self._spill_buffer = self._spill_buffer, []
+        if not items:
+            return
+        if self._spill_executor is None:
+            self._spill_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-spill")
+        self._spill_on_disk += len(items)
+        future = asyncio.get_running_loop().run_in_executor(self._spill_executor, self._write_items, items)
+        future.add_done_callback(lambda done: self._on_spill_written(done, len(items)))
+
+    def _on_spill_written(self, future: asyncio.Future, count: int):
+        if future.cancelled() or future.exception() is None:
+            return
+        self.logger.error(f"Failed to spill {count} items: {str(future.exception())}")
+        # Reads queued behind the failed write will come up short by as many items
+        self.stats.dropped += count
+
+    def _write_items(self, items: List[Any]):
+        """Append items to the spill file, runs on the spill thread"""
+        if self._spill_file is None:
+            if self.spill_path:
+                self._spill_file = open(self.spill_path, "w+b")
+            else:
+                self._spill_file = tempfile.TemporaryFile()
+        spill = self._spill_file
+        spill.seek(0, 2)
+        encode = self.spill_encode
+        for item in items:
+            pickle.dump(item if encode is None else encode(item), spill, protocol=pickle.HIGHEST_PROTOCOL)
+
+    async def _unspill(self, count: int) -> List[Any]:
+        """Take up to count spilled items, oldest first"""
+        if not self._spill_on_disk:
+            # Nothing written yet, the oldest items are still in memory
+            batch = self._spill_buffer[:count]
+            del self._spill_buffer[:count]
+            self._spill_pending -= len(batch)
+            return batch
+        count = min(count, self._spill_on_disk)
+        self._spill_on_disk -= count
+        self._spill_pending -= count
+        # The spill thread runs in order, so the writes of these items come first
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._spill_executor, self._read_items, count)
+
+    def _read_items(self, count: int) -> List[Any]:
+        """Read items back from the spill file, runs on the spill thread"""
+        spill = self._spill_file
+        if spill is None:
+            return []
+        spill.seek(self._spill_read_offset)
+        batch = []
+        try:
+            for _ in range(count):
+                batch.append(pickle.load(spill))
+        except EOFError:
+            # Short after a failed write, already counted as dropped
+            pass
+        self._spill_read_offset = spill.tell()
+
+        if self._spill_read_offset >= spill.seek(0, 2):
+            # Everything on disk has been delivered, start the file over
+            spill.seek(0)
+            spill.truncate()
+            self._spill_read_offset = 0
+        return batch
+
+    async def _close_spill(self):
+        executor, self._spill_executor = self._spill_executor, None
+        self._spill_scheduled = False
+        if executor is None:
+            return
+        await asyncio.get_running_loop().run_in_executor(executor, self._close_spill_file)
+        executor.shutdown(wait=False)
+
+    def _close_spill_file(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+            self._spill_read_offset = 0
@@ -0,0 +1,340 @@
+# src/core/pool.py
+from .base_collector import DeviceCollector
+from .metrics import MetricsRegistry
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, Callable, List, Tuple
+import asyncio
+import logging
+import time
+
+# (device id, data type, data) delivered on the merged output channel
+TaggedItem = Tuple[str, str, Any]
+
+class DeviceState:
+    """Connection states tracked per pooled device"""
+
+    IDLE = "idle"
+    DISCOVERING = "discovering"
+    CONNECTING = "connecting"
+    COLLECTING = "collecting"
+    # Link lost during collection, until the collector reconnects
+    DISCONNECTED = "disconnected"
+    FAILED = "failed"
+    STOPPED = "stopped"
+
+@dataclass
+class DeviceStatus:
+    """Connection state and throughput of one pooled device"""
+    device_id: str
+    state: str = DeviceState.IDLE
+    connect_attempts: int = 0
+    disconnects: int = 0
+    samples: int = 0
+    last_error: Optional[str] = None
+    connected_at_ns: Optional[int] = None
+    last_sample_ns: Optional[int] = None
+
+    @property
+    def samples_per_s(self) -> float:
+        if self.connected_at_ns is None or self.last_sample_ns is None:
+            return 0.0
+        elapsed = (time.monotonic_ns() - self.connected_at_ns) / 1e9
+        return self.samples / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        status = asdict(self)
+        status["samples_per_s"] = self.samples_per_s
+        return status
+
+class CollectorPool:
+    """
+    Runs many DeviceCollectors on one event loop
+
+    Connection attempts are staggered and limited in concurrency so the
+    adapter is not flooded, collectors share one scanner and devices
+    without an address are all resolved from a single scan, and every
+    stream is merged into a single output channel tagged by device id.
+    """
+
+    def __init__(
+        self,
+        output: Optional[Callable[[str, str, Any], None]] = None,
+        max_concurrent_connects: int = 2,
+        connect_interval: float = 0.25,
+        connect_retries: int = 3,
+        retry_delay: float = 2.0,
+        channel_size: int = 10000,
+        scanner: Any = None,
+        discovery_timeout: float = 5.0,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Args:
+            output: Called with (device_id, data_type, data) for every sample;
+                without it samples are put on the `channel` queue
+            max_concurrent_connects: Connection attempts allowed in flight
+            connect_interval: Minimum seconds between starting two attempts
+            connect_retries: Attempts per device before it is marked failed
+            retry_delay: Seconds to wait between attempts for one device
+            channel_size: Bound of the output queue, newest items are dropped when full
+            scanner: Scanner handed to every collector that has a `scanner` attribute
+            discovery_timeout: Seconds the shared scan waits for devices without an address
+            metrics: Registry every added collector records its metrics into
+        """
+        self.output = output
+        self.max_concurrent_connects = max_concurrent_connects
+        self.connect_interval = connect_interval
+        self.connect_retries = connect_retries
+        self.retry_delay = retry_delay
+        self.scanner = scanner
+        self.discovery_timeout = discovery_timeout
+        self.metrics = metrics
+        self.channel: asyncio.Queue = asyncio.Queue(maxsize=channel_size)
+        self.channel_dropped = 0
+        self.collectors: Dict[str, DeviceCollector] = {}
+        self.status: Dict[str, DeviceStatus] = {}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._connect_slots: Optional[asyncio.Semaphore] = None
+        self._slot_lock: Optional[asyncio.Lock] = None
+        self._scan_lock: Optional[asyncio.Lock] = None
+        self._next_attempt = 0.0
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self.collectors)
+
+    def add(self, device_id: str, collector: DeviceCollector):
+        """Register a collector; its data callback is replaced by the pool's"""
+        if device_id in self.collectors:
+            raise ValueError(f"Device {device_id} is already in the pool")
+        if self.scanner is not None and hasattr(collector, "scanner"):
+            collector.scanner = self.scanner
+        self.status[device_id] = DeviceStatus(device_id)
+        collector.data_callback = self._tagger(device_id)
+        collector.connection_callback = self._state_tracker(device_id)
+        if self.metrics is not None:
+            collector.attach_metrics(self.metrics.device(device_id))
+        self.collectors[device_id] = collector
+
+    def _tagger(self, device_id: str) -> Callable[[str, Any], None]:
+        """Build the data callback that tags and merges one device's stream"""
+        status_map = self.status
+
+        def on_data(data_type: str, data: Any):
+            status = status_map[device_id]
+            status.samples += 1
+            status.last_sample_ns = time.monotonic_ns()
+            if self.output is not None:
+                try:
+                    self.output(device_id, data_type, data)
+                except Exception as e:
+                    self.logger.error(f"Output callback failed for {device_id}: {str(e)}")
+                return
+            try:
+                self.channel.put_nowait((device_id, data_type, data))
+            except asyncio.QueueFull:
+                self.channel_dropped += 1
+
+        return on_data
+
+    def _state_tracker(self, device_id: str) -> Callable[[bool], None]:
+        """Build the connection callback keeping a collecting device's state current"""
+        status = self.status[device_id]
+
+        def on_connection(connected: bool):
+            # Bring-up and tear-down set the state themselves
+            if status.state not in (DeviceState.COLLECTING, DeviceState.DISCONNECTED):
+                return
+            if connected:
+                status.state = DeviceState.COLLECTING
+            else:
+                status.state = DeviceState.DISCONNECTED
+                status.disconnects += 1
+
+        return on_connection
+
+    async def start(self):
+        """Connect every collector and start collection, staggering attempts"""
+        self._connect_slots = asyncio.Semaphore(self.max_concurrent_connects)
+        self._slot_lock = asyncio.Lock()
+        self._scan_lock = asyncio.Lock()
+        self._next_attempt = 0.0
+        await self._resolve_addresses()
+        for device_id in self.collectors:
+            if device_id not in self._tasks or self._tasks[device_id].done():
+                self._tasks[device_id] = asyncio.create_task(self._bring_up(device_id))
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        connected = sum(1 for s in self.status.values() if s.state == DeviceState.COLLECTING)
+        self.logger.info(f"Pool started: {connected}/{len(self.collectors)} devices collecting")
+
+    async def _resolve_addresses(self):
+        """
+        Resolve every collector without an address from one shared scan
+
+        The scan fills the scanner's device index and each pending collector
+        takes the strongest match of its scan filters not claimed by another
+        collector. Devices still missing afterwards fall back to their own
+        discover() during bring-up.
+        """
+        pending = {
+            device_id: collector for device_id, collector in self.collectors.items()
+            if hasattr(collector, "scan_filters") and not collector.device_address
+            and self.status[device_id].state != DeviceState.COLLECTING
+        }
+        if not pending:
+            return
+        scanner = self.scanner or next(iter(pending.values())).scanner
+        claimed = {
+            collector.device_address for collector in self.collectors.values()
+            if getattr(collector, "device_address", None)
+        }
+        filters = {device_id: collector.scan_filters() for device_id, collector in pending.items()}
+        for device_id in pending:
+            self.status[device_id].state = DeviceState.DISCOVERING
+
+        advertised = asyncio.Event()
+        listener = lambda entry: advertised.set()
+        scanner.add_listener(listener)
+        started = not scanner.is_scanning
+        if started:
+            await scanner.start()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.discovery_timeout
+        try:
+            while True:
+                advertised.clear()
+                for device_id, collector in list(pending.items()):
+                    address = self._claim(scanner, filters[device_id], claimed)
+                    if address is not None:
+                        collector.device_address = address
+                        del pending[device_id]
+                        self.logger.info(f"{device_id}: found {address}")
+                remaining = deadline - loop.time()
+                if not pending or remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(advertised.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            scanner.remove_listener(listener)
+            if started:
+                await scanner.stop()
+        if pending:
+            self.logger.warning(f"Shared scan found no device for {', '.join(pending)}")
+
+    @staticmethod
+    def _claim(scanner: Any, scan_filters: List[Any], claimed: set) -> Optional[str]:
+        """Strongest unclaimed device matching one of the filters, in filter order"""
+        for scan_filter in scan_filters:
+            for entry in scanner.find(scan_filter):
+                if entry.address not in claimed:
+                    claimed.add(entry.address)
+                    return entry.address
+        return None
+
+    async def stop(self):
+        """Stop collection and disconnect every collector"""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+        await asyncio.gather(
+            *(self._tear_down(device_id) for device_id in self.collectors),
+            return_exceptions=True
+        )
+        self.logger.info("Pool stopped")
+
+    async def _wait_for_slot(self):
+        """Space attempt starts at least connect_interval apart"""
+        async with self._slot_lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            start = max(now, self._next_attempt)
+            self._next_attempt = start + self.connect_interval
+        delay = start - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _bring_up(self, device_id: str):
+        collector = self.collectors[device_id]
+        status = self.status[device_id]
+
+        for attempt in range(self.connect_retries):
+            try:
+                status.state = DeviceState.DISCOVERING
+                async with self._scan_lock:
+                    # The shared scanner can only run one scan at a time
+                    found = await collector.discover()
+                if not found:
+                    raise RuntimeError("device not found")
+
+                async with self._connect_slots:
+                    await self._wait_for_slot()
+                    status.state = DeviceState.CONNECTING
+                    status.connect_attempts += 1
+                    if not await collector.connect():
+                        raise RuntimeError("connect failed")
+
+                if not await collector.start_collection():
+                    raise RuntimeError("start_collection failed")
+
+                status.state = DeviceState.COLLECTING
+                status.connected_at_ns = time.monotonic_ns()
+                status.last_error = None
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                status.last_error = str(e)
+                self.logger.warning(f"{device_id}: attempt {attempt + 1} failed: {str(e)}")
+                if collector.is_connected:
+                    await self._safe_disconnect(collector)
+                if attempt + 1 < self.connect_retries:
+                    await asyncio.sleep(self.retry_delay)
+
+        status.state = DeviceState.FAILED
+        self.logger.error(f"{device_id}: giving up after {self.connect_retries} attempts")
+
+    async def _tear_down(self, device_id: str):
+        collector = self.collectors[device_id]
+        status = self.status[device_id]
+        if collector.is_connected:
+            try:
+                await collector.stop_collection()
+            except Exception as e:
+                self.logger.warning(f"{device_id}: stop_collection failed: {str(e)}")
+            await self._safe_disconnect(collector)
+        if status.state != DeviceState.FAILED:
+            status.state = DeviceState.STOPPED
+
+    async def _safe_disconnect(self, collector: DeviceCollector):
+        try:
+            await collector.disconnect()
+        except Exception as e:
+            self.logger.warning(f"Disconnect failed: {str(e)}")
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-device state and throughput"""
+        return {device_id: status.as_dict() for device_id, status in self.status.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        """Pool-wide counts by state and total throughput"""
+        states: Dict[str, int] = {}
+        for status in self.status.values():
+            states[status.state] = states.get(status.state, 0) + 1
+        return {
+            "devices": len(self.status),
+            "states": states,
+            "samples": sum(s.samples for s in self.status.values()),
+            "samples_per_s": sum(s.samples_per_s for s in self.status.values()),
+            "channel_dropped": self.channel_dropped,
+        }
+
+    async def items(self) -> List[TaggedItem]:
+        """Wait for and return everything currently on the output channel"""
+        items = [await self.channel.get()]
+        while not self.channel.empty():
+            items.append(self.channel.get_nowait())
+        return items
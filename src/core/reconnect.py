@@ -0,0 +1,77 @@
+# src/core/reconnect.py
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Optional, Deque, Dict, Any
+import random
+
+# Recent gaps kept by ReconnectStats; totals cover every gap
+MAX_RECENT_GAPS = 64
+
+@dataclass
+class ReconnectPolicy:
+    """Jittered exponential backoff between reconnect attempts"""
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    max_attempts: Optional[int] = None
+    jitter: float = 0.5
+
+    def delay(self, attempt: int) -> float:
+        """
+        Seconds to wait before the given attempt (0-based)
+
+        The exponential delay is scaled by a random factor in
+        [1 - jitter, 1] so many devices dropped at once don't retry in step.
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * (1.0 - self.jitter * random.random())
+
+    def should_retry(self, attempt: int) -> bool:
+        return self.max_attempts is None or attempt < self.max_attempts
+
+@dataclass
+class DataGap:
+    """A period without data caused by a lost connection"""
+    start_ns: int
+    end_ns: Optional[int] = None
+    attempts: int = 0
+
+    @property
+    def duration_s(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e9
+
+@dataclass
+class ReconnectStats:
+    """
+    Disconnect and reconnect counters with reconnect latency
+
+    Only the last MAX_RECENT_GAPS gaps are kept, so a device that keeps
+    dropping does not grow the stats; the counters and total_gap_s
+    cover every gap.
+    """
+    disconnects: int = 0
+    reconnects: int = 0
+    failed_attempts: int = 0
+    last_reconnect_s: Optional[float] = None
+    max_reconnect_s: float = 0.0
+    total_gap_s: float = 0.0
+    gaps: Deque[DataGap] = field(default_factory=lambda: deque(maxlen=MAX_RECENT_GAPS))
+
+    def open_gap(self, start_ns: int) -> DataGap:
+        self.disconnects += 1
+        gap = DataGap(start_ns)
+        self.gaps.append(gap)
+        return gap
+
+    def close_gap(self, gap: DataGap, end_ns: int):
+        gap.end_ns = end_ns
+        self.reconnects += 1
+        self.last_reconnect_s = gap.duration_s
+        self.max_reconnect_s = max(self.max_reconnect_s, gap.duration_s)
+        self.total_gap_s += gap.duration_s
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["gaps"] = list(data["gaps"])
+        return data
@@ -0,0 +1,473 @@
+# src/core/recording.py
+"""
+Append-only binary session recordings
+
+A recording is a file header followed by records. Each record is a
+fixed header (payload length, kind, characteristic id, monotonic
+timestamp in ns) followed by the payload. Characteristic ids are local
+to the file and declared by a definition record holding the UUID before
+their first sample.
+
+Every recording session starts with a session record holding the wall
+clock time of its first timestamp. Monotonic clocks restart with the
+machine, so a session appended with timestamps at or before the end of
+the file is shifted to continue its timeline by the wall clock time
+elapsed since; timestamps never go backwards within a file.
+
+A sidecar index (`<path>.idx`) holds seek points and the offsets of the
+definition records, so a reader can slice a large capture by time
+without scanning it. Without the sidecar the reader rebuilds the index
+with a single scan.
+"""
+from bisect import bisect_right
+from typing import Optional, List, Dict, Tuple, Iterator, BinaryIO, Any
+import logging
+import mmap
+import os
+import struct
+import time
+
+FILE_MAGIC = b"DCREC001"
+INDEX_MAGIC = b"DCIDX001"
+
+# payload length, record kind, characteristic id, timestamp_ns
+RECORD_HEADER = struct.Struct('<IBHq')
+# entry kind, timestamp_ns or characteristic id, file offset
+INDEX_ENTRY = struct.Struct('<BqQ')
+
+RECORD_SAMPLE = 0
+RECORD_CHARACTERISTIC = 1
+RECORD_SESSION = 2
+
+INDEX_SEEK_POINT = 0
+INDEX_CHARACTERISTIC = 1
+INDEX_SESSION = 2
+
+# Wall clock time in ns of a session record's timestamp
+SESSION_PAYLOAD = struct.Struct('<q')
+
+class RecordingError(Exception):
+    """Raised for files that are not valid recordings"""
+
+def index_path(path: str) -> str:
+    return path + ".idx"
+
+class SessionRecorder:
+    """
+    Streams raw notifications to an append-only recording
+
+    Records are buffered and flushed every `flush_interval` seconds, so a
+    crash loses at most that much data. Readers ignore a torn final record.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        index_interval: int = 1024,
+        flush_interval: float = 1.0,
+        fsync: bool = False
+    ):
+        """
+        Args:
+            path: Recording file, appended to if it already exists
+            index_interval: Records between seek points in the sidecar index
+            flush_interval: Seconds between flushes to the OS
+            fsync: Also fsync on every flush
+        """
+        self.path = path
+        self.index_interval = index_interval
+        self.flush_interval_ns = int(flush_interval * 1e9)
+        self.fsync = fsync
+        self.records_written = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._ids: Dict[str, int] = {}
+        self._next_id = 0
+        self._file: Optional[BinaryIO] = None
+        self._index: Optional[BinaryIO] = None
+        self._offset = 0
+        self._since_seek_point = 0
+        self._last_flush_ns = 0
+        # Shift applied to the timestamps of this session, set by its first record
+        self._shift_ns: Optional[int] = None
+        # Last timestamp of the file and its wall clock time when appending
+        self._file_end: Optional[Tuple[int, int]] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    def open(self):
+        """Open the recording, writing the file headers for a new file"""
+        if self._file is not None:
+            return
+        self._shift_ns = None
+        self._file_end = None
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            # Keep the ids already declared in the file when appending and
+            # cut off a record torn by a crash so new records stay aligned
+            with RecordingReader(self.path) as reader:
+                for char_id, uuid in reader.characteristics.items():
+                    self._ids[uuid] = char_id
+                self._next_id = max(reader.characteristics, default=-1) + 1
+                valid_end, last_ns = reader.tail()
+                if last_ns is not None:
+                    wall_ns = reader.wall_clock_ns(last_ns)
+                    self._file_end = (last_ns, wall_ns if wall_ns is not None else time.time_ns())
+                if not reader.has_index:
+                    # New entries alone would hide the definitions already in the file
+                    reader.write_index()
+            if valid_end < os.path.getsize(self.path):
+                self.logger.warning(f"Truncating torn record at offset {valid_end} in {self.path}")
+                os.truncate(self.path, valid_end)
+            self._truncate_index(valid_end)
+        self._file = open(self.path, "ab")
+        self._index = open(index_path(self.path), "ab")
+        self._offset = self._file.tell()
+        if self._offset == 0:
+            self._file.write(FILE_MAGIC)
+            self._offset = len(FILE_MAGIC)
+        if self._index.tell() == 0:
+            self._index.write(INDEX_MAGIC)
+        # Seek points are only trusted from the first record written now
+        self._since_seek_point = self.index_interval
+        self._last_flush_ns = time.monotonic_ns()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._index.close()
+        self._file = None
+        self._index = None
+        self._ids.clear()
+        self._next_id = 0
+
+    def __enter__(self) -> "SessionRecorder":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record(self, timestamp_ns: int, characteristic_uuid: str, data: bytes):
+        """Append one notification"""
+        if self._file is None:
+            self.open()
+        if self._shift_ns is None:
+            self._start_session(timestamp_ns)
+        clock_ns = timestamp_ns
+        timestamp_ns += self._shift_ns
+
+        char_id = self._ids.get(characteristic_uuid)
+        if char_id is None:
+            char_id = self._define(characteristic_uuid, timestamp_ns)
+
+        if self._since_seek_point >= self.index_interval:
+            self._index.write(INDEX_ENTRY.pack(INDEX_SEEK_POINT, timestamp_ns, self._offset))
+            self._since_seek_point = 0
+        self._since_seek_point += 1
+
+        self._write(RECORD_SAMPLE, char_id, timestamp_ns, data)
+        self.records_written += 1
+
+        if clock_ns - self._last_flush_ns >= self.flush_interval_ns:
+            self.flush()
+            self._last_flush_ns = clock_ns
+
+    def flush(self):
+        """Push buffered records to the OS, main file before index"""
+        if self._file is None:
+            return
+        self._file.flush()
+        self._index.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+            os.fsync(self._index.fileno())
+
+    def _start_session(self, timestamp_ns: int):
+        """Write the session record, shifting the session past the end of the file if needed"""
+        wall_ns = time.time_ns()
+        self._shift_ns = 0
+        if self._file_end is not None:
+            last_ns, last_wall_ns = self._file_end
+            if timestamp_ns <= last_ns:
+                # The clock restarted: continue the file by the wall clock time elapsed
+                self._shift_ns = last_ns + max(1, wall_ns - last_wall_ns) - timestamp_ns
+                self.logger.info(f"Shifting appended session by {self._shift_ns / 1e9:.3f}s in {self.path}")
+        start_ns = timestamp_ns + self._shift_ns
+        self._index.write(INDEX_ENTRY.pack(INDEX_SESSION, start_ns, self._offset))
+        self._write(RECORD_SESSION, 0, start_ns, SESSION_PAYLOAD.pack(wall_ns))
+
+    def _truncate_index(self, valid_end: int):
+        """Drop sidecar entries past the end of the recording and a torn final entry"""
+        path = index_path(self.path)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        keep = 0
+        if data.startswith(INDEX_MAGIC):
+            keep = len(INDEX_MAGIC)
+            usable = len(data) - (len(data) - keep) % INDEX_ENTRY.size
+            # Entries are written in file order
+            for _, _, offset in INDEX_ENTRY.iter_unpack(data[keep:usable]):
+                if offset >= valid_end:
+                    break
+                keep += INDEX_ENTRY.size
+        if keep < len(data):
+            self.logger.warning(f"Truncating sidecar index {path} to the end of the recording")
+            os.truncate(path, keep)
+
+    def _define(self, characteristic_uuid: str, timestamp_ns: int) -> int:
+        """Declare a characteristic id for this file"""
+        normalized = str(characteristic_uuid).lower()
+        char_id = self._ids.get(normalized)
+        if char_id is None:
+            char_id = self._next_id
+            self._next_id += 1
+            self._index.write(INDEX_ENTRY.pack(INDEX_CHARACTERISTIC, char_id, self._offset))
+            self._write(RECORD_CHARACTERISTIC, char_id, timestamp_ns, normalized.encode())
+            self._ids[normalized] = char_id
+        self._ids[characteristic_uuid] = char_id
+        return char_id
+
+    def _write(self, kind: int, char_id: int, timestamp_ns: int, payload: bytes):
+        self._file.write(RECORD_HEADER.pack(len(payload), kind, char_id, timestamp_ns))
+        self._file.write(payload)
+        self._offset += RECORD_HEADER.size + len(payload)
+
+class RecordingReader:
+    """
+    Memory-mapped, random-access reader for session recordings
+
+    Payloads are returned as memoryview slices of the mapping, so they are
+    only valid until the reader is closed; copy them to keep them.
+    """
+
+    def __init__(self, path: str, use_index: bool = True):
+        self.path = path
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.characteristics: Dict[int, str] = {}
+        # (timestamp_ns, wall clock ns) at the start of every session
+        self.sessions: List[Tuple[int, int]] = []
+        self.has_index = False
+        self._seek_times: List[int] = []
+        self._seek_offsets: List[int] = []
+
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < len(FILE_MAGIC):
+            self._file.close()
+            raise RecordingError(f"{path} is too short to be a recording")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if self._view[:len(FILE_MAGIC)] != FILE_MAGIC:
+            self.close()
+            raise RecordingError(f"{path} is not a recording")
+        self.size = size
+
+        self.has_index = use_index and self._load_index()
+        if not self.has_index:
+            self._scan_index()
+
+    def close(self):
+        if self._mmap is None:
+            return
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            self.logger.warning("Recording closed while payload views are still referenced")
+        self._file.close()
+        self._mmap = None
+
+    def __enter__(self) -> "RecordingReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self) -> Iterator[Tuple[int, str, memoryview]]:
+        return self.records()
+
+    @property
+    def start_ns(self) -> Optional[int]:
+        return self._seek_times[0] if self._seek_times else None
+
+    def _read_header(self, offset: int) -> Optional[Tuple[int, int, int, int]]:
+        """Header at offset or None if the record is truncated"""
+        end = offset + RECORD_HEADER.size
+        if end > self.size:
+            return None
+        length, kind, char_id, timestamp_ns = RECORD_HEADER.unpack_from(self._mmap, offset)
+        if end + length > self.size:
+            return None
+        return length, kind, char_id, timestamp_ns
+
+    def _load_index(self) -> bool:
+        """Load seek points and definitions from the sidecar index"""
+        try:
+            with open(index_path(self.path), "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        if not data.startswith(INDEX_MAGIC):
+            return False
+
+        usable = len(data) - (len(data) - len(INDEX_MAGIC)) % INDEX_ENTRY.size
+        for kind, value, offset in INDEX_ENTRY.iter_unpack(data[len(INDEX_MAGIC):usable]):
+            header = self._read_header(offset)
+            if header is None:
+                # Entry points past the flushed end of the recording
+                continue
+            length, record_kind, char_id, _ = header
+            if kind == INDEX_CHARACTERISTIC and record_kind == RECORD_CHARACTERISTIC:
+                start = offset + RECORD_HEADER.size
+                self.characteristics[char_id] = bytes(self._view[start:start + length]).decode()
+            elif kind == INDEX_SESSION and record_kind == RECORD_SESSION:
+                self._add_session(offset, value)
+            elif kind == INDEX_SEEK_POINT:
+                self._seek_times.append(value)
+                self._seek_offsets.append(offset)
+
+        if not self._seek_offsets and self.size > len(FILE_MAGIC):
+            return False
+        return True
+
+    def _scan_index(self, interval: int = 1024):
+        """Rebuild seek points and definitions with one pass over the file"""
+        self.characteristics.clear()
+        self.sessions.clear()
+        self._seek_times.clear()
+        self._seek_offsets.clear()
+
+        count = 0
+        offset = len(FILE_MAGIC)
+        while True:
+            header = self._read_header(offset)
+            if header is None:
+                break
+            length, kind, char_id, timestamp_ns = header
+            if kind == RECORD_CHARACTERISTIC:
+                start = offset + RECORD_HEADER.size
+                self.characteristics[char_id] = bytes(self._view[start:start + length]).decode()
+            elif kind == RECORD_SESSION:
+                self._add_session(offset, timestamp_ns)
+            elif kind == RECORD_SAMPLE:
+                if count % interval == 0:
+                    self._seek_times.append(timestamp_ns)
+                    self._seek_offsets.append(offset)
+                count += 1
+            offset += RECORD_HEADER.size + length
+
+    def _add_session(self, offset: int, timestamp_ns: int):
+        wall_ns, = SESSION_PAYLOAD.unpack_from(self._mmap, offset + RECORD_HEADER.size)
+        self.sessions.append((timestamp_ns, wall_ns))
+
+    def wall_clock_ns(self, timestamp_ns: int) -> Optional[int]:
+        """Wall clock time of a timestamp, None for a recording without session records"""
+        if not self.sessions:
+            return None
+        position = max(bisect_right(self.sessions, (timestamp_ns, float("inf"))) - 1, 0)
+        start_ns, wall_ns = self.sessions[position]
+        return wall_ns + timestamp_ns - start_ns
+
+    def tail(self) -> Tuple[int, Optional[int]]:
+        """
+        Find the end of the complete records
+
+        Returns:
+            (offset just past the last complete record, last timestamp or None)
+        """
+        offset = self._seek_offsets[-1] if self._seek_offsets else len(FILE_MAGIC)
+        last_ns = self.sessions[-1][0] if self.sessions else None
+        if self._seek_times:
+            last_ns = max(last_ns or 0, self._seek_times[-1])
+        while True:
+            header = self._read_header(offset)
+            if header is None:
+                return offset, last_ns
+            if header[1] != RECORD_CHARACTERISTIC:
+                last_ns = header[3] if last_ns is None else max(last_ns, header[3])
+            offset += RECORD_HEADER.size + header[0]
+
+    def valid_end(self) -> int:
+        """Offset just past the last complete record"""
+        return self.tail()[0]
+
+    def write_index(self):
+        """Write a sidecar index for a recording that has none"""
+        with open(index_path(self.path), "wb") as f:
+            f.write(INDEX_MAGIC)
+            offset = len(FILE_MAGIC)
+            seek_points = set(self._seek_offsets)
+            while True:
+                header = self._read_header(offset)
+                if header is None:
+                    break
+                length, kind, char_id, timestamp_ns = header
+                if kind == RECORD_CHARACTERISTIC:
+                    f.write(INDEX_ENTRY.pack(INDEX_CHARACTERISTIC, char_id, offset))
+                elif kind == RECORD_SESSION:
+                    f.write(INDEX_ENTRY.pack(INDEX_SESSION, timestamp_ns, offset))
+                elif offset in seek_points:
+                    f.write(INDEX_ENTRY.pack(INDEX_SEEK_POINT, timestamp_ns, offset))
+                offset += RECORD_HEADER.size + length
+
+    def records(
+        self,
+        start_ns: Optional[int] = None,
+        end_ns: Optional[int] = None
+    ) -> Iterator[Tuple[int, str, memoryview]]:
+        """
+        Iterate sample records, optionally restricted to [start_ns, end_ns)
+
+        Yields:
+            (timestamp_ns, characteristic UUID, payload view)
+        """
+        offset = len(FILE_MAGIC)
+        if start_ns is not None and self._seek_times:
+            position = bisect_right(self._seek_times, start_ns) - 1
+            if position >= 0:
+                offset = self._seek_offsets[position]
+
+        view = self._view
+        characteristics = self.characteristics
+        header_size = RECORD_HEADER.size
+        while True:
+            header = self._read_header(offset)
+            if header is None:
+                return
+            length, kind, char_id, timestamp_ns = header
+            start = offset + header_size
+            offset = start + length
+            if kind != RECORD_SAMPLE:
+                if kind == RECORD_CHARACTERISTIC and char_id not in characteristics:
+                    characteristics[char_id] = bytes(view[start:offset]).decode()
+                continue
+            if start_ns is not None and timestamp_ns < start_ns:
+                continue
+            if end_ns is not None and timestamp_ns >= end_ns:
+                return
+            yield timestamp_ns, characteristics.get(char_id, ""), view[start:offset]
+
+    def replay(
+        self,
+        parser: Any = None,
+        start_ns: Optional[int] = None,
+        end_ns: Optional[int] = None
+    ) -> Iterator[Any]:
+        """
+        Decode records into Samples with a device parser
+
+        Args:
+            parser: Class providing parse_sample, WhoopDataParser by default
+        """
+        if parser is None:
+            from ..devices.whoop.data_parser import WhoopDataParser
+            parser = WhoopDataParser
+        for timestamp_ns, characteristic_uuid, payload in self.records(start_ns, end_ns):
+            yield parser.parse_sample(characteristic_uuid, payload, timestamp_ns)
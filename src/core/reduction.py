@@ -0,0 +1,222 @@
+# src/core/reduction.py
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Optional, List, Dict, Any, Callable, Sequence, Tuple
+import math
+
+def lttb(timestamps: Sequence[float], values: Sequence[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Picks `threshold` points that preserve the visual shape of the series:
+    the first and last points plus, for every bucket in between, the point
+    forming the largest triangle with the previously selected point and
+    the average of the next bucket.
+
+    Returns:
+        Indices of the selected points in ascending order
+    """
+    n = len(values)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        raise ValueError("LTTB needs a threshold of at least 3 points")
+
+    selected = [0]
+    bucket = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        # Average of the following bucket; the last point for the final bucket
+        if end < next_end:
+            span = next_end - end
+            avg_t = sum(timestamps[end:next_end]) / span
+            avg_v = sum(values[end:next_end]) / span
+        else:
+            avg_t, avg_v = timestamps[n - 1], values[n - 1]
+
+        at, av = timestamps[a], values[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((at - avg_t) * (values[j] - av) - (at - timestamps[j]) * (avg_v - av))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+def activity_count(magnitudes: Sequence[float], dead_band: float = 0.068, gravity: float = 1.0) -> float:
+    """
+    Activity count of one epoch
+
+    Sums the deviation of the acceleration magnitude from gravity beyond a
+    dead band, in g, so a device at rest scores zero regardless of posture.
+    """
+    total = 0.0
+    for magnitude in magnitudes:
+        deviation = abs(magnitude - gravity)
+        if deviation > dead_band:
+            total += deviation - dead_band
+    return total
+
+class MovementWindow:
+    """Reduction of the accelerometer samples in one window"""
+
+    __slots__ = ("start_ns", "end_ns", "count", "mean", "min", "max", "energy",
+                 "activity_count", "lttb", "raw")
+
+    def __init__(self, start_ns: int, end_ns: int, count: int):
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self.count = count
+        # Per-axis (x, y, z) statistics in g
+        self.mean: Optional[Tuple[float, float, float]] = None
+        self.min: Optional[Tuple[float, float, float]] = None
+        self.max: Optional[Tuple[float, float, float]] = None
+        # Mean squared magnitude in g^2
+        self.energy: Optional[float] = None
+        self.activity_count: Optional[float] = None
+        # (timestamp_ns, magnitude) points selected by LTTB
+        self.lttb: Optional[List[Tuple[int, float]]] = None
+        # Full-rate columns, only for windows captured on demand
+        self.raw: Optional[Dict[str, array]] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = {slot: getattr(self, slot) for slot in self.__slots__ if getattr(self, slot) is not None}
+        if self.raw is not None:
+            data["raw"] = {name: list(column) for name, column in self.raw.items()}
+        return data
+
+    def __repr__(self) -> str:
+        return f"MovementWindow(start_ns={self.start_ns}, count={self.count}, energy={self.energy})"
+
+class AccelerometerReducer:
+    """
+    Reduces full-rate accelerometer columns to one record per window
+
+    Decoded batches are appended with add_columns; whenever a window
+    boundary is crossed the completed window is reduced and passed to
+    `on_window`. The most recent raw windows are retained, and
+    capture_raw() attaches the raw columns to upcoming windows.
+    """
+
+    STATS = "stats"
+    LTTB = "lttb"
+    ACTIVITY = "activity"
+
+    def __init__(
+        self,
+        on_window: Callable[[MovementWindow], None],
+        window_s: float = 1.0,
+        modes: Sequence[str] = (STATS, ACTIVITY),
+        lttb_points: int = 10,
+        raw_history: int = 60
+    ):
+        """
+        Args:
+            on_window: Called with each completed MovementWindow
+            window_s: Window length in seconds
+            modes: Reductions computed per window, any of STATS, LTTB and ACTIVITY
+            lttb_points: Points kept per window by LTTB
+            raw_history: Number of recent windows whose raw columns are retained
+        """
+        self.on_window = on_window
+        self.window_ns = int(window_s * 1e9)
+        self.modes = frozenset(modes)
+        self.lttb_points = lttb_points
+        self.raw_history: deque = deque(maxlen=raw_history) if raw_history else None
+        self.samples_in = 0
+        self.windows_out = 0
+        self._capture = 0
+        self._window_start: Optional[int] = None
+        self._reset()
+
+    def _reset(self):
+        self._t = array('q')
+        self._x = array('d')
+        self._y = array('d')
+        self._z = array('d')
+
+    def capture_raw(self, windows: int = 1):
+        """Attach the raw columns to the next `windows` windows"""
+        self._capture += windows
+
+    def get_raw(self, timestamp_ns: int) -> Optional[Dict[str, array]]:
+        """Raw columns of the retained window containing a timestamp"""
+        if self.raw_history is None:
+            return None
+        for start_ns, columns in self.raw_history:
+            if start_ns <= timestamp_ns < start_ns + self.window_ns:
+                return columns
+        return None
+
+    def add_columns(self, timestamps: Sequence[int], x: Sequence[float], y: Sequence[float], z: Sequence[float]):
+        """
+        Append a batch of decoded samples
+
+        A batch out of timestamp order is sorted first. Samples older than
+        the open window, whose own window was already emitted, are counted
+        in the open window.
+        """
+        if not len(timestamps):
+            return
+        if any(later < earlier for earlier, later in zip(timestamps, timestamps[1:])):
+            order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+            timestamps = [timestamps[i] for i in order]
+            x = [x[i] for i in order]
+            y = [y[i] for i in order]
+            z = [z[i] for i in order]
+        self.samples_in += len(timestamps)
+        start = 0
+        while start < len(timestamps):
+            if self._window_start is None:
+                self._window_start = timestamps[start] - timestamps[start] % self.window_ns
+            boundary = self._window_start + self.window_ns
+            end = bisect_left(timestamps, boundary, start)
+            self._t.extend(timestamps[start:end])
+            self._x.extend(x[start:end])
+            self._y.extend(y[start:end])
+            self._z.extend(z[start:end])
+            if end < len(timestamps):
+                self._close_window()
+                self._window_start = timestamps[end] - timestamps[end] % self.window_ns
+            start = end
+
+    def flush(self):
+        """Reduce and emit the current partial window"""
+        if len(self._t):
+            self._close_window()
+        self._window_start = None
+
+    def _close_window(self):
+        t, x, y, z = self._t, self._x, self._y, self._z
+        count = len(t)
+        self._reset()
+        if not count:
+            return
+        window = MovementWindow(self._window_start, self._window_start + self.window_ns, count)
+        modes = self.modes
+        magnitudes = list(map(math.hypot, x, y, z))
+        if self.STATS in modes:
+            window.mean = (sum(x) / count, sum(y) / count, sum(z) / count)
+            window.min = (min(x), min(y), min(z))
+            window.max = (max(x), max(y), max(z))
+            window.energy = math.fsum(m * m for m in magnitudes) / count
+        if self.ACTIVITY in modes:
+            window.activity_count = activity_count(magnitudes)
+        if self.LTTB in modes:
+            window.lttb = [(t[i], magnitudes[i]) for i in lttb(t, magnitudes, self.lttb_points)]
+
+        columns = {"timestamp_ns": t, "x": x, "y": y, "z": z}
+        if self.raw_history is not None:
+            self.raw_history.append((window.start_ns, columns))
+        if self._capture:
+            self._capture -= 1
+            window.raw = columns
+
+        self.windows_out += 1
+        self.on_window(window)
@@ -0,0 +1,217 @@
+# src/core/samples.py
+from array import array
+from collections import deque
+from typing import Optional, List, Dict, Any, Tuple, Union
+import numbers
+
+class CharacteristicRegistry:
+    """Interns characteristic UUIDs as small integer ids"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._uuids: List[str] = []
+        self._fields: List[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self._uuids)
+
+    def get_id(self, uuid: str, field: Optional[str] = None) -> int:
+        """
+        Return the id for a UUID, registering it on first use
+
+        Args:
+            uuid: Characteristic UUID in any case
+            field: Name of the decoded field, kept for dict conversion
+        """
+        char_id = self._ids.get(uuid)
+        if char_id is None:
+            normalized = str(uuid).lower()
+            char_id = self._ids.get(normalized)
+            if char_id is None:
+                char_id = len(self._uuids)
+                self._uuids.append(normalized)
+                self._fields.append(field)
+                self._ids[normalized] = char_id
+            self._ids[uuid] = char_id
+        if field is not None and self._fields[char_id] is None:
+            self._fields[char_id] = field
+        return char_id
+
+    def uuid(self, char_id: int) -> str:
+        return self._uuids[char_id]
+
+    def field(self, char_id: int) -> Optional[str]:
+        return self._fields[char_id]
+
+# Process-wide registry shared by every collector
+CHARACTERISTIC_IDS = CharacteristicRegistry()
+
+class Sample:
+    """
+    One decoded notification
+
+    Uses __slots__ and keeps the payload as bytes, so a sample costs a
+    fraction of the equivalent dict. Convert with to_dict when needed.
+    """
+
+    __slots__ = ("timestamp_ns", "char_id", "raw", "value")
+
+    def __init__(self, timestamp_ns: int, char_id: int, raw: bytes, value: Any = None):
+        self.timestamp_ns = timestamp_ns
+        self.char_id = char_id
+        self.raw = raw
+        self.value = value
+
+    @property
+    def characteristic(self) -> str:
+        return CHARACTERISTIC_IDS.uuid(self.char_id)
+
+    @property
+    def field(self) -> Optional[str]:
+        return CHARACTERISTIC_IDS.field(self.char_id)
+
+    def to_dict(self, include_raw: bool = False) -> Dict[str, Any]:
+        """Expand into the dict format produced by the parsers"""
+        data = {
+            "characteristic": self.characteristic,
+            "timestamp_ns": self.timestamp_ns,
+        }
+        if include_raw:
+            data["raw"] = bytes(self.raw).hex()
+        field = self.field
+        if field is not None:
+            data[field] = self.value
+        return data
+
+    def __repr__(self) -> str:
+        return f"Sample(timestamp_ns={self.timestamp_ns}, char_id={self.char_id}, value={self.value!r})"
+
+class SampleRingBuffer:
+    """
+    Fixed-capacity ring of numeric samples backed by typed arrays
+
+    Timestamps are stored as int64 nanoseconds and values as `width`
+    columns of `typecode` ('d' for floats, 'q' for integers), so memory
+    use is constant once allocated.
+    """
+
+    def __init__(self, capacity: int, width: int = 1, typecode: str = 'd'):
+        if capacity <= 0 or width <= 0:
+            raise ValueError("capacity and width must be positive")
+        self.capacity = capacity
+        self.width = width
+        self.typecode = typecode
+        self.timestamps = array('q', bytes(8 * capacity))
+        self.values = array(typecode, bytes(array(typecode).itemsize * capacity * width))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp_ns: int, value: Union[float, List[float], Tuple[float, ...]]):
+        """
+        Store one sample, overwriting the oldest when full
+
+        Raises:
+            ValueError: If a vector value does not have `width` components
+        """
+        index = self._next
+        if self.width == 1:
+            self.values[index] = value
+        else:
+            if len(value) != self.width:
+                raise ValueError(f"Expected {self.width} values, got {len(value)}")
+            start = index * self.width
+            self.values[start:start + self.width] = array(self.typecode, value)
+        self.timestamps[index] = timestamp_ns
+        self._next = (index + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def _order(self) -> List[int]:
+        """Slot indices from oldest to newest"""
+        start = (self._next - self._count) % self.capacity
+        return [(start + i) % self.capacity for i in range(self._count)]
+
+    def to_columns(self) -> Dict[str, array]:
+        """
+        Copy the buffer out in chronological order
+
+        Returns:
+            Dictionary with "timestamp_ns" and one "value_<n>" column per width
+        """
+        order = self._order()
+        columns = {"timestamp_ns": array('q', [self.timestamps[i] for i in order])}
+        for offset in range(self.width):
+            columns[f"value_{offset}"] = array(
+                self.typecode, [self.values[i * self.width + offset] for i in order]
+            )
+        return columns
+
+class SampleStore:
+    """
+    Bounded per-characteristic sample storage
+
+    Numeric samples go into SampleRingBuffers; anything else (hex strings,
+    opaque frames) is kept as Sample objects in a bounded deque.
+    """
+
+    def __init__(self, capacity: int = 180_000):
+        self.capacity = capacity
+        self.buffers: Dict[int, SampleRingBuffer] = {}
+        self.objects: Dict[int, deque] = {}
+        self._opaque = set()
+
+    def __len__(self) -> int:
+        return sum(len(b) for b in self.buffers.values()) + sum(len(d) for d in self.objects.values())
+
+    def _create_buffer(self, value: Any) -> Optional[SampleRingBuffer]:
+        """Allocate a ring buffer if the value is numeric"""
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, numbers.Integral):
+            return SampleRingBuffer(self.capacity, 1, 'q')
+        if isinstance(value, numbers.Real):
+            return SampleRingBuffer(self.capacity, 1)
+        if isinstance(value, (list, tuple)) and value and all(isinstance(v, numbers.Real) for v in value):
+            return SampleRingBuffer(self.capacity, len(value))
+        return None
+
+    def add(self, sample: Sample):
+        value = sample.value
+        if value is not None and sample.char_id not in self._opaque:
+            buffer = self.buffers.get(sample.char_id)
+            if buffer is None:
+                buffer = self._create_buffer(value)
+                if buffer is None:
+                    self._opaque.add(sample.char_id)
+                else:
+                    self.buffers[sample.char_id] = buffer
+            if buffer is not None:
+                try:
+                    buffer.append(sample.timestamp_ns, value)
+                    return
+                except (TypeError, ValueError):
+                    pass
+
+        objects = self.objects.get(sample.char_id)
+        if objects is None:
+            objects = self.objects[sample.char_id] = deque(maxlen=self.capacity)
+        objects.append(sample)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Expand everything into parser-style dicts, oldest first"""
+        rows = []
+        for char_id, buffer in self.buffers.items():
+            uuid = CHARACTERISTIC_IDS.uuid(char_id)
+            field = CHARACTERISTIC_IDS.field(char_id) or "value"
+            columns = buffer.to_columns()
+            values = [columns[f"value_{i}"] for i in range(buffer.width)]
+            for row, timestamp in enumerate(columns["timestamp_ns"]):
+                value = values[0][row] if buffer.width == 1 else [v[row] for v in values]
+                rows.append({"characteristic": uuid, "timestamp_ns": timestamp, field: value})
+        for samples in self.objects.values():
+            rows.extend(sample.to_dict() for sample in samples)
+        rows.sort(key=lambda row: row["timestamp_ns"])
+        return rows
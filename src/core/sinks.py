@@ -0,0 +1,488 @@
+# src/core/sinks.py
+"""
+Batched sample sinks
+
+A sink is used as a collector data callback. Samples are converted to
+rows on the event loop, collected into batches and written by a single
+worker thread, so file and database I/O never blocks notification
+handling. A batch is written every `batch_size` rows or every
+`flush_interval` seconds, whichever comes first.
+
+Two sinks are provided: ColumnarFileSink writes typed column chunks
+grouped per characteristic (row groups, similar in spirit to Parquet),
+and SQLiteSink inserts into a WAL-mode SQLite database.
+"""
+from .samples import Sample
+from abc import ABC, abstractmethod
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict, Any, Tuple, Iterator, BinaryIO
+import asyncio
+import json
+import logging
+import numbers
+import sqlite3
+import struct
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, columns are returned as array otherwise
+    np = None
+
+# timestamp_ns, characteristic UUID, field name, decoded value
+Row = Tuple[int, str, Optional[str], Any]
+
+# Parser dict keys that are not decoded fields
+_META_KEYS = ("characteristic", "timestamp_ns", "raw")
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, array):
+        return value.tolist()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def to_json(value: Any) -> str:
+    return json.dumps(value, default=_json_default, separators=(",", ":"))
+
+def to_row(data: Any, parser: Optional[Any] = None) -> Optional[Row]:
+    """
+    Normalize a Sample or a parser dict into a row
+
+    A dict holding the field the parser's DECODERS entry names becomes a
+    row for that field, leaving out derived fields such as the plain
+    heart rate next to a measurement, the same row its compact Sample
+    gives. Without such an entry a dict with a single decoded field
+    becomes a row for that field; one with several, such as an
+    advertisement, keeps them all as a dict value without a field name.
+    Dicts are stamped with their "timestamp_ns", or the current time
+    if they carry none.
+
+    Args:
+        data: Sample or parser dict
+        parser: CharacteristicParser whose decoders produced the dicts
+    """
+    if isinstance(data, Sample):
+        return data.timestamp_ns, data.characteristic, data.field, data.value
+    characteristic = data.get("characteristic")
+    if characteristic is None:
+        return None
+    timestamp_ns = data.get("timestamp_ns") or time.monotonic_ns()
+    if parser is not None:
+        entry = parser.get_decoder(characteristic)
+        if entry is not None and entry[0] in data:
+            return timestamp_ns, characteristic, entry[0], data[entry[0]]
+    fields = {key: value for key, value in data.items() if key not in _META_KEYS}
+    if len(fields) == 1:
+        (field, value), = fields.items()
+        return timestamp_ns, characteristic, field, value
+    return timestamp_ns, characteristic, None, fields or None
+
+@dataclass
+class SinkStats:
+    """Row and batch counters of a sink"""
+    rows_in: int = 0
+    rows_written: int = 0
+    rows_dropped: int = 0
+    batches: int = 0
+    write_s: float = 0.0
+    errors: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class SampleSink(ABC):
+    """
+    Base class of batched sinks
+
+    Subclasses implement _open, _write and _close, which always run on the
+    sink's worker thread, one batch at a time and in order.
+    """
+
+    def __init__(self, batch_size: int = 10000, flush_interval: float = 5.0, max_pending: int = 2,
+                 max_buffered: Optional[int] = None, parser: Optional[Any] = None):
+        """
+        Args:
+            batch_size: Rows per written batch
+            flush_interval: Seconds after which a partial batch is written
+            max_pending: Batches queued for the worker before further rows
+                are coalesced into the next batch instead
+            max_buffered: Rows buffered while the worker is saturated before
+                new rows are dropped, four batches by default
+            parser: CharacteristicParser of the collector feeding parser
+                dicts, selects the field each dict is stored under
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_buffered = max(max_buffered or 4 * batch_size, batch_size)
+        self.parser = parser
+        self.stats = SinkStats()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._rows: List[Row] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[asyncio.Future] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> "SampleSink":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __call__(self, data_type: str, data: Any):
+        """Data callback entry point"""
+        self.add(data)
+
+    async def open(self):
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.__class__.__name__)
+        await self._loop.run_in_executor(self._executor, self._open)
+        if self.flush_interval:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    def add(self, data: Any):
+        """Queue one Sample or parser dict, submitting a batch when full"""
+        row = to_row(data, self.parser)
+        if row is None:
+            return
+        self.stats.rows_in += 1
+        if self._room() < 1:
+            self.stats.rows_dropped += 1
+            return
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._submit()
+
+    def add_rows(self, rows: List[Row]):
+        """Queue already normalized rows"""
+        self.stats.rows_in += len(rows)
+        room = self._room()
+        if room < len(rows):
+            self.stats.rows_dropped += len(rows) - max(room, 0)
+            rows = rows[:max(room, 0)]
+        self._rows.extend(rows)
+        if len(self._rows) >= self.batch_size:
+            self._submit()
+
+    def _room(self) -> int:
+        """Rows that can still be buffered, retrying the worker once the buffer is full"""
+        room = self.max_buffered - len(self._rows)
+        if room <= 0:
+            self._submit()
+            room = self.max_buffered - len(self._rows)
+        return room
+
+    def _submit(self, force: bool = False):
+        """
+        Hand the buffered rows to the worker unless it is already saturated
+
+        Raises:
+            RuntimeError: If the sink is not open
+        """
+        if self._executor is None:
+            raise RuntimeError(f"{self.__class__.__name__} is not open")
+        self._pending = [f for f in self._pending if not f.done()]
+        if not self._rows or (len(self._pending) >= self.max_pending and not force):
+            return
+        rows, self._rows = self._rows, []
+        self._pending.append(self._loop.run_in_executor(self._executor, self._write_batch, rows))
+
+    def _write_batch(self, rows: List[Row]):
+        start = time.perf_counter()
+        try:
+            self._write(rows)
+            self.stats.rows_written += len(rows)
+            self.stats.batches += 1
+        except Exception as e:
+            self.stats.errors += 1
+            self.logger.error(f"Failed to write {len(rows)} rows: {str(e)}")
+        self.stats.write_s += time.perf_counter() - start
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self._submit()
+
+    async def flush(self):
+        """Write all buffered rows and wait for the worker to finish"""
+        self._submit(force=True)
+        if self._pending:
+            await asyncio.gather(*self._pending)
+            self._pending = []
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._executor is None:
+            return
+        await self.flush()
+        await self._loop.run_in_executor(self._executor, self._close)
+        self._executor.shutdown()
+        self._executor = None
+        self.logger.info(f"Sink stats: {self.stats.as_dict()}")
+
+    @abstractmethod
+    def _open(self):
+        pass
+
+    @abstractmethod
+    def _write(self, rows: List[Row]):
+        pass
+
+    @abstractmethod
+    def _close(self):
+        pass
+
+COLUMNAR_MAGIC = b"DCCOL001"
+# row group header length, row group body length
+ROW_GROUP_HEADER = struct.Struct('<II')
+_BIG_ENDIAN = sys.byteorder == "big"
+
+class ColumnarFileSink(SampleSink):
+    """
+    Writes samples as typed column chunks
+
+    Every batch becomes one row group per characteristic. A row group is a
+    small JSON header (characteristic, field, row count, column layout)
+    followed by the raw little-endian column buffers: int64 timestamps,
+    float64 value columns for numeric and vector values, or a JSON column
+    for anything else. Use ColumnarReader to load the columns back.
+    """
+
+    def __init__(self, path: str, row_group_size: int = 10000, flush_interval: float = 5.0, **kwargs):
+        """
+        Args:
+            path: Output file, appended to if it exists
+            row_group_size: Rows per batch, split into per-characteristic row groups
+            flush_interval: Seconds after which a partial batch is written
+        """
+        super().__init__(batch_size=row_group_size, flush_interval=flush_interval, **kwargs)
+        self.path = path
+        self._file: Optional[BinaryIO] = None
+
+    def _open(self):
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(COLUMNAR_MAGIC)
+
+    def _write(self, rows: List[Row]):
+        groups: Dict[Tuple[str, Optional[str]], List[Row]] = {}
+        for row in rows:
+            key = (row[1], row[2])
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = []
+            group.append(row)
+        for (characteristic, field), group in groups.items():
+            self._write_row_group(characteristic, field, group)
+        self._file.flush()
+
+    def _write_row_group(self, characteristic: str, field: Optional[str], rows: List[Row]):
+        timestamps = array('q', [row[0] for row in rows])
+        columns: List[Tuple[str, str, bytes]] = [("timestamp_ns", "q", self._le_bytes(timestamps))]
+
+        first = rows[0][3]
+        width = None
+        if isinstance(first, numbers.Real) and not isinstance(first, bool):
+            width = 0
+        elif isinstance(first, (list, tuple)) and first and all(isinstance(v, numbers.Real) for v in first):
+            width = len(first)
+
+        encoded = False
+        if width is not None:
+            try:
+                if width == 0:
+                    values = array('d', [row[3] for row in rows])
+                    columns.append(("value", "d", self._le_bytes(values)))
+                else:
+                    for offset in range(width):
+                        values = array('d', [row[3][offset] for row in rows])
+                        columns.append((f"value_{offset}", "d", self._le_bytes(values)))
+                encoded = True
+            except (TypeError, IndexError):
+                del columns[1:]
+        if not encoded:
+            lines = "\n".join(to_json(row[3]) for row in rows)
+            columns.append(("json", "json", lines.encode()))
+
+        layout = []
+        offset = 0
+        for name, kind, data in columns:
+            layout.append({"name": name, "type": kind, "offset": offset, "length": len(data)})
+            offset += len(data)
+        header = json.dumps({
+            "characteristic": characteristic,
+            "field": field,
+            "rows": len(rows),
+            "columns": layout,
+        }).encode()
+        self._file.write(ROW_GROUP_HEADER.pack(len(header), offset))
+        self._file.write(header)
+        for _, _, data in columns:
+            self._file.write(data)
+
+    @staticmethod
+    def _le_bytes(values: array) -> bytes:
+        if _BIG_ENDIAN:
+            values.byteswap()
+        return values.tobytes()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class ColumnarReader:
+    """Reads the row groups written by ColumnarFileSink"""
+
+    def __init__(self, path: str, use_numpy: bool = False):
+        """
+        Args:
+            path: File written by ColumnarFileSink
+            use_numpy: Return numpy arrays instead of array columns
+        """
+        if use_numpy and np is None:
+            raise ImportError("numpy is required for use_numpy=True")
+        self.path = path
+        self.use_numpy = use_numpy
+
+    def row_groups(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield each row group as a dict with "characteristic", "field",
+        "rows" and "columns" (column name -> values)
+        """
+        with open(self.path, "rb") as f:
+            if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+                raise ValueError(f"{self.path} is not a columnar sample file")
+            while True:
+                head = f.read(ROW_GROUP_HEADER.size)
+                if len(head) < ROW_GROUP_HEADER.size:
+                    return
+                header_length, body_length = ROW_GROUP_HEADER.unpack(head)
+                header_bytes = f.read(header_length)
+                body = f.read(body_length)
+                if len(header_bytes) < header_length or len(body) < body_length:
+                    # Torn final row group
+                    return
+                header = json.loads(header_bytes)
+                header["columns"] = {
+                    column["name"]: self._decode(column, body) for column in header["columns"]
+                }
+                yield header
+
+    def _decode(self, column: Dict[str, Any], body: bytes) -> Any:
+        data = body[column["offset"]:column["offset"] + column["length"]]
+        if column["type"] == "json":
+            return [json.loads(line) for line in data.decode().split("\n")] if data else []
+        if self.use_numpy:
+            return np.frombuffer(data, dtype='<' + ('i8' if column["type"] == 'q' else 'f8'))
+        values = array(column["type"])
+        values.frombytes(data)
+        if _BIG_ENDIAN:
+            values.byteswap()
+        return values
+
+    def columns(self, characteristic: str) -> Dict[str, list]:
+        """Concatenate every row group of one characteristic"""
+        merged: Dict[str, Any] = {}
+        for group in self.row_groups():
+            if group["characteristic"] != characteristic:
+                continue
+            for name, values in group["columns"].items():
+                if name in merged:
+                    merged[name] = (np.concatenate((merged[name], values)) if self.use_numpy
+                                    else merged[name] + values)
+                else:
+                    merged[name] = values
+        return merged
+
+class SQLiteSink(SampleSink):
+    """
+    Inserts samples into a SQLite database in WAL mode
+
+    Numeric values go into the REAL `value` column, everything else is
+    stored as JSON in `data`. Each batch is one transaction using
+    executemany over a single cached INSERT statement.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS characteristics ("
+        " id INTEGER PRIMARY KEY, uuid TEXT NOT NULL, field TEXT, UNIQUE (uuid, field))",
+        "CREATE TABLE IF NOT EXISTS samples ("
+        " timestamp_ns INTEGER NOT NULL, char_id INTEGER NOT NULL, value REAL, data TEXT)",
+        "CREATE INDEX IF NOT EXISTS samples_by_time ON samples (char_id, timestamp_ns)",
+    )
+    INSERT = "INSERT INTO samples (timestamp_ns, char_id, value, data) VALUES (?, ?, ?, ?)"
+
+    def __init__(self, path: str, batch_size: int = 5000, flush_interval: float = 1.0,
+                 synchronous: str = "NORMAL", **kwargs):
+        """
+        Args:
+            path: Database file
+            batch_size: Rows per transaction
+            flush_interval: Seconds after which a partial batch is committed
+            synchronous: SQLite synchronous pragma; NORMAL is durable in WAL mode
+                except for the last transactions before a power loss
+        """
+        super().__init__(batch_size=batch_size, flush_interval=flush_interval, **kwargs)
+        self.path = path
+        self.synchronous = synchronous
+        self._db: Optional[sqlite3.Connection] = None
+        self._char_ids: Dict[Tuple[str, Optional[str]], int] = {}
+
+    def _open(self):
+        # Only ever used from the sink's single worker thread
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={self.synchronous}")
+        for statement in self.SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+        self._char_ids = {
+            (uuid, field): char_id
+            for char_id, uuid, field in self._db.execute("SELECT id, uuid, field FROM characteristics")
+        }
+
+    def _char_id(self, characteristic: str, field: Optional[str], added: Dict[Tuple[str, Optional[str]], int]) -> int:
+        """Id of a characteristic, inserting it into the open transaction and `added` if new"""
+        key = (characteristic, field)
+        char_id = self._char_ids.get(key)
+        if char_id is None:
+            char_id = added.get(key)
+            if char_id is None:
+                cursor = self._db.execute(
+                    "INSERT INTO characteristics (uuid, field) VALUES (?, ?)", key
+                )
+                char_id = added[key] = cursor.lastrowid
+        return char_id
+
+    def _write(self, rows: List[Row]):
+        char_id = self._char_id
+        added: Dict[Tuple[str, Optional[str]], int] = {}
+        # New characteristics share the batch's transaction, so they are only
+        # cached once it commits
+        with self._db:
+            params = []
+            for timestamp_ns, characteristic, field, value in rows:
+                if isinstance(value, numbers.Real) and not isinstance(value, bool):
+                    params.append((timestamp_ns, char_id(characteristic, field, added), value, None))
+                else:
+                    params.append((timestamp_ns, char_id(characteristic, field, added), None, to_json(value)))
+            self._db.executemany(self.INSERT, params)
+        self._char_ids.update(added)
+
+    def _close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
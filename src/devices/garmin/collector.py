@@ -0,0 +1,90 @@
+# src/devices/garmin/collector.py
+from ...core.metrics import CollectorMetrics
+from ...core.pipeline import BackpressurePolicy
+from ...core.recording import SessionRecorder
+from ...core.reconnect import ReconnectPolicy
+from ...protocols.ble.collector import BLECollector
+from ...protocols.ble.scanner import BLEScanner
+from ...protocols.ble.gatt_cache import GattProfileCache
+from .protocol import GarminProtocol
+from .data_parser import GarminDataParser
+from bleak import BleakClient
+from typing import Optional, Dict, Any, Callable, Iterable, List
+
+class GarminCollector(BLECollector):
+    """
+    Collector for Garmin sensors speaking the standard sport profiles
+
+    Heart rate straps, running pods, speed/cadence sensors and power
+    meters all go through the same pipeline as the Whoop collector; only
+    the decoder table in GarminDataParser is specific to them.
+    """
+
+    PARSER = GarminDataParser
+    DATA_TYPE = "garmin_data"
+    SERVICES = GarminProtocol.SERVICES
+
+    def __init__(
+        self,
+        device_address: Optional[str] = None,
+        data_callback: Optional[Callable[[str, Dict], None]] = None,
+        profiles: Iterable[str] = tuple(GarminProtocol.PROFILES),
+        include_raw: bool = False,
+        compact_samples: bool = False,
+        queue_size: Optional[int] = 1024,
+        backpressure: str = BackpressurePolicy.DROP_OLDEST,
+        batch_size: int = 64,
+        spill_path: Optional[str] = None,
+        recorder: Optional[SessionRecorder] = None,
+        client_factory: Callable[..., BleakClient] = BleakClient,
+        scanner: Optional[BLEScanner] = None,
+        gatt_cache: Optional[GattProfileCache] = None,
+        auto_reconnect: bool = False,
+        reconnect_policy: Optional[ReconnectPolicy] = None,
+        packet_log_level: Optional[int] = None,
+        packet_log_every: int = 100,
+        metrics: Optional[CollectorMetrics] = None
+    ):
+        """
+        Args:
+            device_address: Address of the sensor, discovered if omitted
+            data_callback: Called with ("garmin_data", parsed dict) for each notification
+            profiles: GarminProtocol.PROFILES names to subscribe to and to
+                discover sensors by; battery notifications are always enabled
+
+        The remaining arguments are described in BLECollector.
+
+        Raises:
+            ValueError: If a profile is unknown
+        """
+        super().__init__(
+            device_address=device_address,
+            data_callback=data_callback,
+            include_raw=include_raw,
+            compact_samples=compact_samples,
+            queue_size=queue_size,
+            backpressure=backpressure,
+            batch_size=batch_size,
+            spill_path=spill_path,
+            recorder=recorder,
+            client_factory=client_factory,
+            scanner=scanner,
+            gatt_cache=gatt_cache,
+            auto_reconnect=auto_reconnect,
+            reconnect_policy=reconnect_policy,
+            packet_log_level=packet_log_level,
+            packet_log_every=packet_log_every,
+            metrics=metrics
+        )
+        self.profiles = tuple(profiles)
+        self._profile_services = [GarminProtocol.profile_service(profile) for profile in self.profiles]
+        self._subscribed = {GarminProtocol.profile_measurement(profile) for profile in self.profiles}
+        self._subscribed.add(GarminProtocol.CHARACTERISTICS["BATTERY_LEVEL"]["uuid"])
+
+    def _discovery_filters(self) -> List[Dict[str, Any]]:
+        """Look for any sensor advertising one of the selected profile services"""
+        return [{"service_uuid": service_uuid} for service_uuid in self._profile_services]
+
+    def _subscribes_to(self, char_uuid: str) -> bool:
+        """Only the measurements of the selected profiles, not vendor characteristics"""
+        return char_uuid.lower() in self._subscribed
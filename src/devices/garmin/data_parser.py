@@ -0,0 +1,35 @@
+# src/devices/garmin/data_parser.py
+from typing import Optional, Dict, Any, Callable
+from ...protocols.ble import heart_rate
+from ...protocols.ble.decoding import CharacteristicParser, DecoderEntry
+from .protocol import GarminProtocol
+
+class GarminDataParser(CharacteristicParser):
+    """
+    Parse the standard sport profile measurements of Garmin sensors
+
+    Notifications are dispatched to the decoders compiled from
+    GarminProtocol.PROFILE, which build the same records as the
+    hand-written decoders in protocols.ble; adding a profile only takes
+    its characteristics in profile.yaml and a row in GarminProtocol.PROFILES.
+    """
+
+    # Normalized characteristic UUID -> (field name, decoder), from the profile
+    DECODERS: Dict[str, DecoderEntry] = {}
+    # Normalized characteristic UUID -> batch decoder
+    BATCH_DECODERS: Dict[str, Callable[..., Dict[str, Any]]] = {}
+
+    @staticmethod
+    def parse_battery_level(data: bytes) -> Optional[int]:
+        """Decode battery level"""
+        try:
+            return int(data[0])
+        except (IndexError, ValueError):
+            return None
+
+
+GarminDataParser.DECODERS = dict(GarminProtocol.PROFILE.decoders)
+GarminDataParser.DERIVED_FIELDS = dict(GarminProtocol.PROFILE.derived_fields)
+GarminDataParser.BATCH_DECODERS = {
+    GarminProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"].lower(): heart_rate.parse_heart_rate_batch,
+}
@@ -0,0 +1,94 @@
+# src/devices/garmin/fake.py
+"""
+Simulated Garmin sensor for the fake BLE stack
+
+FakeGarminSensor is a FakeDevice exposing a chosen set of the standard
+sport profiles in GarminProtocol, with plausible measurements for each,
+for benchmarks and tests without hardware.
+"""
+from ...protocols.ble.fake import FakeDevice, FakeGATTService, PayloadFactory
+from .protocol import GarminProtocol
+from typing import Optional, List, Dict, Iterable
+import struct
+
+def garmin_payloads() -> Dict[str, PayloadFactory]:
+    """Plausible payloads for every Garmin measurement characteristic"""
+    chars = GarminProtocol.CHARACTERISTICS
+    return {
+        # Sensor contact detected, 8-bit heart rate and one RR interval
+        chars["HEART_RATE"]["uuid"]: lambda n: bytes([0x16, 60 + n % 40]) + struct.pack('<H', 800 + n % 200),
+        # Running at ~3 m/s with stride length and total distance
+        chars["RSC_MEASUREMENT"]["uuid"]: lambda n: struct.pack('<BHBHI', 0x07, 768 + n % 64, 170 + n % 10, 110, 30 * n),
+        # Wheel and crank counters with 1/1024 s event times that roll over
+        chars["CSC_MEASUREMENT"]["uuid"]: lambda n: struct.pack('<BIHHH', 0x03, n, n * 512 & 0xFFFF, n >> 2, n * 680 & 0xFFFF),
+        # Power with pedal balance and crank revolution data
+        chars["CYCLING_POWER_MEASUREMENT"]["uuid"]: lambda n: struct.pack('<HhBHH', 0x0021, 200 + n % 100, 100, n >> 2, n * 680 & 0xFFFF),
+        chars["BATTERY_LEVEL"]["uuid"]: lambda n: bytes([90]),
+    }
+
+def garmin_services(profiles: Iterable[str] = tuple(GarminProtocol.PROFILES)) -> List[FakeGATTService]:
+    """GATT layout of a Garmin sensor exposing the given GarminProtocol profiles"""
+    features = {
+        "RSC_SERVICE": ["RSC_FEATURE"],
+        "CSC_SERVICE": ["CSC_FEATURE"],
+        "CYCLING_POWER_SERVICE": ["CYCLING_POWER_FEATURE"],
+    }
+    layout = []
+    for profile in profiles:
+        service_name, measurement = GarminProtocol.PROFILES[profile]
+        layout.append((service_name, [measurement] + features.get(service_name, [])))
+    layout += [
+        ("DEVICE_INFO_SERVICE", ["MANUFACTURER_NAME"]),
+        ("BATTERY_SERVICE", ["BATTERY_LEVEL"]),
+    ]
+    return FakeDevice.build_services(GarminProtocol.SERVICES, GarminProtocol.CHARACTERISTICS, layout)
+
+class FakeGarminSensor(FakeDevice):
+    """
+    A simulated Garmin sensor exposing some of the GarminProtocol profiles
+
+    Every profile's measurement notifies at 4 Hz unless other rates are
+    given, and the profiles' services are advertised.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        profiles: Iterable[str] = tuple(GarminProtocol.PROFILES),
+        name: Optional[str] = "Garmin sensor",
+        notify_rates: Optional[Dict[str, float]] = None,
+        payloads: Optional[Dict[str, PayloadFactory]] = None,
+        read_values: Optional[Dict[str, bytes]] = None,
+        services: Optional[List[FakeGATTService]] = None,
+        advertised_services: Optional[List[str]] = None,
+        **kwargs
+    ):
+        """
+        Args:
+            address: Device address
+            profiles: GarminProtocol.PROFILES names exposed by the sensor
+            name: Advertised name
+
+        The remaining arguments are described in FakeDevice.
+        """
+        chars = GarminProtocol.CHARACTERISTICS
+        self.profiles = tuple(profiles)
+        merged = garmin_payloads()
+        merged.update(payloads or {})
+        super().__init__(
+            address,
+            name=name,
+            notify_rates=notify_rates if notify_rates is not None else {
+                GarminProtocol.profile_measurement(profile): 4.0 for profile in self.profiles
+            },
+            payloads=merged,
+            read_values=read_values if read_values is not None else {
+                chars["MANUFACTURER_NAME"]["uuid"]: b"Garmin International",
+                chars["BATTERY_LEVEL"]["uuid"]: bytes([90]),
+            },
+            services=services or garmin_services(self.profiles),
+            advertised_services=advertised_services if advertised_services is not None else [
+                GarminProtocol.profile_service(profile) for profile in self.profiles
+            ],
+            **kwargs
+        )
@@ -0,0 +1,44 @@
+# src/devices/garmin/protocol.py
+import os
+from ...protocols.ble.profiles import load_profile
+
+class GarminProtocol:
+    """Standard Bluetooth sport profiles exposed by Garmin sensors"""
+
+    # Services, characteristics and decoders are declared in this profile, see protocols.ble.profiles
+    PROFILE_PATH = os.path.join(os.path.dirname(__file__), "profile.yaml")
+    PROFILE = load_profile(PROFILE_PATH)
+
+    # Bluetooth SIG company identifier of Garmin International, seen in manufacturer data
+    COMPANY_ID = 0x0087
+
+    SERVICES = PROFILE.services
+
+    CHARACTERISTICS = PROFILE.characteristics
+
+    # Profile name -> (service, measurement characteristic)
+    PROFILES = {
+        "heart_rate": ("HEART_RATE_SERVICE", "HEART_RATE"),
+        "running_speed_cadence": ("RSC_SERVICE", "RSC_MEASUREMENT"),
+        "cycling_speed_cadence": ("CSC_SERVICE", "CSC_MEASUREMENT"),
+        "cycling_power": ("CYCLING_POWER_SERVICE", "CYCLING_POWER_MEASUREMENT"),
+    }
+
+    @classmethod
+    def profile_service(cls, profile: str) -> str:
+        """
+        Service UUID of a profile
+
+        Raises:
+            ValueError: If the profile is unknown
+        """
+        try:
+            return cls.SERVICES[cls.PROFILES[profile][0]]
+        except KeyError:
+            raise ValueError(f"Unknown profile {profile!r}, expected one of {sorted(cls.PROFILES)}") from None
+
+    @classmethod
+    def profile_measurement(cls, profile: str) -> str:
+        """Measurement characteristic UUID of a profile"""
+        cls.profile_service(profile)
+        return cls.CHARACTERISTICS[cls.PROFILES[profile][1]]["uuid"]
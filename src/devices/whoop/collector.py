@@ -1,185 +1,243 @@
 # src/devices/whoop/collector.py
-from ...core.base_collector import DeviceCollector
+from ...core.metrics import CollectorMetrics
+from ...core.pipeline import BackpressurePolicy
+from ...core.recording import SessionRecorder
+from ...core.reconnect import ReconnectPolicy
+from ...core.reduction import AccelerometerReducer, MovementWindow
+from ...core.samples import Sample, CHARACTERISTIC_IDS
+from ...protocols.ble.collector import BLECollector, QueuedNotification
 from ...protocols.ble.scanner import BLEScanner
+from ...protocols.ble.gatt_cache import GattProfileCache
+from ...protocols.ble.reassembly import FrameFormat, FrameReassembler, FrameDecoder
 from .protocol import WhoopProtocol
 from .data_parser import WhoopDataParser
+from .history import HistoryOffload, HistoryProgress, HistoryError
 from bleak import BleakClient
-from bleak.backends.characteristic import BleakGATTCharacteristic
-from typing import Optional, Dict, Any, Callable, Union
-import asyncio
-import logging
+from functools import partial
+from typing import Optional, Dict, Callable, Tuple, List, Any
 
-class WhoopCollector(DeviceCollector):
+# Pseudo characteristic of the records produced by movement reduction
+MOVEMENT_WINDOW_CHARACTERISTIC = "movement_window"
+
+class WhoopCollector(BLECollector):
     """Collector for Whoop devices"""
+
+    PARSER = WhoopDataParser
+    DATA_TYPE = "whoop_data"
+    SERVICES = WhoopProtocol.SERVICES
+    DEVICE_NAME_PREFIX = WhoopProtocol.DEVICE_NAME_PREFIX
     
-    def __init__(self, device_address: Optional[str] = None, data_callback: Optional[Callable[[str, Dict], None]] = None):
-        super().__init__()
-        self.scanner = BLEScanner()
-        self.client: Optional[BleakClient] = None
-        self.device_address = device_address
-        self.data_callback = data_callback
-        self.device_info: Dict[str, Any] = {}
-        self.logger.setLevel(logging.DEBUG)
-    
-    async def discover(self) -> bool:
+    def __init__(
+        self,
+        device_address: Optional[str] = None,
+        data_callback: Optional[Callable[[str, Dict], None]] = None,
+        include_raw: bool = False,
+        compact_samples: bool = False,
+        queue_size: Optional[int] = 1024,
+        backpressure: str = BackpressurePolicy.DROP_OLDEST,
+        batch_size: int = 64,
+        spill_path: Optional[str] = None,
+        recorder: Optional[SessionRecorder] = None,
+        client_factory: Callable[..., BleakClient] = BleakClient,
+        scanner: Optional[BLEScanner] = None,
+        gatt_cache: Optional[GattProfileCache] = None,
+        auto_reconnect: bool = False,
+        reconnect_policy: Optional[ReconnectPolicy] = None,
+        reduce_movement: bool = False,
+        reduction_window_s: float = 1.0,
+        reduction_modes: Tuple[str, ...] = (AccelerometerReducer.STATS, AccelerometerReducer.ACTIVITY),
+        reassemble_streams: bool = False,
+        stream_format: Optional[FrameFormat] = None,
+        frame_decoders: Optional[Dict[int, FrameDecoder]] = None,
+        packet_log_level: Optional[int] = None,
+        packet_log_every: int = 100,
+        metrics: Optional[CollectorMetrics] = None
+    ):
         """
-        Discover Whoop devices - implemented to satisfy abstract method
-        In direct connection mode, this is not typically used
+        Args:
+            device_address: Address of the strap, discovered if omitted
+            data_callback: Called with ("whoop_data", parsed dict) for each notification
+            reduce_movement: Deliver one "movement_window" record per window
+                instead of every accelerometer sample; raw windows stay
+                available through `reducer`
+            reduction_window_s: Window length used by reduce_movement
+            reduction_modes: AccelerometerReducer modes used by reduce_movement
+            reassemble_streams: Deliver one record per complete frame of the
+                CUSTOM_NOTIFY_3/4 streams instead of one per notification
+            stream_format: Framing of those streams, WhoopProtocol.STREAM_FRAMING
+                if omitted
+            frame_decoders: Frame type -> decoder for reassembled frames; frames
+                without a decoder are delivered as raw bytes. More can be added
+                through `reassemblers`
+
+        The remaining arguments are described in BLECollector.
         """
-        if self.device_address:
-            self.logger.debug(f"Using known device address: {self.device_address}")
-            return True
-            
-        self.logger.debug(f"Starting discovery with name prefix: {WhoopProtocol.DEVICE_NAME_PREFIX}")
-        
-        try:
-            devices = await self.scanner.scan_for_device(
-                name_prefix=WhoopProtocol.DEVICE_NAME_PREFIX,
-                timeout=5
+        super().__init__(
+            device_address=device_address,
+            data_callback=data_callback,
+            include_raw=include_raw,
+            compact_samples=compact_samples,
+            queue_size=queue_size,
+            backpressure=backpressure,
+            batch_size=batch_size,
+            spill_path=spill_path,
+            recorder=recorder,
+            client_factory=client_factory,
+            scanner=scanner,
+            gatt_cache=gatt_cache,
+            auto_reconnect=auto_reconnect,
+            reconnect_policy=reconnect_policy,
+            packet_log_level=packet_log_level,
+            packet_log_every=packet_log_every,
+            metrics=metrics
+        )
+        self.reducer: Optional[AccelerometerReducer] = None
+        if reduce_movement:
+            self.reducer = AccelerometerReducer(
+                self._emit_movement_window,
+                window_s=reduction_window_s,
+                modes=reduction_modes
             )
-            
-            if devices:
-                self.device_address = devices[0]["address"]
-                self.logger.info(f"Found device: {self.device_address}")
-                return True
-                
-            self.logger.warning("No Whoop devices found")
-            return False
-            
-        except Exception as e:
-            self.logger.error(f"Discovery failed: {str(e)}")
-            return False
-    
-    async def connect(self) -> bool:
-        """
-        Connect to the Whoop device - implemented to satisfy abstract method
-        """
-        if not self.device_address:
-            self.logger.error("No device address available")
-            return False
-            
-        return await self.connect_to_address(self.device_address)
-    
-    async def connect_to_address(self, address: str) -> bool:
-        """Connect directly to a device by address"""
-        try:
-            self.logger.debug(f"Connecting directly to device: {address}")
-            self.client = BleakClient(address)
-            await self.client.connect()
-            
-            # Store basic device info
-            self.device_info = {
-                "address": address,
-            }
-            
-            # Read additional device info if available
-            try:
-                services = await self.client.get_services()
-                for service in services.services.values():
-                    if service.uuid == WhoopProtocol.SERVICES["DEVICE_INFO_SERVICE"]:
-                        for char in service.characteristics:
-                            if WhoopProtocol.CHARACTERISTICS["MANUFACTURER_NAME"]["uuid"] in str(char.uuid):
-                                manufacturer = await self.client.read_gatt_char(char.uuid)
-                                self.device_info["manufacturer"] = manufacturer.decode()
-            except Exception as e:
-                self.logger.debug(f"Couldn't read manufacturer name: {e}")
-            
+            self._direct_batches = True
+        self.reassemblers: Dict[str, FrameReassembler] = {}
+        if reassemble_streams:
+            frame_format = stream_format or FrameFormat(**WhoopProtocol.STREAM_FRAMING)
+            for name in WhoopProtocol.STREAM_CHARACTERISTICS:
+                uuid = WhoopProtocol.CHARACTERISTICS[name]["uuid"].lower()
+                field = WhoopDataParser.DECODERS[uuid][0]
+                on_frame = partial(self._emit_frame, uuid, field, CHARACTERISTIC_IDS.get_id(uuid, field))
+                self.reassemblers[uuid] = FrameReassembler(frame_format, on_frame, frame_decoders)
+            self._direct_batches = True
+        self._frame_timestamp_ns = 0
+        self._movement_uuid = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"].lower()
+        self._window_char_id = CHARACTERISTIC_IDS.get_id(MOVEMENT_WINDOW_CHARACTERISTIC, "movement_window")
+
+    def _prepare_batch(self, batch: List[QueuedNotification]) -> List[QueuedNotification]:
+        """Hand stream notifications to the reassemblers and accelerometer ones to the reducer"""
+        if self.reassemblers:
+            batch = self._reassemble(batch)
+        if self.reducer is None:
+            return batch
+        return self._reduce_movement(batch)
+
+    def _reassemble(self, batch: List[QueuedNotification]) -> List[QueuedNotification]:
+        """Feed the stream notifications of a batch to their reassemblers, return the rest"""
+        reassemblers = self.reassemblers
+        rest = []
+        for item in batch:
+            timestamp_ns, char_uuid, data, _ = item
+            reassembler = reassemblers.get(char_uuid.lower())
+            if reassembler is None:
+                rest.append(item)
+                continue
+            # Frames are stamped with the arrival of the notification completing them
+            self._frame_timestamp_ns = timestamp_ns
             try:
-                battery_char = WhoopProtocol.CHARACTERISTICS["BATTERY_LEVEL"]["uuid"]
-                battery = await self.client.read_gatt_char(battery_char)
-                self.device_info["battery_level"] = int(battery[0])
+                reassembler.feed(data)
             except Exception as e:
-                self.logger.debug(f"Couldn't read battery level: {e}")
-            
-            self.is_connected = True
-            self.logger.info(f"Connected to device: {address}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Connection failed: {str(e)}")
-            return False
-    
-    def _handle_data(self, characteristic: Union[BleakGATTCharacteristic, str], data: bytearray):
+                if self.metrics is not None:
+                    self.metrics.parse_errors += 1
+                self.logger.error(f"Frame delivery error for {char_uuid}: {str(e)}")
+        return rest
+
+    def _emit_frame(self, char_uuid: str, field: str, char_id: int, frame_type: int, body: memoryview, decoded: Any):
+        """Reassembler callback: deliver one complete frame, undecoded frames as raw bytes"""
+        if not self.data_callback:
+            return
+        raw = bytes(body)
+        value = raw if decoded is None else decoded
+        if self.compact_samples:
+            data = Sample(self._frame_timestamp_ns, char_id, raw, value)
+        else:
+            data = {
+                "characteristic": char_uuid, "timestamp_ns": self._frame_timestamp_ns,
+                field: value, "frame_type": frame_type
+            }
+            if self.include_raw:
+                data["raw"] = raw.hex()
+        self.data_callback(self.DATA_TYPE, data)
+
+    def _reduce_movement(self, batch: List[QueuedNotification]) -> List[QueuedNotification]:
+        """Feed the accelerometer notifications of a batch to the reducer, return the rest"""
+        movement_uuid = self._movement_uuid
+        timestamps = []
+        payloads = []
+        rest = []
+        for item in batch:
+            timestamp_ns, char_uuid, data, _ = item
+            if char_uuid.lower() == movement_uuid and len(data) >= 6:
+                timestamps.append(timestamp_ns)
+                payloads.append(bytes(data[:6]))
+            else:
+                rest.append(item)
+        if payloads:
+            columns = WhoopDataParser.parse_accelerometer_batch(payloads)
+            self.reducer.add_columns(timestamps, columns["x"], columns["y"], columns["z"])
+        return rest
+
+    def _emit_movement_window(self, window: MovementWindow):
+        """Reducer callback: deliver one reduced window"""
+        if not self.data_callback:
+            return
+        if self.compact_samples:
+            data = Sample(window.start_ns, self._window_char_id, b"", window)
+        else:
+            data = {
+                "characteristic": MOVEMENT_WINDOW_CHARACTERISTIC, "timestamp_ns": window.start_ns,
+                "movement_window": window.as_dict()
+            }
+        self.data_callback(self.DATA_TYPE, data)
+
+    async def offload_history(
+        self,
+        offset: Optional[int] = None,
+        on_chunk: Optional[Callable[[int, memoryview], None]] = None,
+        on_progress: Optional[Callable[[HistoryProgress], None]] = None,
+        acknowledge: bool = False,
+        **options
+    ) -> Optional[bytearray]:
         """
-        Handle incoming data from device
-        
+        Download the history stored on the strap, e.g. after the gateway was offline
+
+        Run it before start_collection: the transfer needs the CUSTOM_NOTIFY_3/4
+        channels to itself.
+
         Args:
-            characteristic: Either a BleakGATTCharacteristic object or UUID string
-            data: Raw data received from the device
+            offset: Where to start, e.g. the `next_offset` of the last progress
+                reported before an interrupted transfer
+            on_chunk: Called with (offset, view) per received window, in order
+            on_progress: Called with the HistoryProgress after every window
+            acknowledge: Let the strap free the downloaded history afterwards
+            options: HistoryOffload arguments, e.g. window and pipeline_depth
+
+        Returns:
+            The history bytes, or None if the transfer failed
         """
-        if self.data_callback:
-            try:
-                # Extract the UUID from the characteristic object or use the string directly
-                if isinstance(characteristic, BleakGATTCharacteristic):
-                    char_uuid = str(characteristic.uuid)
-                else:
-                    char_uuid = str(characteristic)
-                
-                parsed_data = WhoopDataParser.parse_characteristic_data(char_uuid, data)
-                self.data_callback("whoop_data", parsed_data)
-                
-                # Log the first few bytes of data for debugging
-                self.logger.debug(f"Received data from {char_uuid}: {data[:8].hex()}")
-                
-            except Exception as e:
-                self.logger.error(f"Data handling error for {characteristic}: {str(e)}")
-    
-    async def start_collection(self) -> bool:
-        """Start collecting data from the device"""
         if not self.client or not self.is_connected:
             self.logger.error("Device not connected")
-            return False
-        
-        try:
-            # Enable notifications for all notifiable characteristics
-            services = await self.client.get_services()
-            
-            for service in services.services.values():
-                self.logger.debug(f"Checking service: {service.uuid}")
-                for char in service.characteristics:
-                    if "notify" in char.properties:
-                        try:
-                            self.logger.debug(f"Enabling notifications for: {char.uuid}")
-                            await self.client.start_notify(char, self._handle_data)
-                            self.logger.info(f"Enabled notifications for {char.uuid}")
-                        except Exception as e:
-                            self.logger.warning(f"Failed to enable notifications for {char.uuid}: {e}")
-            
-            self.logger.info("Started data collection")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Failed to start collection: {str(e)}")
-            return False
-    
-    async def stop_collection(self) -> bool:
-        """Stop collecting data"""
-        if not self.client or not self.is_connected:
-            return False
-            
+            return None
+        if self._collecting:
+            self.logger.error("Cannot offload history while collecting")
+            return None
         try:
-            services = await self.client.get_services()
-            for service in services.services.values():
-                for char in service.characteristics:
-                    if "notify" in char.properties:
-                        try:
-                            await self.client.stop_notify(char)
-                        except Exception as e:
-                            self.logger.warning(f"Failed to disable notifications for {char.uuid}: {e}")
-            
-            self.logger.info("Stopped data collection")
-            return True
-        except Exception as e:
-            self.logger.error(f"Failed to stop collection: {str(e)}")
-            return False
-    async def disconnect(self) -> bool:
-        """Disconnect from the device"""
-        if self.client and self.is_connected:
-            try:
-                await self.client.disconnect()
-                self.is_connected = False
-                self.logger.info("Disconnected from device")
-                return True
-            except Exception as e:
-                self.logger.error(f"Disconnect failed: {str(e)}")
-        return False
\ No newline at end of file
+            async with HistoryOffload(self.client, logger=self.logger, **options) as offload:
+                data = await offload.download(offset, on_chunk=on_chunk, on_progress=on_progress)
+                if acknowledge:
+                    await offload.acknowledge(offload.progress.next_offset)
+                return data
+        except HistoryError as e:
+            resume = e.progress.next_offset if e.progress is not None else offset
+            self.logger.error(f"History offload failed, resume from offset {resume}: {str(e)}")
+            return None
+
+    async def _subscribe(self) -> List[Tuple[str, int]]:
+        """Restart the streams at a frame boundary, their sequence numbers restart with the connection"""
+        for reassembler in self.reassemblers.values():
+            reassembler.reset()
+        return await super()._subscribe()
+
+    def _flush(self):
+        """Close the open movement window before the recorder is flushed"""
+        if self.reducer is not None and self.data_callback:
+            self.reducer.flush()
+        super()._flush()
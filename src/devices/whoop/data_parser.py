@@ -1,40 +1,71 @@
 # src/devices/whoop/data_parser.py
 import struct
-from typing import Optional, List, Dict, Any
+import sys
+from array import array
+from typing import Optional, List, Dict, Any, Callable, Iterable, Union
+from ...protocols.ble import heart_rate
+from ...protocols.ble.decoding import CharacteristicParser, DecoderEntry
+from ...protocols.ble.heart_rate import HeartRateMeasurement
 from .protocol import WhoopProtocol
 
-class WhoopDataParser:
-    """Parse raw Whoop device data"""
-    
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, batch decoding falls back to array
+    np = None
+
+# A single concatenated buffer or one payload per notification
+BatchInput = Union[bytes, bytearray, memoryview, Iterable[bytes]]
+
+_HRV_STRUCT = struct.Struct('<H')
+_ACCEL_STRUCT = struct.Struct('<hhh')
+# Batch decoders scale like the profile's layouts
+_ACCEL_SCALE = 1 / WhoopProtocol.PROFILE.layout("CUSTOM_NOTIFY_2")["fields"][0]["divisor"]
+_HRV_SCALE = 1 / WhoopProtocol.PROFILE.layout("CUSTOM_NOTIFY_1")["fields"][0]["divisor"]
+_BIG_ENDIAN = sys.byteorder == "big"
+
+class WhoopDataParser(CharacteristicParser):
+    """
+    Parse raw Whoop device data
+
+    Notifications are dispatched to the decoders compiled from
+    WhoopProtocol.PROFILE; the parse_* methods decode the same
+    characteristics by hand and produce identical values.
+    """
+
+    # Normalized characteristic UUID -> (field name, decoder), from the profile
+    DECODERS: Dict[str, DecoderEntry] = {}
+    # Normalized characteristic UUID -> batch decoder
+    BATCH_DECODERS: Dict[str, Callable[..., Dict[str, Any]]] = {}
+
     @staticmethod
     def parse_heart_rate(data: bytes) -> Optional[int]:
-        """Decode heart rate measurement"""
-        try:
-            return int(data[1]) if len(data) >= 2 else None
-        except (IndexError, ValueError):
-            return None
-    
+        """Decode the heart rate value of a heart rate measurement"""
+        return heart_rate.parse_heart_rate(data)
+
+    @staticmethod
+    def parse_heart_rate_measurement(data: bytes) -> Optional[HeartRateMeasurement]:
+        """Decode heart rate, sensor contact, energy expended and RR intervals"""
+        return heart_rate.parse_heart_rate_measurement(data)
+
     @staticmethod
     def parse_hrv(data: bytes) -> Optional[float]:
         """Decode Heart Rate Variability"""
         try:
-            return struct.unpack('<H', data[:2])[0] / 10.0 if len(data) >= 2 else None
+            return _HRV_STRUCT.unpack_from(data)[0] / 10.0 if len(data) >= 2 else None
         except Exception:
             return None
-    
+
     @staticmethod
     def parse_accelerometer(data: bytes) -> Optional[List[float]]:
         """Decode movement/accelerometer data"""
         try:
             if len(data) >= 6:
-                x = struct.unpack('<h', data[0:2])[0] / 16384.0
-                y = struct.unpack('<h', data[2:4])[0] / 16384.0
-                z = struct.unpack('<h', data[4:6])[0] / 16384.0
-                return [x, y, z]
+                x, y, z = _ACCEL_STRUCT.unpack_from(data)
+                return [x / 16384.0, y / 16384.0, z / 16384.0]
         except Exception:
             pass
         return None
-    
+
     @staticmethod
     def parse_battery_level(data: bytes) -> Optional[int]:
         """Decode battery level"""
@@ -42,35 +73,106 @@ class WhoopDataParser:
             return int(data[0])
         except (IndexError, ValueError):
             return None
-    
+
+    @staticmethod
+    def parse_opaque(data: bytes) -> bytes:
+        """Keep an undecoded payload as raw bytes, see WhoopCollector(reassemble_streams=True)"""
+        return bytes(data)
+
+    @staticmethod
+    def _join_samples(payloads: BatchInput, sample_size: int) -> bytes:
+        """
+        Collect fixed-size samples into one contiguous buffer
+
+        A bytes-like input is treated as concatenated samples and any
+        trailing partial sample is dropped. An iterable contributes the
+        first sample of each payload, matching the per-packet parsers,
+        and skips payloads that are too short.
+        """
+        if isinstance(payloads, (bytes, bytearray, memoryview)):
+            buffer = bytes(payloads)
+            return buffer[:len(buffer) - len(buffer) % sample_size]
+        if not isinstance(payloads, (list, tuple)):
+            payloads = list(payloads)
+        # Fast path for the common case of one sample per notification
+        if set(map(len, payloads)) == {sample_size}:
+            return b"".join(payloads)
+        return b"".join(p[:sample_size] for p in payloads if len(p) >= sample_size)
+
+    @staticmethod
+    def _decode_int16(buffer: bytes, typecode: str) -> array:
+        """Reinterpret a little-endian buffer as a typed integer array"""
+        values = array(typecode)
+        values.frombytes(buffer)
+        if _BIG_ENDIAN:
+            values.byteswap()
+        return values
+
     @classmethod
-    def parse_characteristic_data(cls, characteristic_uuid: str, data: bytes) -> Dict[str, Any]:
-        """Parse data based on characteristic UUID"""
-        parsed_data = {
-            "raw": data.hex(),
-            "characteristic": characteristic_uuid
+    def parse_accelerometer_batch(cls, payloads: BatchInput, use_numpy: bool = False) -> Dict[str, Any]:
+        """
+        Decode many accelerometer samples in a single pass
+
+        Args:
+            payloads: Concatenated 6-byte samples or an iterable of notification payloads
+            use_numpy: Return numpy arrays instead of array('d') columns
+
+        Returns:
+            Dictionary of "x", "y" and "z" columns in g
+        """
+        buffer = cls._join_samples(payloads, _ACCEL_STRUCT.size)
+
+        if use_numpy:
+            if np is None:
+                raise ImportError("numpy is required for use_numpy=True")
+            samples = np.frombuffer(buffer, dtype='<i2').reshape(-1, 3) * _ACCEL_SCALE
+            return {"x": samples[:, 0], "y": samples[:, 1], "z": samples[:, 2]}
+
+        values = cls._decode_int16(buffer, 'h')
+        return {
+            axis: array('d', [v * _ACCEL_SCALE for v in values[offset::3]])
+            for offset, axis in enumerate(("x", "y", "z"))
         }
-        
-        # Convert UUID to standard format if needed
-        uuid = str(characteristic_uuid).lower()
-        
-        # Match against known characteristics
-        if uuid == WhoopProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"].lower():
-            parsed_data["heart_rate"] = cls.parse_heart_rate(data)
-            
-        elif uuid == WhoopProtocol.CHARACTERISTICS["BATTERY_LEVEL"]["uuid"].lower():
-            parsed_data["battery_level"] = cls.parse_battery_level(data)
-            
-        elif uuid == WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_1"]["uuid"].lower():
-            parsed_data["hrv"] = cls.parse_hrv(data)
-            
-        elif uuid == WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"].lower():
-            parsed_data["movement"] = cls.parse_accelerometer(data)
-            
-        elif uuid == WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_3"]["uuid"].lower():
-            parsed_data["custom_data_3"] = data.hex()
-            
-        elif uuid == WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_4"]["uuid"].lower():
-            parsed_data["custom_data_4"] = data.hex()
-        
-        return parsed_data
\ No newline at end of file
+
+    @classmethod
+    def parse_hrv_batch(cls, payloads: BatchInput, use_numpy: bool = False) -> Dict[str, Any]:
+        """
+        Decode many HRV samples in a single pass
+
+        Args:
+            payloads: Concatenated 2-byte samples or an iterable of notification payloads
+            use_numpy: Return a numpy array instead of an array('d') column
+
+        Returns:
+            Dictionary with an "hrv" column in milliseconds
+        """
+        buffer = cls._join_samples(payloads, _HRV_STRUCT.size)
+
+        if use_numpy:
+            if np is None:
+                raise ImportError("numpy is required for use_numpy=True")
+            return {"hrv": np.frombuffer(buffer, dtype='<u2') * _HRV_SCALE}
+
+        values = cls._decode_int16(buffer, 'H')
+        return {"hrv": array('d', [v * _HRV_SCALE for v in values])}
+
+    @staticmethod
+    def parse_heart_rate_batch(payloads: Iterable[bytes], use_numpy: bool = False) -> Dict[str, Any]:
+        """
+        Decode many heart rate measurements in a single pass
+
+        Returns:
+            Dictionary of "heart_rate", "energy_expended", "rr_intervals"
+            and "rr_offsets" columns, see heart_rate.parse_heart_rate_batch
+        """
+        return heart_rate.parse_heart_rate_batch(payloads, use_numpy=use_numpy)
+
+
+WhoopDataParser.DECODERS = dict(WhoopProtocol.PROFILE.decoders)
+# Parser dicts keep the bare heart rate under "heart_rate"
+WhoopDataParser.DERIVED_FIELDS = dict(WhoopProtocol.PROFILE.derived_fields)
+WhoopDataParser.BATCH_DECODERS = {
+    WhoopProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"].lower(): WhoopDataParser.parse_heart_rate_batch,
+    WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_1"]["uuid"].lower(): WhoopDataParser.parse_hrv_batch,
+    WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"].lower(): WhoopDataParser.parse_accelerometer_batch,
+}
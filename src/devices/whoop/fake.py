@@ -0,0 +1,261 @@
+# src/devices/whoop/fake.py
+"""
+Simulated Whoop strap for the fake BLE stack
+
+FakeWhoop is a FakeDevice with the GATT layout, advertisement, readable
+values and notification payloads of a strap as described by
+WhoopProtocol, for benchmarks and tests without hardware.
+FramedPayloads streams framed CUSTOM_NOTIFY_3/4 data from it, and
+FakeHistoryServer answers the history commands of history.py.
+"""
+from ...protocols.ble.fake import FakeBleakClient, FakeDevice, FakeGATTService, PayloadFactory
+from ...protocols.ble.reassembly import FrameFormat, FrameReassembler, Packetizer
+from . import history
+from .protocol import WhoopProtocol
+from collections import deque
+from typing import Optional, List, Dict, Callable, Tuple
+import asyncio
+import random
+import struct
+import weakref
+
+def whoop_payloads() -> Dict[str, PayloadFactory]:
+    """Plausible payloads for every Whoop notify characteristic"""
+    chars = WhoopProtocol.CHARACTERISTICS
+    accel = struct.Struct('<hhh')
+    return {
+        # Sensor contact detected, 8-bit heart rate and one RR interval
+        chars["HEART_RATE"]["uuid"]: lambda n: bytes([0x16, 60 + n % 40]) + struct.pack('<H', 800 + n % 200),
+        chars["BATTERY_LEVEL"]["uuid"]: lambda n: bytes([80]),
+        chars["CUSTOM_NOTIFY_1"]["uuid"]: lambda n: struct.pack('<H', 400 + n % 200),
+        chars["CUSTOM_NOTIFY_2"]["uuid"]: lambda n: accel.pack(n % 1000, -(n % 500), 16384),
+        chars["CUSTOM_NOTIFY_3"]["uuid"]: lambda n: bytes(20),
+        chars["CUSTOM_NOTIFY_4"]["uuid"]: lambda n: bytes(20),
+    }
+
+def whoop_services() -> List[FakeGATTService]:
+    """GATT layout of a Whoop strap built from WhoopProtocol"""
+    return FakeDevice.build_services(WhoopProtocol.SERVICES, WhoopProtocol.CHARACTERISTICS, [
+        ("CUSTOM_SERVICE", ["CUSTOM_WRITE", "CUSTOM_NOTIFY_1", "CUSTOM_NOTIFY_2",
+                            "CUSTOM_NOTIFY_3", "CUSTOM_NOTIFY_4"]),
+        ("HEART_RATE_SERVICE", ["HEART_RATE"]),
+        ("DEVICE_INFO_SERVICE", ["MANUFACTURER_NAME"]),
+        ("BATTERY_SERVICE", ["BATTERY_LEVEL"]),
+    ])
+
+class FakeWhoop(FakeDevice):
+    """
+    A simulated Whoop strap
+
+    Streams accelerometer data at 50 Hz and heart rate at 1 Hz unless
+    other rates are given; payloads passed in override the defaults per
+    characteristic.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        name: Optional[str] = "WHOOP 4A0000000",
+        notify_rates: Optional[Dict[str, float]] = None,
+        payloads: Optional[Dict[str, PayloadFactory]] = None,
+        read_values: Optional[Dict[str, bytes]] = None,
+        services: Optional[List[FakeGATTService]] = None,
+        advertised_services: Optional[List[str]] = None,
+        **kwargs
+    ):
+        """
+        Args:
+            address: Device address
+            name: Advertised name
+
+        The remaining arguments are described in FakeDevice.
+        """
+        chars = WhoopProtocol.CHARACTERISTICS
+        merged = whoop_payloads()
+        merged.update(payloads or {})
+        super().__init__(
+            address,
+            name=name,
+            notify_rates=notify_rates if notify_rates is not None else {
+                chars["CUSTOM_NOTIFY_2"]["uuid"]: 50.0,
+                chars["HEART_RATE"]["uuid"]: 1.0,
+            },
+            payloads=merged,
+            read_values=read_values if read_values is not None else {
+                chars["MANUFACTURER_NAME"]["uuid"]: b"WHOOP Inc.",
+                chars["BATTERY_LEVEL"]["uuid"]: bytes([80]),
+            },
+            services=services or whoop_services(),
+            advertised_services=advertised_services if advertised_services is not None else [
+                WhoopProtocol.SERVICES["HEART_RATE_SERVICE"], WhoopProtocol.SERVICES["CUSTOM_SERVICE"]
+            ],
+            **kwargs
+        )
+
+    @classmethod
+    def generate(cls, n: int, address: str, rng: random.Random, **kwargs) -> "FakeWhoop":
+        """Device factory for FakeAdapter.populate: numbered straps with random manufacturer data"""
+        options = dict(name=f"WHOOP 4A{n:07d}", manufacturer_data={0x0059: bytes(rng.getrandbits(8) for _ in range(4))})
+        options.update(kwargs)
+        return cls(address, **options)
+
+class FramedPayloads:
+    """
+    Payload factory cutting a stream of frames into sequenced notifications
+
+    Notification n carries the n-th packet of the stream, so a notification
+    lost on air leaves a sequence gap. Asking for an earlier index, as a new
+    subscription does, restarts the stream and its sequence numbers.
+    """
+
+    def __init__(
+        self,
+        frame_format: FrameFormat,
+        frames: Callable[[int], Tuple[int, bytes]],
+        payload_size: int = 20
+    ):
+        """
+        Args:
+            frame_format: Layout of the stream
+            frames: Returns (frame type, body) of the n-th frame
+            payload_size: Notification payload size, ATT MTU minus 3
+        """
+        self.frame_format = frame_format
+        self.frames = frames
+        self.payload_size = payload_size
+        self._restart()
+
+    def _restart(self):
+        self._packetizer = Packetizer(self.frame_format, self.payload_size)
+        self._packets: deque = deque()
+        self._first = 0
+        self._frame = 0
+
+    def __call__(self, n: int) -> bytes:
+        if n < self._first:
+            self._restart()
+        while n >= self._first + len(self._packets):
+            frame_type, body = self.frames(self._frame)
+            self._frame += 1
+            self._packets.extend(self._packetizer.packets(self.frame_format.encode(frame_type, body)))
+        while self._first < n:
+            self._packets.popleft()
+            self._first += 1
+        return self._packets[0]
+
+class _HistorySession:
+    """Per-connection state of a FakeHistoryServer"""
+
+    def __init__(self, server: "FakeHistoryServer"):
+        self.commands: deque = deque()
+        self.parser = FrameReassembler(
+            history.COMMAND_FORMAT,
+            lambda frame_type, body, decoded: self.commands.append((frame_type, bytes(body)))
+        )
+        self.control = Packetizer(history.STREAM_FORMAT)
+        self.data = Packetizer(history.STREAM_FORMAT)
+        self.budget = server.packets_per_event
+        self.task: Optional[asyncio.Task] = None
+
+class FakeHistoryServer:
+    """
+    Serves a history buffer through the Whoop history commands
+
+    Attached to a FakeDevice, it answers the commands written to
+    CUSTOM_WRITE as described in devices.whoop.history. Requests are served
+    one after the other; a request arriving while the server is idle waits
+    for the next connection event, so a host that does not pipeline its
+    requests pays a round trip per request. Notifications go out
+    `packets_per_event` per connection event of the device and follow its
+    notification_loss, sized by the MTU agreed on connect.
+    """
+
+    def __init__(self, history_buffer: bytes, first_offset: int = 0, frame_packets: int = 4, packets_per_event: int = 6):
+        """
+        Args:
+            history_buffer: Stored history bytes
+            first_offset: Absolute offset of the first stored byte
+            frame_packets: Notifications per data frame
+            packets_per_event: Notifications per connection event
+        """
+        self.history = bytes(history_buffer)
+        self.first_offset = first_offset
+        self.frame_packets = frame_packets
+        self.packets_per_event = packets_per_event
+        self.device: Optional[FakeDevice] = None
+        self.requests = 0
+        self.bytes_sent = 0
+        self.notifications_lost = 0
+        self._sessions: "weakref.WeakKeyDictionary[FakeBleakClient, _HistorySession]" = weakref.WeakKeyDictionary()
+
+    @property
+    def end_offset(self) -> int:
+        return self.first_offset + len(self.history)
+
+    def attach(self, device: FakeDevice) -> "FakeHistoryServer":
+        """Handle the history commands written to the device"""
+        self.device = device
+        device.write_handlers[history.WRITE_UUID] = self.on_write
+        return self
+
+    def on_write(self, client: FakeBleakClient, data: bytes, response: bool):
+        session = self._sessions.get(client)
+        if session is None:
+            session = self._sessions[client] = _HistorySession(self)
+        session.parser.feed(data)
+        if session.commands and (session.task is None or session.task.done()):
+            session.task = asyncio.get_running_loop().create_task(self._serve(client, session))
+
+    async def _serve(self, client: FakeBleakClient, session: _HistorySession):
+        # The first command of a burst is only seen at the next connection event
+        await self._event()
+        while session.commands and client.is_connected:
+            frame_type, body = session.commands.popleft()
+            if frame_type == history.CMD_HISTORY_INFO and not body:
+                await self._reply(client, session, history.RSP_HISTORY_INFO, history.INFO_STRUCT.pack(self.first_offset, self.end_offset))
+            elif frame_type == history.CMD_ACK_HISTORY and len(body) == history.OFFSET_STRUCT.size:
+                offset = min(max(history.OFFSET_STRUCT.unpack(body)[0], self.first_offset), self.end_offset)
+                self.history = self.history[offset - self.first_offset:]
+                self.first_offset = offset
+                await self._reply(client, session, history.RSP_HISTORY_INFO, history.INFO_STRUCT.pack(self.first_offset, self.end_offset))
+            elif frame_type == history.CMD_READ_HISTORY and len(body) == history.READ_STRUCT.size:
+                await self._read(client, session, *history.READ_STRUCT.unpack(body))
+
+    async def _read(self, client: FakeBleakClient, session: _HistorySession, offset: int, length: int):
+        self.requests += 1
+        if offset < self.first_offset or offset + length > self.end_offset:
+            await self._reply(client, session, history.RSP_READ_DONE, history.DONE_STRUCT.pack(offset, length, history.STATUS_OUT_OF_RANGE))
+            return
+        payload_size = client.mtu_size - history.ATT_HEADER
+        # History bytes that fill frame_packets notifications exactly
+        chunk = max(1, self.frame_packets * (payload_size - history.STREAM_FORMAT.sequence_size) - history.DATA_FRAME_OVERHEAD)
+        position = offset
+        while position < offset + length and client.is_connected:
+            size = min(chunk, offset + length - position)
+            data = self.history[position - self.first_offset:position - self.first_offset + size]
+            frame = history.STREAM_FORMAT.encode(history.HISTORY_DATA, history.OFFSET_STRUCT.pack(position) + data)
+            await self._send(client, session.data, history.DATA_UUID, frame, session)
+            self.bytes_sent += size
+            position += size
+        await self._reply(client, session, history.RSP_READ_DONE, history.DONE_STRUCT.pack(offset, length, history.STATUS_OK))
+
+    async def _reply(self, client: FakeBleakClient, session: _HistorySession, frame_type: int, body: bytes):
+        frame = history.STREAM_FORMAT.encode(frame_type, body)
+        await self._send(client, session.control, history.CONTROL_UUID, frame, session)
+
+    async def _send(self, client: FakeBleakClient, packetizer: Packetizer, uuid: str, frame: bytes, session: _HistorySession):
+        device = self.device
+        packetizer.payload_size = client.mtu_size - history.ATT_HEADER
+        for packet in packetizer.packets(frame):
+            if session.budget == 0:
+                session.budget = self.packets_per_event
+                await self._event()
+            session.budget -= 1
+            if device.notification_loss and device.rng.random() < device.notification_loss:
+                self.notifications_lost += 1
+                continue
+            await client.send_notification(uuid, packet)
+
+    async def _event(self):
+        """Wait for the next connection event"""
+        await asyncio.sleep(self.device.connection_interval)
@@ -0,0 +1,442 @@
+# src/devices/whoop/history.py
+"""
+Offload of the history stored on a Whoop strap
+
+Commands are frames written to CUSTOM_WRITE without response. Replies
+come back as frames on CUSTOM_NOTIFY_3 and history bytes as data frames
+on CUSTOM_NOTIFY_4, each tagged with its absolute offset in the history
+buffer, so the host can place them wherever they land and re-request
+only what went missing:
+
+    INFO                      -> HISTORY_INFO first, end
+    READ offset, length       -> DATA offset bytes ... then READ_DONE offset, length, status
+    ACK offset                -> HISTORY_INFO first, end (history before offset freed)
+
+The framing and command set are an assumption: the strap's protocol is
+not documented, so they live here as constants rather than in
+WhoopProtocol.
+"""
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, Callable, List, Tuple
+import asyncio
+import logging
+import struct
+import time
+from ...protocols.ble.reassembly import FrameFormat, FrameReassembler
+from .protocol import WhoopProtocol
+
+# Command frame types, host to strap
+CMD_HISTORY_INFO = 0x10
+CMD_READ_HISTORY = 0x11
+CMD_ACK_HISTORY = 0x12
+
+# Reply frame types, strap to host
+RSP_HISTORY_INFO = 0x90
+RSP_READ_DONE = 0x91
+HISTORY_DATA = 0x92
+
+# READ_DONE status codes
+STATUS_OK = 0
+STATUS_OUT_OF_RANGE = 1
+STATUS_BUSY = 2
+
+INFO_STRUCT = struct.Struct("<II")
+READ_STRUCT = struct.Struct("<II")
+DONE_STRUCT = struct.Struct("<IIB")
+OFFSET_STRUCT = struct.Struct("<I")
+
+# Commands are written one whole frame per write, so they carry no sequence number
+COMMAND_FORMAT = FrameFormat(**dict(WhoopProtocol.STREAM_FRAMING, sequence_format=None))
+STREAM_FORMAT = FrameFormat(**WhoopProtocol.STREAM_FRAMING)
+
+# Framing bytes around the history bytes of one data frame
+DATA_FRAME_OVERHEAD = STREAM_FORMAT.header_size + STREAM_FORMAT.crc_size + OFFSET_STRUCT.size
+
+# ATT header bytes of a notification or write
+ATT_HEADER = 3
+DEFAULT_MTU = 23
+
+# Command channel and the channels of replies and history data
+WRITE_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_WRITE"]["uuid"]
+CONTROL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_3"]["uuid"]
+DATA_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_4"]["uuid"]
+
+class HistoryError(Exception):
+    """A history transfer failed; resume it from `progress.next_offset`"""
+
+    def __init__(self, message: str, progress: Optional["HistoryProgress"] = None):
+        super().__init__(message)
+        self.progress = progress
+
+@dataclass
+class HistoryProgress:
+    """State of one transfer, `next_offset` is where to resume it"""
+    start_offset: int
+    end_offset: int
+    next_offset: int
+    bytes_received: int = 0
+    requests: int = 0
+    retries: int = 0
+    lost_frames: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def fraction(self) -> float:
+        size = self.end_offset - self.start_offset
+        return (self.next_offset - self.start_offset) / size if size else 1.0
+
+    @property
+    def bytes_per_s(self) -> float:
+        return self.bytes_received / self.elapsed_s if self.elapsed_s else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["fraction"] = self.fraction
+        data["bytes_per_s"] = self.bytes_per_s
+        return data
+
+class _Window:
+    """One window of a transfer and the byte ranges of it received so far"""
+
+    __slots__ = ("start", "end", "ranges", "received", "retries")
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+        self.ranges: List[Tuple[int, int]] = []
+        self.received = 0
+        self.retries = 0
+
+    @property
+    def complete(self) -> bool:
+        return self.received == self.end - self.start
+
+    def add(self, start: int, end: int) -> int:
+        """Mark [start, end) received, returns the number of new bytes"""
+        start = max(start, self.start)
+        end = min(end, self.end)
+        if start >= end:
+            return 0
+        new = end - start
+        merged_start, merged_end = start, end
+        ranges = []
+        for range_start, range_end in self.ranges:
+            if range_end < start or range_start > end:
+                ranges.append((range_start, range_end))
+                continue
+            new -= max(0, min(range_end, end) - max(range_start, start))
+            merged_start = min(merged_start, range_start)
+            merged_end = max(merged_end, range_end)
+        ranges.append((merged_start, merged_end))
+        ranges.sort()
+        self.ranges = ranges
+        self.received += new
+        return new
+
+    def missing(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Gaps left in [start, end)"""
+        gaps = []
+        position = max(start, self.start)
+        end = min(end, self.end)
+        for range_start, range_end in self.ranges:
+            if range_end <= position:
+                continue
+            if range_start >= end:
+                break
+            if range_start > position:
+                gaps.append((position, range_start))
+            position = max(position, range_end)
+        if position < end:
+            gaps.append((position, end))
+        return gaps
+
+class HistoryOffload:
+    """
+    Downloads history over a connected BleakClient
+
+    READ requests cover one window each and up to `pipeline_depth` of them
+    are in flight at once, so the strap never idles waiting for the next
+    request. Data lands directly in a preallocated buffer; windows are
+    handed to `on_chunk` in order as they complete, and the gaps left by
+    lost notifications are requested again.
+
+    Owns the CUSTOM_NOTIFY_3/4 subscriptions while open, so use it before
+    live collection starts or after it stopped.
+    """
+
+    def __init__(
+        self,
+        client,
+        window: int = 4096,
+        pipeline_depth: int = 4,
+        timeout: float = 2.0,
+        max_retries: int = 5,
+        logger: Optional[logging.Logger] = None
+    ):
+        """
+        Args:
+            client: Connected BleakClient
+            window: Bytes per READ request
+            pipeline_depth: READ requests in flight at once
+            timeout: Seconds without any reply before the requests in flight
+                are sent again
+            max_retries: Requests of one window repeated before giving up
+            logger: Logger, the class name if omitted
+        """
+        if window <= 0 or pipeline_depth <= 0:
+            raise ValueError("window and pipeline_depth must be positive")
+        self.client = client
+        self.window = window
+        self.pipeline_depth = pipeline_depth
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.mtu = DEFAULT_MTU
+        # Progress of the current or last transfer
+        self.progress: Optional[HistoryProgress] = None
+        self.control = FrameReassembler(STREAM_FORMAT, self._on_control_frame, {
+            RSP_HISTORY_INFO: INFO_STRUCT.unpack,
+            RSP_READ_DONE: DONE_STRUCT.unpack,
+        })
+        self.data = FrameReassembler(STREAM_FORMAT, self._on_data_frame)
+        self._info: Optional[asyncio.Future] = None
+        self._done: List[Tuple[int, int, int]] = []
+        self._wake = asyncio.Event()
+        self._transfer: Optional[Tuple[int, bytearray, List[_Window], HistoryProgress]] = None
+        # Last time anything arrived on the reply channels
+        self._activity = 0.0
+        self._open = False
+
+    async def __aenter__(self) -> "HistoryOffload":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self) -> int:
+        """
+        Negotiate the MTU and subscribe to the reply channels
+
+        Returns:
+            The ATT MTU in use
+        """
+        self.control.reset()
+        self.data.reset()
+        mtu = await self.negotiate_mtu()
+        await asyncio.gather(
+            self.client.start_notify(CONTROL_UUID, self._on_control),
+            self.client.start_notify(DATA_UUID, self._on_data)
+        )
+        self._open = True
+        return mtu
+
+    async def close(self):
+        """Release the reply channels"""
+        if not self._open:
+            return
+        self._open = False
+        for uuid in (CONTROL_UUID, DATA_UUID):
+            try:
+                await self.client.stop_notify(uuid)
+            except Exception as e:
+                self.logger.debug("Stopping notifications for %s failed: %s", uuid, e)
+
+    async def negotiate_mtu(self) -> int:
+        """
+        Ask for the largest MTU the link supports
+
+        CoreBluetooth and WinRT negotiate on connect; BlueZ only does when
+        asked, through its backend. Larger MTUs carry more history bytes per
+        notification, so every transfer starts here.
+        """
+        backend = getattr(self.client, "_backend", None)
+        acquire = getattr(backend, "_acquire_mtu", None)
+        if acquire is not None:
+            try:
+                await acquire()
+            except Exception as e:
+                self.logger.debug("MTU exchange failed, keeping the default: %s", e)
+        self.mtu = getattr(self.client, "mtu_size", None) or DEFAULT_MTU
+        self.logger.debug("Using ATT MTU %d", self.mtu)
+        return self.mtu
+
+    async def info(self) -> Tuple[int, int]:
+        """
+        Offsets of the stored history
+
+        Returns:
+            (first, end): history from first up to end is available
+
+        Raises:
+            HistoryError: If the strap does not answer
+        """
+        return await self._query(CMD_HISTORY_INFO, b"")
+
+    async def acknowledge(self, offset: int) -> Tuple[int, int]:
+        """
+        Let the strap free history before `offset` once it is stored safely
+
+        Returns:
+            (first, end) after freeing
+        """
+        return await self._query(CMD_ACK_HISTORY, OFFSET_STRUCT.pack(offset))
+
+    async def download(
+        self,
+        offset: Optional[int] = None,
+        end: Optional[int] = None,
+        on_chunk: Optional[Callable[[int, memoryview], None]] = None,
+        on_progress: Optional[Callable[[HistoryProgress], None]] = None
+    ) -> bytearray:
+        """
+        Download history from offset up to end
+
+        Args:
+            offset: Where to start, e.g. `next_offset` of an interrupted
+                transfer; the first stored byte if omitted
+            end: Where to stop, the end of the stored history if omitted
+            on_chunk: Called with (offset, view) per completed window, in
+                order; the view is only valid during the call
+            on_progress: Called with the progress after every window
+
+        Returns:
+            The history bytes
+
+        Raises:
+            HistoryError: If the link drops or the strap stops answering;
+                its progress tells where to resume
+        """
+        first, stored_end = await self.info()
+        start = first if offset is None else offset
+        end = stored_end if end is None else end
+        if start < first or end > stored_end or start > end:
+            raise HistoryError(f"Range {start}-{end} is outside the stored history {first}-{stored_end}")
+        buffer = bytearray(end - start)
+        windows = [_Window(position, min(position + self.window, end)) for position in range(start, end, self.window)]
+        progress = self.progress = HistoryProgress(start, end, start)
+        self._transfer = (start, buffer, windows, progress)
+        self._done.clear()
+        lost_before = self.data.stats.dropped_frames
+        began = self._activity = time.monotonic()
+        view = memoryview(buffer)
+        pending = [(window.start, window.end) for window in windows]
+        pending.reverse()
+        in_flight = set()
+        delivered = 0
+        try:
+            while delivered < len(windows):
+                while pending and len(in_flight) < self.pipeline_depth:
+                    request = pending.pop()
+                    await self._send(CMD_READ_HISTORY, READ_STRUCT.pack(request[0], request[1] - request[0]))
+                    in_flight.add(request)
+                    progress.requests += 1
+
+                self._wake.clear()
+                if not self._done and not windows[delivered].complete:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), max(0.0, self._activity + self.timeout - time.monotonic()))
+                    except asyncio.TimeoutError:
+                        pass
+
+                finished = []
+                done, self._done = self._done, []
+                for done_offset, length, status in done:
+                    request = (done_offset, done_offset + length)
+                    if request not in in_flight:
+                        continue
+                    in_flight.discard(request)
+                    if status != STATUS_OK:
+                        raise HistoryError(f"Strap refused READ {request[0]}-{request[1]} with status {status}", progress)
+                    finished.append(request)
+                if in_flight and time.monotonic() - self._activity >= self.timeout:
+                    # Nothing heard for a while, the requests or their replies were lost
+                    finished.extend(in_flight)
+                    in_flight.clear()
+                    self._activity = time.monotonic()
+                for request_start, request_end in finished:
+                    window = windows[(request_start - start) // self.window]
+                    gaps = window.missing(request_start, request_end)
+                    if gaps:
+                        window.retries += 1
+                        progress.retries += 1
+                        if window.retries > self.max_retries:
+                            raise HistoryError(f"Gave up on history {gaps[0][0]}-{gaps[-1][1]}", progress)
+                        # Gaps go ahead of the remaining windows so the oldest data completes first
+                        pending.extend(reversed(gaps))
+
+                while delivered < len(windows) and windows[delivered].complete:
+                    window = windows[delivered]
+                    if on_chunk is not None:
+                        on_chunk(window.start, view[window.start - start:window.end - start])
+                    delivered += 1
+                    progress.next_offset = window.end
+                    progress.elapsed_s = time.monotonic() - began
+                    progress.lost_frames = self.data.stats.dropped_frames - lost_before
+                    if on_progress is not None:
+                        on_progress(progress)
+        except HistoryError:
+            raise
+        except Exception as e:
+            raise HistoryError(f"History transfer interrupted: {str(e)}", progress) from e
+        finally:
+            self._transfer = None
+            progress.elapsed_s = time.monotonic() - began
+        return buffer
+
+    async def _query(self, command: int, body: bytes) -> Tuple[int, int]:
+        """Send a command answered by HISTORY_INFO, asking again on timeout"""
+        for attempt in range(self.max_retries + 1):
+            self._info = asyncio.get_running_loop().create_future()
+            try:
+                await self._send(command, body)
+                return await asyncio.wait_for(self._info, self.timeout)
+            except asyncio.TimeoutError:
+                self.logger.debug("History command %#x unanswered, attempt %d", command, attempt + 1)
+            except Exception as e:
+                raise HistoryError(f"History command {command:#x} failed: {str(e)}") from e
+            finally:
+                self._info = None
+        raise HistoryError(f"No answer to history command {command:#x}")
+
+    async def _send(self, command: int, body: bytes):
+        await self.client.write_gatt_char(WRITE_UUID, COMMAND_FORMAT.encode(command, body), response=False)
+
+    def _on_control(self, characteristic, data: bytearray):
+        self._activity = time.monotonic()
+        self.control.feed(data)
+
+    def _on_data(self, characteristic, data: bytearray):
+        self._activity = time.monotonic()
+        self.data.feed(data)
+
+    def _on_control_frame(self, frame_type: int, body: memoryview, decoded: Any):
+        if decoded is None:
+            return
+        if frame_type == RSP_HISTORY_INFO:
+            if self._info is not None and not self._info.done():
+                self._info.set_result(decoded)
+        elif frame_type == RSP_READ_DONE:
+            self._done.append(decoded)
+            self._wake.set()
+
+    def _on_data_frame(self, frame_type: int, body: memoryview, decoded: Any):
+        transfer = self._transfer
+        if frame_type != HISTORY_DATA or transfer is None or len(body) < OFFSET_STRUCT.size:
+            return
+        start, buffer, windows, progress = transfer
+        offset = OFFSET_STRUCT.unpack_from(body)[0]
+        data = body[OFFSET_STRUCT.size:]
+        begin = max(offset, start)
+        finish = min(offset + len(data), start + len(buffer))
+        if begin >= finish:
+            return
+        buffer[begin - start:finish - start] = data[begin - offset:finish - offset]
+        window_size = self.window
+        index = (begin - start) // window_size
+        while index < len(windows) and windows[index].start < finish:
+            window = windows[index]
+            progress.bytes_received += window.add(begin, finish)
+            if window.complete:
+                self._wake.set()
+            index += 1
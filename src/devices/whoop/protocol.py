@@ -1,47 +1,34 @@
 # src/devices/whoop/protocol.py
+import os
+import zlib
+from ...protocols.ble.profiles import load_profile
+
 class WhoopProtocol:
     """Whoop-specific BLE protocol constants and methods"""
     
+    # Services, characteristics and decoders are declared in this profile, see protocols.ble.profiles
+    PROFILE_PATH = os.path.join(os.path.dirname(__file__), "profile.yaml")
+    PROFILE = load_profile(PROFILE_PATH)
+    
     # Device identification - now just the prefix since the rest is the serial number
-    DEVICE_NAME_PREFIX = "WHOOP"
+    DEVICE_NAME_PREFIX = PROFILE.device_name_prefix
     
     # Known Whoop BLE Service and Characteristic UUIDs
-    SERVICES = {
-        "CUSTOM_SERVICE": "61080001-8d6d-82b8-614a-1c8cb0f8dcc6",
-        "HEART_RATE_SERVICE": "0000180d-0000-1000-8000-00805f9b34fb",
-        "DEVICE_INFO_SERVICE": "0000180a-0000-1000-8000-00805f9b34fb",
-        "BATTERY_SERVICE": "0000180f-0000-1000-8000-00805f9b34fb"
-    }
+    SERVICES = PROFILE.services
+    
+    CHARACTERISTICS = PROFILE.characteristics
+    
+    # Notification streams carrying frames split across MTU-sized packets
+    STREAM_CHARACTERISTICS = ("CUSTOM_NOTIFY_3", "CUSTOM_NOTIFY_4")
     
-    CHARACTERISTICS = {
-        "CUSTOM_WRITE": {
-            "uuid": "61080002-8d6d-82b8-614a-1c8cb0f8dcc6",
-            "properties": ["write", "write-no-response"]
-        },
-        "CUSTOM_NOTIFY_1": {
-            "uuid": "61080003-8d6d-82b8-614a-1c8cb0f8dcc6",
-            "properties": ["notify"]
-        },
-        "CUSTOM_NOTIFY_2": {
-            "uuid": "61080004-8d6d-82b8-614a-1c8cb0f8dcc6",
-            "properties": ["notify"]
-        },
-        "CUSTOM_NOTIFY_3": {
-            "uuid": "61080005-8d6d-82b8-614a-1c8cb0f8dcc6",
-            "properties": ["notify"]
-        },
-        "CUSTOM_NOTIFY_4": {
-            "uuid": "61080007-8d6d-82b8-614a-1c8cb0f8dcc6",
-            "properties": ["notify"]
-        },
-        "HEART_RATE": {
-            "uuid": "00002a37-0000-1000-8000-00805f9b34fb",
-            "properties": ["notify"]
-        },
-        "BATTERY_LEVEL": {
-            "uuid": "00002a19-0000-1000-8000-00805f9b34fb",
-            "properties": ["read", "notify"]
-        }
+    # Assumed framing of those streams, arguments of protocols.ble.reassembly.FrameFormat.
+    # The wire format is undocumented; pass another FrameFormat to WhoopCollector if it differs.
+    STREAM_FRAMING = {
+        "sequence_format": "B",
+        "start_of_frame": 0xAA,
+        "length_format": "<H",
+        "crc": zlib.crc32,
+        "crc_format": "<I"
     }
     
     @staticmethod
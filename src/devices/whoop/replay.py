@@ -0,0 +1,213 @@
+# src/devices/whoop/replay.py
+from ...core.metrics import LatencyHistogram
+from ...core.recording import RecordingReader
+from ...protocols.ble.collector import QueuedNotification
+from .collector import WhoopCollector
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, Iterable, List, Tuple, Union
+import asyncio
+import time
+
+# (timestamp_ns, characteristic UUID, payload)
+Notification = Tuple[int, str, bytes]
+
+@dataclass
+class ReplayStats:
+    """
+    Throughput and end-to-end latency of a replay run
+
+    Covers every notification consumed, including those folded into
+    movement windows or reassembled frames, except the ones whose
+    delivery failed.
+    """
+    packets: int = 0
+    elapsed_s: float = 0.0
+    packets_per_s: float = 0.0
+    latency_mean_us: float = 0.0
+    latency_p99_us: float = 0.0
+    latency_max_us: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class ReplayCollector(WhoopCollector):
+    """
+    Collector that replays recorded or synthetic notifications
+
+    Notifications are fed into the same `_handle_data` path a live strap
+    uses, so parsing, the ingest pipeline and the user callback can be
+    load-tested without hardware. Delivery always goes through
+    `_process_batch`, so notifications are counted and timed where a batch
+    is consumed, whether they reach the callback one by one or are
+    reduced or reassembled first. Latencies go into a LatencyHistogram,
+    keeping memory fixed however long the replay runs.
+    """
+
+    # Yield to the event loop at least this often when running unpaced
+    YIELD_EVERY = 64
+
+    def __init__(
+        self,
+        source: Union[str, RecordingReader, Iterable[Notification]],
+        speed: Optional[float] = 1.0,
+        **kwargs
+    ):
+        """
+        Args:
+            source: Recording path, open RecordingReader or iterable of
+                (timestamp_ns, characteristic UUID, payload) tuples
+            speed: Playback multiplier, 1.0 is real time; None or 0 replays
+                as fast as possible
+            **kwargs: Passed to WhoopCollector
+        """
+        super().__init__(**kwargs)
+        self.source = source
+        self.speed = speed
+        self.stats = ReplayStats()
+        self._reader: Optional[RecordingReader] = None
+        self._task: Optional[asyncio.Task] = None
+        self.latency = LatencyHistogram()
+        self._failed = 0
+        self._start_ns = 0
+        self._direct_batches = True
+
+    async def discover(self) -> bool:
+        """A replay source is always available"""
+        self.device_address = self.device_address or "replay"
+        return True
+
+    async def connect(self) -> bool:
+        """Open the recording, nothing to connect to"""
+        try:
+            if isinstance(self.source, str):
+                self._reader = RecordingReader(self.source)
+                self.device_address = self.device_address or f"replay:{self.source}"
+            elif isinstance(self.source, RecordingReader):
+                self._reader = self.source
+            self.device_info = {"address": self.device_address or "replay"}
+            self.is_connected = True
+            self.logger.info(f"Replay source ready: {self.device_info['address']}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to open replay source: {str(e)}")
+            return False
+
+    async def disconnect(self) -> bool:
+        if not self.is_connected:
+            return False
+        await self.stop_collection()
+        if self._reader is not None and isinstance(self.source, str):
+            self._reader.close()
+        self._reader = None
+        self.is_connected = False
+        self.logger.info("Replay source closed")
+        return True
+
+    async def start_collection(self) -> bool:
+        """Start feeding notifications"""
+        if not self.is_connected:
+            self.logger.error("Replay source not connected")
+            return False
+        if self._task is not None and not self._task.done():
+            return True
+
+        if self.pipeline is not None:
+            await self.pipeline.start()
+        self.stats = ReplayStats()
+        self.latency = LatencyHistogram()
+        self._task = asyncio.create_task(self._replay())
+        self.logger.info(f"Started replay at speed {self.speed or 'unpaced'}")
+        return True
+
+    async def stop_collection(self) -> bool:
+        """Stop feeding notifications and drain the pipeline"""
+        task, self._task = self._task, None
+        if task is None:
+            return False
+        if not task.done():
+            task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await self._finish()
+        return True
+
+    async def wait_finished(self) -> ReplayStats:
+        """Wait for the source to be exhausted and everything delivered"""
+        if self._task is not None:
+            task, self._task = self._task, None
+            await task
+            await self._finish()
+        return self.stats
+
+    def _notifications(self) -> Iterable[Notification]:
+        if self._reader is not None:
+            return self._reader.records()
+        return self.source
+
+    async def _replay(self):
+        """Pace notifications from the source into _handle_data"""
+        speed = self.speed or None
+        handle = self._notification_callback()
+        is_async = asyncio.iscoroutinefunction(handle)
+        first_ts = None
+        self._start_ns = time.monotonic_ns()
+
+        for count, (timestamp_ns, characteristic_uuid, payload) in enumerate(self._notifications()):
+            if speed is not None:
+                if first_ts is None:
+                    first_ts = timestamp_ns
+                due_ns = self._start_ns + (timestamp_ns - first_ts) / speed
+                delay = (due_ns - time.monotonic_ns()) / 1e9
+                if delay > 0.001:
+                    await asyncio.sleep(delay)
+                elif count % self.YIELD_EVERY == 0:
+                    await asyncio.sleep(0)
+            elif count % self.YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+
+            # bleak hands callbacks a fresh bytearray, copy out of the mmap too
+            result = handle(characteristic_uuid, bytearray(payload))
+            if is_async:
+                await result
+
+    def _process_batch(self, batch: List[QueuedNotification]):
+        self._failed = 0
+        super()._process_batch(batch)
+        done_ns = time.monotonic_ns()
+        # A failing callback does not show up as throughput
+        self.stats.packets += len(batch) - self._failed
+        record = self.latency.record
+        for item in batch:
+            record(done_ns - item[0])
+
+    def _process_notification(
+        self,
+        timestamp_ns: int,
+        char_uuid: str,
+        data: bytearray,
+        decoder: Optional[Tuple] = None,
+        timed: bool = False
+    ):
+        try:
+            super()._process_notification(timestamp_ns, char_uuid, data, decoder, timed=timed)
+        except Exception:
+            self._failed += 1
+            raise
+
+    async def _finish(self):
+        """Drain the pipeline and compute the run statistics"""
+        if self.pipeline is not None:
+            await self.pipeline.stop()
+
+        stats = self.stats
+        stats.elapsed_s = (time.monotonic_ns() - self._start_ns) / 1e9
+        if stats.elapsed_s > 0:
+            stats.packets_per_s = stats.packets / stats.elapsed_s
+        latency = self.latency
+        if latency.count:
+            stats.latency_mean_us = latency.mean / 1e3
+            stats.latency_p99_us = latency.percentile(0.99) / 1e3
+            stats.latency_max_us = latency.max / 1e3
+        self.logger.info(f"Replay finished: {stats.as_dict()}")
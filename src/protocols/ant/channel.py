@@ -0,0 +1,63 @@
+# src/protocols/ant/channel.py
+"""
+ANT channel configuration
+
+A ChannelConfig describes one channel; config_messages turns it into
+the ordered command sequence an ANT chip expects before OPEN_CHANNEL.
+"""
+from dataclasses import dataclass
+from typing import Optional, List, Tuple, NamedTuple
+from . import messages
+from .pages import ANT_PLUS_FREQUENCY, channel_period
+
+# Channel types
+CHANNEL_TYPE_RECEIVE = 0x00
+CHANNEL_TYPE_TRANSMIT = 0x10
+CHANNEL_TYPE_SHARED_RECEIVE = 0x20
+CHANNEL_TYPE_RECEIVE_ONLY = 0x40
+
+# Device number, type or transmission type 0 match any device while searching
+WILDCARD = 0
+
+# Search timeout in 2.5 s units, 0xFF searches forever
+SEARCH_TIMEOUT_INFINITE = 0xFF
+
+class ChannelId(NamedTuple):
+    """Identity of the transmitting device on a channel"""
+    device_number: int
+    device_type: int
+    transmission_type: int
+
+@dataclass
+class ChannelConfig:
+    """Parameters of one ANT channel"""
+    device_type: int
+    device_number: int = WILDCARD
+    transmission_type: int = WILDCARD
+    channel_type: int = CHANNEL_TYPE_RECEIVE
+    network: int = 0
+    # 1/32768 s, the ANT+ period of the device type if omitted
+    period: Optional[int] = None
+    frequency: int = ANT_PLUS_FREQUENCY
+    search_timeout: int = 12
+
+    def __post_init__(self):
+        if self.period is None:
+            self.period = channel_period(self.device_type)
+
+    @property
+    def message_rate_hz(self) -> float:
+        """Messages per second the channel receives from its device"""
+        return 32768 / self.period
+
+def config_messages(channel: int, config: ChannelConfig) -> List[Tuple[int, bytes]]:
+    """(message id, payload) of every command configuring `channel`, in order"""
+    return [
+        (messages.ASSIGN_CHANNEL, bytes([channel, config.channel_type, config.network])),
+        (messages.CHANNEL_ID, messages.encode_channel_id(
+            channel, config.device_number, config.device_type, config.transmission_type
+        )),
+        (messages.CHANNEL_PERIOD, bytes([channel, config.period & 0xFF, config.period >> 8])),
+        (messages.CHANNEL_RF_FREQ, bytes([channel, config.frequency])),
+        (messages.SEARCH_TIMEOUT, bytes([channel, config.search_timeout])),
+    ]
@@ -0,0 +1,375 @@
+# src/protocols/ant/fake.py
+"""
+Simulated ANT USB stick with ANT+ sensors in range
+
+FakeAntStick sits on the device end of a transport, typically the other
+half of a LoopbackTransport pair, and answers the host's commands the
+way an ANT chip does: channel responses, the startup message after a
+reset, requested messages and the RF events of open channels. Open
+channels receive broadcasts from matching FakeAntSensors at their
+channel period, optionally sped up, so one host can be driven with
+many concurrent channels without any hardware.
+"""
+from typing import Optional, List, Dict, Callable, Iterable, Tuple
+import asyncio
+import heapq
+import logging
+import random
+import struct
+from . import messages
+from .channel import ChannelId, WILDCARD
+from .framing import FrameParser, BurstAssembler, burst_packets
+from .pages import (
+    HEART_RATE, BIKE_POWER, BIKE_SPEED_CADENCE, BIKE_CADENCE, BIKE_SPEED, STRIDE_SPEED_DISTANCE,
+    POWER_ONLY_PAGE, SDM_MAIN_PAGE, channel_period
+)
+from .transport import AntTransport
+
+# Produces the 8-byte data page of the n-th broadcast of a sensor
+PageFactory = Callable[[int], bytes]
+
+def _default_pages() -> Dict[int, PageFactory]:
+    """Plausible data pages for every ANT+ device type in pages.py"""
+    return {
+        # Page 4 with the toggle bit, a beat roughly every 0.8 s
+        HEART_RATE: lambda n: struct.pack(
+            '<BBHHBB', 0x04 | (0x80 if n & 4 else 0), 0xFF, (n - 1) * 820 & 0xFFFF, n * 820 & 0xFFFF, n & 0xFF, 60 + n % 40
+        ),
+        BIKE_POWER: lambda n: struct.pack('<BBBBHH', POWER_ONLY_PAGE, n & 0xFF, 0xB2, 90, n * 200 & 0xFFFF, 200 + n % 50),
+        BIKE_SPEED_CADENCE: lambda n: struct.pack('<HHHH', n * 680 & 0xFFFF, n >> 2, n * 512 & 0xFFFF, n & 0xFFFF),
+        BIKE_CADENCE: lambda n: struct.pack('<BBBBHH', 0x00, 0xFF, 0xFF, 0xFF, n * 680 & 0xFFFF, n >> 2),
+        BIKE_SPEED: lambda n: struct.pack('<BBBBHH', 0x00, 0xFF, 0xFF, 0xFF, n * 512 & 0xFFFF, n & 0xFFFF),
+        STRIDE_SPEED_DISTANCE: lambda n: bytes([
+            SDM_MAIN_PAGE, n * 50 % 200, n // 4 & 0xFF, n & 0xFF, 0x53, 0x00, n >> 1 & 0xFF, 8
+        ]),
+    }
+
+class FakeAntSensor:
+    """A simulated ANT+ master: identity, data pages and link quality"""
+
+    def __init__(
+        self,
+        device_number: int,
+        device_type: int,
+        transmission_type: int = 1,
+        period: Optional[int] = None,
+        pages: Optional[PageFactory] = None,
+        burst: Optional[PageFactory] = None,
+        burst_every: int = 0,
+        loss: float = 0.0
+    ):
+        """
+        Args:
+            device_number: 16-bit device number
+            device_type: ANT+ device type
+            transmission_type: Transmission type
+            period: Channel period in 1/32768 s, the ANT+ period of the type if omitted
+            pages: Page factory, a plausible one for known device types if omitted
+            burst: Produces the payload of the n-th burst transfer
+            burst_every: Send a burst instead of every n-th broadcast, 0 never
+            loss: Probability that a broadcast is lost, reported as EVENT_RX_FAIL
+        """
+        self.channel_id = ChannelId(device_number, device_type, transmission_type)
+        self.period = period if period is not None else channel_period(device_type)
+        self.pages = pages or _default_pages().get(device_type, lambda n: bytes(messages.DATA_SIZE))
+        self.burst = burst
+        self.burst_every = burst_every
+        self.loss = loss
+        self.sent = 0
+
+    def matches(self, wanted: ChannelId) -> bool:
+        """Whether a channel searching for `wanted`, with wildcards, pairs with this sensor"""
+        return (
+            wanted.device_type in (WILDCARD, self.channel_id.device_type)
+            and wanted.device_number in (WILDCARD, self.channel_id.device_number)
+            and wanted.transmission_type in (WILDCARD, self.channel_id.transmission_type)
+        )
+
+    def __repr__(self) -> str:
+        return f"FakeAntSensor({self.channel_id})"
+
+class _StickChannel:
+    """Configuration and state of one channel of the fake chip"""
+
+    def __init__(self, number: int, channel_type: int, network: int):
+        self.number = number
+        self.channel_type = channel_type
+        self.network = network
+        self.wanted = ChannelId(WILDCARD, WILDCARD, WILDCARD)
+        self.period: Optional[int] = None
+        self.is_open = False
+        self.sensors: List[FakeAntSensor] = []
+        self.burst = BurstAssembler()
+
+class FakeAntStick:
+    """
+    The device end of a transport, behaving like an ANT USB stick
+
+    One task parses host commands; another serves every open channel from
+    a heap ordered by the time of its next broadcast. Broadcasts due at
+    the same time are written to the transport together, so the host
+    sees several messages per read as it would from a USB stick.
+    """
+
+    def __init__(
+        self,
+        transport: AntTransport,
+        sensors: Iterable[FakeAntSensor] = (),
+        max_channels: int = 8,
+        speedup: float = 1.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            transport: Device end of the byte stream to the host
+            sensors: Sensors in range
+            max_channels: Channels the simulated chip supports
+            speedup: Factor applied to every channel's message rate
+            seed: Seed of the random source used for broadcast loss
+        """
+        self.transport = transport
+        self.sensors = list(sensors)
+        self.max_channels = max_channels
+        self.speedup = speedup
+        self.rng = random.Random(seed)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.channels: Dict[int, _StickChannel] = {}
+        self.network_keys: Dict[int, bytes] = {}
+        self.lib_config = 0
+        self.scan_mode = False
+        # Burst transfers received from the host as (channel, payload)
+        self.received_bursts: List[Tuple[int, bytes]] = []
+        self.broadcasts_sent = 0
+        self.parser = FrameParser(self._on_command)
+        self._schedule: List[Tuple[float, int, int, FakeAntSensor]] = []
+        self._sequence = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        await self.transport.open()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._read_loop()), asyncio.create_task(self._broadcast_loop())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        await self.transport.close()
+
+    async def _read_loop(self):
+        while True:
+            chunk = await self.transport.read()
+            if not chunk:
+                break
+            self.parser.feed(chunk)
+
+    def _send(self, msg_id: int, payload: bytes):
+        try:
+            self.transport.write(messages.encode(msg_id, payload))
+        except ConnectionError:
+            pass
+
+    def _respond(self, channel: int, msg_id: int, code: int = messages.RESPONSE_NO_ERROR):
+        self._send(messages.CHANNEL_EVENT, bytes([channel, msg_id, code]))
+
+    def _event(self, channel: int, code: int):
+        self._send(messages.CHANNEL_EVENT, bytes([channel, messages.RF_EVENT, code]))
+
+    def _on_command(self, msg_id: int, payload: memoryview):
+        if msg_id == messages.BURST_TRANSFER_DATA:
+            self._on_host_burst(payload)
+            return
+        if msg_id == messages.RESET_SYSTEM:
+            self.channels.clear()
+            self._schedule.clear()
+            self.lib_config = 0
+            self.scan_mode = False
+            # Reset reason: command reset
+            self._send(messages.STARTUP_MESSAGE, b"\x20")
+            return
+        if msg_id == messages.BROADCAST_DATA or msg_id == messages.ACKNOWLEDGED_DATA:
+            return
+        number = payload[0]
+        if msg_id == messages.REQUEST_MESSAGE:
+            self._on_request(number, payload[1])
+            return
+        if msg_id == messages.SET_NETWORK_KEY:
+            self.network_keys[number] = bytes(payload[1:9])
+            self._respond(number, msg_id)
+            return
+        if msg_id == messages.LIB_CONFIG:
+            self.lib_config = payload[1]
+            self._respond(number, msg_id)
+            return
+        if msg_id == messages.ENABLE_EXT_RX_MESSAGES:
+            self.lib_config = messages.LIB_CONFIG_CHANNEL_ID if payload[1] else 0
+            self._respond(number, msg_id)
+            return
+        if number >= self.max_channels:
+            self._respond(number, msg_id, messages.INVALID_MESSAGE)
+            return
+        if msg_id == messages.ASSIGN_CHANNEL:
+            if number in self.channels:
+                self._respond(number, msg_id, messages.CHANNEL_IN_WRONG_STATE)
+                return
+            self.channels[number] = _StickChannel(number, payload[1], payload[2])
+            self._respond(number, msg_id)
+            return
+        channel = self.channels.get(number)
+        if channel is None:
+            self._respond(number, msg_id, messages.CHANNEL_IN_WRONG_STATE)
+            return
+        if msg_id == messages.CHANNEL_ID:
+            channel.wanted = ChannelId(payload[1] | (payload[2] << 8), payload[3], payload[4])
+            self._respond(number, msg_id)
+        elif msg_id == messages.CHANNEL_PERIOD:
+            channel.period = payload[1] | (payload[2] << 8)
+            self._respond(number, msg_id)
+        elif msg_id in (messages.CHANNEL_RF_FREQ, messages.SEARCH_TIMEOUT, messages.LOW_PRIORITY_SEARCH_TIMEOUT):
+            self._respond(number, msg_id)
+        elif msg_id == messages.OPEN_CHANNEL or msg_id == messages.OPEN_RX_SCAN_MODE:
+            if channel.is_open:
+                self._respond(number, msg_id, messages.CHANNEL_IN_WRONG_STATE)
+                return
+            self._respond(number, msg_id)
+            self._open(channel, scan=msg_id == messages.OPEN_RX_SCAN_MODE)
+        elif msg_id == messages.CLOSE_CHANNEL:
+            if not channel.is_open:
+                self._respond(number, msg_id, messages.CHANNEL_IN_WRONG_STATE)
+                return
+            self._respond(number, msg_id)
+            channel.is_open = False
+            channel.sensors = []
+            self.scan_mode = self.scan_mode and number != 0
+            self._event(number, messages.EVENT_CHANNEL_CLOSED)
+        elif msg_id == messages.UNASSIGN_CHANNEL:
+            if channel.is_open:
+                self._respond(number, msg_id, messages.CHANNEL_IN_WRONG_STATE)
+                return
+            del self.channels[number]
+            self._respond(number, msg_id)
+        else:
+            self._respond(number, msg_id, messages.INVALID_MESSAGE)
+
+    def _on_request(self, number: int, requested: int):
+        if requested == messages.CHANNEL_ID:
+            channel = self.channels.get(number)
+            if channel is None or not channel.sensors:
+                self._respond(number, messages.REQUEST_MESSAGE, messages.CHANNEL_ID_NOT_SET)
+                return
+            paired = channel.sensors[0].channel_id
+            self._send(messages.CHANNEL_ID, messages.encode_channel_id(number, *paired))
+        elif requested == messages.CAPABILITIES:
+            # Channels, networks, standard options, advanced options
+            self._send(messages.CAPABILITIES, bytes([self.max_channels, 8, 0x00, 0x00]))
+        elif requested == messages.CHANNEL_STATUS:
+            channel = self.channels.get(number)
+            # Bits 0-1: 0 unassigned, 1 assigned, 2 searching, 3 tracking
+            if channel is None:
+                status = 0
+            elif not channel.is_open:
+                status = 1
+            else:
+                status = 3 if channel.sensors else 2
+            self._send(messages.CHANNEL_STATUS, bytes([number, status]))
+        else:
+            self._respond(number, messages.REQUEST_MESSAGE, messages.INVALID_MESSAGE)
+
+    def _open(self, channel: _StickChannel, scan: bool):
+        """Pair the channel with its sensors and schedule their broadcasts"""
+        channel.is_open = True
+        if scan:
+            # Scan mode hears every matching device, each with its own period
+            self.scan_mode = True
+            channel.sensors = [sensor for sensor in self.sensors if sensor.matches(channel.wanted)]
+        else:
+            taken = {
+                id(sensor) for other in self.channels.values() if other is not channel
+                for sensor in other.sensors
+            }
+            # A channel tracks the first matching sensor not tracked by another channel
+            for sensor in self.sensors:
+                if id(sensor) not in taken and sensor.matches(channel.wanted):
+                    channel.sensors = [sensor]
+                    break
+            if not channel.sensors:
+                self.logger.debug("No sensor matches channel %d searching for %s", channel.number, channel.wanted)
+                return
+        now = asyncio.get_running_loop().time()
+        for sensor in channel.sensors:
+            interval = self._interval(channel, sensor, scan)
+            self._sequence += 1
+            heapq.heappush(self._schedule, (now + self.rng.random() * interval, self._sequence, channel.number, sensor))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _interval(self, channel: _StickChannel, sensor: FakeAntSensor, scan: bool) -> float:
+        period = sensor.period if scan or channel.period is None else channel.period
+        return period / 32768 / self.speedup
+
+    async def _broadcast_loop(self):
+        loop = asyncio.get_running_loop()
+        schedule = self._schedule
+        while True:
+            if not schedule:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            delay = schedule[0][0] - loop.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            now = loop.time()
+            out = bytearray()
+            while schedule and schedule[0][0] <= now:
+                due, sequence, number, sensor = heapq.heappop(schedule)
+                channel = self.channels.get(number)
+                # Closed channels drop their sensors from the schedule
+                if channel is None or not channel.is_open or sensor not in channel.sensors:
+                    continue
+                out += self._transmission(channel, sensor)
+                heapq.heappush(schedule, (due + self._interval(channel, sensor, self.scan_mode), sequence, number, sensor))
+            if out:
+                try:
+                    self.transport.write(out)
+                except ConnectionError:
+                    return
+
+    def _transmission(self, channel: _StickChannel, sensor: FakeAntSensor) -> bytes:
+        """Frames received on a channel for the sensor's next message period"""
+        n = sensor.sent
+        sensor.sent += 1
+        if sensor.loss and self.rng.random() < sensor.loss:
+            return messages.encode(messages.CHANNEL_EVENT, bytes([channel.number, messages.RF_EVENT, messages.EVENT_RX_FAIL]))
+        if sensor.burst is not None and sensor.burst_every and n % sensor.burst_every == sensor.burst_every - 1:
+            return b"".join(
+                messages.encode_data(messages.BURST_TRANSFER_DATA, sequence, chunk)
+                for sequence, chunk in burst_packets(channel.number, sensor.burst(n))
+            )
+        self.broadcasts_sent += 1
+        payload = bytes([channel.number]) + sensor.pages(n)
+        if self.scan_mode or self.lib_config & messages.LIB_CONFIG_CHANNEL_ID:
+            payload += bytes([messages.LIB_CONFIG_CHANNEL_ID]) + messages.encode_channel_id(0, *sensor.channel_id)[1:]
+        return messages.encode(messages.BROADCAST_DATA, payload)
+
+    def _on_host_burst(self, payload: memoryview):
+        sequence = payload[0]
+        number = sequence & 0x1F
+        channel = self.channels.get(number)
+        if channel is None or not channel.is_open:
+            self._event(number, messages.EVENT_TRANSFER_TX_FAILED)
+            return
+        transfer = channel.burst.add(sequence, payload[1:9])
+        if transfer is not None:
+            self.received_bursts.append((number, bytes(transfer)))
+            self._event(number, messages.EVENT_TRANSFER_TX_COMPLETED)
@@ -0,0 +1,221 @@
+# src/protocols/ant/framing.py
+"""
+Zero-copy framing of the ANT serial stream and burst reassembly
+
+Bytes read from a transport arrive in arbitrary chunks, e.g. 64-byte USB
+packets holding several messages or half of one. FrameParser copies each
+chunk once into a preallocated buffer and hands every complete message
+to its callback as a memoryview into that buffer, so no per-message
+bytes object is created. BurstAssembler collects the 8-byte packets of
+a burst transfer into a preallocated buffer the same way.
+"""
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Callable, Union
+from .messages import SYNC, FRAME_OVERHEAD, MAX_PAYLOAD, DATA_SIZE, checksum
+
+# Called with the message id and a view of the payload, valid only during the call
+MessageCallback = Callable[[int, memoryview], None]
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# Burst sequence byte: channel in bits 0-4, rolling counter in bits 5-6, last packet in bit 7
+BURST_CHANNEL_MASK = 0x1F
+BURST_SEQUENCE_MASK = 0x60
+BURST_SEQUENCE_STEP = 0x20
+BURST_LAST = 0x80
+
+@dataclass
+class FramingStats:
+    """Counters of the frame parser"""
+    frames: int = 0
+    checksum_errors: int = 0
+    length_errors: int = 0
+    discarded_bytes: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+class FrameParser:
+    """
+    Incremental parser of SYNC-framed ANT messages
+
+    Garbage between frames is skipped by searching for the next sync byte;
+    a frame with a bad length or checksum costs one byte of resync, so a
+    corrupted frame never swallows the valid frames behind it.
+    """
+
+    def __init__(self, on_message: MessageCallback, capacity: int = 4096):
+        """
+        Args:
+            on_message: Called with (message id, payload view) per valid frame;
+                the view is only valid during the call, copy it to keep it
+            capacity: Size of the preallocated receive buffer
+        """
+        if capacity < MAX_PAYLOAD + FRAME_OVERHEAD:
+            raise ValueError(f"capacity must hold at least one frame ({MAX_PAYLOAD + FRAME_OVERHEAD} bytes)")
+        self.on_message = on_message
+        self.capacity = capacity
+        self.stats = FramingStats()
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+
+    @property
+    def pending(self) -> int:
+        """Bytes of an incomplete frame waiting for the next chunk"""
+        return self._end - self._start
+
+    def reset(self):
+        """Drop any partial frame, e.g. after the transport reconnected"""
+        self._start = self._end = 0
+
+    def feed(self, data: BytesLike) -> int:
+        """
+        Parse a chunk of the byte stream
+
+        Returns:
+            Number of messages delivered to the callback
+        """
+        source = memoryview(data)
+        size = len(source)
+        offset = 0
+        frames = 0
+        while offset < size:
+            space = self.capacity - self._end
+            if space < size - offset and self._start:
+                # Move the partial frame to the front; it is at most one frame long
+                pending = self._end - self._start
+                self._buffer[:pending] = bytes(self._view[self._start:self._end])
+                self._start = 0
+                self._end = pending
+                space = self.capacity - pending
+            count = min(space, size - offset)
+            self._buffer[self._end:self._end + count] = source[offset:offset + count]
+            self._end += count
+            offset += count
+            frames += self._parse()
+        return frames
+
+    def _parse(self) -> int:
+        buffer = self._buffer
+        view = self._view
+        on_message = self.on_message
+        stats = self.stats
+        start = self._start
+        end = self._end
+        frames = 0
+        while end - start >= FRAME_OVERHEAD:
+            if buffer[start] != SYNC:
+                sync = buffer.find(SYNC, start, end)
+                if sync < 0:
+                    stats.discarded_bytes += end - start
+                    start = end
+                    break
+                stats.discarded_bytes += sync - start
+                start = sync
+                continue
+            length = buffer[start + 1]
+            if length > MAX_PAYLOAD:
+                stats.length_errors += 1
+                stats.discarded_bytes += 1
+                start += 1
+                continue
+            frame_end = start + length + FRAME_OVERHEAD
+            if frame_end > end:
+                break
+            # XOR over the whole frame, checksum included, is zero when intact
+            if checksum(view[start:frame_end]):
+                stats.checksum_errors += 1
+                stats.discarded_bytes += 1
+                start += 1
+                continue
+            frames += 1
+            on_message(buffer[start + 2], view[start + 3:frame_end - 1])
+            start = frame_end
+        if start == end:
+            start = end = 0
+        self._start = start
+        self._end = end
+        stats.frames += frames
+        return frames
+
+class BurstAssembler:
+    """
+    Reassembles the packets of burst transfers on one channel
+
+    The first packet of a transfer has sequence 0; the counter then runs
+    1, 2, 3, 1, ... and the last packet has bit 7 set. A packet out of
+    sequence aborts the transfer, as the ANT chip does.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._size = 0
+        self._expected: Optional[int] = None
+        self.completed = 0
+        self.aborted = 0
+
+    @property
+    def in_progress(self) -> bool:
+        return self._expected is not None
+
+    def add(self, sequence: int, data: BytesLike) -> Optional[memoryview]:
+        """
+        Add one burst packet
+
+        Args:
+            sequence: The sequence/channel byte of the packet
+            data: Its 8 data bytes
+
+        Returns:
+            A view of the complete transfer on its last packet, valid until
+            the next call, otherwise None
+        """
+        counter = sequence & BURST_SEQUENCE_MASK
+        if counter == 0:
+            if self._expected is not None:
+                self.aborted += 1
+            self._size = 0
+        elif counter != self._expected:
+            if self._expected is not None:
+                self.aborted += 1
+                self._expected = None
+            return None
+
+        size = self._size
+        if size + DATA_SIZE > len(self._buffer):
+            # Grow by doubling into a new buffer, views handed out earlier stay intact
+            grown = bytearray(2 * len(self._buffer))
+            grown[:size] = self._view[:size]
+            self._buffer = grown
+            self._view = memoryview(grown)
+        self._buffer[size:size + DATA_SIZE] = data[:DATA_SIZE]
+        self._size = size + DATA_SIZE
+
+        if sequence & BURST_LAST:
+            self._expected = None
+            self.completed += 1
+            return self._view[:self._size]
+        self._expected = BURST_SEQUENCE_STEP if counter == 3 * BURST_SEQUENCE_STEP else counter + BURST_SEQUENCE_STEP
+        return None
+
+def burst_packets(channel: int, data: BytesLike):
+    """
+    Split data into burst packets of (sequence byte, 8 data bytes)
+
+    The last packet is zero-padded to 8 bytes.
+    """
+    data = memoryview(data)
+    count = max(1, -(-len(data) // DATA_SIZE))
+    counter = 0
+    for index in range(count):
+        chunk = bytes(data[index * DATA_SIZE:(index + 1) * DATA_SIZE])
+        if len(chunk) < DATA_SIZE:
+            chunk += bytes(DATA_SIZE - len(chunk))
+        sequence = counter | (channel & BURST_CHANNEL_MASK)
+        if index == count - 1:
+            sequence |= BURST_LAST
+        yield sequence, chunk
+        counter = BURST_SEQUENCE_STEP if counter == 3 * BURST_SEQUENCE_STEP else counter + BURST_SEQUENCE_STEP
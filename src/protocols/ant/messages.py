@@ -0,0 +1,119 @@
+# src/protocols/ant/messages.py
+"""
+ANT serial message constants and encoding
+
+Every message on the wire is framed as
+
+    SYNC (0xA4) | length | message id | payload[length] | checksum
+
+where the checksum is the XOR of all preceding bytes of the frame.
+"""
+import struct
+from functools import reduce
+from operator import xor
+from typing import Optional, Union
+
+SYNC = 0xA4
+# Bytes around the payload: sync, length, id and checksum
+FRAME_OVERHEAD = 4
+# Largest payload sent by ANT chips, extended broadcasts with every flag set
+MAX_PAYLOAD = 41
+
+# Configuration
+UNASSIGN_CHANNEL = 0x41
+ASSIGN_CHANNEL = 0x42
+CHANNEL_PERIOD = 0x43
+SEARCH_TIMEOUT = 0x44
+CHANNEL_RF_FREQ = 0x45
+SET_NETWORK_KEY = 0x46
+CHANNEL_ID = 0x51
+LOW_PRIORITY_SEARCH_TIMEOUT = 0x63
+ENABLE_EXT_RX_MESSAGES = 0x66
+LIB_CONFIG = 0x6E
+
+# Control
+RESET_SYSTEM = 0x4A
+OPEN_CHANNEL = 0x4B
+CLOSE_CHANNEL = 0x4C
+REQUEST_MESSAGE = 0x4D
+OPEN_RX_SCAN_MODE = 0x5B
+
+# Data
+BROADCAST_DATA = 0x4E
+ACKNOWLEDGED_DATA = 0x4F
+BURST_TRANSFER_DATA = 0x50
+
+# Notifications and requested responses
+CHANNEL_EVENT = 0x40
+CHANNEL_STATUS = 0x52
+CAPABILITIES = 0x54
+STARTUP_MESSAGE = 0x6F
+
+# Message id carried by CHANNEL_EVENT for RF events rather than command responses
+RF_EVENT = 0x01
+
+# Channel response and event codes
+RESPONSE_NO_ERROR = 0x00
+EVENT_RX_SEARCH_TIMEOUT = 0x01
+EVENT_RX_FAIL = 0x02
+EVENT_TX = 0x03
+EVENT_TRANSFER_RX_FAILED = 0x04
+EVENT_TRANSFER_TX_COMPLETED = 0x05
+EVENT_TRANSFER_TX_FAILED = 0x06
+EVENT_CHANNEL_CLOSED = 0x07
+EVENT_RX_FAIL_GO_TO_SEARCH = 0x08
+EVENT_CHANNEL_COLLISION = 0x09
+EVENT_TRANSFER_TX_START = 0x0A
+CHANNEL_IN_WRONG_STATE = 0x15
+CHANNEL_NOT_OPENED = 0x16
+CHANNEL_ID_NOT_SET = 0x18
+TRANSFER_IN_PROGRESS = 0x1F
+TRANSFER_SEQUENCE_NUMBER_ERROR = 0x20
+INVALID_MESSAGE = 0x28
+INVALID_NETWORK_NUMBER = 0x29
+
+# LIB_CONFIG flags: append the channel id, RSSI or a timestamp to received data
+LIB_CONFIG_CHANNEL_ID = 0x80
+LIB_CONFIG_RSSI = 0x40
+LIB_CONFIG_TIMESTAMP = 0x20
+
+# Broadcast, acknowledged and burst data carry 8 bytes after the channel byte
+DATA_SIZE = 8
+
+_CHANNEL_ID = struct.Struct('<BHBB')
+
+class AntError(Exception):
+    """A command was rejected by the ANT chip or not answered"""
+
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+
+def checksum(frame: Union[bytes, bytearray, memoryview]) -> int:
+    """XOR of all bytes of `frame`"""
+    return reduce(xor, frame, 0)
+
+def encode(msg_id: int, payload: Union[bytes, bytearray, memoryview] = b"") -> bytes:
+    """Frame one message"""
+    frame = bytes((SYNC, len(payload), msg_id)) + payload
+    return frame + bytes((checksum(frame),))
+
+def encode_data(msg_id: int, channel: int, data: Union[bytes, bytearray, memoryview]) -> bytes:
+    """Frame a broadcast, acknowledged or burst message from its 8 data bytes"""
+    frame = bytes((SYNC, len(data) + 1, msg_id, channel)) + data
+    return frame + bytes((checksum(frame),))
+
+def encode_channel_id(channel: int, device_number: int, device_type: int, transmission_type: int) -> bytes:
+    """Payload of a CHANNEL_ID message, also appended to extended data"""
+    return _CHANNEL_ID.pack(channel, device_number, device_type, transmission_type)
+
+def describe_code(code: int) -> str:
+    """Name of a channel response or event code"""
+    return _CODE_NAMES.get(code, f"0x{code:02X}")
+
+_CODE_NAMES = {
+    value: name for name, value in globals().items()
+    if name.startswith(("RESPONSE_", "EVENT_", "CHANNEL_IN", "CHANNEL_NOT", "CHANNEL_ID_NOT",
+                        "TRANSFER_IN", "TRANSFER_SEQ", "INVALID_"))
+    and isinstance(value, int)
+}
@@ -0,0 +1,404 @@
+# src/protocols/ant/node.py
+"""
+Host side of an ANT chip: commands, channels and received data dispatch
+
+AntNode owns one transport. A single reader task feeds every received
+chunk to the FrameParser, which calls back into the node per message;
+data messages go straight to their channel's callback as memoryviews,
+command responses resolve the futures of the commands awaiting them.
+"""
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, Callable, Tuple, Union
+import asyncio
+import logging
+import time
+from . import messages
+from .channel import ChannelConfig, ChannelId, config_messages
+from .framing import FrameParser, BurstAssembler, burst_packets
+from .transport import AntTransport
+
+# Called with (channel, arrival time in ns, 8-byte page view, channel id or None);
+# the view is only valid during the call
+DataCallback = Callable[["AntChannel", int, memoryview, Optional[ChannelId]], None]
+# Called with (channel, complete transfer view), valid only during the call
+BurstCallback = Callable[["AntChannel", memoryview], None]
+
+@dataclass
+class NodeStats:
+    """Counters of received traffic"""
+    broadcasts: int = 0
+    acknowledged: int = 0
+    burst_packets: int = 0
+    bursts: int = 0
+    rx_failures: int = 0
+    unknown_channel: int = 0
+    reads: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+class AntChannel:
+    """One open channel of an AntNode"""
+
+    def __init__(
+        self,
+        node: "AntNode",
+        number: int,
+        config: ChannelConfig,
+        on_data: Optional[DataCallback] = None,
+        on_burst: Optional[BurstCallback] = None
+    ):
+        self.node = node
+        self.number = number
+        self.config = config
+        self.on_data = on_data
+        self.on_burst = on_burst
+        # Identity of the paired device, from extended data or request_channel_id
+        self.channel_id: Optional[ChannelId] = None
+        self.messages = 0
+        self.rx_failures = 0
+        self.is_open = False
+        self.burst = BurstAssembler()
+        # Resolved by EVENT_TRANSFER_TX_COMPLETED/FAILED of an outgoing transfer
+        self._transfer: Optional[asyncio.Future] = None
+
+    def __repr__(self) -> str:
+        return f"AntChannel(number={self.number}, device_type={self.config.device_type}, open={self.is_open})"
+
+class AntNode:
+    """
+    Configures channels on one ANT chip and dispatches what they receive
+
+    Commands are answered by the chip with a channel response; they are
+    awaited with a timeout and a response code other than
+    RESPONSE_NO_ERROR raises AntError.
+    """
+
+    def __init__(
+        self,
+        transport: AntTransport,
+        network_key: Optional[bytes] = None,
+        network: int = 0,
+        max_channels: int = 8,
+        response_timeout: float = 2.0,
+        receive_buffer: int = 4096
+    ):
+        """
+        Args:
+            transport: Byte stream to the chip
+            network_key: 8-byte key set on `network` by start(), e.g. the
+                ANT+ managed network key; the chip's public key if omitted
+            network: Network number channels are assigned to by default
+            max_channels: Channels the chip supports
+            response_timeout: Seconds to wait for each command response
+            receive_buffer: Size of the preallocated frame parser buffer
+        """
+        if network_key is not None and len(network_key) != 8:
+            raise ValueError("network_key must be 8 bytes")
+        self.transport = transport
+        self.network_key = network_key
+        self.network = network
+        self.max_channels = max_channels
+        self.response_timeout = response_timeout
+        self.channels: Dict[int, AntChannel] = {}
+        self.stats = NodeStats()
+        self.parser = FrameParser(self._on_message, capacity=receive_buffer)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # (channel, message id) -> future of the response code
+        self._responses: Dict[Tuple[int, int], asyncio.Future] = {}
+        # Message id -> future of a requested message's payload
+        self._requests: Dict[int, asyncio.Future] = {}
+        self._startup: Optional[asyncio.Future] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._closed_events: Dict[int, asyncio.Future] = {}
+        # Arrival time of the chunk being parsed, shared by its messages
+        self._chunk_ns = 0
+        self._command_lock = asyncio.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._reader is not None and not self._reader.done()
+
+    async def start(self):
+        """Open the transport, reset the chip and set the network key"""
+        await self.transport.open()
+        self.parser.reset()
+        self._reader = asyncio.create_task(self._read_loop())
+        await self.reset()
+        if self.network_key is not None:
+            await self.command(messages.SET_NETWORK_KEY, bytes([self.network]) + self.network_key)
+
+    async def stop(self):
+        """Close every channel, stop reading and close the transport"""
+        for channel in list(self.channels.values()):
+            try:
+                await self.close_channel(channel)
+            except (messages.AntError, ConnectionError) as e:
+                self.logger.debug("Closing channel %d failed: %s", channel.number, e)
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        await self.transport.close()
+        self._fail_pending(ConnectionError("ANT node stopped"))
+
+    async def _read_loop(self):
+        read = self.transport.read
+        feed = self.parser.feed
+        stats = self.stats
+        try:
+            while True:
+                chunk = await read()
+                if not chunk:
+                    self.logger.warning("ANT transport closed")
+                    break
+                self._chunk_ns = time.monotonic_ns()
+                stats.reads += 1
+                feed(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"ANT receive failed: {str(e)}")
+        self._fail_pending(ConnectionError("ANT transport closed"))
+
+    def _fail_pending(self, error: Exception):
+        for futures in (self._responses, self._requests, self._closed_events):
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(error)
+            futures.clear()
+        if self._startup is not None and not self._startup.done():
+            self._startup.set_exception(error)
+
+    def _on_message(self, msg_id: int, payload: memoryview):
+        """FrameParser callback, the hot path for data messages"""
+        if msg_id == messages.BROADCAST_DATA or msg_id == messages.ACKNOWLEDGED_DATA:
+            channel = self.channels.get(payload[0])
+            if channel is None:
+                self.stats.unknown_channel += 1
+                return
+            if msg_id == messages.BROADCAST_DATA:
+                self.stats.broadcasts += 1
+            else:
+                self.stats.acknowledged += 1
+            channel.messages += 1
+            channel_id = None
+            # Extended data: flag byte after the page, channel id first when flagged
+            if len(payload) >= 14 and payload[9] & messages.LIB_CONFIG_CHANNEL_ID:
+                channel_id = ChannelId(payload[10] | (payload[11] << 8), payload[12], payload[13])
+            if channel.on_data is not None:
+                channel.on_data(channel, self._chunk_ns, payload[1:9], channel_id)
+        elif msg_id == messages.BURST_TRANSFER_DATA:
+            self._on_burst(payload)
+        elif msg_id == messages.CHANNEL_EVENT:
+            self._on_channel_event(payload[0], payload[1], payload[2])
+        elif msg_id == messages.STARTUP_MESSAGE:
+            if self._startup is not None and not self._startup.done():
+                self._startup.set_result(payload[0] if len(payload) else 0)
+        else:
+            future = self._requests.pop(msg_id, None)
+            if future is not None and not future.done():
+                future.set_result(bytes(payload))
+            else:
+                self.logger.debug("Unhandled ANT message 0x%02X", msg_id)
+
+    def _on_burst(self, payload: memoryview):
+        self.stats.burst_packets += 1
+        sequence = payload[0]
+        channel = self.channels.get(sequence & 0x1F)
+        if channel is None:
+            self.stats.unknown_channel += 1
+            return
+        transfer = channel.burst.add(sequence, payload[1:9])
+        if transfer is not None:
+            self.stats.bursts += 1
+            if channel.on_burst is not None:
+                channel.on_burst(channel, transfer)
+
+    def _on_channel_event(self, number: int, msg_id: int, code: int):
+        if msg_id != messages.RF_EVENT:
+            future = self._responses.pop((number, msg_id), None)
+            if future is not None and not future.done():
+                future.set_result(code)
+            return
+        channel = self.channels.get(number)
+        if code == messages.EVENT_RX_FAIL:
+            self.stats.rx_failures += 1
+            if channel is not None:
+                channel.rx_failures += 1
+        elif code in (messages.EVENT_TRANSFER_TX_COMPLETED, messages.EVENT_TRANSFER_TX_FAILED):
+            if channel is not None and channel._transfer is not None and not channel._transfer.done():
+                channel._transfer.set_result(code)
+        elif code == messages.EVENT_CHANNEL_CLOSED:
+            if channel is not None:
+                channel.is_open = False
+            future = self._closed_events.pop(number, None)
+            if future is not None and not future.done():
+                future.set_result(code)
+        elif code == messages.EVENT_RX_SEARCH_TIMEOUT:
+            self.logger.info(f"Search timed out on ANT channel {number}")
+        elif code == messages.EVENT_TRANSFER_RX_FAILED:
+            self.logger.debug("Burst receive failed on ANT channel %d", number)
+
+    async def _await(self, future: asyncio.Future, what: str):
+        try:
+            return await asyncio.wait_for(future, self.response_timeout)
+        except asyncio.TimeoutError:
+            raise messages.AntError(f"No response to {what} within {self.response_timeout}s") from None
+
+    async def command(self, msg_id: int, payload: bytes) -> None:
+        """
+        Send a command and wait for its channel response
+
+        Raises:
+            AntError: If the chip rejects the command or does not answer
+        """
+        key = (payload[0], msg_id)
+        async with self._command_lock:
+            future = asyncio.get_running_loop().create_future()
+            self._responses[key] = future
+            try:
+                self.transport.write(messages.encode(msg_id, payload))
+                code = await self._await(future, f"message 0x{msg_id:02X}")
+            finally:
+                self._responses.pop(key, None)
+        if code != messages.RESPONSE_NO_ERROR:
+            raise messages.AntError(
+                f"Message 0x{msg_id:02X} on channel {payload[0]} rejected: {messages.describe_code(code)}", code
+            )
+
+    async def request(self, channel: int, msg_id: int) -> bytes:
+        """Request a message from the chip, e.g. CHANNEL_ID or CAPABILITIES, and return its payload"""
+        future = asyncio.get_running_loop().create_future()
+        self._requests[msg_id] = future
+        try:
+            self.transport.write(messages.encode(messages.REQUEST_MESSAGE, bytes([channel, msg_id])))
+            return await self._await(future, f"request for 0x{msg_id:02X}")
+        finally:
+            self._requests.pop(msg_id, None)
+
+    async def reset(self):
+        """Reset the chip, closing every channel, and wait for its startup message"""
+        self._startup = asyncio.get_running_loop().create_future()
+        self.transport.write(messages.encode(messages.RESET_SYSTEM, b"\x00"))
+        await self._await(self._startup, "reset")
+        self.channels.clear()
+
+    async def enable_extended_messages(self, flags: int = messages.LIB_CONFIG_CHANNEL_ID):
+        """Append the transmitting device's channel id (and optionally RSSI/timestamp) to received data"""
+        await self.command(messages.LIB_CONFIG, bytes([0, flags]))
+
+    def _free_channel(self) -> int:
+        for number in range(self.max_channels):
+            if number not in self.channels:
+                return number
+        raise messages.AntError(f"All {self.max_channels} channels are in use")
+
+    async def open_channel(
+        self,
+        config: ChannelConfig,
+        on_data: Optional[DataCallback] = None,
+        on_burst: Optional[BurstCallback] = None,
+        number: Optional[int] = None
+    ) -> AntChannel:
+        """
+        Assign, configure and open a channel
+
+        Args:
+            config: Channel parameters
+            on_data: Receives every broadcast and acknowledged page
+            on_burst: Receives every complete burst transfer
+            number: Channel number, the lowest free one if omitted
+
+        Raises:
+            AntError: If no channel is free or the chip rejects the configuration
+        """
+        number = self._free_channel() if number is None else number
+        channel = AntChannel(self, number, config, on_data, on_burst)
+        if config.device_number:
+            channel.channel_id = ChannelId(config.device_number, config.device_type, config.transmission_type)
+        self.channels[number] = channel
+        try:
+            for msg_id, payload in config_messages(number, config):
+                await self.command(msg_id, payload)
+            await self.command(messages.OPEN_CHANNEL, bytes([number]))
+        except Exception:
+            self.channels.pop(number, None)
+            raise
+        channel.is_open = True
+        self.logger.debug("Opened ANT channel %d for device type %d", number, config.device_type)
+        return channel
+
+    async def open_scan_mode(self, config: ChannelConfig, on_data: DataCallback) -> AntChannel:
+        """
+        Receive every device matching `config` on channel 0 in continuous scan mode
+
+        Scan mode takes over the radio, so it cannot be combined with other
+        channels. Extended messages are enabled so each page carries the
+        channel id of the device that sent it.
+        """
+        if self.channels:
+            raise messages.AntError("Scan mode requires all channels to be closed")
+        channel = AntChannel(self, 0, config, on_data)
+        self.channels[0] = channel
+        try:
+            await self.enable_extended_messages()
+            for msg_id, payload in config_messages(0, config):
+                await self.command(msg_id, payload)
+            await self.command(messages.OPEN_RX_SCAN_MODE, b"\x00")
+        except Exception:
+            self.channels.pop(0, None)
+            raise
+        channel.is_open = True
+        return channel
+
+    async def close_channel(self, channel: Union[AntChannel, int]):
+        """Close and unassign a channel, waiting for the chip to report it closed"""
+        number = channel.number if isinstance(channel, AntChannel) else channel
+        if number not in self.channels:
+            return
+        closed = asyncio.get_running_loop().create_future()
+        self._closed_events[number] = closed
+        try:
+            await self.command(messages.CLOSE_CHANNEL, bytes([number]))
+            await self._await(closed, f"closing channel {number}")
+            await self.command(messages.UNASSIGN_CHANNEL, bytes([number]))
+        finally:
+            self._closed_events.pop(number, None)
+            self.channels.pop(number, None)
+
+    async def request_channel_id(self, channel: AntChannel) -> ChannelId:
+        """Ask the chip which device a channel is paired with"""
+        payload = await self.request(channel.number, messages.CHANNEL_ID)
+        channel.channel_id = ChannelId(payload[1] | (payload[2] << 8), payload[3], payload[4])
+        return channel.channel_id
+
+    def send_broadcast(self, channel: AntChannel, data: bytes):
+        """Queue 8 bytes for the channel's next broadcast slot"""
+        self.transport.write(messages.encode_data(messages.BROADCAST_DATA, channel.number, data[:messages.DATA_SIZE]))
+
+    async def send_burst(self, channel: AntChannel, data: bytes) -> None:
+        """
+        Send a burst transfer and wait until the device acknowledged it
+
+        All packets are written back to back without waiting on each one;
+        the chip paces them over the air.
+
+        Raises:
+            AntError: If the transfer failed or was not confirmed in time
+        """
+        if channel._transfer is not None and not channel._transfer.done():
+            raise messages.AntError(f"Transfer in progress on channel {channel.number}", messages.TRANSFER_IN_PROGRESS)
+        channel._transfer = asyncio.get_running_loop().create_future()
+        frames = b"".join(
+            messages.encode_data(messages.BURST_TRANSFER_DATA, sequence, chunk)
+            for sequence, chunk in burst_packets(channel.number, data)
+        )
+        self.transport.write(frames)
+        await self.transport.drain()
+        code = await self._await(channel._transfer, f"burst on channel {channel.number}")
+        if code != messages.EVENT_TRANSFER_TX_COMPLETED:
+            raise messages.AntError(f"Burst on channel {channel.number} failed: {messages.describe_code(code)}", code)
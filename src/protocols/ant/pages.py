@@ -0,0 +1,258 @@
+# src/protocols/ant/pages.py
+"""
+ANT+ device profiles and broadcast data page decoding
+
+Each broadcast carries one 8-byte data page. Decoders read the page in
+place with struct.unpack_from, so they accept the memoryviews handed out
+by FrameParser without copying. PAGE_DECODERS maps an ANT+ device type
+to its decoder, the same table-driven dispatch the BLE parsers use.
+"""
+import struct
+from typing import Optional, Dict, Any, Callable, Tuple, Union
+from ..ble.cycling_speed_cadence import revolution_rate
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# ANT+ managed network: RF channel 57 (2457 MHz)
+ANT_PLUS_FREQUENCY = 57
+
+# Device types
+HEART_RATE = 120
+BIKE_POWER = 11
+BIKE_SPEED_CADENCE = 121
+BIKE_CADENCE = 122
+BIKE_SPEED = 123
+STRIDE_SPEED_DISTANCE = 124
+
+# Device type -> (profile name, channel period in 1/32768 s)
+DEVICE_PROFILES: Dict[int, Tuple[str, int]] = {
+    HEART_RATE: ("heart_rate", 8070),
+    BIKE_POWER: ("bike_power", 8182),
+    BIKE_SPEED_CADENCE: ("bike_speed_cadence", 8086),
+    BIKE_CADENCE: ("bike_cadence", 8102),
+    BIKE_SPEED: ("bike_speed", 8118),
+    STRIDE_SPEED_DISTANCE: ("stride_speed_distance", 8134),
+}
+
+# Page numbers use bits 0-6; bit 7 toggles every 4 messages on HR and speed/cadence sensors
+PAGE_NUMBER_MASK = 0x7F
+# Bike power: standard power-only main data page
+POWER_ONLY_PAGE = 0x10
+# Stride based speed and distance: main data page
+SDM_MAIN_PAGE = 0x01
+
+# Event times in 1/1024 s, 16-bit counters
+EVENT_TIME_UNITS_PER_S = 1024
+COUNTER_MODULUS = 1 << 16
+
+_HR_COMMON = struct.Struct('<HBB')
+_HR_PREVIOUS = struct.Struct('<H')
+_POWER_ONLY = struct.Struct('<BBBBHH')
+_SPEED_CADENCE = struct.Struct('<HHHH')
+_TIME_COUNT = struct.Struct('<HH')
+_SDM_MAIN = struct.Struct('<BBBBBBBB')
+
+class HeartRatePage:
+    """Heart rate data page; every page carries the beat fields"""
+
+    __slots__ = ("page", "heart_rate", "beat_count", "beat_time", "previous_beat_time")
+
+    def __init__(self, page: int, heart_rate: int, beat_count: int, beat_time: int, previous_beat_time: Optional[int] = None):
+        self.page = page
+        # Computed heart rate in bpm, 0 when invalid
+        self.heart_rate = heart_rate
+        # 8-bit beat counter and 1/1024 s time of its last beat
+        self.beat_count = beat_count
+        self.beat_time = beat_time
+        # From page 4 only, time of the beat before the last one
+        self.previous_beat_time = previous_beat_time
+
+    def rr_interval_ms(self) -> Optional[float]:
+        """Interval between the last two beats, page 4 only"""
+        if self.previous_beat_time is None:
+            return None
+        return ((self.beat_time - self.previous_beat_time) % COUNTER_MODULUS) * 1000.0 / EVENT_TIME_UNITS_PER_S
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (
+            f"HeartRatePage(page={self.page}, heart_rate={self.heart_rate}, beat_count={self.beat_count}, "
+            f"beat_time={self.beat_time}, previous_beat_time={self.previous_beat_time})"
+        )
+
+class PowerPage:
+    """Bike power standard power-only page (0x10)"""
+
+    __slots__ = ("event_count", "pedal_power", "cadence", "accumulated_power", "power")
+
+    def __init__(self, event_count: int, pedal_power: Optional[int], cadence: Optional[int], accumulated_power: int, power: int):
+        # Increments with every power update
+        self.event_count = event_count
+        # Percent contribution, None when not available; bit 7 of the raw
+        # value marks the right pedal as reference and is stripped here
+        self.pedal_power = pedal_power
+        # rpm, None when not available
+        self.cadence = cadence
+        # Watts, rolls over at 65536
+        self.accumulated_power = accumulated_power
+        self.power = power
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (
+            f"PowerPage(event_count={self.event_count}, pedal_power={self.pedal_power}, cadence={self.cadence}, "
+            f"accumulated_power={self.accumulated_power}, power={self.power})"
+        )
+
+class SpeedCadencePage:
+    """Speed and/or cadence event data; absent halves are None"""
+
+    __slots__ = ("cadence_event_time", "cadence_revolutions", "speed_event_time", "speed_revolutions")
+
+    def __init__(
+        self,
+        cadence_event_time: Optional[int] = None,
+        cadence_revolutions: Optional[int] = None,
+        speed_event_time: Optional[int] = None,
+        speed_revolutions: Optional[int] = None
+    ):
+        self.cadence_event_time = cadence_event_time
+        self.cadence_revolutions = cadence_revolutions
+        self.speed_event_time = speed_event_time
+        self.speed_revolutions = speed_revolutions
+
+    def rates_since(self, previous: "SpeedCadencePage") -> Tuple[Optional[float], Optional[float]]:
+        """(wheel rpm, crank rpm) since an earlier page, see cycling_speed_cadence.revolution_rate"""
+        wheel_rpm = crank_rpm = None
+        if self.speed_event_time is not None and previous.speed_event_time is not None:
+            wheel_rpm = revolution_rate(
+                previous.speed_revolutions, previous.speed_event_time,
+                self.speed_revolutions, self.speed_event_time, COUNTER_MODULUS
+            )
+        if self.cadence_event_time is not None and previous.cadence_event_time is not None:
+            crank_rpm = revolution_rate(
+                previous.cadence_revolutions, previous.cadence_event_time,
+                self.cadence_revolutions, self.cadence_event_time, COUNTER_MODULUS
+            )
+        return wheel_rpm, crank_rpm
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (
+            f"SpeedCadencePage(cadence_event_time={self.cadence_event_time}, cadence_revolutions={self.cadence_revolutions}, "
+            f"speed_event_time={self.speed_event_time}, speed_revolutions={self.speed_revolutions})"
+        )
+
+class StridePage:
+    """Stride based speed and distance main page (0x01)"""
+
+    __slots__ = ("time", "distance", "speed", "stride_count", "latency")
+
+    def __init__(self, time: float, distance: float, speed: float, stride_count: int, latency: float):
+        # Seconds, rolls over at 256 s
+        self.time = time
+        # Metres, rolls over at 256 m
+        self.distance = distance
+        # Metres per second
+        self.speed = speed
+        # Rolls over at 256 strides
+        self.stride_count = stride_count
+        # Seconds between the last event and the transmission
+        self.latency = latency
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (
+            f"StridePage(time={self.time}, distance={self.distance}, speed={self.speed}, "
+            f"stride_count={self.stride_count}, latency={self.latency})"
+        )
+
+def decode_heart_rate(data: BytesLike) -> Optional[HeartRatePage]:
+    """Decode any heart rate page, the last four bytes are common to all of them"""
+    if len(data) < 8:
+        return None
+    page = data[0] & PAGE_NUMBER_MASK
+    beat_time, beat_count, heart_rate = _HR_COMMON.unpack_from(data, 4)
+    previous = _HR_PREVIOUS.unpack_from(data, 2)[0] if page == 4 else None
+    return HeartRatePage(page, heart_rate, beat_count, beat_time, previous)
+
+def decode_bike_power(data: BytesLike) -> Optional[PowerPage]:
+    """Decode the power-only page, None for the other bike power pages"""
+    if len(data) < 8 or data[0] != POWER_ONLY_PAGE:
+        return None
+    _, event_count, pedal_power, cadence, accumulated_power, power = _POWER_ONLY.unpack_from(data)
+    return PowerPage(
+        event_count,
+        None if pedal_power == 0xFF else pedal_power & 0x7F,
+        None if cadence == 0xFF else cadence,
+        accumulated_power,
+        power
+    )
+
+def decode_bike_speed_cadence(data: BytesLike) -> Optional[SpeedCadencePage]:
+    """Decode the combined speed and cadence sensor, which has no page byte"""
+    if len(data) < 8:
+        return None
+    return SpeedCadencePage(*_SPEED_CADENCE.unpack_from(data))
+
+def decode_bike_cadence(data: BytesLike) -> Optional[SpeedCadencePage]:
+    """Decode the event fields common to every cadence-only page"""
+    if len(data) < 8:
+        return None
+    event_time, revolutions = _TIME_COUNT.unpack_from(data, 4)
+    return SpeedCadencePage(cadence_event_time=event_time, cadence_revolutions=revolutions)
+
+def decode_bike_speed(data: BytesLike) -> Optional[SpeedCadencePage]:
+    """Decode the event fields common to every speed-only page"""
+    if len(data) < 8:
+        return None
+    event_time, revolutions = _TIME_COUNT.unpack_from(data, 4)
+    return SpeedCadencePage(speed_event_time=event_time, speed_revolutions=revolutions)
+
+def decode_stride(data: BytesLike) -> Optional[StridePage]:
+    """Decode the SDM main page, None for the other pages"""
+    if len(data) < 8 or data[0] != SDM_MAIN_PAGE:
+        return None
+    _, time_fraction, time_seconds, distance, distance_speed, speed_fraction, strides, latency = _SDM_MAIN.unpack_from(data)
+    return StridePage(
+        time_seconds + time_fraction / 200.0,
+        distance + (distance_speed >> 4) / 16.0,
+        (distance_speed & 0x0F) + speed_fraction / 256.0,
+        strides,
+        latency / 32.0
+    )
+
+# Device type -> page decoder
+PAGE_DECODERS: Dict[int, Callable[[BytesLike], Any]] = {
+    HEART_RATE: decode_heart_rate,
+    BIKE_POWER: decode_bike_power,
+    BIKE_SPEED_CADENCE: decode_bike_speed_cadence,
+    BIKE_CADENCE: decode_bike_cadence,
+    BIKE_SPEED: decode_bike_speed,
+    STRIDE_SPEED_DISTANCE: decode_stride,
+}
+
+def decode_page(device_type: int, data: BytesLike) -> Any:
+    """Decode a data page of a device type, None for unknown types and pages"""
+    decode = PAGE_DECODERS.get(device_type)
+    return decode(data) if decode is not None else None
+
+def channel_period(device_type: int) -> int:
+    """
+    ANT+ channel period of a device type
+
+    Raises:
+        ValueError: If the device type is not an ANT+ profile known here
+    """
+    try:
+        return DEVICE_PROFILES[device_type][1]
+    except KeyError:
+        raise ValueError(f"Unknown ANT+ device type {device_type}") from None
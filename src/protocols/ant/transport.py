@@ -0,0 +1,191 @@
+# src/protocols/ant/transport.py
+"""
+Non-blocking byte stream transports between the host and an ANT chip
+
+AntNode only needs `read` to await the next chunk and `write` to queue
+bytes without blocking the event loop. LoopbackTransport connects two
+endpoints in-process, e.g. an AntNode and a FakeAntStick, and
+SerialTransport drives an ANT USB stick exposed as a serial device.
+"""
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+import asyncio
+import logging
+import os
+
+try:
+    import termios
+    import tty
+except ImportError:  # termios is POSIX only, SerialTransport is unavailable without it
+    termios = None
+
+class AntTransport(ABC):
+    """Byte stream to or from an ANT chip"""
+
+    async def open(self):
+        """Open the underlying device, a no-op for transports that are ready on creation"""
+
+    @abstractmethod
+    async def read(self) -> bytes:
+        """Wait for the next chunk of received bytes, b"" once the transport is closed"""
+
+    @abstractmethod
+    def write(self, data: bytes):
+        """Queue bytes for sending without blocking"""
+
+    async def drain(self):
+        """Wait until queued bytes were handed to the device"""
+
+    @abstractmethod
+    async def close(self):
+        pass
+
+class LoopbackTransport(AntTransport):
+    """
+    One end of an in-process byte pipe
+
+    Writes are cut into chunks of at most `max_chunk` bytes, like the
+    64-byte packets of a USB endpoint, so the reader sees messages split
+    across reads exactly as it would from real hardware.
+    """
+
+    def __init__(self, max_chunk: Optional[int] = 64):
+        self.max_chunk = max_chunk
+        self.peer: Optional["LoopbackTransport"] = None
+        self.bytes_written = 0
+        self._chunks: asyncio.Queue = asyncio.Queue()
+        self._closed = False
+
+    @classmethod
+    def pair(cls, max_chunk: Optional[int] = 64) -> Tuple["LoopbackTransport", "LoopbackTransport"]:
+        """Two connected endpoints, e.g. (host side, stick side)"""
+        host, device = cls(max_chunk), cls(max_chunk)
+        host.peer, device.peer = device, host
+        return host, device
+
+    async def read(self) -> bytes:
+        if self._closed and self._chunks.empty():
+            return b""
+        chunk = await self._chunks.get()
+        return chunk if chunk is not None else b""
+
+    def write(self, data: bytes):
+        if self._closed or self.peer is None or self.peer._closed:
+            raise ConnectionError("Loopback transport is closed")
+        self.bytes_written += len(data)
+        put = self.peer._chunks.put_nowait
+        step = self.max_chunk
+        if step is None or len(data) <= step:
+            put(bytes(data))
+            return
+        for offset in range(0, len(data), step):
+            put(bytes(data[offset:offset + step]))
+
+    async def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        # Wake both readers
+        self._chunks.put_nowait(None)
+        if self.peer is not None and not self.peer._closed:
+            self.peer._chunks.put_nowait(None)
+
+class SerialTransport(AntTransport):
+    """
+    ANT USB stick exposed as a serial device, e.g. /dev/ttyUSB0
+
+    The file descriptor is non-blocking and watched by the event loop, so
+    reads and writes never block it. Requires termios (POSIX).
+    """
+
+    def __init__(self, path: str, baudrate: int = 115200, read_size: int = 4096):
+        """
+        Args:
+            path: Serial device of the stick
+            baudrate: 115200 for USB-m sticks, 57600 for the older USB2 ones
+            read_size: Most bytes taken per read
+        """
+        self.path = path
+        self.baudrate = baudrate
+        self.read_size = read_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._fd: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._chunks: asyncio.Queue = asyncio.Queue()
+        self._outgoing = bytearray()
+        self._drained: Optional[asyncio.Event] = None
+
+    async def open(self):
+        if termios is None:
+            raise RuntimeError("SerialTransport requires termios")
+        self._loop = asyncio.get_running_loop()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        try:
+            if os.isatty(self._fd):
+                tty.setraw(self._fd)
+                attributes = termios.tcgetattr(self._fd)
+                speed = getattr(termios, f"B{self.baudrate}")
+                attributes[4] = attributes[5] = speed
+                termios.tcsetattr(self._fd, termios.TCSANOW, attributes)
+        except Exception:
+            os.close(self._fd)
+            self._fd = None
+            raise
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._loop.add_reader(self._fd, self._on_readable)
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, self.read_size)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.logger.error(f"Read from {self.path} failed: {str(e)}")
+            data = b""
+        if not data:
+            self._loop.remove_reader(self._fd)
+        self._chunks.put_nowait(data)
+
+    async def read(self) -> bytes:
+        if self._fd is None and self._chunks.empty():
+            return b""
+        return await self._chunks.get()
+
+    def write(self, data: bytes):
+        if self._fd is None:
+            raise ConnectionError(f"{self.path} is not open")
+        was_empty = not self._outgoing
+        self._outgoing += data
+        if was_empty:
+            self._flush()
+
+    def _flush(self):
+        try:
+            written = os.write(self._fd, self._outgoing)
+        except BlockingIOError:
+            written = 0
+        del self._outgoing[:written]
+        if self._outgoing:
+            self._drained.clear()
+            self._loop.add_writer(self._fd, self._on_writable)
+        else:
+            self._drained.set()
+
+    def _on_writable(self):
+        self._loop.remove_writer(self._fd)
+        self._flush()
+
+    async def drain(self):
+        if self._drained is not None:
+            await self._drained.wait()
+
+    async def close(self):
+        if self._fd is None:
+            return
+        self._loop.remove_reader(self._fd)
+        self._loop.remove_writer(self._fd)
+        os.close(self._fd)
+        self._fd = None
+        self._drained.set()
+        self._chunks.put_nowait(b"")
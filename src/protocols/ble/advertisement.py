@@ -0,0 +1,240 @@
+# src/protocols/ble/advertisement.py
+from bleak import BLEDevice
+from bleak.uuids import normalize_uuid_str
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Callable, Sequence
+import functools
+import struct
+
+# Decodes one manufacturer or service data payload into named fields,
+# returning None when the payload is not in the expected layout
+PayloadParser = Callable[[bytes], Optional[Dict[str, Any]]]
+
+# CoreBluetooth advertisement dictionary keys
+_CB_SERVICE_UUIDS = 'kCBAdvDataServiceUUIDs'
+_CB_MANUFACTURER_DATA = 'kCBAdvDataManufacturerData'
+_CB_SERVICE_DATA = 'kCBAdvDataServiceData'
+_CB_TX_POWER = 'kCBAdvDataTxPowerLevel'
+_CB_CONNECTABLE = 'kCBAdvDataIsConnectable'
+
+# WinRT BluetoothLEAdvertisementType values of connectable advertisements
+_WINRT_CONNECTABLE_TYPES = (0, 1)
+
+APPLE_COMPANY_ID = 0x004C
+BATTERY_SERVICE_UUID = "0000180f-0000-1000-8000-00805f9b34fb"
+
+@dataclass
+class BLEAdvertisementData:
+    """Structured BLE advertisement data"""
+    local_name: Optional[str]
+    service_uuids: List[str]
+    manufacturer_data: Dict[int, bytes]
+    service_data: Dict[str, bytes]
+    tx_power: Optional[int]
+    rssi: Optional[int]
+    # None when the backend does not report it, as on BlueZ
+    is_connectable: Optional[bool]
+    # Fields produced by the registered manufacturer and service data parsers
+    decoded: Dict[str, Any] = field(default_factory=dict)
+
+@functools.lru_cache(maxsize=4096)
+def normalize_uuid(uuid: Any) -> str:
+    """
+    Lower-case 128-bit form of a 16, 32 or 128-bit UUID
+
+    Memoized, as the same few UUIDs repeat in every advertisement.
+    """
+    text = str(uuid)
+    try:
+        return normalize_uuid_str(text)
+    except ValueError:
+        return text.lower()
+
+class StructParser:
+    """
+    Payload parser for a fixed layout, compiled once into a struct.Struct
+
+    Args:
+        fmt: struct format of the fields
+        fields: Names given to the unpacked values, in order
+        offset: Byte offset of the first field
+        prefix: Bytes the payload must start with, e.g. a frame type
+        scale: Per-field multipliers applied after unpacking
+    """
+
+    __slots__ = ("struct", "fields", "offset", "prefix", "scale", "_min_length")
+
+    def __init__(
+        self,
+        fmt: str,
+        fields: Sequence[str],
+        offset: int = 0,
+        prefix: bytes = b"",
+        scale: Optional[Dict[str, float]] = None
+    ):
+        self.struct = struct.Struct(fmt)
+        self.fields = tuple(fields)
+        self.offset = offset
+        self.prefix = prefix
+        self.scale = scale or {}
+        self._min_length = offset + self.struct.size
+        if len(self.fields) != len(self.struct.unpack(bytes(self.struct.size))):
+            raise ValueError(f"{fmt!r} does not unpack to {len(self.fields)} fields")
+
+    def __call__(self, payload: bytes) -> Optional[Dict[str, Any]]:
+        if len(payload) < self._min_length or not payload.startswith(self.prefix):
+            return None
+        values = dict(zip(self.fields, self.struct.unpack_from(payload, self.offset)))
+        for name, factor in self.scale.items():
+            values[name] *= factor
+        return values
+
+_IBEACON = StructParser(
+    '>16sHHb', ("ibeacon_uuid", "ibeacon_major", "ibeacon_minor", "ibeacon_measured_power"),
+    offset=2, prefix=b"\x02\x15"
+)
+
+def parse_ibeacon(payload: bytes) -> Optional[Dict[str, Any]]:
+    """Apple iBeacon frame"""
+    values = _IBEACON(payload)
+    if values is not None:
+        values["ibeacon_uuid"] = values["ibeacon_uuid"].hex()
+    return values
+
+def parse_battery_service_data(payload: bytes) -> Optional[Dict[str, Any]]:
+    """Battery Level broadcast as Battery Service data"""
+    if not payload:
+        return None
+    return {"battery_level": payload[0]}
+
+class AdvertisementDecoder:
+    """
+    Backend-independent advertisement decoding
+
+    Accepts bleak's AdvertisementData (all backends) as well as raw
+    CoreBluetooth advertisement dictionaries, normalizes service UUIDs to
+    their lower-case 128-bit form and runs the parser registered for each
+    manufacturer company ID and service data UUID.
+    """
+
+    def __init__(
+        self,
+        manufacturer_parsers: Optional[Dict[int, PayloadParser]] = None,
+        service_data_parsers: Optional[Dict[str, PayloadParser]] = None
+    ):
+        self.manufacturer_parsers: Dict[int, PayloadParser] = {APPLE_COMPANY_ID: parse_ibeacon}
+        self.service_data_parsers: Dict[str, PayloadParser] = {
+            BATTERY_SERVICE_UUID: parse_battery_service_data
+        }
+        for company_id, parser in (manufacturer_parsers or {}).items():
+            self.register_manufacturer(company_id, parser)
+        for uuid, parser in (service_data_parsers or {}).items():
+            self.register_service_data(uuid, parser)
+
+    def register_manufacturer(self, company_id: int, parser: PayloadParser):
+        self.manufacturer_parsers[company_id] = parser
+
+    def register_service_data(self, uuid: str, parser: PayloadParser):
+        self.service_data_parsers[normalize_uuid(uuid)] = parser
+
+    def decode(self, device: BLEDevice, adv_data: Any) -> BLEAdvertisementData:
+        """Structured advertisement from bleak AdvertisementData or a CoreBluetooth dict"""
+        if isinstance(adv_data, dict):
+            return self._from_corebluetooth(device, adv_data)
+
+        service_data = {normalize_uuid(u): bytes(v) for u, v in adv_data.service_data.items()}
+        manufacturer_data = {k: bytes(v) for k, v in adv_data.manufacturer_data.items()}
+        return BLEAdvertisementData(
+            local_name=adv_data.local_name or getattr(device, 'name', None),
+            service_uuids=[normalize_uuid(u) for u in adv_data.service_uuids],
+            manufacturer_data=manufacturer_data,
+            service_data=service_data,
+            tx_power=adv_data.tx_power,
+            rssi=adv_data.rssi,
+            is_connectable=self._connectable(adv_data.platform_data),
+            decoded=self.decode_payloads(manufacturer_data, service_data)
+        )
+
+    def _from_corebluetooth(self, device: BLEDevice, adv_data: dict) -> BLEAdvertisementData:
+        service_data = {
+            normalize_uuid(u): bytes(v) for u, v in adv_data.get(_CB_SERVICE_DATA, {}).items()
+        }
+        manufacturer_data = self._split_manufacturer_data(adv_data.get(_CB_MANUFACTURER_DATA, {}))
+        return BLEAdvertisementData(
+            local_name=getattr(device, 'name', None),
+            service_uuids=[normalize_uuid(u) for u in adv_data.get(_CB_SERVICE_UUIDS, [])],
+            manufacturer_data=manufacturer_data,
+            service_data=service_data,
+            tx_power=adv_data.get(_CB_TX_POWER),
+            rssi=getattr(device, 'rssi', None),
+            is_connectable=self._corebluetooth_connectable(adv_data),
+            decoded=self.decode_payloads(manufacturer_data, service_data)
+        )
+
+    @staticmethod
+    def _split_manufacturer_data(raw: Any) -> Dict[int, bytes]:
+        """CoreBluetooth reports manufacturer data as one blob led by the company ID"""
+        if isinstance(raw, dict):
+            return {k: bytes(v) for k, v in raw.items()}
+        raw = bytes(raw)
+        if len(raw) < 2:
+            return {}
+        return {int.from_bytes(raw[:2], 'little'): raw[2:]}
+
+    @staticmethod
+    def _corebluetooth_connectable(adv_data: Any) -> Optional[bool]:
+        try:
+            connectable = adv_data.get(_CB_CONNECTABLE)
+        except Exception:
+            return None
+        return None if connectable is None else bool(connectable)
+
+    @classmethod
+    def _connectable(cls, platform_data: Any) -> Optional[bool]:
+        """
+        Connectable flag from the backend's platform data, None if it has none
+
+        CoreBluetooth reports it in the advertisement dictionary and WinRT
+        on the received event arguments, as is_connectable or, on older
+        Windows builds, through the advertisement type. BlueZ does not
+        expose it.
+        """
+        for item in platform_data or ():
+            if hasattr(item, 'get'):
+                # CoreBluetooth advertisement dictionary; BlueZ device properties lack the key
+                connectable = cls._corebluetooth_connectable(item)
+                if connectable is not None:
+                    return connectable
+                continue
+            # WinRT (sender, _RawAdvData(adv, scan)); a scan response's type
+            # says nothing about the advertisement, only its flag is used
+            advertisement, scan_response = getattr(item, 'adv', None), getattr(item, 'scan', None)
+            for event in (advertisement, scan_response):
+                connectable = getattr(event, 'is_connectable', None)
+                if connectable is not None:
+                    return bool(connectable)
+            advertisement_type = getattr(advertisement, 'advertisement_type', None)
+            if advertisement_type is not None:
+                return int(advertisement_type) in _WINRT_CONNECTABLE_TYPES
+        return None
+
+    def decode_payloads(self, manufacturer_data: Dict[int, bytes], service_data: Dict[str, bytes]) -> Dict[str, Any]:
+        """Merged output of every parser matching the advertisement"""
+        decoded: Dict[str, Any] = {}
+        if manufacturer_data:
+            parsers = self.manufacturer_parsers
+            for company_id, payload in manufacturer_data.items():
+                parser = parsers.get(company_id)
+                if parser is not None:
+                    values = parser(payload)
+                    if values:
+                        decoded.update(values)
+        if service_data:
+            parsers = self.service_data_parsers
+            for uuid, payload in service_data.items():
+                parser = parsers.get(uuid)
+                if parser is not None:
+                    values = parser(payload)
+                    if values:
+                        decoded.update(values)
+        return decoded
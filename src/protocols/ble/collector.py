@@ -0,0 +1,565 @@
+# src/protocols/ble/collector.py
+"""
+Connection, subscription and ingest plumbing shared by the BLE collectors
+
+BLECollector owns everything that does not depend on the device: the
+client and its reconnects, GATT profile caching, the handle cache, the
+ingest pipeline and delivery through a CharacteristicParser's decoder
+table. A device collector sets PARSER and DATA_TYPE and describes how to
+find the device; per-notification work stays one table lookup per GATT
+handle plus one decoder call.
+"""
+from ...core.base_collector import DeviceCollector
+from ...core.metrics import CollectorMetrics
+from ...core.pipeline import IngestPipeline, BackpressurePolicy
+from ...core.recording import SessionRecorder
+from ...core.reconnect import ReconnectPolicy, ReconnectStats, DataGap
+from ...utils.hot_path_logging import HotPathLog
+from .decoding import CharacteristicParser
+from .gatt_cache import GattProfile, GattProfileCache, MANUFACTURER_NAME_UUID, FIRMWARE_REVISION_UUID
+from .scanner import BLEScanner, ScanFilter
+from bleak import BleakClient
+from bleak.backends.characteristic import BleakGATTCharacteristic
+from typing import Optional, Dict, Any, Callable, Union, Tuple, List, Type
+import asyncio
+import time
+
+BATTERY_LEVEL_UUID = "00002a19-0000-1000-8000-00805f9b34fb"
+
+# (timestamp_ns, characteristic UUID, payload, decoder entry) queued for the consumer
+QueuedNotification = Tuple[int, str, bytearray, Optional[Tuple]]
+
+def _spillable(item: QueuedNotification) -> QueuedNotification:
+    """Drop the decoder entry, which may not pickle, from a spilled notification"""
+    timestamp_ns, char_uuid, data, _ = item
+    return timestamp_ns, char_uuid, data, None
+
+class BLECollector(DeviceCollector):
+    """Base for collectors of BLE devices that stream GATT notifications"""
+
+    # Decoder table used for every notification
+    PARSER: Type[CharacteristicParser] = CharacteristicParser
+    # First argument of every data_callback call
+    DATA_TYPE = "ble_data"
+    # Service UUIDs kept in the GATT profile even without notifiable characteristics
+    SERVICES: Dict[str, str] = {}
+    # Advertised name prefix used by discover()
+    DEVICE_NAME_PREFIX: Optional[str] = None
+
+    def __init__(
+        self,
+        device_address: Optional[str] = None,
+        data_callback: Optional[Callable[[str, Dict], None]] = None,
+        include_raw: bool = False,
+        compact_samples: bool = False,
+        queue_size: Optional[int] = 1024,
+        backpressure: str = BackpressurePolicy.DROP_OLDEST,
+        batch_size: int = 64,
+        spill_path: Optional[str] = None,
+        recorder: Optional[SessionRecorder] = None,
+        client_factory: Callable[..., BleakClient] = BleakClient,
+        scanner: Optional[BLEScanner] = None,
+        gatt_cache: Optional[GattProfileCache] = None,
+        auto_reconnect: bool = False,
+        reconnect_policy: Optional[ReconnectPolicy] = None,
+        packet_log_level: Optional[int] = None,
+        packet_log_every: int = 100,
+        metrics: Optional[CollectorMetrics] = None
+    ):
+        """
+        Args:
+            device_address: Address of the device, discovered if omitted
+            data_callback: Called with (DATA_TYPE, parsed dict) for each notification
+            include_raw: Add the hex encoded payload to every parsed dict
+            compact_samples: Deliver Sample records instead of dicts
+            queue_size: Bound of the ingest queue, None delivers synchronously
+                from the notification callback
+            backpressure: BackpressurePolicy applied when the queue is full;
+                notifications cannot be paused, so under BLOCK new ones are
+                dropped while the queue is full
+            batch_size: Maximum notifications handed to the consumer at once
+            spill_path: File used by the spill policy, a temporary file if omitted
+            recorder: Streams every raw notification to a binary recording
+            client_factory: Builds the BLE client for an address, e.g. a fake client
+            scanner: Scanner to share with other collectors
+            gatt_cache: Reuses GATT layouts across reconnects and restarts
+            auto_reconnect: Reconnect and resubscribe when the link drops during collection
+            reconnect_policy: Backoff used by auto_reconnect
+            packet_log_level: Level for per-packet log records, None (the
+                default) disables them
+            packet_log_every: Log one packet out of this many
+            metrics: Records per-characteristic packet counts, inter-arrival
+                jitter, loss estimates and parse latencies
+        """
+        super().__init__()
+        self.scanner = scanner or BLEScanner()
+        self.client_factory = client_factory
+        self.client: Optional[BleakClient] = None
+        self.device_address = device_address
+        self.data_callback = data_callback
+        self.device_info: Dict[str, Any] = {}
+        self.include_raw = include_raw
+        self.compact_samples = compact_samples
+        self.recorder = recorder
+        # GATT handle -> (characteristic UUID, decoder entry), valid for one connection
+        self._handle_cache: Dict[int, Tuple[str, Optional[Tuple]]] = {}
+        self.gatt_cache = gatt_cache
+        self.profile: Optional[GattProfile] = None
+        self.connection_metrics: Dict[str, Any] = {}
+        self._connect_start_ns = 0
+        self._awaiting_first_sample = False
+        self.auto_reconnect = auto_reconnect
+        self.reconnect_policy = reconnect_policy or ReconnectPolicy()
+        self.reconnect_stats = ReconnectStats()
+        self._collecting = False
+        self._closing = False
+        self._reconnect_task: Optional[asyncio.Task] = None
+        # Route synchronous delivery through _process_batch, for subclasses
+        # whose _prepare_batch consumes notifications
+        self._direct_batches = False
+        self.pipeline: Optional[IngestPipeline] = None
+        if queue_size is not None:
+            self.pipeline = IngestPipeline(
+                self._process_batch,
+                maxsize=queue_size,
+                policy=backpressure,
+                batch_size=batch_size,
+                spill_path=spill_path,
+                spill_encode=_spillable
+            )
+        self.packet_log = HotPathLog(self.__class__.__name__, packet_log_level, packet_log_every)
+        self.attach_metrics(metrics)
+
+    def attach_metrics(self, metrics: Optional[CollectorMetrics]):
+        """Record into `metrics`, including the ingest pipeline counters"""
+        super().attach_metrics(metrics)
+        if metrics is not None and self.pipeline is not None:
+            metrics.pipeline_stats = self.pipeline.stats
+
+    def _discovery_filters(self) -> List[Dict[str, Any]]:
+        """scan_for_device keyword arguments tried in turn by discover()"""
+        return [{"name_prefix": self.DEVICE_NAME_PREFIX}]
+
+    def scan_filters(self) -> List[ScanFilter]:
+        """Filters matching this collector's devices in a scanner's device index"""
+        return [ScanFilter(**scan_filter) for scan_filter in self._discovery_filters()]
+
+    async def discover(self) -> bool:
+        """
+        Find a matching device unless an address was given
+        In direct connection mode, this is not typically used
+        """
+        if self.device_address:
+            self.logger.debug("Using known device address: %s", self.device_address)
+            return True
+
+        try:
+            for scan_filter in self._discovery_filters():
+                self.logger.debug("Starting discovery with filter: %s", scan_filter)
+                devices = await self.scanner.scan_for_device(timeout=5, **scan_filter)
+
+                if devices:
+                    self.device_address = devices[0]["address"]
+                    self.logger.info(f"Found device: {self.device_address}")
+                    return True
+
+            self.logger.warning("No matching devices found")
+            return False
+
+        except Exception as e:
+            self.logger.error(f"Discovery failed: {str(e)}")
+            return False
+
+    async def connect(self) -> bool:
+        """Connect to the discovered or configured device address"""
+        if not self.device_address:
+            self.logger.error("No device address available")
+            return False
+
+        return await self.connect_to_address(self.device_address)
+
+    async def _open_client(self, address: str, profile: Optional[GattProfile] = None):
+        """Create and connect the client, limiting discovery to cached services"""
+        kwargs = {"services": profile.service_uuids} if profile and profile.service_uuids else {}
+        self.client = self.client_factory(address, disconnected_callback=self._on_disconnected, **kwargs)
+        await self.client.connect()
+
+    async def _read_device_info(self):
+        """Read identity and battery characteristics into device_info"""
+        identity = {
+            MANUFACTURER_NAME_UUID: "manufacturer",
+            FIRMWARE_REVISION_UUID: "firmware",
+        }
+        try:
+            for service in self.client.services.services.values():
+                for char in service.characteristics:
+                    key = identity.get(str(char.uuid).lower())
+                    if key is not None:
+                        value = await self.client.read_gatt_char(char.uuid)
+                        self.device_info[key] = bytes(value).decode(errors="replace")
+        except Exception as e:
+            self.logger.debug("Couldn't read device information: %s", e)
+
+        try:
+            battery = await self.client.read_gatt_char(BATTERY_LEVEL_UUID)
+            self.device_info["battery_level"] = int(battery[0])
+        except Exception as e:
+            self.logger.debug("Couldn't read battery level: %s", e)
+
+    async def connect_to_address(self, address: str) -> bool:
+        """Connect directly to a device by address"""
+        try:
+            self.logger.debug("Connecting directly to device: %s", address)
+            self._closing = False
+            connect_start_ns = time.monotonic_ns()
+            self._handle_cache.clear()
+            self.profile = None
+            cached = self.gatt_cache.lookup(address) if self.gatt_cache is not None else None
+            await self._open_client(address, cached)
+
+            # Store basic device info
+            self.device_info = {
+                "address": address,
+            }
+            await self._read_device_info()
+
+            if cached is not None:
+                self.profile = self.gatt_cache.get(
+                    address, self.device_info.get("manufacturer"), self.device_info.get("firmware")
+                )
+                if self.profile is not None and not self.profile.matches_services(
+                    self.client.services.services.values()
+                ):
+                    self.logger.info(f"GATT profile for {address} no longer matches its services, invalidating")
+                    self.gatt_cache.invalidate(address)
+                    self.profile = None
+                if self.profile is None:
+                    # Discovery was limited to the stale profile's services, redo it in full
+                    self._closing = True
+                    await self.client.disconnect()
+                    self._closing = False
+                    await self._open_client(address)
+                    await self._read_device_info()
+
+            self.is_connected = True
+            self._connect_start_ns = connect_start_ns
+            self.connection_metrics = {
+                "connect_s": (time.monotonic_ns() - connect_start_ns) / 1e9,
+                "gatt_cache_hit": self.profile is not None,
+            }
+            self.logger.info(f"Connected to device: {address}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Connection failed: {str(e)}")
+            return False
+
+    def _subscribes_to(self, char_uuid: str) -> bool:
+        """Whether notifications of a notifiable characteristic are enabled"""
+        return True
+
+    def _discover_profile(self) -> GattProfile:
+        """Walk the discovered services and record the notifiable characteristics"""
+        profile = GattProfile(
+            address=self.device_info.get("address", self.device_address or ""),
+            manufacturer=self.device_info.get("manufacturer"),
+            firmware=self.device_info.get("firmware"),
+        )
+        known_services = self.SERVICES.values()
+        for service in self.client.services.services.values():
+            self.logger.debug("Checking service: %s", service.uuid)
+            notifiable = [
+                c for c in service.characteristics
+                if "notify" in c.properties and self._subscribes_to(str(c.uuid))
+            ]
+            if notifiable or str(service.uuid) in known_services:
+                profile.service_uuids.append(str(service.uuid))
+            for char in notifiable:
+                profile.notify_characteristics.append((str(char.uuid), char.handle))
+        return profile
+
+    def _resolve_characteristic(self, characteristic: Union[BleakGATTCharacteristic, str]) -> Tuple[str, Optional[Tuple]]:
+        """
+        Resolve a notification source to its UUID and decoder entry
+
+        Characteristic objects are cached by GATT handle so repeated
+        notifications skip the string conversion and UUID lookup.
+        """
+        if isinstance(characteristic, str):
+            return characteristic, self.PARSER.get_decoder(characteristic)
+
+        resolved = self._handle_cache.get(characteristic.handle)
+        if resolved is None:
+            char_uuid = str(characteristic.uuid)
+            resolved = (char_uuid, self.PARSER.get_decoder(char_uuid))
+            self._handle_cache[characteristic.handle] = resolved
+        return resolved
+
+    def _handle_data(self, characteristic: Union[BleakGATTCharacteristic, str], data: bytearray):
+        """
+        Handle incoming data from device
+
+        With a pipeline configured this only enqueues the notification;
+        parsing and the user callback run on the consumer task.
+
+        Args:
+            characteristic: Either a BleakGATTCharacteristic object or UUID string
+            data: Raw data received from the device
+        """
+        if not self.data_callback and self.recorder is None:
+            return
+        try:
+            char_uuid, decoder = self._resolve_characteristic(characteristic)
+            timestamp_ns = time.monotonic_ns()
+            if self._awaiting_first_sample:
+                self._record_first_sample(timestamp_ns)
+            if self.recorder is not None:
+                self.recorder.record(timestamp_ns, char_uuid, data)
+            if not self.data_callback:
+                return
+            if self.pipeline is not None:
+                self.pipeline.submit((timestamp_ns, char_uuid, data, decoder))
+            elif self._direct_batches:
+                self._process_batch([(timestamp_ns, char_uuid, data, decoder)])
+            else:
+                timed = self.metrics is not None and self.metrics.arrival(char_uuid, timestamp_ns)
+                self._process_notification(timestamp_ns, char_uuid, data, decoder, timed=timed)
+        except Exception as e:
+            if self.metrics is not None:
+                self.metrics.parse_errors += 1
+            self.logger.error(f"Data handling error for {characteristic}: {str(e)}")
+
+    async def _handle_data_blocking(self, characteristic: Union[BleakGATTCharacteristic, str], data: bytearray):
+        """
+        Feed a notification from an in-process producer, waiting for queue space
+
+        Only for producers that await it one notification at a time, e.g.
+        a replay; bleak would run it in a new task per notification.
+        """
+        if not self.data_callback and self.recorder is None:
+            return
+        try:
+            timestamp_ns = time.monotonic_ns()
+            char_uuid, decoder = self._resolve_characteristic(characteristic)
+            if self._awaiting_first_sample:
+                self._record_first_sample(timestamp_ns)
+            if self.recorder is not None:
+                self.recorder.record(timestamp_ns, char_uuid, data)
+            if not self.data_callback:
+                return
+            await self.pipeline.put((timestamp_ns, char_uuid, data, decoder))
+        except Exception as e:
+            self.logger.error(f"Data handling error for {characteristic}: {str(e)}")
+
+    def _record_first_sample(self, timestamp_ns: int):
+        """Measure time from the start of connecting to the first notification"""
+        self._awaiting_first_sample = False
+        self.connection_metrics["time_to_first_sample_s"] = (timestamp_ns - self._connect_start_ns) / 1e9
+        self.logger.info(
+            f"First sample {self.connection_metrics['time_to_first_sample_s']:.3f}s after connect "
+            f"(GATT cache {'hit' if self.connection_metrics.get('gatt_cache_hit') else 'miss'})"
+        )
+
+    def _process_notification(
+        self,
+        timestamp_ns: int,
+        char_uuid: str,
+        data: bytearray,
+        decoder: Optional[Tuple] = None,
+        timed: bool = False
+    ):
+        """
+        Parse one notification and hand it to the user callback, timing it into the metrics if `timed`
+
+        The decoder entry resolved on arrival skips the UUID lookup; it is
+        None for notifications read back from a spill file.
+        """
+        if timed:
+            start_ns = time.perf_counter_ns()
+        if self.compact_samples:
+            parsed_data = self.PARSER.parse_sample(char_uuid, data, timestamp_ns, decoder=decoder)
+        else:
+            parsed_data = self.PARSER.parse_characteristic_data(
+                char_uuid, data, include_raw=self.include_raw, decoder=decoder
+            )
+            parsed_data["timestamp_ns"] = timestamp_ns
+        if timed:
+            self.metrics.record_parse(char_uuid, time.perf_counter_ns() - start_ns, time.monotonic_ns() - timestamp_ns)
+        self.data_callback(self.DATA_TYPE, parsed_data)
+
+        if self.packet_log.enabled:
+            self.packet_log.packet(char_uuid, data)
+
+    def _prepare_batch(self, batch: List[QueuedNotification]) -> List[QueuedNotification]:
+        """Hook run on every batch before delivery, returns the notifications left to deliver"""
+        return batch
+
+    def _process_batch(self, batch: List[QueuedNotification]):
+        """Pipeline consumer: deliver a batch of queued notifications"""
+        # Sampled batches get their first notification timed
+        timed = self.metrics is not None and self.metrics.consume(batch)
+        try:
+            batch = self._prepare_batch(batch)
+        except Exception as e:
+            self.logger.error(f"Batch preparation error: {str(e)}")
+        for timestamp_ns, char_uuid, data, decoder in batch:
+            try:
+                self._process_notification(timestamp_ns, char_uuid, data, decoder, timed=timed)
+                timed = False
+            except Exception as e:
+                if self.metrics is not None:
+                    self.metrics.parse_errors += 1
+                self.logger.error(f"Data handling error for {char_uuid}: {str(e)}")
+
+    def _notification_callback(self) -> Callable:
+        """Pick the callback an in-process producer feeds notifications to"""
+        if self.pipeline is not None and self.pipeline.policy == BackpressurePolicy.BLOCK:
+            return self._handle_data_blocking
+        return self._handle_data
+
+    async def _subscribe(self) -> List[Tuple[str, int]]:
+        """Enable notifications for every notifiable characteristic at once"""
+        if self.profile is None:
+            self.profile = self._discover_profile()
+            if self.gatt_cache is not None:
+                self.gatt_cache.put(self.profile)
+
+        # Always synchronous: bleak spawns a task per call of a coroutine callback
+        callback = self._handle_data
+        subscribe_start_ns = time.monotonic_ns()
+        self._awaiting_first_sample = True
+        characteristics = self.profile.notify_characteristics
+        results = await asyncio.gather(
+            *(self.client.start_notify(handle, callback) for _, handle in characteristics),
+            return_exceptions=True
+        )
+        for (char_uuid, _), result in zip(characteristics, results):
+            if isinstance(result, Exception):
+                self.logger.warning(f"Failed to enable notifications for {char_uuid}: {result}")
+            else:
+                self.logger.debug("Enabled notifications for %s", char_uuid)
+        self.connection_metrics["subscribe_s"] = (time.monotonic_ns() - subscribe_start_ns) / 1e9
+        return characteristics
+
+    async def start_collection(self) -> bool:
+        """Start collecting data from the device"""
+        if not self.client or not self.is_connected:
+            self.logger.error("Device not connected")
+            return False
+
+        try:
+            if self.pipeline is not None:
+                await self.pipeline.start()
+
+            self._collecting = True
+            characteristics = await self._subscribe()
+
+            self.logger.info(f"Started data collection on {len(characteristics)} characteristics")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to start collection: {str(e)}")
+            return False
+
+    def _flush(self):
+        """Deliver anything held back once the pipeline has drained"""
+        if self.recorder is not None:
+            self.recorder.flush()
+
+    async def stop_collection(self) -> bool:
+        """Stop collecting data"""
+        self._collecting = False
+        self._cancel_reconnect()
+        if not self.client or not self.is_connected:
+            return False
+
+        try:
+            characteristics = self.profile.notify_characteristics if self.profile else []
+            results = await asyncio.gather(
+                *(self.client.stop_notify(handle) for _, handle in characteristics),
+                return_exceptions=True
+            )
+            for (char_uuid, _), result in zip(characteristics, results):
+                if isinstance(result, Exception):
+                    self.logger.warning(f"Failed to disable notifications for {char_uuid}: {result}")
+
+            if self.pipeline is not None:
+                await self.pipeline.stop()
+                self.logger.info(f"Ingest pipeline stats: {self.pipeline.stats.as_dict()}")
+            self._flush()
+
+            self.logger.info("Stopped data collection")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to stop collection: {str(e)}")
+            return False
+
+    async def disconnect(self) -> bool:
+        """Disconnect from the device"""
+        self._closing = True
+        self._cancel_reconnect()
+        if self.client and self.is_connected:
+            try:
+                await self.client.disconnect()
+                self.is_connected = False
+                self.logger.info("Disconnected from device")
+                return True
+            except Exception as e:
+                self.logger.error(f"Disconnect failed: {str(e)}")
+        return False
+
+    def _on_disconnected(self, client: BleakClient):
+        """bleak disconnected callback: account the gap and start reconnecting"""
+        if client is not self.client or self._closing or not self.is_connected:
+            return
+        self.is_connected = False
+        self._awaiting_first_sample = False
+        gap = self.reconnect_stats.open_gap(time.monotonic_ns())
+        self.logger.warning(f"Lost connection to {self.device_address}")
+        self._notify_connection(False)
+
+        if self.auto_reconnect and self._collecting:
+            self._reconnect_task = asyncio.ensure_future(self._reconnect(gap))
+
+    async def _drop_client(self):
+        """Close a half-established connection without triggering a reconnect"""
+        self._closing = True
+        try:
+            await self.client.disconnect()
+        except Exception as e:
+            self.logger.debug("Disconnect after failed reconnect: %s", e)
+        finally:
+            self._closing = False
+            self.is_connected = False
+
+    def _cancel_reconnect(self):
+        if self._reconnect_task is not None and not self._reconnect_task.done():
+            self._reconnect_task.cancel()
+        self._reconnect_task = None
+
+    async def _reconnect(self, gap: DataGap):
+        """Reconnect with jittered exponential backoff and resubscribe"""
+        policy = self.reconnect_policy
+        attempt = 0
+        while policy.should_retry(attempt):
+            await asyncio.sleep(policy.delay(attempt))
+            attempt += 1
+            gap.attempts = attempt
+            if self._closing or not self._collecting:
+                return
+            if await self.connect_to_address(self.device_address) and self._collecting:
+                try:
+                    await self._subscribe()
+                    self.reconnect_stats.close_gap(gap, time.monotonic_ns())
+                    self._notify_connection(True)
+                    self.logger.info(
+                        f"Reconnected to {self.device_address} after {gap.duration_s:.2f}s "
+                        f"({attempt} attempt{'s' if attempt > 1 else ''})"
+                    )
+                    return
+                except Exception as e:
+                    self.logger.warning(f"Resubscribe failed: {str(e)}")
+                    await self._drop_client()
+            self.reconnect_stats.failed_attempts += 1
+            self.logger.debug("Reconnect attempt %d to %s failed", attempt, self.device_address)
+        self.logger.error(f"Giving up reconnecting to {self.device_address} after {attempt} attempts")
@@ -0,0 +1,210 @@
+# src/protocols/ble/cycling_power.py
+"""
+Cycling Power Measurement (0x2A63) decoding
+
+Implements the characteristic of the Bluetooth Cycling Power Service:
+instantaneous power plus the optional pedal power balance, accumulated
+torque, wheel and crank revolution data, extreme force, torque and
+angle magnitudes, dead spot angles and accumulated energy.
+"""
+import struct
+from typing import Optional, Dict, Any, Tuple
+
+CYCLING_POWER_MEASUREMENT_UUID = "00002a63-0000-1000-8000-00805f9b34fb"
+
+# Flags field (uint16)
+FLAG_PEDAL_POWER_BALANCE = 0x0001
+FLAG_PEDAL_POWER_BALANCE_LEFT = 0x0002
+FLAG_ACCUMULATED_TORQUE = 0x0004
+FLAG_ACCUMULATED_TORQUE_CRANK = 0x0008
+FLAG_WHEEL_REVOLUTIONS = 0x0010
+FLAG_CRANK_REVOLUTIONS = 0x0020
+FLAG_EXTREME_FORCES = 0x0040
+FLAG_EXTREME_TORQUES = 0x0080
+FLAG_EXTREME_ANGLES = 0x0100
+FLAG_TOP_DEAD_SPOT = 0x0200
+FLAG_BOTTOM_DEAD_SPOT = 0x0400
+FLAG_ACCUMULATED_ENERGY = 0x0800
+FLAG_OFFSET_COMPENSATION = 0x1000
+
+# Balance in 1/2 %, torque in 1/32 Nm; wheel event times are 1/2048 s, crank 1/1024 s
+BALANCE_SCALE = 1 / 2.0
+TORQUE_SCALE = 1 / 32.0
+WHEEL_EVENT_TIME_UNITS_PER_S = 2048
+
+# Optional fields in transmission order with their struct format
+_OPTIONAL_FIELDS = (
+    (FLAG_PEDAL_POWER_BALANCE, 'B'),
+    (FLAG_ACCUMULATED_TORQUE, 'H'),
+    (FLAG_WHEEL_REVOLUTIONS, 'IH'),
+    (FLAG_CRANK_REVOLUTIONS, 'HH'),
+    (FLAG_EXTREME_FORCES, 'hh'),
+    (FLAG_EXTREME_TORQUES, 'hh'),
+    (FLAG_EXTREME_ANGLES, 'HB'),
+    (FLAG_TOP_DEAD_SPOT, 'H'),
+    (FLAG_BOTTOM_DEAD_SPOT, 'H'),
+    (FLAG_ACCUMULATED_ENERGY, 'H'),
+)
+_PRESENT_MASK = 0
+for _flag, _ in _OPTIONAL_FIELDS:
+    _PRESENT_MASK |= _flag
+
+# Layouts by field-present flags, compiled on first use; sensors use one or two
+_LAYOUTS: Dict[int, struct.Struct] = {}
+
+class CyclingPowerMeasurement:
+    """One decoded Cycling Power Measurement notification"""
+
+    __slots__ = (
+        "power", "pedal_power_balance", "accumulated_torque", "wheel_revolutions", "wheel_event_time",
+        "crank_revolutions", "crank_event_time", "extreme_forces", "extreme_torques", "extreme_angles",
+        "dead_spot_angles", "accumulated_energy", "flags"
+    )
+
+    def __init__(self, power: int, flags: int = 0):
+        # Watts
+        self.power = power
+        # Raw flags field, e.g. for the balance reference and torque source bits
+        self.flags = flags
+        # Percent of the total power, from the left pedal if flagged so
+        self.pedal_power_balance: Optional[float] = None
+        # Newton metres
+        self.accumulated_torque: Optional[float] = None
+        # Cumulative counts with 1/2048 s (wheel) and 1/1024 s (crank) event times
+        self.wheel_revolutions: Optional[int] = None
+        self.wheel_event_time: Optional[int] = None
+        self.crank_revolutions: Optional[int] = None
+        self.crank_event_time: Optional[int] = None
+        # (maximum, minimum) in N, Nm and degrees
+        self.extreme_forces: Optional[Tuple[int, int]] = None
+        self.extreme_torques: Optional[Tuple[float, float]] = None
+        self.extreme_angles: Optional[Tuple[int, int]] = None
+        # (top, bottom) in degrees, either may be None
+        self.dead_spot_angles: Optional[Tuple[Optional[int], Optional[int]]] = None
+        # Kilojoules
+        self.accumulated_energy: Optional[int] = None
+
+    @classmethod
+    def from_fields(
+        cls,
+        power: int,
+        flags: int = 0,
+        pedal_power_balance: Optional[float] = None,
+        accumulated_torque: Optional[float] = None,
+        wheel_revolutions: Optional[int] = None,
+        wheel_event_time: Optional[int] = None,
+        crank_revolutions: Optional[int] = None,
+        crank_event_time: Optional[int] = None,
+        maximum_force: Optional[int] = None,
+        minimum_force: Optional[int] = None,
+        maximum_torque: Optional[float] = None,
+        minimum_torque: Optional[float] = None,
+        extreme_angles_low: Optional[int] = None,
+        extreme_angles_high: Optional[int] = None,
+        top_dead_spot_angle: Optional[int] = None,
+        bottom_dead_spot_angle: Optional[int] = None,
+        accumulated_energy: Optional[int] = None
+    ) -> "CyclingPowerMeasurement":
+        """
+        Build a measurement from flat, already scaled field values
+
+        This is the result type of the cycling power layout in device
+        profiles, see protocols.ble.profiles. Field pairs become tuples and
+        the extreme angles arrive as the raw word and byte holding them.
+        """
+        measurement = cls(power, flags)
+        measurement.pedal_power_balance = pedal_power_balance
+        measurement.accumulated_torque = accumulated_torque
+        measurement.wheel_revolutions = wheel_revolutions
+        measurement.wheel_event_time = wheel_event_time
+        measurement.crank_revolutions = crank_revolutions
+        measurement.crank_event_time = crank_event_time
+        if maximum_force is not None:
+            measurement.extreme_forces = (maximum_force, minimum_force)
+        if maximum_torque is not None:
+            measurement.extreme_torques = (maximum_torque, minimum_torque)
+        if extreme_angles_low is not None:
+            packed = extreme_angles_low | (extreme_angles_high << 16)
+            measurement.extreme_angles = (packed & 0xFFF, packed >> 12)
+        if top_dead_spot_angle is not None or bottom_dead_spot_angle is not None:
+            measurement.dead_spot_angles = (top_dead_spot_angle, bottom_dead_spot_angle)
+        measurement.accumulated_energy = accumulated_energy
+        return measurement
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CyclingPowerMeasurement):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__
+                           if getattr(self, name) is not None and name != "flags")
+        return f"CyclingPowerMeasurement({fields})"
+
+def _layout(present: int) -> struct.Struct:
+    layout = _LAYOUTS.get(present)
+    if layout is None:
+        layout = struct.Struct('<Hh' + ''.join(fmt for flag, fmt in _OPTIONAL_FIELDS if present & flag))
+        _LAYOUTS[present] = layout
+    return layout
+
+def parse_cycling_power_measurement(data: bytes) -> Optional[CyclingPowerMeasurement]:
+    """
+    Decode a Cycling Power Measurement with a single unpack_from
+
+    Returns:
+        The measurement, or None if the payload is truncated
+    """
+    if len(data) < 4:
+        return None
+    flags = data[0] | (data[1] << 8)
+    present = flags & _PRESENT_MASK
+    layout = _layout(present)
+    if len(data) < layout.size:
+        return None
+    values = layout.unpack_from(data)
+    measurement = CyclingPowerMeasurement(values[1], flags)
+    if not present:
+        return measurement
+
+    offset = 2
+    if present & FLAG_PEDAL_POWER_BALANCE:
+        measurement.pedal_power_balance = values[offset] * BALANCE_SCALE
+        offset += 1
+    if present & FLAG_ACCUMULATED_TORQUE:
+        measurement.accumulated_torque = values[offset] * TORQUE_SCALE
+        offset += 1
+    if present & FLAG_WHEEL_REVOLUTIONS:
+        measurement.wheel_revolutions = values[offset]
+        measurement.wheel_event_time = values[offset + 1]
+        offset += 2
+    if present & FLAG_CRANK_REVOLUTIONS:
+        measurement.crank_revolutions = values[offset]
+        measurement.crank_event_time = values[offset + 1]
+        offset += 2
+    if present & FLAG_EXTREME_FORCES:
+        measurement.extreme_forces = (values[offset], values[offset + 1])
+        offset += 2
+    if present & FLAG_EXTREME_TORQUES:
+        measurement.extreme_torques = (values[offset] * TORQUE_SCALE, values[offset + 1] * TORQUE_SCALE)
+        offset += 2
+    if present & FLAG_EXTREME_ANGLES:
+        # Two 12-bit angles packed into three bytes, maximum first
+        packed = values[offset] | (values[offset + 1] << 16)
+        measurement.extreme_angles = (packed & 0xFFF, packed >> 12)
+        offset += 2
+    if present & (FLAG_TOP_DEAD_SPOT | FLAG_BOTTOM_DEAD_SPOT):
+        top = bottom = None
+        if present & FLAG_TOP_DEAD_SPOT:
+            top = values[offset]
+            offset += 1
+        if present & FLAG_BOTTOM_DEAD_SPOT:
+            bottom = values[offset]
+            offset += 1
+        measurement.dead_spot_angles = (top, bottom)
+    if present & FLAG_ACCUMULATED_ENERGY:
+        measurement.accumulated_energy = values[offset]
+    return measurement
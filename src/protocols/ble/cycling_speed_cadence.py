@@ -0,0 +1,132 @@
+# src/protocols/ble/cycling_speed_cadence.py
+"""
+CSC Measurement (0x2A5B) decoding
+
+Implements the characteristic of the Bluetooth Cycling Speed and Cadence
+Service. The sensor only reports cumulative revolution counts and the
+time of the last revolution event; speed and cadence are derived from
+two consecutive measurements with revolution_rate.
+"""
+import struct
+from typing import Optional, Dict, Any, Tuple
+
+CSC_MEASUREMENT_UUID = "00002a5b-0000-1000-8000-00805f9b34fb"
+
+# Flags byte
+FLAG_WHEEL_REVOLUTIONS = 0x01
+FLAG_CRANK_REVOLUTIONS = 0x02
+
+# Event times are transmitted in units of 1/1024 s and roll over at 16 bits
+EVENT_TIME_UNITS_PER_S = 1024
+EVENT_TIME_MODULUS = 1 << 16
+WHEEL_REVOLUTIONS_MODULUS = 1 << 32
+CRANK_REVOLUTIONS_MODULUS = 1 << 16
+
+# Precompiled layouts by the two field-present flags, one unpack per packet
+_LAYOUTS = [
+    struct.Struct('<B' + ('IH' if flags & FLAG_WHEEL_REVOLUTIONS else '') + ('HH' if flags & FLAG_CRANK_REVOLUTIONS else ''))
+    for flags in range(4)
+]
+
+class CSCMeasurement:
+    """One decoded CSC Measurement notification, in the sensor's raw units"""
+
+    __slots__ = ("wheel_revolutions", "wheel_event_time", "crank_revolutions", "crank_event_time")
+
+    def __init__(
+        self,
+        wheel_revolutions: Optional[int] = None,
+        wheel_event_time: Optional[int] = None,
+        crank_revolutions: Optional[int] = None,
+        crank_event_time: Optional[int] = None
+    ):
+        # Cumulative counts and 1/1024 s event times, None when not included
+        self.wheel_revolutions = wheel_revolutions
+        self.wheel_event_time = wheel_event_time
+        self.crank_revolutions = crank_revolutions
+        self.crank_event_time = crank_event_time
+
+    def rates_since(self, previous: "CSCMeasurement") -> Tuple[Optional[float], Optional[float]]:
+        """
+        Wheel and crank revolutions per minute since an earlier measurement
+
+        Returns:
+            (wheel rpm, crank rpm), each None when either measurement
+            lacks the data or no new revolution event happened
+        """
+        wheel_rpm = crank_rpm = None
+        if self.wheel_event_time is not None and previous.wheel_event_time is not None:
+            wheel_rpm = revolution_rate(
+                previous.wheel_revolutions, previous.wheel_event_time,
+                self.wheel_revolutions, self.wheel_event_time, WHEEL_REVOLUTIONS_MODULUS
+            )
+        if self.crank_event_time is not None and previous.crank_event_time is not None:
+            crank_rpm = revolution_rate(
+                previous.crank_revolutions, previous.crank_event_time,
+                self.crank_revolutions, self.crank_event_time, CRANK_REVOLUTIONS_MODULUS
+            )
+        return wheel_rpm, crank_rpm
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "wheel_revolutions": self.wheel_revolutions,
+            "wheel_event_time": self.wheel_event_time,
+            "crank_revolutions": self.crank_revolutions,
+            "crank_event_time": self.crank_event_time,
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CSCMeasurement):
+            return NotImplemented
+        return (self.wheel_revolutions, self.wheel_event_time, self.crank_revolutions, self.crank_event_time) == \
+            (other.wheel_revolutions, other.wheel_event_time, other.crank_revolutions, other.crank_event_time)
+
+    def __repr__(self) -> str:
+        return (
+            f"CSCMeasurement(wheel_revolutions={self.wheel_revolutions}, wheel_event_time={self.wheel_event_time}, "
+            f"crank_revolutions={self.crank_revolutions}, crank_event_time={self.crank_event_time})"
+        )
+
+def revolution_rate(
+    previous_revolutions: int,
+    previous_event_time: int,
+    revolutions: int,
+    event_time: int,
+    revolutions_modulus: int,
+    time_units_per_s: int = EVENT_TIME_UNITS_PER_S
+) -> Optional[float]:
+    """
+    Revolutions per minute between two cumulative readings, across rollovers
+
+    Returns:
+        The rate, or None if the event time did not advance
+    """
+    elapsed = (event_time - previous_event_time) % EVENT_TIME_MODULUS
+    if not elapsed:
+        return None
+    return (revolutions - previous_revolutions) % revolutions_modulus * time_units_per_s * 60.0 / elapsed
+
+def parse_csc_measurement(data: bytes) -> Optional[CSCMeasurement]:
+    """
+    Decode a CSC Measurement with a single unpack_from
+
+    Returns:
+        The measurement, or None if the payload is truncated
+    """
+    if not data:
+        return None
+    flags = data[0]
+    layout = _LAYOUTS[flags & 0x03]
+    if len(data) < layout.size:
+        return None
+    values = layout.unpack_from(data)
+    if flags & FLAG_WHEEL_REVOLUTIONS:
+        measurement = CSCMeasurement(values[1], values[2])
+        offset = 3
+    else:
+        measurement = CSCMeasurement()
+        offset = 1
+    if flags & FLAG_CRANK_REVOLUTIONS:
+        measurement.crank_revolutions = values[offset]
+        measurement.crank_event_time = values[offset + 1]
+    return measurement
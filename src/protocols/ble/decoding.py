@@ -0,0 +1,118 @@
+# src/protocols/ble/decoding.py
+"""
+Table-driven characteristic decoding shared by the BLE device parsers
+
+A device parser is a CharacteristicParser subclass with its own DECODERS
+table mapping normalized characteristic UUIDs to (field name, decoder)
+pairs, optionally DERIVED_FIELDS for plain values the parser dicts carry
+next to a structured one, and BATCH_DECODERS for columnar decoding. Dispatch,
+Sample construction and the parser-style dicts are implemented once here.
+"""
+from typing import Optional, Dict, Any, Callable, Tuple
+from ...core.samples import Sample, CHARACTERISTIC_IDS
+
+# (field name, decoder) pair stored in the dispatch table
+DecoderEntry = Tuple[str, Callable[[bytes], Any]]
+
+class CharacteristicParser:
+    """Dispatch notifications to per-characteristic decoders"""
+
+    # Normalized characteristic UUID -> (field name, decoder), set by subclasses
+    DECODERS: Dict[str, DecoderEntry] = {}
+    # Decoded field -> (extra field, getter) added to the parser dicts
+    DERIVED_FIELDS: Dict[str, DecoderEntry] = {}
+    # Normalized characteristic UUID -> batch decoder
+    BATCH_DECODERS: Dict[str, Callable[..., Dict[str, Any]]] = {}
+
+    @classmethod
+    def get_decoder(cls, characteristic_uuid: str) -> Optional[DecoderEntry]:
+        """
+        Look up the decoder for a characteristic
+
+        Args:
+            characteristic_uuid: Characteristic UUID in any case
+
+        Returns:
+            (field name, decoder) pair or None for unknown characteristics
+        """
+        entry = cls.DECODERS.get(characteristic_uuid)
+        if entry is None:
+            entry = cls.DECODERS.get(str(characteristic_uuid).lower())
+        return entry
+
+    @classmethod
+    def parse_characteristic_data(
+        cls,
+        characteristic_uuid: str,
+        data: bytes,
+        include_raw: bool = False,
+        decoder: Optional[DecoderEntry] = None
+    ) -> Dict[str, Any]:
+        """
+        Parse data based on characteristic UUID
+
+        Args:
+            characteristic_uuid: UUID of the characteristic that sent the data
+            data: Raw notification payload
+            include_raw: Add the payload as a hex string under "raw"
+            decoder: Previously resolved decoder entry, skips the UUID lookup
+
+        Returns:
+            Dictionary with the characteristic UUID, decoded field and
+            any field derived from it
+        """
+        parsed_data = {"characteristic": characteristic_uuid}
+        if include_raw:
+            parsed_data["raw"] = data.hex()
+
+        entry = decoder or cls.get_decoder(characteristic_uuid)
+        if entry is not None:
+            field, decode = entry
+            value = parsed_data[field] = decode(data)
+            derived = cls.DERIVED_FIELDS.get(field)
+            if derived is not None:
+                derived_field, get = derived
+                parsed_data[derived_field] = None if value is None else get(value)
+
+        return parsed_data
+
+    @classmethod
+    def parse_sample(
+        cls,
+        characteristic_uuid: str,
+        data: bytes,
+        timestamp_ns: int,
+        decoder: Optional[DecoderEntry] = None
+    ) -> Sample:
+        """
+        Parse a notification into a compact Sample record
+
+        Args:
+            characteristic_uuid: UUID of the characteristic that sent the data
+            data: Raw notification payload, stored as bytes
+            timestamp_ns: Monotonic arrival time in nanoseconds
+            decoder: Previously resolved decoder entry, skips the UUID lookup
+        """
+        entry = decoder or cls.get_decoder(characteristic_uuid)
+        if entry is None:
+            return Sample(timestamp_ns, CHARACTERISTIC_IDS.get_id(characteristic_uuid), bytes(data))
+        field, decode = entry
+        return Sample(
+            timestamp_ns,
+            CHARACTERISTIC_IDS.get_id(characteristic_uuid, field),
+            bytes(data),
+            decode(data)
+        )
+
+    @classmethod
+    def parse_batch(cls, characteristic_uuid: str, payloads: Any, use_numpy: bool = False) -> Dict[str, Any]:
+        """
+        Decode a batch of payloads from one characteristic into columns
+
+        Raises:
+            ValueError: If the characteristic has no batch decoder
+        """
+        decode = cls.BATCH_DECODERS.get(str(characteristic_uuid).lower())
+        if decode is None:
+            raise ValueError(f"No batch decoder for characteristic {characteristic_uuid}")
+        return decode(payloads, use_numpy=use_numpy)
@@ -0,0 +1,648 @@
+# src/protocols/ble/fake.py
+"""
+In-process stand-ins for bleak's BleakClient and BleakScanner
+
+The fakes implement the subset of the bleak API the collectors use, so
+collectors can be exercised on a machine without a Bluetooth adapter by
+passing a client or scanner factory. A FakeAdapter holds the simulated
+devices in range and hands out both factories, so scanning, connecting
+and going out of range behave consistently across collectors.
+
+Nothing here knows about a particular device: the simulated Whoop strap
+and Garmin sensors are FakeDevice subclasses next to their collectors,
+in devices.whoop.fake and devices.garmin.fake.
+"""
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Callable, Union, Iterable, Tuple
+import asyncio
+import heapq
+import inspect
+import logging
+import random
+import weakref
+
+# Produces the payload for the n-th notification of a characteristic
+PayloadFactory = Callable[[int], bytes]
+
+# Called with (client, written bytes, with response) for writes to a characteristic
+WriteHandler = Callable[["FakeBleakClient", bytes, bool], None]
+
+# Builds the n-th generated device of FakeAdapter.populate from
+# (n, address, adapter random source, FakeDevice keyword arguments)
+DeviceFactory = Callable[..., "FakeDevice"]
+
+GENERIC_ACCESS_SERVICE_UUID = "00001800-0000-1000-8000-00805f9b34fb"
+GENERIC_ATTRIBUTE_SERVICE_UUID = "00001801-0000-1000-8000-00805f9b34fb"
+DEVICE_NAME_UUID = "00002a00-0000-1000-8000-00805f9b34fb"
+SERVICE_CHANGED_UUID = "00002a05-0000-1000-8000-00805f9b34fb"
+
+@dataclass
+class FakeGATTCharacteristic:
+    """Characteristic with the attributes bleak exposes"""
+    uuid: str
+    handle: int
+    properties: List[str]
+    description: str = ""
+    descriptors: List[Any] = field(default_factory=list)
+    service_uuid: str = ""
+
+    def __str__(self) -> str:
+        return f"{self.uuid} (Handle: {self.handle}): {self.description}"
+
+@dataclass
+class FakeGATTService:
+    uuid: str
+    handle: int
+    characteristics: List[FakeGATTCharacteristic] = field(default_factory=list)
+
+class FakeGATTServiceCollection:
+    """Mirrors bleak's BleakGATTServiceCollection lookups"""
+
+    def __init__(self, services: List[FakeGATTService]):
+        self.services: Dict[int, FakeGATTService] = {s.handle: s for s in services}
+        self.characteristics: Dict[int, FakeGATTCharacteristic] = {
+            c.handle: c for s in services for c in s.characteristics
+        }
+
+    def __iter__(self):
+        return iter(self.services.values())
+
+    def get_characteristic(self, specifier: Union[int, str, FakeGATTCharacteristic]) -> Optional[FakeGATTCharacteristic]:
+        if isinstance(specifier, FakeGATTCharacteristic):
+            return specifier
+        if isinstance(specifier, int):
+            return self.characteristics.get(specifier)
+        wanted = str(specifier).lower()
+        for char in self.characteristics.values():
+            if char.uuid == wanted:
+                return char
+        return None
+
+class FakeDevice:
+    """
+    A simulated peripheral: GATT layout, readable values and notification rates
+
+    The default layout only has the mandatory GAP and GATT services;
+    device fakes pass their own layout built with build_services.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        name: Optional[str] = None,
+        notify_rates: Optional[Dict[str, float]] = None,
+        payloads: Optional[Dict[str, PayloadFactory]] = None,
+        read_values: Optional[Dict[str, bytes]] = None,
+        services: Optional[List[FakeGATTService]] = None,
+        drop_schedule: Optional[List[float]] = None,
+        connect_failures: int = 0,
+        notification_loss: float = 0.0,
+        connection_interval: float = 0.0,
+        advertise_interval: float = 0.1,
+        rssi: int = -60,
+        manufacturer_data: Optional[Dict[int, bytes]] = None,
+        advertised_services: Optional[List[str]] = None,
+        tx_power: Optional[int] = None,
+        mtu: int = 23,
+        write_handlers: Optional[Dict[str, WriteHandler]] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            address: Device address
+            name: Advertised name
+            notify_rates: Notifications per second keyed by characteristic UUID,
+                characteristics not listed do not notify
+            payloads: Payload factories keyed by characteristic UUID
+            read_values: Values returned by read_gatt_char
+            services: GATT layout, only the GAP and GATT services if omitted
+            drop_schedule: Seconds each successive connection stays up before
+                the link drops; connections beyond the list stay up
+            connect_failures: Number of upcoming connection attempts that fail
+            notification_loss: Probability that a notification is lost on air;
+                its payload index is still consumed, leaving a gap
+            connection_interval: Seconds between connection events; when set,
+                notifications are held back and delivered in bursts at
+                connection events like a real link
+            advertise_interval: Seconds between advertisements
+            rssi: Mean received signal strength of advertisements
+            manufacturer_data: Advertised manufacturer data by company id
+            advertised_services: Advertised service UUIDs
+            tx_power: Advertised transmit power
+            mtu: Largest ATT MTU the device accepts, agreed on connect
+            write_handlers: Handlers of writes keyed by characteristic UUID,
+                e.g. the command channel of a device fake
+            seed: Seed of the device's random source, for repeatable runs
+        """
+        self.address = address
+        self.name = name
+        self.notify_rates = dict(notify_rates or {})
+        self.payloads = dict(payloads or {})
+        self.read_values = dict(read_values or {})
+        self.services = services or self.build_services({}, {}, [])
+        self.drop_schedule = list(drop_schedule or [])
+        self.connect_failures = connect_failures
+        self.connections = 0
+        self.notification_loss = notification_loss
+        self.connection_interval = connection_interval
+        self.advertise_interval = advertise_interval
+        self.rssi = rssi
+        self.manufacturer_data = manufacturer_data or {}
+        self.advertised_services = list(advertised_services or [])
+        self.tx_power = tx_power
+        self.mtu = mtu
+        self.write_handlers: Dict[str, WriteHandler] = {
+            uuid.lower(): handler for uuid, handler in (write_handlers or {}).items()
+        }
+        self.rng = random.Random(seed)
+        self.ble_device = BLEDevice(address, name, None)
+
+    def advertisement(self) -> AdvertisementData:
+        """Next advertisement, with a little RSSI noise"""
+        return AdvertisementData(
+            local_name=self.name,
+            manufacturer_data=self.manufacturer_data,
+            service_data={},
+            service_uuids=self.advertised_services,
+            tx_power=self.tx_power,
+            rssi=int(self.rssi + self.rng.gauss(0, 2)),
+            platform_data=(),
+        )
+
+    @staticmethod
+    def build_services(
+        service_uuids: Dict[str, str],
+        characteristics: Dict[str, Dict[str, Any]],
+        layout: List[Tuple[str, List[str]]]
+    ) -> List[FakeGATTService]:
+        """
+        GATT layout from protocol constants plus the mandatory GAP/GATT services
+
+        Args:
+            service_uuids: Service UUIDs by name, e.g. WhoopProtocol.SERVICES
+            characteristics: Characteristic definitions by name, e.g. WhoopProtocol.CHARACTERISTICS
+            layout: (service name, characteristic names) in handle order
+        """
+        services = [
+            FakeGATTService(GENERIC_ACCESS_SERVICE_UUID, 1, [
+                FakeGATTCharacteristic(DEVICE_NAME_UUID, 2, ["read"], "DEVICE_NAME", service_uuid=GENERIC_ACCESS_SERVICE_UUID)
+            ]),
+            FakeGATTService(GENERIC_ATTRIBUTE_SERVICE_UUID, 5, [
+                FakeGATTCharacteristic(SERVICE_CHANGED_UUID, 6, ["indicate"], "SERVICE_CHANGED", service_uuid=GENERIC_ATTRIBUTE_SERVICE_UUID)
+            ]),
+        ]
+        handle = 10
+        for service_name, char_names in layout:
+            service_uuid = service_uuids[service_name]
+            service = FakeGATTService(service_uuid, handle)
+            handle += 1
+            for char_name in char_names:
+                definition = characteristics[char_name]
+                service.characteristics.append(FakeGATTCharacteristic(
+                    uuid=definition["uuid"],
+                    handle=handle,
+                    properties=list(definition["properties"]),
+                    description=char_name,
+                    service_uuid=service_uuid
+                ))
+                handle += 3
+            services.append(service)
+        return services
+
+class FakeBleakClient:
+    """
+    Minimal BleakClient replacement driven by a FakeDevice
+
+    Notifications are generated by one task per subscribed characteristic
+    at the rate configured on the device.
+    """
+
+    def __init__(
+        self,
+        address_or_device: Union[str, FakeDevice],
+        disconnected_callback: Optional[Callable[["FakeBleakClient"], None]] = None,
+        services: Optional[Iterable[str]] = None,
+        connect_latency: float = 0.0,
+        discovery_latency: float = 0.0,
+        gatt_latency: float = 0.0,
+        adapter: Optional["FakeAdapter"] = None,
+        **kwargs
+    ):
+        """
+        Args:
+            address_or_device: A FakeDevice, or an address for a device with
+                the default (empty) layout
+            disconnected_callback: Called with the client when the link drops
+            services: Limit discovery to these service UUIDs, as bleak does
+            connect_latency: Seconds taken by connect()
+            discovery_latency: Seconds of service discovery per discovered service
+            gatt_latency: Seconds taken by each read, write and (un)subscribe
+            adapter: Adapter the device must be in range of to connect
+        """
+        if isinstance(address_or_device, FakeDevice):
+            self.device = address_or_device
+        else:
+            self.device = FakeDevice(str(address_or_device))
+        self.address = self.device.address
+        self.disconnected_callback = disconnected_callback
+        self.connect_latency = connect_latency
+        self.discovery_latency = discovery_latency
+        self.gatt_latency = gatt_latency
+        self.adapter = adapter
+        self.mtu_size = 23
+        self.notifications_sent = 0
+        self.notifications_lost = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._connected = False
+        wanted = {str(u).lower() for u in services} if services is not None else None
+        self._services = FakeGATTServiceCollection([
+            service for service in self.device.services
+            if wanted is None or service.uuid in wanted
+        ])
+        self._notify_tasks: Dict[int, asyncio.Task] = {}
+        self._callbacks: Dict[int, Callable] = {}
+        self._drop_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    @property
+    def services(self) -> FakeGATTServiceCollection:
+        return self._services
+
+    async def get_services(self) -> FakeGATTServiceCollection:
+        """Pre-0.21 bleak API, kept for collectors that still call it"""
+        return self._services
+
+    async def connect(self, **kwargs) -> bool:
+        delay = self.connect_latency + self.discovery_latency * len(self._services.services)
+        if delay:
+            await asyncio.sleep(delay)
+        device = self.device
+        if self.adapter is not None and self.adapter.devices.get(self.address) is not device:
+            raise ConnectionError(f"Fake device {self.address} is not in range")
+        if device.connect_failures > 0:
+            device.connect_failures -= 1
+            raise ConnectionError(f"Fake connection to {self.address} failed")
+        self._connected = True
+        # Negotiated on connect, as CoreBluetooth and WinRT do
+        self.mtu_size = device.mtu
+        device.connections += 1
+        if self.adapter is not None:
+            self.adapter._clients.add(self)
+        if device.drop_schedule:
+            uptime = device.drop_schedule.pop(0)
+            self._drop_handle = asyncio.get_running_loop().call_later(uptime, self._drop)
+        return True
+
+    def simulate_disconnect(self):
+        """Drop the link as if the peripheral went out of range"""
+        self._drop()
+
+    async def disconnect(self) -> bool:
+        was_connected = self._connected
+        self._drop()
+        return was_connected
+
+    def _drop(self):
+        """Tear down the link and notify the disconnected callback"""
+        if self._drop_handle is not None:
+            self._drop_handle.cancel()
+            self._drop_handle = None
+        for task in self._notify_tasks.values():
+            task.cancel()
+        self._notify_tasks.clear()
+        self._callbacks.clear()
+        if self._connected:
+            self._connected = False
+            if self.disconnected_callback is not None:
+                self.disconnected_callback(self)
+
+    async def _gatt_operation(self):
+        if self.gatt_latency:
+            await asyncio.sleep(self.gatt_latency)
+
+    def _require(self, specifier) -> FakeGATTCharacteristic:
+        if not self._connected:
+            raise RuntimeError("Not connected")
+        char = self._services.get_characteristic(specifier)
+        if char is None:
+            raise ValueError(f"Characteristic {specifier} not found")
+        return char
+
+    async def read_gatt_char(self, specifier, **kwargs) -> bytearray:
+        char = self._require(specifier)
+        await self._gatt_operation()
+        if "read" not in char.properties:
+            raise ValueError(f"Characteristic {char.uuid} is not readable")
+        return bytearray(self.device.read_values.get(char.uuid, b""))
+
+    async def write_gatt_char(self, specifier, data: bytes, response: bool = False):
+        char = self._require(specifier)
+        if "write" not in char.properties and "write-no-response" not in char.properties:
+            raise ValueError(f"Characteristic {char.uuid} is not writable")
+        # Writes without response do not wait for the peer
+        if response:
+            await self._gatt_operation()
+        handler = self.device.write_handlers.get(char.uuid)
+        if handler is not None:
+            handler(self, bytes(data), response)
+
+    async def send_notification(self, specifier, data: bytes) -> bool:
+        """
+        Deliver a notification pushed by the device, e.g. in reply to a write
+
+        Returns:
+            False if notifications of the characteristic are not enabled
+        """
+        char = self._services.get_characteristic(specifier)
+        callback = self._callbacks.get(char.handle) if char is not None and self._connected else None
+        if callback is None:
+            return False
+        result = callback(char, bytearray(data))
+        if inspect.isawaitable(result):
+            await result
+        self.notifications_sent += 1
+        return True
+
+    async def start_notify(self, specifier, callback: Callable, **kwargs):
+        char = self._require(specifier)
+        if "notify" not in char.properties:
+            raise ValueError(f"Characteristic {char.uuid} does not notify")
+        await self._gatt_operation()
+        self._callbacks[char.handle] = callback
+        rate = self.device.notify_rates.get(char.uuid)
+        if rate and char.handle not in self._notify_tasks:
+            self._notify_tasks[char.handle] = asyncio.create_task(self._notify(char, callback, rate))
+
+    async def stop_notify(self, specifier):
+        char = self._require(specifier)
+        await self._gatt_operation()
+        self._callbacks.pop(char.handle, None)
+        task = self._notify_tasks.pop(char.handle, None)
+        if task is not None:
+            task.cancel()
+
+    async def _notify(self, char: FakeGATTCharacteristic, callback: Callable, rate: float):
+        """Emit notifications at a fixed rate with a random phase"""
+        device = self.device
+        payload = device.payloads.get(char.uuid, lambda n: bytes(1))
+        is_async = inspect.iscoroutinefunction(callback)
+        loop = asyncio.get_running_loop()
+        period = 1.0 / rate
+        interval = device.connection_interval
+        rng = device.rng
+        due = loop.time() + rng.random() * period
+        count = 0
+        while True:
+            # Without a connection interval each notification goes out when due
+            send_at = due if not interval else (due // interval + 1) * interval
+            delay = send_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if device.notification_loss and rng.random() < device.notification_loss:
+                self.notifications_lost += 1
+            else:
+                result = callback(char, bytearray(payload(count)))
+                if is_async:
+                    await result
+                self.notifications_sent += 1
+            count += 1
+            due += period
+
+class FakeBleakScanner:
+    """
+    BleakScanner replacement that hears every advertiser of a FakeAdapter
+
+    One task serves all advertisers from a heap ordered by the time of
+    their next advertisement, so thousands of advertisers cost one task
+    and one callback per advertisement. The service UUID filter is
+    applied before the detection callback, as the OS stack would.
+    """
+
+    def __init__(
+        self,
+        adapter: Optional["FakeAdapter"] = None,
+        detection_callback: Optional[Callable[[BLEDevice, AdvertisementData], None]] = None,
+        service_uuids: Optional[List[str]] = None,
+        **kwargs
+    ):
+        self.adapter = adapter if adapter is not None else FakeAdapter()
+        self.detection_callback = detection_callback
+        self.service_uuids = {str(u).lower() for u in service_uuids} if service_uuids else None
+        self.advertisements_seen = 0
+        self._seen: Dict[str, Tuple[BLEDevice, AdvertisementData]] = {}
+        self._schedule: List[Tuple[float, int, FakeDevice]] = []
+        self._sequence = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def discovered_devices_and_advertisement_data(self) -> Dict[str, Tuple[BLEDevice, AdvertisementData]]:
+        return dict(self._seen)
+
+    @property
+    def discovered_devices(self) -> List[BLEDevice]:
+        return [device for device, _ in self._seen.values()]
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._seen.clear()
+        self._schedule = []
+        self._wakeup = asyncio.Event()
+        now = asyncio.get_running_loop().time()
+        for device in list(self.adapter.devices.values()):
+            self.schedule(device, now)
+        self.adapter._scanners.add(self)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.adapter._scanners.discard(self)
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def schedule(self, device: FakeDevice, now: float):
+        """Start hearing a device, its first advertisement at a random phase"""
+        self._sequence += 1
+        due = now + self.adapter.rng.random() * device.advertise_interval
+        heapq.heappush(self._schedule, (due, self._sequence, device))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        schedule = self._schedule
+        devices = self.adapter.devices
+        while True:
+            if not schedule:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            delay = schedule[0][0] - loop.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            now = loop.time()
+            while schedule and schedule[0][0] <= now:
+                due, sequence, device = heapq.heappop(schedule)
+                # Devices that went out of range stop advertising
+                if devices.get(device.address) is not device:
+                    continue
+                self._emit(device)
+                heapq.heappush(schedule, (due + device.advertise_interval, sequence, device))
+
+    def _emit(self, device: FakeDevice):
+        advertisement = device.advertisement()
+        if self.service_uuids is not None and not self.service_uuids.intersection(advertisement.service_uuids):
+            return
+        self.advertisements_seen += 1
+        self._seen[device.address] = (device.ble_device, advertisement)
+        if self.detection_callback is not None:
+            self.detection_callback(device.ble_device, advertisement)
+
+    async def discover(
+        self,
+        timeout: float = 5.0,
+        return_adv: bool = False,
+        **kwargs
+    ) -> Union[List[BLEDevice], Dict[str, Tuple[BLEDevice, AdvertisementData]]]:
+        """Scan for `timeout` seconds, like BleakScanner.discover"""
+        scanner = FakeBleakScanner(self.adapter, **kwargs)
+        await scanner.start()
+        try:
+            await asyncio.sleep(timeout)
+        finally:
+            await scanner.stop()
+        if return_adv:
+            return scanner.discovered_devices_and_advertisement_data
+        return scanner.discovered_devices
+
+class FakeAdapter:
+    """
+    Simulated radio: the fake devices in range, shared by scanners and clients
+
+    Pass `scanner_factory` to BLEScanner and `client_factory` to a
+    collector. Clients only connect to devices in range, and removing a
+    device drops its connections and silences its advertisements.
+    """
+
+    def __init__(
+        self,
+        devices: Optional[Iterable[FakeDevice]] = None,
+        seed: int = 0,
+        connect_latency: float = 0.0,
+        discovery_latency: float = 0.0,
+        gatt_latency: float = 0.0
+    ):
+        """
+        Args:
+            devices: Devices initially in range
+            seed: Seed for advertisement phases and generated devices
+            connect_latency: Default connect() time of the clients handed out
+            discovery_latency: Default per-service discovery time of the clients
+            gatt_latency: Default time of each GATT operation of the clients
+        """
+        self.devices: Dict[str, FakeDevice] = OrderedDict()
+        self.rng = random.Random(seed)
+        self.connect_latency = connect_latency
+        self.discovery_latency = discovery_latency
+        self.gatt_latency = gatt_latency
+        self._clients: "weakref.WeakSet[FakeBleakClient]" = weakref.WeakSet()
+        self._scanners: "weakref.WeakSet[FakeBleakScanner]" = weakref.WeakSet()
+        for device in devices or ():
+            self.add(device)
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def add(self, device: FakeDevice) -> FakeDevice:
+        """Bring a device into range"""
+        self.devices[device.address] = device
+        for scanner in list(self._scanners):
+            scanner.schedule(device, asyncio.get_running_loop().time())
+        return device
+
+    def remove(self, address: str) -> Optional[FakeDevice]:
+        """Take a device out of range, dropping its connections"""
+        device = self.devices.pop(address, None)
+        for client in list(self._clients):
+            if client.address == address:
+                client.simulate_disconnect()
+        return device
+
+    def populate(
+        self,
+        count: int,
+        device_factory: Optional[DeviceFactory] = None,
+        factory_every: int = 10,
+        advertise_interval: Tuple[float, float] = (0.1, 1.0),
+        **device_kwargs
+    ) -> List[FakeDevice]:
+        """
+        Add `count` generated advertisers
+
+        Every `factory_every`-th device is built by `device_factory`, e.g.
+        FakeWhoop.generate; the others carry random names, manufacturer
+        data and services. Intervals and RSSI are drawn from the adapter's
+        seeded random source.
+
+        Args:
+            count: Devices to add
+            device_factory: Called with (n, address, random source, keyword
+                arguments) for the devices of interest
+            factory_every: Build every n-th device with device_factory,
+                0 for bystanders only
+            advertise_interval: Range of the drawn advertising intervals
+            **device_kwargs: Passed to every device, over the drawn values
+        """
+        rng = self.rng
+        added = []
+        base = len(self.devices)
+        for n in range(base, base + count):
+            address = f"FA:KE:{n >> 24 & 0xFF:02X}:{n >> 16 & 0xFF:02X}:{n >> 8 & 0xFF:02X}:{n & 0xFF:02X}"
+            kwargs = dict(
+                advertise_interval=rng.uniform(*advertise_interval),
+                rssi=rng.randint(-95, -40),
+                seed=rng.getrandbits(32),
+            )
+            if device_factory is not None and factory_every and n % factory_every == 0:
+                kwargs.update(device_kwargs)
+                added.append(self.add(device_factory(n, address, rng, **kwargs)))
+                continue
+            kwargs.update(
+                name=rng.choice((None, f"Device {n}", f"Tag-{n:04X}")),
+                manufacturer_data={rng.choice((0x004C, 0x0006, 0x0075, 0x0087)): bytes(rng.getrandbits(8) for _ in range(8))},
+                advertised_services=[f"0000{rng.randrange(0x1800, 0x1830):04x}-0000-1000-8000-00805f9b34fb"],
+            )
+            kwargs.update(device_kwargs)
+            added.append(self.add(FakeDevice(address, **kwargs)))
+        return added
+
+    def client_factory(self, address_or_device: Union[str, FakeDevice], **kwargs) -> FakeBleakClient:
+        """BleakClient factory: clients for devices of this adapter"""
+        if isinstance(address_or_device, FakeDevice):
+            device = address_or_device
+        else:
+            device = self.devices.get(str(address_or_device)) or FakeDevice(str(address_or_device))
+        kwargs.setdefault("connect_latency", self.connect_latency)
+        kwargs.setdefault("discovery_latency", self.discovery_latency)
+        kwargs.setdefault("gatt_latency", self.gatt_latency)
+        return FakeBleakClient(device, adapter=self, **kwargs)
+
+    def scanner_factory(self, **kwargs) -> FakeBleakScanner:
+        """BleakScanner factory: scanners hearing the devices of this adapter"""
+        return FakeBleakScanner(self, **kwargs)
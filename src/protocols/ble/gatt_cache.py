@@ -0,0 +1,124 @@
+# src/protocols/ble/gatt_cache.py
+from dataclasses import dataclass, field, asdict
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+import json
+import logging
+import os
+import time
+
+# Standard Device Information characteristics used to validate a profile
+MANUFACTURER_NAME_UUID = "00002a29-0000-1000-8000-00805f9b34fb"
+FIRMWARE_REVISION_UUID = "00002a26-0000-1000-8000-00805f9b34fb"
+
+@dataclass
+class GattProfile:
+    """GATT layout of one device that is needed to resume collection"""
+    address: str
+    manufacturer: Optional[str] = None
+    firmware: Optional[str] = None
+    service_uuids: List[str] = field(default_factory=list)
+    # (characteristic UUID, handle) for every notifiable characteristic
+    notify_characteristics: List[Tuple[str, int]] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+
+    def matches(self, manufacturer: Optional[str], firmware: Optional[str]) -> bool:
+        """True if the device still reports the identity the profile was built for"""
+        return self.manufacturer == manufacturer and self.firmware == firmware
+
+    def matches_services(self, services: Iterable[Any]) -> bool:
+        """
+        True if discovered services still hold every cached service and handle
+
+        Args:
+            services: Discovered GATT services, as in BleakGATTServiceCollection.services.values()
+        """
+        service_uuids = set()
+        handles = {}
+        for service in services:
+            service_uuids.add(str(service.uuid).lower())
+            for char in service.characteristics:
+                handles[char.handle] = str(char.uuid).lower()
+        return (
+            all(uuid.lower() in service_uuids for uuid in self.service_uuids)
+            and all(handles.get(handle) == uuid.lower() for uuid, handle in self.notify_characteristics)
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GattProfile":
+        data = dict(data)
+        data["notify_characteristics"] = [tuple(c) for c in data.get("notify_characteristics", [])]
+        return cls(**data)
+
+class GattProfileCache:
+    """
+    Per-device cache of discovered GATT profiles
+
+    Profiles are keyed by address and validated against the manufacturer
+    and firmware strings read after connecting; a mismatch drops the entry.
+    Collectors also drop a profile whose services or handles are no longer
+    discovered, see GattProfile.matches_services.
+    With a path the cache is persisted as JSON and survives restarts.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._profiles: Dict[str, GattProfile] = {}
+        if path:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def __contains__(self, address: str) -> bool:
+        return address.upper() in self._profiles
+
+    def load(self):
+        """Read the cache file, ignoring it if it is missing or corrupt"""
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+            self._profiles = {
+                address: GattProfile.from_dict(entry) for address, entry in entries.items()
+            }
+        except FileNotFoundError:
+            self._profiles = {}
+        except (ValueError, TypeError) as e:
+            self.logger.warning(f"Ignoring unreadable GATT cache {self.path}: {e}")
+            self._profiles = {}
+
+    def save(self):
+        """Atomically write the cache file"""
+        if not self.path:
+            return
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({address: asdict(p) for address, p in self._profiles.items()}, f, indent=1)
+        os.replace(temp_path, self.path)
+
+    def lookup(self, address: str) -> Optional[GattProfile]:
+        """Profile for an address without validating it"""
+        return self._profiles.get(address.upper())
+
+    def get(self, address: str, manufacturer: Optional[str], firmware: Optional[str]) -> Optional[GattProfile]:
+        """
+        Profile for an address if it matches the device identity
+
+        A stale profile is removed from the cache.
+        """
+        profile = self.lookup(address)
+        if profile is None:
+            return None
+        if not profile.matches(manufacturer, firmware):
+            self.logger.info(f"GATT profile for {address} is stale, invalidating")
+            self.invalidate(address)
+            return None
+        return profile
+
+    def put(self, profile: GattProfile):
+        self._profiles[profile.address.upper()] = profile
+        self.save()
+
+    def invalidate(self, address: str):
+        if self._profiles.pop(address.upper(), None) is not None:
+            self.save()
@@ -0,0 +1,201 @@
+# src/protocols/ble/heart_rate.py
+"""
+Heart Rate Measurement (0x2A37) decoding
+
+Implements the full characteristic layout of the Bluetooth Heart Rate
+Service: an 8 or 16-bit heart rate, sensor contact status, the optional
+energy expended counter and any number of RR intervals.
+"""
+import struct
+import sys
+from operator import attrgetter
+from array import array
+from typing import Optional, Dict, Any, Iterable
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, batch decoding falls back to array
+    np = None
+
+HEART_RATE_MEASUREMENT_UUID = "00002a37-0000-1000-8000-00805f9b34fb"
+
+# Flags byte
+FLAG_HR_UINT16 = 0x01
+FLAG_CONTACT_DETECTED = 0x02
+FLAG_CONTACT_SUPPORTED = 0x04
+FLAG_ENERGY_EXPENDED = 0x08
+FLAG_RR_INTERVALS = 0x10
+
+# RR intervals are transmitted in units of 1/1024 s
+RR_SCALE_MS = 1000.0 / 1024.0
+
+_U16 = struct.Struct('<H')
+_BIG_ENDIAN = sys.byteorder == "big"
+# Precompiled RR layouts by interval count; a 23-byte ATT MTU holds at most 10
+_RR_STRUCTS = [struct.Struct(f'<{n}H') for n in range(11)]
+
+class HeartRateMeasurement:
+    """One decoded Heart Rate Measurement notification"""
+
+    __slots__ = ("heart_rate", "sensor_contact", "energy_expended", "rr_intervals")
+
+    def __init__(
+        self,
+        heart_rate: int,
+        sensor_contact: Optional[bool] = None,
+        energy_expended: Optional[int] = None,
+        rr_intervals: tuple = ()
+    ):
+        self.heart_rate = heart_rate
+        # None when the sensor does not support contact detection
+        self.sensor_contact = sensor_contact
+        # Cumulative kilojoules, None when not included in this notification
+        self.energy_expended = energy_expended
+        # RR intervals in milliseconds, oldest first
+        self.rr_intervals = rr_intervals
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "heart_rate": self.heart_rate,
+            "sensor_contact": self.sensor_contact,
+            "energy_expended": self.energy_expended,
+            "rr_intervals": list(self.rr_intervals),
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, HeartRateMeasurement):
+            return NotImplemented
+        return (self.heart_rate, self.sensor_contact, self.energy_expended, self.rr_intervals) == \
+            (other.heart_rate, other.sensor_contact, other.energy_expended, other.rr_intervals)
+
+    def __repr__(self) -> str:
+        return (
+            f"HeartRateMeasurement(heart_rate={self.heart_rate}, sensor_contact={self.sensor_contact}, "
+            f"energy_expended={self.energy_expended}, rr_intervals={self.rr_intervals})"
+        )
+
+# Parser dicts carry the full measurement under "heart_rate_measurement" and
+# the bare heart rate under "heart_rate", see CharacteristicParser.DERIVED_FIELDS
+DERIVED_FIELDS = {"heart_rate_measurement": ("heart_rate", attrgetter("heart_rate"))}
+
+def _rr_struct(count: int) -> struct.Struct:
+    if count < len(_RR_STRUCTS):
+        return _RR_STRUCTS[count]
+    return struct.Struct(f'<{count}H')
+
+def parse_heart_rate_measurement(data: bytes) -> Optional[HeartRateMeasurement]:
+    """
+    Decode a Heart Rate Measurement in one pass without copying the payload
+
+    Fields are read in place with struct.unpack_from, which accepts bytes,
+    bytearray and memoryview alike, so no slice is ever taken.
+
+    Returns:
+        The measurement, or None if the payload is truncated
+    """
+    size = len(data)
+    if size < 2:
+        return None
+    flags = data[0]
+    if flags & FLAG_HR_UINT16:
+        if size < 3:
+            return None
+        heart_rate = _U16.unpack_from(data, 1)[0]
+        offset = 3
+    else:
+        heart_rate = data[1]
+        offset = 2
+
+    sensor_contact = bool(flags & FLAG_CONTACT_DETECTED) if flags & FLAG_CONTACT_SUPPORTED else None
+
+    energy_expended = None
+    if flags & FLAG_ENERGY_EXPENDED:
+        if size < offset + 2:
+            return None
+        energy_expended = _U16.unpack_from(data, offset)[0]
+        offset += 2
+
+    rr_intervals = ()
+    if flags & FLAG_RR_INTERVALS:
+        count = (size - offset) >> 1
+        if count:
+            rr_intervals = tuple([v * RR_SCALE_MS for v in _rr_struct(count).unpack_from(data, offset)])
+
+    return HeartRateMeasurement(heart_rate, sensor_contact, energy_expended, rr_intervals)
+
+def parse_heart_rate(data: bytes) -> Optional[int]:
+    """Heart rate value only, honouring the 8/16-bit format flag"""
+    size = len(data)
+    if size < 2:
+        return None
+    if data[0] & FLAG_HR_UINT16:
+        return data[1] | (data[2] << 8) if size >= 3 else None
+    return data[1]
+
+def parse_heart_rate_batch(payloads: Iterable[bytes], use_numpy: bool = False) -> Dict[str, Any]:
+    """
+    Decode many Heart Rate Measurements into columns
+
+    RR intervals of all packets are emitted into one contiguous column;
+    rr_offsets[i]:rr_offsets[i + 1] selects the intervals of packet i.
+    Truncated packets are skipped.
+
+    Args:
+        payloads: Iterable of notification payloads
+        use_numpy: Return numpy arrays instead of array columns
+
+    Returns:
+        Dictionary of "heart_rate" (bpm), "energy_expended" (kJ, -1 when
+        absent), "rr_intervals" (ms) and "rr_offsets" columns
+    """
+    heart_rate = array('H')
+    energy = array('l')
+    # Raw 1/1024 s units, scaled once at the end
+    rr_raw = array('H')
+    rr_offsets = array('L', [0])
+    for data in payloads:
+        view = memoryview(data)
+        size = len(view)
+        if size < 2:
+            continue
+        flags = view[0]
+        if flags & FLAG_HR_UINT16:
+            if size < 3:
+                continue
+            hr = _U16.unpack_from(view, 1)[0]
+            offset = 3
+        else:
+            hr = view[1]
+            offset = 2
+        expended = -1
+        if flags & FLAG_ENERGY_EXPENDED:
+            if size < offset + 2:
+                continue
+            expended = _U16.unpack_from(view, offset)[0]
+            offset += 2
+        if flags & FLAG_RR_INTERVALS:
+            end = offset + ((size - offset) & ~1)
+            if end > offset:
+                rr_raw.frombytes(view[offset:end])
+        heart_rate.append(hr)
+        energy.append(expended)
+        rr_offsets.append(len(rr_raw))
+
+    if _BIG_ENDIAN:
+        rr_raw.byteswap()
+
+    if use_numpy:
+        if np is None:
+            raise ImportError("numpy is required for use_numpy=True")
+        return {
+            "heart_rate": np.frombuffer(heart_rate, dtype=np.uint16),
+            "energy_expended": np.array(energy, dtype=np.int64),
+            "rr_intervals": np.frombuffer(rr_raw, dtype=np.uint16) * RR_SCALE_MS,
+            "rr_offsets": np.array(rr_offsets, dtype=np.int64),
+        }
+    return {
+        "heart_rate": heart_rate,
+        "energy_expended": energy,
+        "rr_intervals": array('d', [v * RR_SCALE_MS for v in rr_raw]),
+        "rr_offsets": rr_offsets,
+    }
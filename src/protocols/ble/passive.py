@@ -0,0 +1,168 @@
+# src/protocols/ble/passive.py
+from ...core.base_collector import DeviceCollector
+from ...core.pipeline import IngestPipeline, BackpressurePolicy
+from ...core.samples import Sample, CHARACTERISTIC_IDS
+from .scanner import BLEScanner, ScanFilter, DeviceIndexEntry
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict, Any, Callable, Tuple
+import time
+
+# Pseudo characteristic reported for samples decoded from advertisements
+ADVERTISEMENT_CHARACTERISTIC = "advertisement"
+
+@dataclass
+class PassiveStats:
+    """Advertisement counters of a PassiveCollector"""
+    advertisements: int = 0
+    duplicates: int = 0
+    filtered: int = 0
+    samples: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+class PassiveCollector(DeviceCollector):
+    """
+    Collects telemetry broadcast in advertisements, without connecting
+
+    Listens on a BLEScanner's continuous scan and turns the fields decoded
+    from manufacturer and service data into samples, one per changed
+    advertisement. Repeated advertisements are recognized by the scanner's
+    payload hash and dropped, and memory is bounded by the scanner's
+    device index, so hundreds of broadcasters cost no GATT links.
+    """
+
+    def __init__(
+        self,
+        data_callback: Optional[Callable[[str, Any], None]] = None,
+        scanner: Optional[BLEScanner] = None,
+        scan_filter: Optional[ScanFilter] = None,
+        service_uuids: Optional[List[str]] = None,
+        compact_samples: bool = False,
+        queue_size: Optional[int] = 1024,
+        backpressure: str = BackpressurePolicy.DROP_OLDEST,
+        batch_size: int = 64,
+        data_type: str = "advertisement_data"
+    ):
+        """
+        Args:
+            data_callback: Called with (data_type, parsed dict) for each new advertisement
+            scanner: Scanner to listen on, shared with other collectors
+            scan_filter: Only devices matching this filter are collected
+            service_uuids: Service UUIDs passed to the OS scan filter when
+                this collector starts the scan itself
+            compact_samples: Deliver Sample records instead of dicts
+            queue_size: Bound of the ingest queue, None delivers synchronously
+                from the detection callback
+            backpressure: BackpressurePolicy applied when the queue is full
+            batch_size: Maximum advertisements handed to the consumer at once
+            data_type: First argument of every data_callback call
+        """
+        super().__init__()
+        self.scanner = scanner or BLEScanner(max_devices=1024)
+        self.scan_filter = scan_filter
+        self.service_uuids = service_uuids
+        self.data_callback = data_callback
+        self.compact_samples = compact_samples
+        self.data_type = data_type
+        self.stats = PassiveStats()
+        self._char_id = CHARACTERISTIC_IDS.get_id(ADVERTISEMENT_CHARACTERISTIC)
+        self._owns_scan = False
+        self._collecting = False
+        self.pipeline: Optional[IngestPipeline] = None
+        if queue_size is not None:
+            self.pipeline = IngestPipeline(
+                self._process_batch,
+                maxsize=queue_size,
+                policy=backpressure,
+                batch_size=batch_size
+            )
+
+    async def discover(self) -> bool:
+        """True once any matching broadcaster is in the scanner's index"""
+        return bool(self.scanner.find(self.scan_filter or ScanFilter()))
+
+    async def connect(self) -> bool:
+        """Start the continuous scan unless the shared scanner already runs it"""
+        try:
+            if not self.scanner.is_scanning:
+                await self.scanner.start(service_uuids=self.service_uuids)
+                self._owns_scan = True
+            self.is_connected = True
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to start scanning: {str(e)}")
+            return False
+
+    async def disconnect(self) -> bool:
+        """Stop the scan if this collector started it"""
+        try:
+            if self._collecting:
+                await self.stop_collection()
+            if self._owns_scan:
+                await self.scanner.stop()
+                self._owns_scan = False
+            self.is_connected = False
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to stop scanning: {str(e)}")
+            return False
+
+    async def start_collection(self) -> bool:
+        if not self.is_connected:
+            self.logger.error("Scanner is not running")
+            return False
+        if self.pipeline is not None:
+            await self.pipeline.start()
+        self.scanner.add_listener(self._on_advertisement)
+        self._collecting = True
+        return True
+
+    async def stop_collection(self) -> bool:
+        self.scanner.remove_listener(self._on_advertisement)
+        self._collecting = False
+        if self.pipeline is not None:
+            await self.pipeline.stop()
+            self.logger.info(f"Ingest pipeline stats: {self.pipeline.stats.as_dict()}")
+        self.logger.info(f"Passive collection stats: {self.stats.as_dict()}")
+        return True
+
+    def _on_advertisement(self, entry: DeviceIndexEntry):
+        """Scanner listener: queue the decoded fields of a changed advertisement"""
+        stats = self.stats
+        stats.advertisements += 1
+        if not entry.payload_changed:
+            stats.duplicates += 1
+            return
+        decoded = entry.advertisement.decoded
+        if not decoded or (self.scan_filter is not None and not self.scan_filter.matches(entry)):
+            stats.filtered += 1
+            return
+        if not self.data_callback:
+            return
+        item = (time.monotonic_ns(), entry.address, entry.advertisement.rssi, decoded)
+        if self.pipeline is not None:
+            self.pipeline.submit(item)
+        else:
+            self._process_advertisement(item)
+
+    def _process_advertisement(self, item: Tuple[int, str, Optional[int], Dict[str, Any]]):
+        """Turn one advertisement into a sample and hand it to the user callback"""
+        timestamp_ns, address, rssi, decoded = item
+        values = {"address": address, "rssi": rssi}
+        values.update(decoded)
+        if self.compact_samples:
+            data = Sample(timestamp_ns, self._char_id, b"", values)
+        else:
+            data = {"characteristic": ADVERTISEMENT_CHARACTERISTIC}
+            data.update(values)
+        self.stats.samples += 1
+        self.data_callback(self.data_type, data)
+
+    def _process_batch(self, batch: List[Tuple[int, str, Optional[int], Dict[str, Any]]]):
+        """Pipeline consumer: deliver a batch of queued advertisements"""
+        for item in batch:
+            try:
+                self._process_advertisement(item)
+            except Exception as e:
+                self.logger.error(f"Advertisement handling error for {item[1]}: {str(e)}")
@@ -0,0 +1,644 @@
+# src/protocols/ble/profiles.py
+"""
+Declarative device profiles compiled to characteristic decoders
+
+A profile is a YAML file listing a device's services and characteristics
+in the shape of the *Protocol classes. A characteristic with a `layout`
+also gets a decoder:
+
+    CUSTOM_NOTIFY_2:
+      uuid: "61080004-8d6d-82b8-614a-1c8cb0f8dcc6"
+      properties: [notify]
+      field: movement
+      layout:
+        result: list
+        fields:
+          - {name: [x, y, z], format: hhh, divisor: 16384.0}
+
+A field has a name (a list when its struct format holds several values),
+a struct format without byte order, and optionally an `offset`, a
+`scale` multiplier or `divisor`, and a `none_if` sentinel. A layout with
+a `flags` field reads it first; fields then follow it in order, each
+present only while all of its `if` bits and none of its `unless` bits
+are set, and left out of the decoded dict otherwise. Named `bits` of
+the flags decode to booleans. A trailing `repeat` field
+consumes the rest of the payload as a tuple.
+
+A dict layout may name a `type` from RESULT_TYPES instead, which is
+then called with the decoded fields as keyword arguments, so a profile
+produces the same records as the hand-written decoders. A layout with
+`result: bytes` keeps the payload as bytes, for streams decoded
+elsewhere. A characteristic's `derived` names an attribute of its
+decoded value that parser dicts also carry as a plain field, like
+CharacteristicParser.DERIVED_FIELDS.
+
+Compilation happens once per profile load: each layout, and with flags
+each combination of field-present bits on first use, becomes one
+precompiled struct.Struct plus a closure generated for exactly that
+shape, so decoding costs one size check, one unpack_from and one
+literal. Loaded profiles are cached in memory, and optionally on disk
+as their validated form, so startup does not parse YAML again.
+"""
+import hashlib
+import inspect
+import logging
+import marshal
+import math
+import os
+import struct
+from operator import attrgetter
+from typing import Optional, List, Dict, Any, Callable, Tuple
+import yaml
+from .cycling_power import CyclingPowerMeasurement
+from .cycling_speed_cadence import CSCMeasurement
+from .decoding import CharacteristicParser, DecoderEntry
+from .heart_rate import HeartRateMeasurement
+from .running_speed_cadence import RSCMeasurement
+
+try:
+    _YAML_LOADER = yaml.CSafeLoader
+except AttributeError:  # PyYAML built without libyaml
+    _YAML_LOADER = yaml.SafeLoader
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the validated form changes, invalidating disk caches
+CACHE_VERSION = 2
+
+_BYTE_ORDERS = {"little": "<", "big": ">"}
+_RESULTS = ("value", "list", "tuple", "dict", "bytes")
+
+# Layout `type` name -> callable taking the decoded fields as keyword arguments
+RESULT_TYPES: Dict[str, Callable[..., Any]] = {
+    "HeartRateMeasurement": HeartRateMeasurement,
+    "RSCMeasurement": RSCMeasurement,
+    "CSCMeasurement": CSCMeasurement,
+    "CyclingPowerMeasurement": CyclingPowerMeasurement.from_fields,
+}
+
+class ProfileError(ValueError):
+    """A profile file is malformed"""
+
+# Validation, producing the plain data form that is cached on disk
+
+def _mask(value: Any, where: str) -> int:
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ProfileError(f"{where}: expected a non-negative integer bit mask, got {value!r}")
+    return value
+
+def _number(value: Any, where: str) -> Optional[float]:
+    if value is None:
+        return None
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or not math.isfinite(value):
+        raise ProfileError(f"{where}: expected a finite number, got {value!r}")
+    return value
+
+def _value_count(fmt: Any, where: str) -> int:
+    """Values unpacked by a struct format, validating it"""
+    if not isinstance(fmt, str) or not fmt or fmt[0] in "<>!=@":
+        raise ProfileError(f"{where}: format must be a struct format without byte order, got {fmt!r}")
+    try:
+        layout = struct.Struct("<" + fmt)
+    except struct.error as e:
+        raise ProfileError(f"{where}: invalid format {fmt!r}: {e}") from None
+    return len(layout.unpack(bytes(layout.size)))
+
+def _validate_field(spec: Any, where: str, conditional: bool) -> Dict[str, Any]:
+    if not isinstance(spec, dict):
+        raise ProfileError(f"{where}: expected a mapping, got {spec!r}")
+    unknown = set(spec) - {"name", "format", "offset", "scale", "divisor", "none_if", "if", "unless"}
+    if unknown:
+        raise ProfileError(f"{where}: unknown keys {sorted(unknown)}")
+    names = spec.get("name")
+    names = [names] if isinstance(names, str) else names
+    if not names or not all(isinstance(name, str) for name in names):
+        raise ProfileError(f"{where}: name must be a string or a list of strings")
+    count = _value_count(spec.get("format"), where)
+    if count != len(names):
+        raise ProfileError(f"{where}: format {spec['format']!r} holds {count} values for {len(names)} names")
+    if spec.get("scale") is not None and spec.get("divisor") is not None:
+        raise ProfileError(f"{where}: scale and divisor are exclusive")
+    if spec.get("divisor") == 0:
+        raise ProfileError(f"{where}: divisor must not be zero")
+    offset = spec.get("offset")
+    if offset is not None:
+        if conditional:
+            raise ProfileError(f"{where}: offsets are not allowed in layouts with flags, fields follow the flags in order")
+        _mask(offset, where)
+    return {
+        "names": list(names),
+        "format": spec["format"],
+        "offset": offset,
+        "scale": _number(spec.get("scale"), where),
+        "divisor": _number(spec.get("divisor"), where),
+        "none_if": _number(spec.get("none_if"), where),
+        "if": _mask(spec.get("if", 0), where),
+        "unless": _mask(spec.get("unless", 0), where),
+    }
+
+def _validate_layout(spec: Any, where: str) -> Dict[str, Any]:
+    if not isinstance(spec, dict):
+        raise ProfileError(f"{where}: layout must be a mapping")
+    unknown = set(spec) - {"byte_order", "flags", "fields", "repeat", "result", "type"}
+    if unknown:
+        raise ProfileError(f"{where}: unknown layout keys {sorted(unknown)}")
+    byte_order = spec.get("byte_order", "little")
+    if byte_order not in _BYTE_ORDERS:
+        raise ProfileError(f"{where}: byte_order must be one of {sorted(_BYTE_ORDERS)}")
+
+    flags = None
+    if spec.get("flags") is not None:
+        flags_spec = spec["flags"]
+        if not isinstance(flags_spec, dict) or _value_count(flags_spec.get("format"), f"{where}.flags") != 1:
+            raise ProfileError(f"{where}.flags: expected a mapping with a single-value integer format")
+        bits = {}
+        for name, bit in (flags_spec.get("bits") or {}).items():
+            # A bit is a mask, or {mask, if} for bits only valid while another bit is set
+            if isinstance(bit, dict):
+                bits[str(name)] = [_mask(bit.get("mask"), f"{where}.flags.{name}"), _mask(bit.get("if", 0), f"{where}.flags.{name}")]
+            else:
+                bits[str(name)] = [_mask(bit, f"{where}.flags.{name}"), 0]
+        name = flags_spec.get("name")
+        if name is not None and not isinstance(name, str):
+            raise ProfileError(f"{where}.flags: name must be a string")
+        flags = {"format": flags_spec["format"], "name": name, "bits": bits}
+
+    fields = spec.get("fields") or []
+    if not isinstance(fields, list):
+        raise ProfileError(f"{where}: fields must be a list")
+    fields = [_validate_field(field, f"{where}.fields[{index}]", flags is not None) for index, field in enumerate(fields)]
+    if flags is None and any(field["if"] or field["unless"] for field in fields):
+        raise ProfileError(f"{where}: conditional fields need a flags field")
+
+    repeat = None
+    if spec.get("repeat") is not None:
+        repeat = _validate_field(spec["repeat"], f"{where}.repeat", flags is not None)
+        if len(repeat["names"]) != 1 or repeat["offset"] is not None:
+            raise ProfileError(f"{where}.repeat: expected one name, one value per item and no offset")
+        if flags is None and repeat["if"] | repeat["unless"]:
+            raise ProfileError(f"{where}.repeat: conditions need a flags field")
+
+    result_type = spec.get("type")
+    value_count = sum(len(field["names"]) for field in fields)
+    default = "value" if value_count == 1 and flags is None and repeat is None and result_type is None else "dict"
+    result = spec.get("result", default)
+    if result not in _RESULTS:
+        raise ProfileError(f"{where}: result must be one of {_RESULTS}")
+    if result != "dict" and (flags is not None or repeat is not None):
+        raise ProfileError(f"{where}: layouts with flags or repeat produce dicts")
+    if result == "value" and value_count != 1:
+        raise ProfileError(f"{where}: result 'value' needs exactly one value, the layout has {value_count}")
+    if result == "bytes":
+        if fields:
+            raise ProfileError(f"{where}: result 'bytes' keeps the whole payload and takes no fields")
+    elif not fields and repeat is None:
+        raise ProfileError(f"{where}: layout has no fields")
+    if result_type is not None:
+        if result != "dict":
+            raise ProfileError(f"{where}: a type is built from the fields of a dict layout")
+        if result_type not in RESULT_TYPES:
+            raise ProfileError(f"{where}: unknown type {result_type!r}, expected one of {sorted(RESULT_TYPES)}")
+        names = [name for field in fields for name in field["names"]] + list(flags["bits"] if flags else [])
+        names += [flags["name"]] if flags and flags["name"] else []
+        names += repeat["names"] if repeat else []
+        invalid = [name for name in names if not name.isidentifier()]
+        if invalid:
+            raise ProfileError(f"{where}: names {invalid} cannot be passed to {result_type}")
+    return {
+        "byte_order": byte_order, "flags": flags, "fields": fields, "repeat": repeat,
+        "result": result, "type": result_type,
+    }
+
+def validate_profile(spec: Any, source: str = "<profile>") -> Dict[str, Any]:
+    """
+    Check a parsed profile and normalize it to plain data
+
+    Raises:
+        ProfileError: If the profile is malformed
+    """
+    if not isinstance(spec, dict):
+        raise ProfileError(f"{source}: expected a mapping at the top level")
+    name = spec.get("name")
+    if not isinstance(name, str) or not name:
+        raise ProfileError(f"{source}: missing profile name")
+    services = spec.get("services") or {}
+    if not isinstance(services, dict):
+        raise ProfileError(f"{source}: services must map names to UUIDs")
+    characteristics = {}
+    for char_name, char in (spec.get("characteristics") or {}).items():
+        where = f"{source}: {char_name}"
+        if not isinstance(char, dict) or not isinstance(char.get("uuid"), str):
+            raise ProfileError(f"{where}: expected a mapping with a uuid string")
+        entry = {"uuid": char["uuid"].lower(), "properties": list(char.get("properties") or [])}
+        if char.get("layout") is not None:
+            field = char.get("field")
+            if not isinstance(field, str):
+                raise ProfileError(f"{where}: a characteristic with a layout needs a field name")
+            entry["field"] = field
+            entry["layout"] = _validate_layout(char["layout"], where)
+            derived = char.get("derived")
+            if derived is not None and (not isinstance(derived, str) or not derived.isidentifier()):
+                raise ProfileError(f"{where}: derived must name an attribute of the decoded value")
+            entry["derived"] = derived
+        elif char.get("derived") is not None:
+            raise ProfileError(f"{where}: a derived field needs a layout")
+        characteristics[str(char_name)] = entry
+    return {
+        "name": name,
+        "device_name_prefix": spec.get("device_name_prefix"),
+        "services": {str(key): str(value).lower() for key, value in services.items()},
+        "characteristics": characteristics,
+    }
+
+# Code generation
+
+# Generated source -> factory, shared by every layout of the same shape
+_FACTORIES: Dict[str, Callable[..., Callable]] = {}
+
+def _factory(source: str) -> Callable[..., Callable]:
+    factory = _FACTORIES.get(source)
+    if factory is None:
+        namespace: Dict[str, Any] = {}
+        exec(source, namespace)
+        factory = _FACTORIES[source] = namespace["factory"]
+    return factory
+
+class _Closure:
+    """Collects the source lines and closure constants of one decoder"""
+
+    def __init__(self):
+        self.constants: List[Any] = []
+        self.lines: List[str] = []
+
+    def constant(self, value: Any) -> str:
+        self.constants.append(value)
+        return f"c{len(self.constants) - 1}"
+
+    def value_expression(self, variable: str, field: Dict[str, Any]) -> str:
+        # Validated numbers are inlined as literals, their repr round-trips exactly
+        expression = variable
+        if field["scale"] is not None:
+            expression = f"{variable} * {field['scale']!r}"
+        elif field["divisor"] is not None:
+            expression = f"{variable} / {field['divisor']!r}"
+        if field["none_if"] is not None:
+            expression = f"(None if {variable} == {field['none_if']!r} else {expression})"
+        return expression
+
+    def build(self, parameters: str) -> Callable:
+        arguments = ", ".join(f"c{index}" for index in range(len(self.constants)))
+        body = "\n".join(f"        {line}" for line in self.lines)
+        source = f"def factory({arguments}):\n    def decode({parameters}):\n{body}\n    return decode\n"
+        return _factory(source)(*self.constants)
+
+class _RepeatStructs(dict):
+    """Structs for n repeated items keyed by n, created on first use"""
+
+    def __init__(self, prefix: str, fmt: str):
+        super().__init__()
+        self.prefix = prefix
+        self.format = fmt
+
+    def __missing__(self, count: int) -> struct.Struct:
+        layout = self[count] = struct.Struct(f"{self.prefix}{count}{self.format}")
+        return layout
+
+def _arguments(constructor: Callable[..., Any], values: Dict[str, str], closure: _Closure) -> str:
+    """
+    Argument list passing field expressions to a result type
+
+    Arguments go by position where the signature allows, which calls
+    faster than keywords; absent fields before the last present one
+    are passed their defaults.
+    """
+    positional = []
+    remaining = dict(values)
+    for parameter in inspect.signature(constructor).parameters.values():
+        if not remaining or parameter.kind not in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD):
+            break
+        if parameter.name in remaining:
+            positional.append(remaining.pop(parameter.name))
+        elif parameter.default is parameter.empty:
+            break
+        else:
+            positional.append(closure.constant(parameter.default))
+    return ", ".join(positional + [f"{name}={value}" for name, value in remaining.items()])
+
+def _generate(layout: Dict[str, Any], present: Optional[int]) -> Callable:
+    """
+    Generate the decoder of a layout, or of one field-present combination
+
+    Args:
+        layout: Validated layout
+        present: Flag bits selecting the fields of a flags layout, None
+            for layouts without flags; the decoder then takes (data, flags)
+    """
+    prefix = _BYTE_ORDERS[layout["byte_order"]]
+    flags = layout["flags"]
+    closure = _Closure()
+    lines = closure.lines
+
+    def active(field: Dict[str, Any]) -> bool:
+        if present is None:
+            return True
+        return (present & field["if"]) == field["if"] and not present & field["unless"]
+
+    # One struct covering every present field, gaps padded
+    fmt = ""
+    position = struct.calcsize(prefix + flags["format"]) if flags is not None else 0
+    start = position
+    expressions: Dict[str, str] = {}
+    index = 0
+    # Fields are laid out in file order, each at its offset or right after the previous one
+    for field in (f for f in layout["fields"] if active(f)):
+        if field["offset"] is not None:
+            if field["offset"] < position:
+                raise ProfileError(f"Field {field['names']} at offset {field['offset']} overlaps the previous field")
+            fmt += "x" * (field["offset"] - position)
+            position = field["offset"]
+        fmt += field["format"]
+        position = start + struct.calcsize(prefix + fmt)
+        for name in field["names"]:
+            expressions[name] = closure.value_expression(f"v{index}", field)
+            index += 1
+
+    unpack = struct.Struct(prefix + fmt)
+    size = start + unpack.size
+    lines.append(f"if len(data) < {size}:")
+    lines.append("    return None")
+    if index == 1 and fmt == "B":
+        # A single byte reads faster by index than through struct
+        lines.append(f"v0 = data[{start}]")
+    elif index:
+        unpack_from = closure.constant(unpack.unpack_from)
+        call = f"{unpack_from}(data{', ' + str(start) if start else ''})"
+        if index == 1:
+            lines.append(f"v0 = {call}[0]")
+        else:
+            lines.append(f"{', '.join(f'v{i}' for i in range(index))} = {call}")
+
+    repeat = layout["repeat"]
+    if repeat is not None and active(repeat):
+        item_size = struct.calcsize(prefix + repeat["format"])
+        repeat_structs = closure.constant(_RepeatStructs(prefix, repeat["format"]))
+        lines.append(f"count = (len(data) - {size}) // {item_size}")
+        item = closure.value_expression("v", repeat)
+        collect = "tuple(values)" if item == "v" else f"tuple([{item} for v in values])"
+        lines.append("if count:")
+        lines.append(f"    values = {repeat_structs}[count].unpack_from(data, {size})")
+        lines.append(f"    repeated = {collect}")
+        lines.append("else:")
+        lines.append("    repeated = ()")
+
+    result = layout["result"]
+    names = [name for field in layout["fields"] for name in field["names"]]
+    if result == "value":
+        lines.append(f"return {expressions[names[0]]}")
+    elif result == "list":
+        lines.append(f"return [{', '.join(expressions[name] for name in names)}]")
+    elif result == "tuple":
+        lines.append(f"return ({', '.join(expressions[name] for name in names)},)")
+    else:
+        items = []
+        if flags is not None and flags["name"]:
+            items.append((flags["name"], "flags"))
+        # Fields absent from this combination are left out, like unset optional fields on the wire
+        for name in dict.fromkeys(names):
+            if name in expressions:
+                items.append((name, expressions[name]))
+        if flags is not None:
+            # Bit conditions are part of the combination, so they are settled here
+            for name, (mask, condition) in flags["bits"].items():
+                valid = (present & condition) == condition
+                items.append((name, f"bool(flags & {mask})" if valid else "None"))
+        if repeat is not None and active(repeat):
+            items.append((repeat["names"][0], "repeated"))
+        if layout["type"] is not None:
+            constructor = RESULT_TYPES[layout["type"]]
+            lines.append(f"return {closure.constant(constructor)}({_arguments(constructor, dict(items), closure)})")
+        else:
+            lines.append(f"return {{{', '.join(f'{name!r}: {value}' for name, value in items)}}}")
+    return closure.build("data, flags" if present is not None else "data")
+
+def compile_layout(layout: Dict[str, Any]) -> Callable[[bytes], Any]:
+    """
+    Compile a validated layout into a decoder
+
+    The decoder takes a bytes-like payload and returns the decoded value,
+    or None if the payload is too short for its layout.
+    """
+    if layout["result"] == "bytes":
+        return bytes
+    flags = layout["flags"]
+    if flags is None:
+        return _generate(layout, None)
+
+    conditions = [layout["repeat"]] if layout["repeat"] is not None else []
+    mask = 0
+    for field in layout["fields"] + conditions:
+        mask |= field["if"] | field["unless"]
+    for _, condition in flags["bits"].values():
+        mask |= condition
+    flags_struct = struct.Struct(_BYTE_ORDERS[layout["byte_order"]] + flags["format"])
+    flags_size = flags_struct.size
+    # Decoders by field-present bits, generated on first use; sensors use one or two
+    variants: Dict[int, Callable] = {}
+
+    def variant(present: int) -> Callable:
+        decode = variants[present] = _generate(layout, present)
+        return decode
+
+    if flags["format"] == "B":
+        def decode(data):
+            if len(data) < 1:
+                return None
+            flags = data[0]
+            try:
+                decode_present = variants[flags & mask]
+            except KeyError:
+                decode_present = variant(flags & mask)
+            return decode_present(data, flags)
+    else:
+        unpack_flags = flags_struct.unpack_from
+
+        def decode(data):
+            if len(data) < flags_size:
+                return None
+            flags = unpack_flags(data)[0]
+            try:
+                decode_present = variants[flags & mask]
+            except KeyError:
+                decode_present = variant(flags & mask)
+            return decode_present(data, flags)
+    return decode
+
+class CompiledProfile:
+    """A loaded profile: its services and characteristics, plus compiled decoders"""
+
+    def __init__(self, spec: Dict[str, Any], source: Optional[str] = None):
+        """
+        Args:
+            spec: Validated profile, see validate_profile
+            source: File the profile was loaded from
+        """
+        self.spec = spec
+        self.source = source
+        self.name: str = spec["name"]
+        self.device_name_prefix: Optional[str] = spec["device_name_prefix"]
+        self.services: Dict[str, str] = dict(spec["services"])
+        # Same shape as the CHARACTERISTICS of the *Protocol classes
+        self.characteristics: Dict[str, Dict[str, Any]] = {
+            name: {"uuid": char["uuid"], "properties": list(char["properties"])}
+            for name, char in spec["characteristics"].items()
+        }
+        # Normalized characteristic UUID -> (field name, decoder)
+        self.decoders: Dict[str, DecoderEntry] = {}
+        # Decoded field -> (extra field, getter), in the form of CharacteristicParser.DERIVED_FIELDS
+        self.derived_fields: Dict[str, DecoderEntry] = {}
+        self._by_name: Dict[str, Callable[[bytes], Any]] = {}
+        for name, char in spec["characteristics"].items():
+            if "layout" in char:
+                try:
+                    decode = compile_layout(char["layout"])
+                except ProfileError as e:
+                    raise ProfileError(f"{source or self.name}: {name}: {e}") from None
+                self._by_name[name] = decode
+                self.decoders[char["uuid"]] = (char["field"], decode)
+                if char["derived"] is not None:
+                    self.derived_fields[char["field"]] = (char["derived"], attrgetter(char["derived"]))
+        self._parser: Optional[type] = None
+
+    def decoder(self, name: str) -> Callable[[bytes], Any]:
+        """
+        Compiled decoder of a characteristic by name
+
+        Raises:
+            KeyError: If the characteristic has no layout
+        """
+        return self._by_name[name]
+
+    def layout(self, name: str) -> Dict[str, Any]:
+        """
+        Validated layout of a characteristic by name, e.g. for its scale factors
+
+        Raises:
+            KeyError: If the characteristic has no layout
+        """
+        return self.spec["characteristics"][name]["layout"]
+
+    @property
+    def parser(self) -> type:
+        """CharacteristicParser subclass dispatching to the compiled decoders, usable as a collector's PARSER"""
+        if self._parser is None:
+            class_name = "".join(part.capitalize() for part in self.name.replace("-", "_").split("_")) + "ProfileParser"
+            self._parser = type(class_name, (CharacteristicParser,), {
+                "__doc__": f"Decoders compiled from the {self.name} profile",
+                "DECODERS": dict(self.decoders),
+                "DERIVED_FIELDS": dict(self.derived_fields),
+                "BATCH_DECODERS": {},
+            })
+        return self._parser
+
+    def __repr__(self) -> str:
+        return f"CompiledProfile(name={self.name!r}, characteristics={len(self.characteristics)}, decoders={len(self.decoders)})"
+
+class ProfileCache:
+    """
+    Loads profiles once per file version
+
+    Compiled profiles are kept in memory keyed by path and revalidated
+    against the file's modification time and size. With a cache
+    directory, the validated form is also stored there with marshal,
+    so a new process skips YAML parsing and validation and only
+    regenerates the decoders.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Args:
+            cache_dir: Directory for the on-disk cache, created on demand;
+                memory only if omitted
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._profiles: Dict[str, Tuple[Tuple[int, int], CompiledProfile]] = {}
+
+    def clear(self):
+        """Forget the in-memory profiles, leaving the disk cache alone"""
+        self._profiles.clear()
+
+    def load(self, path: str) -> CompiledProfile:
+        """
+        Load and compile a profile, from cache when the file is unchanged
+
+        Raises:
+            OSError: If the file cannot be read
+            ProfileError: If the profile is malformed
+        """
+        path = os.path.realpath(path)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._profiles.get(path)
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            return cached[1]
+
+        spec = self._read_disk(path, version)
+        if spec is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            with open(path, "rb") as f:
+                try:
+                    raw = yaml.load(f, Loader=_YAML_LOADER)
+                except yaml.YAMLError as e:
+                    raise ProfileError(f"{path}: {e}") from None
+            spec = validate_profile(raw, path)
+            self._write_disk(path, version, spec)
+        profile = CompiledProfile(spec, path)
+        self._profiles[path] = (version, profile)
+        return profile
+
+    def _disk_path(self, path: str) -> str:
+        digest = hashlib.sha1(path.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{os.path.basename(path)}.{digest}.profile")
+
+    def _read_disk(self, path: str, version: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._disk_path(path), "rb") as f:
+                cache_version, file_version, spec = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if cache_version != CACHE_VERSION or tuple(file_version) != version:
+            return None
+        return spec
+
+    def _write_disk(self, path: str, version: Tuple[int, int], spec: Dict[str, Any]):
+        if self.cache_dir is None:
+            return
+        target = self._disk_path(path)
+        temporary = f"{target}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temporary, "wb") as f:
+                marshal.dump((CACHE_VERSION, version, spec), f)
+            os.replace(temporary, target)
+        except OSError as e:
+            logger.debug("Could not write profile cache %s: %s", target, e)
+
+# Process-wide cache used by load_profile
+_CACHE = ProfileCache()
+
+def load_profile(path: str, cache: Optional[ProfileCache] = None) -> CompiledProfile:
+    """
+    Load a profile file through a cache, the process-wide one by default
+
+    Raises:
+        OSError: If the file cannot be read
+        ProfileError: If the profile is malformed
+    """
+    return (cache or _CACHE).load(path)
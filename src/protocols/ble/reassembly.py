@@ -0,0 +1,328 @@
+# src/protocols/ble/reassembly.py
+"""
+Reassembly of framed packets streamed over BLE notifications
+
+Proprietary streams send frames larger than the negotiated MTU, so one
+frame arrives split over several notifications and one notification may
+end one frame and start the next. FrameReassembler treats the
+notifications of one characteristic as a byte stream: each payload is
+copied once into a preallocated buffer and every complete frame is
+handed to the decoder registered for its type as a memoryview into that
+buffer. Frames of unregistered types are delivered undecoded so the
+caller can keep their raw bytes.
+
+The layout is described by a FrameFormat:
+
+    notification: [sequence] chunk of the frame stream
+    frame:        [start of frame] length type body[length] [crc]
+
+A sequence gap means notifications were lost, so the partial frame is
+dropped rather than delivered with a hole in it.
+"""
+import binascii
+import struct
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Callable, List, Union, Any
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# Decodes the body of a frame; the view is only valid during the call
+FrameDecoder = Callable[[memoryview], Any]
+
+# Called with (frame type, body view, decoded value or None) per complete frame
+FrameCallback = Callable[[int, memoryview, Any], None]
+
+# Computes the checksum of a frame from its start of frame up to the checksum field
+CrcFunction = Callable[[BytesLike], int]
+
+def crc16_ccitt(data: BytesLike) -> int:
+    """CRC-16/CCITT-FALSE, the checksum of many BLE vendor protocols"""
+    return binascii.crc_hqx(data, 0xFFFF)
+
+class FrameFormat:
+    """Wire layout of a framed notification stream"""
+
+    def __init__(
+        self,
+        sequence_format: Optional[str] = "B",
+        start_of_frame: Optional[int] = 0xAA,
+        length_format: str = "<H",
+        crc: Optional[CrcFunction] = None,
+        crc_format: str = "<I",
+        max_body: int = 4096
+    ):
+        """
+        Args:
+            sequence_format: struct format of the rolling sequence number
+                prefixed to every notification, None if there is none
+            start_of_frame: Byte opening every frame, used to resync after
+                corruption; None if frames follow each other directly
+            length_format: struct format of the body length field
+            crc: Checksum over the frame from its first byte up to the crc
+                field, e.g. zlib.crc32 or crc16_ccitt; None if unchecked
+            crc_format: struct format of the checksum field
+            max_body: Largest body accepted, longer lengths are errors
+        """
+        self.sequence_format = sequence_format
+        self.start_of_frame = start_of_frame
+        self.length_format = length_format
+        self.crc = crc
+        self.crc_format = crc_format
+        self.max_body = max_body
+
+        self.sequence_struct = struct.Struct(sequence_format) if sequence_format else None
+        self.sequence_size = self.sequence_struct.size if sequence_format else 0
+        self.sequence_modulus = 1 << (8 * self.sequence_size)
+        self.length_struct = struct.Struct(length_format)
+        self.length_offset = 0 if start_of_frame is None else 1
+        self.type_offset = self.length_offset + self.length_struct.size
+        self.header_size = self.type_offset + 1
+        self.crc_struct = struct.Struct(crc_format) if crc is not None else None
+        self.crc_size = self.crc_struct.size if crc is not None else 0
+        self.max_frame = self.header_size + max_body + self.crc_size
+
+    def encode(self, frame_type: int, body: BytesLike) -> bytes:
+        """Build one frame, e.g. for a fake device"""
+        if len(body) > self.max_body:
+            raise ValueError(f"Frame body of {len(body)} bytes exceeds max_body ({self.max_body})")
+        head = b"" if self.start_of_frame is None else bytes((self.start_of_frame,))
+        frame = head + self.length_struct.pack(len(body)) + bytes((frame_type,)) + bytes(body)
+        if self.crc is not None:
+            frame += self.crc_struct.pack(self.crc(frame))
+        return frame
+
+class Packetizer:
+    """Splits a frame stream into notifications carrying rolling sequence numbers"""
+
+    def __init__(self, frame_format: FrameFormat, payload_size: int = 20, sequence: int = 0):
+        """
+        Args:
+            frame_format: Layout of the stream
+            payload_size: Notification payload size, ATT MTU minus 3
+            sequence: First sequence number
+        """
+        if payload_size <= frame_format.sequence_size:
+            raise ValueError(f"payload_size must exceed the sequence number ({frame_format.sequence_size} bytes)")
+        self.frame_format = frame_format
+        self.payload_size = payload_size
+        self.sequence = sequence
+
+    def packets(self, stream: BytesLike) -> List[bytes]:
+        """Split stream bytes into notification payloads"""
+        frame_format = self.frame_format
+        chunk = self.payload_size - frame_format.sequence_size
+        stream = memoryview(stream)
+        packets = []
+        for offset in range(0, len(stream), chunk):
+            data = bytes(stream[offset:offset + chunk])
+            if frame_format.sequence_struct is not None:
+                data = frame_format.sequence_struct.pack(self.sequence) + data
+                self.sequence = (self.sequence + 1) % frame_format.sequence_modulus
+            packets.append(data)
+        return packets
+
+@dataclass
+class ReassemblyStats:
+    """Counters of one frame reassembler"""
+    packets: int = 0
+    frames: int = 0
+    decoded_frames: int = 0
+    sequence_gaps: int = 0
+    lost_packets: int = 0
+    dropped_frames: int = 0
+    crc_errors: int = 0
+    length_errors: int = 0
+    decode_errors: int = 0
+    discarded_bytes: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+class FrameReassembler:
+    """
+    Incremental reassembler of the frames of one notification stream
+
+    With a start of frame byte, garbage and frames failing their length or
+    checksum cost one byte of resync, so a corrupted frame never swallows
+    the valid frames behind it. Without one, the stream can only resync on
+    a notification boundary after a sequence gap.
+    """
+
+    def __init__(
+        self,
+        frame_format: FrameFormat,
+        on_frame: FrameCallback,
+        decoders: Optional[Dict[int, FrameDecoder]] = None,
+        capacity: int = 8192
+    ):
+        """
+        Args:
+            frame_format: Layout of the stream
+            on_frame: Called with (frame type, body view, decoded value) per
+                complete frame; the decoded value is None for frame types
+                without a decoder, and the view is only valid during the
+                call, copy it to keep the raw bytes
+            decoders: Frame type -> decoder, extended with register
+            capacity: Size of the preallocated receive buffer
+        """
+        if capacity < frame_format.max_frame:
+            raise ValueError(f"capacity must hold at least one frame ({frame_format.max_frame} bytes)")
+        self.frame_format = frame_format
+        self.on_frame = on_frame
+        self.decoders: Dict[int, FrameDecoder] = dict(decoders or {})
+        self.capacity = capacity
+        self.stats = ReassemblyStats()
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self._expected: Optional[int] = None
+        # Buffer end needed before the pending frame can be complete
+        self._need = frame_format.header_size
+
+    def register(self, frame_type: int, decoder: FrameDecoder):
+        """Decode frames of a type with `decoder` from now on"""
+        self.decoders[frame_type] = decoder
+
+    def unregister(self, frame_type: int):
+        """Deliver frames of a type undecoded again"""
+        self.decoders.pop(frame_type, None)
+
+    @property
+    def pending(self) -> int:
+        """Bytes of an incomplete frame waiting for the next notification"""
+        return self._end - self._start
+
+    def reset(self):
+        """Drop any partial frame and sequence state, e.g. after a reconnect"""
+        self._start = self._end = 0
+        self._expected = None
+        self._need = self.frame_format.header_size
+
+    def feed(self, packet: BytesLike) -> int:
+        """
+        Add the payload of one notification
+
+        Returns:
+            Number of frames delivered to the callback
+        """
+        frame_format = self.frame_format
+        stats = self.stats
+        stats.packets += 1
+        offset = frame_format.sequence_size
+        if offset:
+            if len(packet) < offset:
+                stats.length_errors += 1
+                return 0
+            sequence = frame_format.sequence_struct.unpack_from(packet)[0]
+            expected = self._expected
+            if sequence != expected and expected is not None:
+                stats.sequence_gaps += 1
+                stats.lost_packets += (sequence - expected) % frame_format.sequence_modulus
+                if self._end > self._start:
+                    stats.dropped_frames += 1
+                    stats.discarded_bytes += self._end - self._start
+                self._start = self._end = 0
+                self._need = frame_format.header_size
+            self._expected = (sequence + 1) % frame_format.sequence_modulus
+
+        size = len(packet) - offset
+        end = self._end
+        if end + size <= self.capacity:
+            # Common case: the payload fits behind the pending bytes
+            self._view[end:end + size] = packet[offset:] if offset else packet
+            self._end = end + size
+            # Parse only once the pending frame can be complete
+            return self._parse() if self._end >= self._need else 0
+
+        frames = 0
+        source = memoryview(packet)
+        while size > 0:
+            space = self.capacity - self._end
+            if space < size and self._start:
+                # Move the partial frame to the front; it is at most one frame long
+                start = self._start
+                pending = self._end - start
+                self._buffer[:pending] = bytes(self._view[start:self._end])
+                self._start = 0
+                self._end = pending
+                self._need -= start
+                space = self.capacity - pending
+            count = min(space, size)
+            self._buffer[self._end:self._end + count] = source[offset:offset + count]
+            self._end += count
+            offset += count
+            size -= count
+            frames += self._parse()
+        return frames
+
+    def _parse(self) -> int:
+        frame_format = self.frame_format
+        buffer = self._buffer
+        view = self._view
+        stats = self.stats
+        start_of_frame = frame_format.start_of_frame
+        header_size = frame_format.header_size
+        length_offset = frame_format.length_offset
+        unpack_length = frame_format.length_struct.unpack_from
+        max_body = frame_format.max_body
+        crc = frame_format.crc
+        crc_size = frame_format.crc_size
+        decoders = self.decoders
+        on_frame = self.on_frame
+        start = self._start
+        end = self._end
+        frames = 0
+        need = 0
+        while end - start >= header_size:
+            if start_of_frame is not None and buffer[start] != start_of_frame:
+                found = buffer.find(start_of_frame, start, end)
+                if found < 0:
+                    stats.discarded_bytes += end - start
+                    start = end
+                    break
+                stats.discarded_bytes += found - start
+                start = found
+                continue
+            length = unpack_length(buffer, start + length_offset)[0]
+            if length > max_body:
+                stats.length_errors += 1
+                if start_of_frame is None:
+                    # No way to find the next frame, wait for a gap or reset
+                    stats.discarded_bytes += end - start
+                    start = end
+                    break
+                stats.discarded_bytes += 1
+                start += 1
+                continue
+            body_end = start + header_size + length
+            frame_end = body_end + crc_size
+            if frame_end > end:
+                need = frame_end
+                break
+            if crc is not None and crc(view[start:body_end]) != frame_format.crc_struct.unpack_from(buffer, body_end)[0]:
+                stats.crc_errors += 1
+                skip = 1 if start_of_frame is not None else frame_end - start
+                stats.discarded_bytes += skip
+                start += skip
+                continue
+            frame_type = buffer[start + header_size - 1]
+            body = view[start + header_size:body_end]
+            decoded = None
+            decode = decoders.get(frame_type)
+            if decode is not None:
+                try:
+                    decoded = decode(body)
+                    stats.decoded_frames += 1
+                except Exception:
+                    stats.decode_errors += 1
+            frames += 1
+            start = frame_end
+            on_frame(frame_type, body, decoded)
+        if start == end:
+            start = end = 0
+        self._start = start
+        self._end = end
+        self._need = need or start + header_size
+        stats.frames += frames
+        return frames
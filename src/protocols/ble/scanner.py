@@ -1,58 +1,299 @@
 # src/protocols/ble/scanner.py
+from .advertisement import AdvertisementDecoder, BLEAdvertisementData, normalize_uuid
 from bleak import BleakScanner, BLEDevice
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Any, Callable, Tuple, FrozenSet
+from collections import OrderedDict
+import asyncio
 import logging
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 
 @dataclass
-class BLEAdvertisementData:
-    """Structured BLE advertisement data"""
-    local_name: Optional[str]
-    service_uuids: List[str]
-    manufacturer_data: Dict[int, bytes]
-    service_data: Dict[str, bytes]
-    tx_power: Optional[int]
-    rssi: Optional[int]
-    is_connectable: bool
+class DeviceIndexEntry:
+    """Latest known state of one advertising device"""
+    address: str
+    name: str
+    advertisement: BLEAdvertisementData
+    rssi: Optional[float] = None
+    first_seen: float = field(default_factory=time.monotonic)
+    last_seen: float = field(default_factory=time.monotonic)
+    seen_count: int = 0
+    # Normalized copies used by ScanFilter, refreshed only when the advertisement changes
+    name_upper: str = ""
+    service_uuid_set: FrozenSet[str] = frozenset()
+    # Hash of the raw advertisement payload; repeats skip decoding
+    payload_hash: Optional[int] = None
+    payload_changed: bool = True
+
+    def to_device_info(self) -> Dict:
+        adv = self.advertisement
+        return {
+            "address": self.address,
+            "name": self.name,
+            "rssi": self.rssi,
+            "is_connectable": adv.is_connectable,
+            "service_uuids": adv.service_uuids,
+            "tx_power": adv.tx_power,
+            "manufacturer_data": adv.manufacturer_data,
+            "service_data": adv.service_data,
+            "decoded": adv.decoded
+        }
+
+class ScanFilter:
+    """
+    Device filter compiled once and applied to every index entry
+
+    Name prefixes are matched case-insensitively and service UUIDs in
+    their normalized 128-bit form, both against values normalized at
+    index time, so no device has to be connected to be filtered.
+    """
+
+    def __init__(
+        self,
+        name_prefix: Optional[str] = None,
+        service_uuid: Optional[str] = None,
+        company_id: Optional[int] = None,
+        predicate: Optional[Callable[[DeviceIndexEntry], bool]] = None
+    ):
+        self.name_prefix = name_prefix
+        self.service_uuid = service_uuid
+        self.company_id = company_id
+        self.predicate = predicate
+        self._prefix = name_prefix.upper() if name_prefix else None
+        self._uuid = normalize_uuid(service_uuid) if service_uuid else None
+
+    def matches(self, entry: DeviceIndexEntry) -> bool:
+        if self._prefix is not None and not entry.name_upper.startswith(self._prefix):
+            return False
+        if self._uuid is not None and self._uuid not in entry.service_uuid_set:
+            return False
+        if self.company_id is not None and self.company_id not in entry.advertisement.manufacturer_data:
+            return False
+        if self.predicate is not None and not self.predicate(entry):
+            return False
+        return True
+
+# Called with the index entry after every advertisement merged into the index
+AdvertisementListener = Callable[[DeviceIndexEntry], None]
 
 class BLEScanner:
     """Enhanced BLE scanner with detailed advertisement data handling"""
-    
-    def __init__(self):
-        self.scanner = BleakScanner()
+
+    def __init__(
+        self,
+        scanner_factory: Callable[..., BleakScanner] = BleakScanner,
+        rssi_smoothing: float = 0.3,
+        stale_after: float = 30.0,
+        decoder: Optional[AdvertisementDecoder] = None,
+        max_devices: Optional[int] = None
+    ):
+        """
+        Args:
+            scanner_factory: Builds the underlying bleak scanner
+            decoder: Advertisement decoder holding the manufacturer and
+                service data parser tables
+            max_devices: Bound of the device index, the least recently
+                seen device is evicted when it is full
+            rssi_smoothing: Weight of the newest reading in the RSSI moving average
+            stale_after: Seconds without an advertisement before a device is forgotten
+        """
+        self.scanner_factory = scanner_factory
+        self.scanner = scanner_factory()
+        self.rssi_smoothing = rssi_smoothing
+        self.stale_after = stale_after
+        self.decoder = decoder or AdvertisementDecoder()
+        self.max_devices = max_devices
+        self.devices: Dict[str, DeviceIndexEntry] = OrderedDict()
+        self._listeners: List[AdvertisementListener] = []
         self.logger = logging.getLogger(self.__class__.__name__)
-    
-    def _parse_advertisement_data(self, device: BLEDevice, adv_data: dict) -> BLEAdvertisementData:
+        self._continuous: Optional[BleakScanner] = None
+        self._expiry_task: Optional[asyncio.Task] = None
+        self._waiters: List[Tuple[ScanFilter, asyncio.Future]] = []
+
+    def _parse_advertisement_data(self, device: BLEDevice, adv_data: Any) -> BLEAdvertisementData:
         """
-        Parse CoreBluetooth advertisement data into structured format
+        Parse advertisement data from any bleak backend into structured format
         """
-        return BLEAdvertisementData(
-            local_name=getattr(device, 'name', None),
-            service_uuids=adv_data.get('kCBAdvDataServiceUUIDs', []),
-            manufacturer_data=adv_data.get('kCBAdvDataManufacturerData', {}),
-            service_data=adv_data.get('kCBAdvDataServiceData', {}),
-            tx_power=adv_data.get('kCBAdvDataTxPowerLevel'),
-            rssi=getattr(device, 'rssi', None),
-            is_connectable=adv_data.get('kCBAdvDataIsConnectable', False)
-        )
-    
+        return self.decoder.decode(device, adv_data)
+
     def _get_device_info(self, device: BLEDevice, adv_data: dict) -> Dict:
         """
         Extract relevant information from a BLE device
         """
-        parsed_data = self._parse_advertisement_data(device, adv_data)
-        
-        return {
-            "address": device.address,
-            "name": parsed_data.local_name or '',
-            "rssi": parsed_data.rssi,
-            "is_connectable": parsed_data.is_connectable,
-            "service_uuids": parsed_data.service_uuids,
-            "tx_power": parsed_data.tx_power,
-            "manufacturer_data": parsed_data.manufacturer_data,
-            "service_data": parsed_data.service_data
-        }
-    
+        return self._update_index(device, adv_data).to_device_info()
+
+    def _update_index(self, device: BLEDevice, adv_data: Any) -> DeviceIndexEntry:
+        """Merge one advertisement into the device index"""
+        now = time.monotonic()
+        payload_hash = self._payload_hash(adv_data)
+        entry = self.devices.get(device.address)
+        if entry is not None and payload_hash is not None and payload_hash == entry.payload_hash:
+            # Repeated advertisement: refresh liveness and RSSI only
+            self._smooth_rssi(entry, adv_data.rssi)
+            entry.payload_changed = False
+        else:
+            parsed_data = self._parse_advertisement_data(device, adv_data)
+            if entry is None:
+                entry = DeviceIndexEntry(
+                    address=device.address,
+                    name=parsed_data.local_name or '',
+                    advertisement=parsed_data,
+                    rssi=parsed_data.rssi,
+                    first_seen=now
+                )
+                if self.max_devices is not None and len(self.devices) >= self.max_devices:
+                    self.devices.popitem(last=False)
+                self.devices[device.address] = entry
+                self._normalize(entry)
+            else:
+                previous = entry.advertisement
+                entry.advertisement = parsed_data
+                if parsed_data.local_name:
+                    entry.name = parsed_data.local_name
+                self._smooth_rssi(entry, parsed_data.rssi)
+                if (parsed_data.service_uuids != previous.service_uuids
+                        or entry.name_upper != entry.name.upper()):
+                    self._normalize(entry)
+            entry.payload_hash = payload_hash
+            entry.payload_changed = True
+        if self.max_devices is not None:
+            self.devices.move_to_end(device.address)
+        entry.last_seen = now
+        entry.seen_count += 1
+        return entry
+
+    def _smooth_rssi(self, entry: DeviceIndexEntry, rssi: Optional[int]):
+        if rssi is None:
+            return
+        if entry.rssi is None:
+            entry.rssi = rssi
+        else:
+            entry.rssi += self.rssi_smoothing * (rssi - entry.rssi)
+
+    @staticmethod
+    def _payload_hash(adv_data: Any) -> Optional[int]:
+        """Hash of everything in an advertisement except its RSSI"""
+        if isinstance(adv_data, dict):
+            return None
+        try:
+            return hash((
+                adv_data.local_name,
+                tuple(adv_data.service_uuids),
+                tuple(adv_data.manufacturer_data.items()),
+                tuple(adv_data.service_data.items()),
+                adv_data.tx_power
+            ))
+        except (AttributeError, TypeError):
+            return None
+
+    @staticmethod
+    def _normalize(entry: DeviceIndexEntry):
+        entry.name_upper = entry.name.upper()
+        # The decoder already normalized the UUIDs
+        entry.service_uuid_set = frozenset(entry.advertisement.service_uuids)
+
+    def _on_detection(self, device: BLEDevice, adv_data: Any):
+        """Detection callback of the continuous scanner"""
+        try:
+            entry = self._update_index(device, adv_data)
+        except Exception as e:
+            self.logger.debug("Ignoring advertisement from %s: %s", device.address, e)
+            return
+        if self._waiters:
+            for waiter in list(self._waiters):
+                scan_filter, future = waiter
+                if not future.done() and scan_filter.matches(entry):
+                    future.set_result(entry)
+        for listener in self._listeners:
+            try:
+                listener(entry)
+            except Exception as e:
+                self.logger.error(f"Advertisement listener failed: {str(e)}")
+
+    def add_listener(self, listener: AdvertisementListener):
+        """Receive every index entry updated by the continuous scan"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: AdvertisementListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @property
+    def is_scanning(self) -> bool:
+        return self._continuous is not None
+
+    async def start(self, service_uuids: Optional[List[str]] = None):
+        """
+        Start scanning continuously and keep the device index up to date
+
+        Args:
+            service_uuids: Only report devices advertising one of these
+                services; the filter runs in the OS Bluetooth stack
+        """
+        if self._continuous is not None:
+            return
+        kwargs = {"service_uuids": [normalize_uuid(u) for u in service_uuids]} if service_uuids else {}
+        self._continuous = self.scanner_factory(detection_callback=self._on_detection, **kwargs)
+        await self._continuous.start()
+        self._expiry_task = asyncio.create_task(self._expire_periodically())
+        self.logger.info("Started continuous BLE scan")
+
+    async def stop(self):
+        """Stop the continuous scan, keeping the index"""
+        scanner, self._continuous = self._continuous, None
+        if self._expiry_task is not None:
+            self._expiry_task.cancel()
+            self._expiry_task = None
+        if scanner is not None:
+            await scanner.stop()
+            self.logger.info("Stopped continuous BLE scan")
+
+    async def _expire_periodically(self):
+        while True:
+            await asyncio.sleep(max(self.stale_after / 2, 0.1))
+            self.expire()
+
+    def expire(self) -> int:
+        """Forget devices not seen for stale_after seconds"""
+        cutoff = time.monotonic() - self.stale_after
+        stale = [address for address, entry in self.devices.items() if entry.last_seen < cutoff]
+        for address in stale:
+            del self.devices[address]
+        return len(stale)
+
+    def find(self, scan_filter: ScanFilter) -> List[DeviceIndexEntry]:
+        """Fresh index entries matching a filter, strongest signal first"""
+        cutoff = time.monotonic() - self.stale_after
+        matches = [
+            entry for entry in self.devices.values()
+            if entry.last_seen >= cutoff and scan_filter.matches(entry)
+        ]
+        matches.sort(key=lambda e: e.rssi if e.rssi is not None else -1000, reverse=True)
+        return matches
+
+    async def wait_for_device(self, scan_filter: ScanFilter, timeout: float = 5) -> Optional[DeviceIndexEntry]:
+        """
+        Return a matching device, waiting for its advertisement if needed
+
+        Returns immediately when the index already holds a match. Requires
+        the continuous scan to be running to see new devices.
+        """
+        matches = self.find(scan_filter)
+        if matches:
+            return matches[0]
+        if not self.is_scanning:
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (scan_filter, future)
+        self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._waiters.remove(waiter)
+
     async def scan_for_device(
         self,
         name_prefix: Optional[str] = None,
@@ -61,59 +302,57 @@ class BLEScanner:
     ) -> List[Dict]:
         """
         Scan for BLE devices with enhanced filtering
-        
+
+        While the continuous scan is running this answers from the device
+        index and only waits if no matching device is known yet.
+
         Args:
             name_prefix: Optional prefix to filter device names
             service_uuid: Optional service UUID to filter devices
             timeout: Scan timeout in seconds
-            
+
         Returns:
             List of dictionaries containing device information
         """
+        scan_filter = ScanFilter(name_prefix=name_prefix, service_uuid=service_uuid)
+        if self.is_scanning:
+            if await self.wait_for_device(scan_filter, timeout) is None:
+                self.logger.info("No matching devices in the scan index")
+                return []
+            return [entry.to_device_info() for entry in self.find(scan_filter)]
+
         try:
             self.logger.info(f"Starting BLE scan (timeout: {timeout}s)")
+            kwargs = {"service_uuids": [normalize_uuid(service_uuid)]} if service_uuid else {}
             devices = await self.scanner.discover(
                 timeout=timeout,
-                return_adv=True  # Get advertisement data
+                return_adv=True,  # Get advertisement data
+                **kwargs
             )
-            
+
             if not devices:
                 self.logger.warning("No devices found during scan")
                 return []
-            
-            self.logger.debug(f"Found {len(devices)} total devices")
-            for device, adv_data in devices.items():
-                self.logger.debug(
-                    f"Found device: {getattr(device, 'name', 'Unknown')} "
-                    f"({device.address})"
-                )
-            
+
+            self.logger.debug("Found %d total devices", len(devices))
             filtered_devices = []
-            for device, adv_data in devices.items():
-                device_info = self._get_device_info(device, adv_data)
-                
-                # Apply name prefix filter if specified
-                if name_prefix:
-                    if not device_info["name"] or not device_info["name"].upper().startswith(name_prefix.upper()):
-                        continue
-                
-                # Apply service UUID filter if specified
-                if service_uuid:
-                    device_uuids = device_info["service_uuids"]
-                    if not device_uuids or service_uuid.lower() not in [uuid.lower() for uuid in device_uuids]:
-                        continue
-                
-                filtered_devices.append(device_info)
+            # return_adv maps each address to a (BLEDevice, AdvertisementData) pair
+            for device, adv_data in devices.values():
+                entry = self._update_index(device, adv_data)
+                if not scan_filter.matches(entry):
+                    continue
+
+                filtered_devices.append(entry.to_device_info())
                 self.logger.debug(
-                    f"Added filtered device: {device_info['name']} "
-                    f"({device_info['address']})"
+                    f"Added filtered device: {entry.name} "
+                    f"({entry.address})"
                 )
-            
+
             self.logger.info(
                 f"Found {len(filtered_devices)} matching device(s)"
             )
             return filtered_devices
-            
+
         except Exception as e:
             self.logger.error(f"Scan failed: {str(e)}", exc_info=True)
-            return []
\ No newline at end of file
+            return []
@@ -0,0 +1,105 @@
+# src/utils/hot_path_logging.py
+"""
+Logging for per-packet code paths
+
+Per-packet logging is off unless a level is configured, is checked with
+a single attribute read, formats lazily and only logs one packet in N.
+install_queue_logging moves a logger's handlers behind a QueueListener
+so formatting and I/O run on a background thread.
+"""
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, List
+import logging
+import queue
+
+# Hot-path loggers live under this prefix so they can be routed separately
+HOT_PATH_LOGGER = "hotpath"
+
+class HexPreview:
+    """Hex rendering of a payload prefix, computed only when formatted"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __str__(self) -> str:
+        return self.data.hex()
+
+class HotPathLog:
+    """
+    Sampled, lazily formatted packet logging for one component
+
+    Callers guard every use with `if log.enabled:` so the disabled case
+    costs one attribute read per packet. The logger's own level is checked
+    on the sampled packets only, so later changes to the logging
+    configuration take effect without calling set_level again.
+    """
+
+    def __init__(self, name: str, level: Optional[int] = None, sample_every: int = 100, preview_bytes: int = 8):
+        """
+        Args:
+            name: Component name, logged under "hotpath.<name>"
+            level: Level of packet records, None disables packet logging
+            sample_every: Log one packet out of this many
+            preview_bytes: Leading payload bytes included in a packet record
+        """
+        if sample_every <= 0:
+            raise ValueError("sample_every must be positive")
+        self.logger = logging.getLogger(f"{HOT_PATH_LOGGER}.{name}")
+        self.sample_every = sample_every
+        self.preview_bytes = preview_bytes
+        self.packets = 0
+        self.set_level(level)
+
+    def set_level(self, level: Optional[int]):
+        """Change the packet log level; None turns packet logging off"""
+        self.level = level
+        self.enabled = level is not None
+
+    def packet(self, char_uuid: str, data: bytes):
+        """Log one in `sample_every` packets"""
+        self.packets += 1
+        if self.packets % self.sample_every or not self.logger.isEnabledFor(self.level):
+            return
+        # Copy the prefix now; the record may be formatted on another thread
+        self.logger.log(
+            self.level, "Received data from %s: %s (packet %d, 1 in %d logged)",
+            char_uuid, HexPreview(bytes(data[:self.preview_bytes])), self.packets, self.sample_every
+        )
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread
+
+    The stock handler merges the message arguments before enqueueing so
+    records can cross process boundaries; within one process the record
+    can be passed as-is and formatted by the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def install_queue_logging(logger_name: Optional[str] = None,
+                          handlers: Optional[List[logging.Handler]] = None) -> QueueListener:
+    """
+    Route a logger's records through a queue to a background thread
+
+    Args:
+        logger_name: Logger to reroute, the root logger if omitted
+        handlers: Handlers run on the listener thread; defaults to the
+            logger's current handlers, or a StreamHandler if it has none
+
+    Returns:
+        The started QueueListener; call stop() on shutdown to drain it
+    """
+    logger = logging.getLogger(logger_name)
+    if handlers is None:
+        handlers = list(logger.handlers) or [logging.StreamHandler()]
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,95 @@
+# tests/test_core/test_analytics.py
+import math
+import random
+import statistics
+
+import pytest
+
+from src.core.analytics import OnlineAnalytics, RunningWindow
+from src.protocols.ble.heart_rate import HeartRateMeasurement
+
+SECOND_NS = 1_000_000_000
+START_NS = 100 * SECOND_NS
+
+
+def test_running_window_matches_statistics():
+    window = RunningWindow(span_s=10.0, capacity=64)
+    rng = random.Random(1)
+    values = []
+    for n in range(1000):
+        value = 1e6 + rng.gauss(0, 5)
+        window.add(n * SECOND_NS // 10, value)
+        values.append(value)
+    # 100 samples span 10 s, plus the one on the cutoff; the capacity caps it
+    recent = values[-64:]
+    assert len(window) == 64
+    assert window.mean == pytest.approx(statistics.fmean(recent))
+    assert window.variance == pytest.approx(statistics.variance(recent), rel=1e-6)
+
+
+def test_running_window_evicts_by_time():
+    window = RunningWindow(span_s=1.0, capacity=16)
+    for n in range(4):
+        window.add(n * SECOND_NS, float(n))
+    assert len(window) == 2
+    assert window.mean == 2.5
+    window.expire(10 * SECOND_NS)
+    assert len(window) == 0
+    assert window.mean is None and window.variance is None
+    with pytest.raises(ValueError):
+        RunningWindow(0, 16)
+
+
+def _feed_rr(analytics, rr, seconds):
+    for value, second in zip(rr, seconds):
+        measurement = HeartRateMeasurement(heart_rate=60, rr_intervals=(value,))
+        analytics.add("heart_rate_measurement", measurement, START_NS + second * SECOND_NS)
+    return analytics.snapshot()[60.0]
+
+
+def _rmssd(rr):
+    diffs = [(b - a) ** 2 for a, b in zip(rr, rr[1:])]
+    return math.sqrt(sum(diffs) / len(diffs))
+
+
+def test_rmssd_and_sdnn():
+    analytics = OnlineAnalytics(windows=(60.0,))
+    rr = [800.0, 810.0, 790.0, 805.0, 795.0]
+    summary = _feed_rr(analytics, rr, range(5))
+    assert summary.rr_count == 5
+    assert summary.rmssd == pytest.approx(_rmssd(rr))
+    assert summary.sdnn == pytest.approx(statistics.stdev(rr))
+
+
+def test_artifact_breaks_the_rr_series():
+    analytics = OnlineAnalytics(windows=(60.0,))
+    summary = _feed_rr(analytics, [800.0, 820.0, 3000.0, 700.0, 710.0], range(5))
+    assert analytics.rr_artifacts == 1
+    assert summary.rr_count == 4
+    # 820 -> 700 spans the artifact and is left out
+    assert summary.rmssd == pytest.approx(math.sqrt((20 ** 2 + 10 ** 2) / 2))
+
+
+def test_gap_breaks_the_rr_series():
+    analytics = OnlineAnalytics(windows=(60.0,), rr_gap_s=3.0)
+    summary = _feed_rr(analytics, [800.0, 820.0, 600.0, 610.0], [0, 1, 10, 11])
+    assert summary.rmssd == pytest.approx(math.sqrt((20 ** 2 + 10 ** 2) / 2))
+
+
+def test_summaries_are_emitted_once_per_span():
+    summaries = []
+    forwarded = []
+    analytics = OnlineAnalytics(
+        windows=(5.0,), on_summary=summaries.append, forward=lambda data_type, data: forwarded.append(data)
+    )
+    for n in range(21):
+        measurement = HeartRateMeasurement(heart_rate=60 + n % 2, rr_intervals=[1000.0])
+        analytics("whoop", {"characteristic": "hr", "timestamp_ns": START_NS + n * SECOND_NS,
+                            "heart_rate_measurement": measurement, "heart_rate": measurement.heart_rate})
+        analytics("whoop", {"characteristic": "accel", "timestamp_ns": START_NS + n * SECOND_NS, "movement": (3, 4, 0)})
+    assert [(summary.end_ns - START_NS) // SECOND_NS for summary in summaries] == [5, 10, 15, 20]
+    last = summaries[-1]
+    assert last.mean_hr == pytest.approx(60.5, abs=0.1)
+    assert last.rmssd == 0
+    assert last.movement_mean == 5.0
+    assert len(forwarded) == 42
@@ -0,0 +1,147 @@
+# tests/test_core/test_metrics.py
+import asyncio
+import random
+
+import pytest
+
+from src.core.metrics import CollectorMetrics, LatencyHistogram, MetricsRegistry, MetricsServer
+
+CHAR = "0000abcd-0000-1000-8000-00805f9b34fb"
+INTERVAL_NS = 10_000_000
+START_NS = 1_000_000_000
+
+
+def _bucket_high(histogram, value):
+    fresh = LatencyHistogram(histogram.sub_bits)
+    fresh.record(value)
+    index = next(i for i, count in enumerate(fresh._counts) if count)
+    return fresh._bucket_high(index)
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.record(value)
+    assert histogram.percentile(0.5) == 50
+    assert histogram.percentile(0.99) == 99
+    assert histogram.percentile(1.0) == 100
+    assert histogram.mean == pytest.approx(50.5)
+    assert (histogram.min, histogram.max) == (1, 100)
+
+
+def test_bucket_bounds_keep_relative_precision():
+    histogram = LatencyHistogram(sub_bits=5)
+    rng = random.Random(3)
+    for _ in range(2000):
+        value = rng.randrange(1, 1 << 35)
+        high = _bucket_high(histogram, value)
+        assert value <= high <= value + (value >> 5)
+
+
+def test_quantiles_stay_within_a_bucket():
+    histogram = LatencyHistogram()
+    values = sorted(random.Random(5).randrange(1000, 10_000_000) for _ in range(5000))
+    for value in values:
+        histogram.record(value)
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * len(values) + 0.5) - 1]
+        assert exact <= histogram.percentile(q) <= exact + (exact >> 5)
+    assert histogram.percentile(1.0) == values[-1]
+
+
+def test_values_out_of_range_are_clamped():
+    histogram = LatencyHistogram(max_bits=20)
+    histogram.record(-5)
+    histogram.record(1 << 30)
+    assert histogram.count == 2
+    assert histogram.min == 0
+    assert histogram.max == 1 << 30
+    assert histogram._counts[histogram._last] == 1
+    assert LatencyHistogram().percentile(0.5) is None
+
+
+def test_merge_requires_same_layout():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record(10)
+    second.record(5)
+    second.record(1000)
+    first.merge(second)
+    assert (first.count, first.min, first.max, first.total) == (3, 5, 1000, 1015)
+    with pytest.raises(ValueError):
+        first.merge(LatencyHistogram(sub_bits=4))
+
+
+def _stream(metrics, indices):
+    for index in indices:
+        metrics.arrival(CHAR, START_NS + index * INTERVAL_NS)
+
+
+def test_loss_estimate_counts_missing_packets():
+    metrics = CollectorMetrics("device", sample_every=1)
+    _stream(metrics, [n for n in range(100) if not 40 <= n < 50])
+    char = metrics.characteristic(CHAR)
+    assert metrics.packets[CHAR] == 90
+    assert char.mean_interval_ns == pytest.approx(INTERVAL_NS)
+    assert char.jitter_ns == 0
+    assert char.sampled_gaps == 1
+    assert char.lost_estimate == 10
+    assert metrics.snapshot()["lost_estimate"] == 10
+
+
+def test_steady_stream_has_no_losses():
+    metrics = CollectorMetrics("device", sample_every=8)
+    _stream(metrics, range(200))
+    char = metrics.characteristic(CHAR)
+    assert char.lost_estimate == 0
+    assert char.rate_hz == pytest.approx(1e9 / INTERVAL_NS)
+    # Packets 8k and 8k + 1 form the sampled pairs
+    assert char.interarrival.count == 200 // 8 - 1
+
+
+def test_consume_times_one_batch_per_period():
+    metrics = CollectorMetrics("device", sample_every=4)
+    batch = [(n * INTERVAL_NS, CHAR, b"", None) for n in range(2)]
+    assert [metrics.consume(batch) for _ in range(4)] == [False, True, False, True]
+    assert metrics.packets[CHAR] == 8
+    with pytest.raises(ValueError):
+        CollectorMetrics("device", sample_every=3)
+
+
+def _registry():
+    registry = MetricsRegistry(sample_every=1)
+    metrics = registry.device('strap "1"')
+    _stream(metrics, range(10))
+    metrics.record_parse(CHAR, 2_000, 50_000)
+    metrics.parse_errors = 3
+    return registry
+
+
+def test_prometheus_text():
+    lines = _registry().render_prometheus().splitlines()
+    labels = f'device="strap \\"1\\"",characteristic="{CHAR}"'
+    assert "# TYPE collector_packets_total counter" in lines
+    assert f"collector_packets_total{{{labels}}} 10" in lines
+    assert f"collector_lost_packets_estimate{{{labels}}} 0" in lines
+    assert f"collector_packet_rate_hz{{{labels}}} 100" in lines
+    assert "# TYPE collector_parse_seconds summary" in lines
+    assert f'collector_parse_seconds{{{labels},quantile="0.5"}} 2e-06' in lines
+    assert f"collector_parse_seconds_count{{{labels}}} 1" in lines
+    assert f"collector_delivery_seconds_sum{{{labels}}} 5e-05" in lines
+    assert 'collector_parse_errors_total{device="strap \\"1\\""} 3' in lines
+    # No pipeline attached, so no dropped series
+    assert not [line for line in lines if line.startswith("collector_pipeline_dropped_total{")]
+    for line in lines:
+        if not line.startswith("#"):
+            float(line.rsplit(" ", 1)[1])
+
+
+@pytest.mark.asyncio
+async def test_server_serves_metrics():
+    async with MetricsServer(_registry(), port=0) as server:
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+    head, body = response.split(b"\r\n\r\n", 1)
+    assert head.startswith(b"HTTP/1.1 200 OK")
+    assert b"collector_packets_total" in body
@@ -0,0 +1,123 @@
+# tests/test_core/test_pipeline.py
+import asyncio
+import threading
+
+import pytest
+
+from src.core.pipeline import BackpressurePolicy, IngestPipeline
+
+
+class _Consumer:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.items = []
+
+    async def __call__(self, batch):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.items.extend(batch)
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_the_newest_items():
+    consumer = _Consumer()
+    pipeline = IngestPipeline(consumer, maxsize=4, policy=BackpressurePolicy.DROP_OLDEST)
+    for n in range(10):
+        assert pipeline.submit(n)
+
+    await pipeline.start()
+    await pipeline.stop()
+    assert consumer.items == [6, 7, 8, 9]
+    assert pipeline.stats.dropped == 6
+    assert pipeline.stats.consumed == 4
+
+
+@pytest.mark.asyncio
+async def test_block_waits_for_space():
+    items = []
+    pipeline = IngestPipeline(items.extend, maxsize=8, policy=BackpressurePolicy.BLOCK, batch_size=4)
+    await pipeline.start()
+    for n in range(200):
+        assert await pipeline.put(n)
+    await pipeline.stop()
+
+    assert items == list(range(200))
+    assert pipeline.stats.dropped == 0
+    assert pipeline.stats.max_depth <= 8
+
+
+@pytest.mark.asyncio
+async def test_block_submit_drops_when_full():
+    pipeline = IngestPipeline(_Consumer(), maxsize=2, policy=BackpressurePolicy.BLOCK)
+    assert pipeline.submit(0) and pipeline.submit(1)
+    assert not pipeline.submit(2)
+    assert pipeline.stats.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_spill_preserves_order(tmp_path):
+    consumer = _Consumer()
+    pipeline = IngestPipeline(
+        consumer, maxsize=16, policy=BackpressurePolicy.SPILL, batch_size=8, spill_path=str(tmp_path / "spill")
+    )
+    items = [(n, "uuid", bytearray(n.to_bytes(2, "little"))) for n in range(100)]
+    for item in items:
+        assert pipeline.submit(item)
+    assert pipeline.depth == 100
+    assert pipeline.stats.spilled == 84
+
+    await pipeline.start()
+    # Items arriving while the backlog drains queue up behind it
+    for item in items[:10]:
+        pipeline.submit(item)
+    await pipeline.stop()
+
+    assert consumer.items == items + items[:10]
+    assert pipeline.stats.dropped == 0
+    assert pipeline.depth == 0
+
+
+class _ThreadRecorder:
+    """Item recording which thread pickles it"""
+    threads = set()
+
+    def __init__(self, n):
+        self.n = n
+
+    def __reduce__(self):
+        _ThreadRecorder.threads.add(threading.current_thread().name)
+        return _ThreadRecorder, (self.n,)
+
+
+@pytest.mark.asyncio
+async def test_spill_writes_off_the_event_loop():
+    consumer = _Consumer()
+    pipeline = IngestPipeline(consumer, maxsize=4, policy=BackpressurePolicy.SPILL, batch_size=4)
+    await pipeline.start()
+    _ThreadRecorder.threads.clear()
+    for n in range(50):
+        pipeline.submit(_ThreadRecorder(n))
+    await asyncio.sleep(0.05)
+    await pipeline.stop()
+
+    assert [item.n for item in consumer.items] == list(range(50))
+    assert _ThreadRecorder.threads
+    assert threading.current_thread().name not in _ThreadRecorder.threads
+
+
+@pytest.mark.asyncio
+async def test_stop_finishes_the_batch_in_flight():
+    consumer = _Consumer(delay=0.001)
+    pipeline = IngestPipeline(consumer, maxsize=8, policy=BackpressurePolicy.BLOCK, batch_size=4)
+    await pipeline.start()
+    for n in range(200):
+        assert await pipeline.put(n)
+    await pipeline.stop()
+
+    assert consumer.items == list(range(200))
+    assert pipeline.stats.consumed == 200
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        IngestPipeline(lambda batch: None, policy="drop_newest")
@@ -0,0 +1,132 @@
+# tests/test_core/test_pool.py
+import asyncio
+
+import pytest
+
+from src.core.pool import CollectorPool, DeviceState
+from src.core.reconnect import ReconnectPolicy
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.fake import FakeWhoop
+from src.devices.whoop.protocol import WhoopProtocol
+from src.protocols.ble.fake import FakeAdapter
+from src.protocols.ble.scanner import BLEScanner
+
+HEART_RATE_UUID = WhoopProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"]
+
+
+def _adapter(count, **kwargs):
+    adapter = FakeAdapter(seed=7)
+    for n in range(count):
+        adapter.add(FakeWhoop(f"FA:KE:00:00:00:{n:02X}", notify_rates={HEART_RATE_UUID: 50.0}, seed=n, **kwargs))
+    return adapter
+
+
+def _pool(adapter, addresses, **kwargs):
+    received = []
+    pool = CollectorPool(
+        output=lambda device_id, data_type, data: received.append((device_id, data_type)),
+        connect_interval=0.001,
+        retry_delay=0.01,
+        **kwargs
+    )
+    for address in addresses:
+        pool.add(address, WhoopCollector(device_address=address, client_factory=adapter.client_factory))
+    return pool, received
+
+
+@pytest.mark.asyncio
+async def test_pool_merges_tagged_streams():
+    adapter = _adapter(4)
+    pool, received = _pool(adapter, adapter.devices)
+    await pool.start()
+    await asyncio.sleep(0.2)
+    await pool.stop()
+
+    assert {device_id for device_id, _ in received} == set(adapter.devices)
+    assert all(data_type == WhoopCollector.DATA_TYPE for _, data_type in received)
+    summary = pool.summary()
+    assert summary["states"] == {DeviceState.STOPPED: 4}
+    assert summary["samples"] == len(received)
+
+
+@pytest.mark.asyncio
+async def test_pool_retries_then_marks_failed():
+    adapter = _adapter(2)
+    flaky, dead = list(adapter.devices.values())
+    flaky.connect_failures = 1
+    dead.connect_failures = 10
+    pool, _ = _pool(adapter, adapter.devices, connect_retries=3)
+    await pool.start()
+    try:
+        assert pool.status[flaky.address].state == DeviceState.COLLECTING
+        assert pool.status[flaky.address].connect_attempts == 2
+        assert pool.status[dead.address].state == DeviceState.FAILED
+        assert pool.status[dead.address].connect_attempts == 3
+        assert pool.status[dead.address].last_error == "connect failed"
+    finally:
+        await pool.stop()
+    assert pool.status[dead.address].state == DeviceState.FAILED
+
+
+@pytest.mark.asyncio
+async def test_pool_channel_without_output():
+    adapter = _adapter(2)
+    pool = CollectorPool(connect_interval=0.001, channel_size=10)
+    for address in adapter.devices:
+        pool.add(address, WhoopCollector(device_address=address, client_factory=adapter.client_factory))
+    with pytest.raises(ValueError):
+        pool.add(next(iter(adapter.devices)), WhoopCollector())
+
+    await pool.start()
+    await asyncio.sleep(0.2)
+    await pool.stop()
+    items = await pool.items()
+    assert len(items) == 10
+    assert pool.channel_dropped > 0
+
+
+@pytest.mark.asyncio
+async def test_pool_resolves_addresses_from_one_scan():
+    adapter = _adapter(3)
+    scans = []
+
+    def scanner_factory(**kwargs):
+        scans.append(kwargs)
+        return adapter.scanner_factory(**kwargs)
+
+    pool = CollectorPool(connect_interval=0.001, scanner=BLEScanner(scanner_factory=scanner_factory), discovery_timeout=2.0)
+    for n in range(3):
+        pool.add(f"strap-{n}", WhoopCollector(client_factory=adapter.client_factory))
+    await pool.start()
+    try:
+        addresses = {collector.device_address for collector in pool.collectors.values()}
+        assert addresses == set(adapter.devices)
+        assert all(status.state == DeviceState.COLLECTING for status in pool.status.values())
+        # The scanner built at construction and the one continuous scan
+        assert len(scans) == 2
+    finally:
+        await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_pool_state_follows_disconnects_and_reconnects():
+    adapter = _adapter(2, drop_schedule=[0.1])
+    pool = CollectorPool(connect_interval=0.001)
+    policies = {"reconnecting": ReconnectPolicy(base_delay=0.3, max_delay=0.3, jitter=0.0), "plain": None}
+    for (device_id, policy), address in zip(policies.items(), adapter.devices):
+        pool.add(device_id, WhoopCollector(
+            device_address=address,
+            client_factory=adapter.client_factory,
+            auto_reconnect=policy is not None,
+            reconnect_policy=policy
+        ))
+    await pool.start()
+    try:
+        await asyncio.sleep(0.2)
+        assert pool.summary()["states"] == {DeviceState.DISCONNECTED: 2}
+        await asyncio.sleep(0.4)
+        assert pool.status["reconnecting"].state == DeviceState.COLLECTING
+        assert pool.status["plain"].state == DeviceState.DISCONNECTED
+        assert pool.status["reconnecting"].disconnects == pool.status["plain"].disconnects == 1
+    finally:
+        await pool.stop()
@@ -0,0 +1,135 @@
+# tests/test_core/test_recording.py
+import os
+
+import pytest
+
+from src.core.recording import (
+    INDEX_ENTRY, INDEX_SEEK_POINT, RecordingError, RecordingReader, SessionRecorder, index_path
+)
+
+HEART_RATE_UUID = "00002a37-0000-1000-8000-00805f9b34fb"
+ACCEL_UUID = "61080005-8d6d-82b8-614a-1c8cb0f8dcc6"
+
+
+def _notifications(count=3000):
+    return [
+        (1_000_000 * n, HEART_RATE_UUID if n % 3 == 0 else ACCEL_UUID, bytes((n % 256,)) * (1 + n % 7))
+        for n in range(count)
+    ]
+
+
+def _record(path, notifications, **kwargs):
+    with SessionRecorder(path, **kwargs) as recorder:
+        for timestamp_ns, uuid, payload in notifications:
+            recorder.record(timestamp_ns, uuid, payload)
+
+
+def _read(path, *args, **kwargs):
+    with RecordingReader(path, **kwargs) as reader:
+        return [(timestamp_ns, uuid, bytes(payload)) for timestamp_ns, uuid, payload in reader.records(*args)]
+
+
+@pytest.mark.parametrize("use_index", [True, False])
+def test_round_trip(tmp_path, use_index):
+    path = str(tmp_path / "session.rec")
+    notifications = _notifications()
+    _record(path, notifications, index_interval=100)
+
+    assert _read(path, use_index=use_index) == notifications
+
+
+def test_time_slice_uses_seek_points(tmp_path):
+    path = str(tmp_path / "session.rec")
+    notifications = _notifications()
+    _record(path, notifications, index_interval=100)
+
+    start_ns, end_ns = 1_234_000_000, 2_345_000_000
+    expected = [n for n in notifications if start_ns <= n[0] < end_ns]
+    assert _read(path, start_ns, end_ns) == expected
+
+
+def test_reader_without_sidecar_rebuilds_it(tmp_path):
+    path = str(tmp_path / "session.rec")
+    notifications = _notifications()
+    _record(path, notifications)
+    os.remove(index_path(path))
+
+    with RecordingReader(path) as reader:
+        reader.write_index()
+    assert os.path.exists(index_path(path))
+    assert _read(path) == notifications
+
+
+def test_torn_record_is_ignored_and_cut_on_append(tmp_path):
+    path = str(tmp_path / "session.rec")
+    notifications = _notifications(500)
+    _record(path, notifications)
+    # A crash in the middle of a record leaves a partial header and payload behind
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00\x00\x01\x00torn")
+
+    assert _read(path) == notifications
+
+    more = [(timestamp_ns + 1_000_000_000, uuid, payload) for timestamp_ns, uuid, payload in _notifications(100)]
+    _record(path, more)
+    assert _read(path) == notifications + more
+    assert _read(path, use_index=False) == notifications + more
+
+
+def test_stale_index_entries_are_cut_on_append(tmp_path):
+    path = str(tmp_path / "session.rec")
+    notifications = _notifications(500)
+    _record(path, notifications)
+    valid_end = os.path.getsize(path)
+    # The index reached the OS ahead of the torn record it points to, then tore itself
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00\x00\x01\x00torn")
+    with open(index_path(path), "ab") as f:
+        f.write(INDEX_ENTRY.pack(INDEX_SEEK_POINT, 10 ** 15, valid_end))
+        f.write(b"\x00\x01")
+
+    more = [(timestamp_ns + 1_000_000_000, uuid, payload) for timestamp_ns, uuid, payload in _notifications(100)]
+    _record(path, more, index_interval=10)
+    assert (os.path.getsize(index_path(path)) - 8) % INDEX_ENTRY.size == 0
+    assert _read(path) == notifications + more
+    assert _read(path, 1_050_000_000) == [n for n in more if n[0] >= 1_050_000_000]
+
+
+def test_append_without_sidecar_keeps_definitions(tmp_path):
+    path = str(tmp_path / "session.rec")
+    notifications = _notifications(500)
+    _record(path, notifications)
+    os.remove(index_path(path))
+
+    more = [(timestamp_ns + 1_000_000_000, uuid, payload) for timestamp_ns, uuid, payload in _notifications(100)]
+    _record(path, more)
+    assert _read(path, 1_000_000_000) == more
+
+
+def test_appended_session_from_restarted_clock_follows_the_file(tmp_path):
+    path = str(tmp_path / "session.rec")
+    notifications = _notifications(500)
+    _record(path, notifications, index_interval=50)
+    # A new boot: the monotonic clock starts over below the end of the file
+    _record(path, _notifications(100), index_interval=50)
+
+    with RecordingReader(path) as reader:
+        assert len(reader.sessions) == 2
+        first_ns = reader.sessions[1][0]
+        assert first_ns > notifications[-1][0]
+        assert reader.wall_clock_ns(first_ns) == reader.sessions[1][1]
+    records = _read(path)
+    timestamps = [timestamp_ns for timestamp_ns, _, _ in records]
+    assert timestamps == sorted(timestamps)
+    assert [(uuid, payload) for _, uuid, payload in records[500:]] == [(uuid, payload) for _, uuid, payload in _notifications(100)]
+    assert timestamps[500:] == [first_ns + timestamp_ns for timestamp_ns, _, _ in _notifications(100)]
+    # Slicing by time stays exact across the session boundary
+    assert _read(path, first_ns) == records[500:]
+    assert _read(path, None, first_ns) == records[:500]
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a recording at all")
+    with pytest.raises(RecordingError):
+        RecordingReader(str(path))
@@ -0,0 +1,124 @@
+# tests/test_core/test_reduction.py
+import math
+import random
+
+import pytest
+
+from src.core.reduction import AccelerometerReducer, MovementWindow, activity_count, lttb
+
+SECOND_NS = 1_000_000_000
+STEP_NS = SECOND_NS // 100
+
+
+def _columns(count, start_ns=0):
+    rng = random.Random(15)
+    timestamps = [start_ns + n * STEP_NS for n in range(count)]
+    x = [rng.uniform(-1, 1) for _ in range(count)]
+    y = [rng.uniform(-1, 1) for _ in range(count)]
+    z = [1.0 + rng.uniform(-0.5, 0.5) for _ in range(count)]
+    return timestamps, x, y, z
+
+
+def _reducer(**kwargs):
+    windows = []
+    return AccelerometerReducer(windows.append, **kwargs), windows
+
+
+def _summary(windows):
+    return [(w.start_ns, w.end_ns, w.count, w.mean, w.energy, w.activity_count) for w in windows]
+
+
+def test_windows_close_on_boundaries_and_flush():
+    reducer, windows = _reducer()
+    reducer.add_columns(*_columns(350))
+    assert [(w.start_ns, w.end_ns, w.count) for w in windows] == [
+        (0, SECOND_NS, 100), (SECOND_NS, 2 * SECOND_NS, 100), (2 * SECOND_NS, 3 * SECOND_NS, 100)
+    ]
+    reducer.flush()
+    assert windows[-1].start_ns == 3 * SECOND_NS and windows[-1].count == 50
+    reducer.flush()
+    assert len(windows) == 4
+    assert (reducer.samples_in, reducer.windows_out) == (350, 4)
+
+
+def test_windows_do_not_depend_on_batching():
+    columns = _columns(500, start_ns=SECOND_NS // 3)
+    reducer, whole = _reducer()
+    reducer.add_columns(*columns)
+    reducer, chunked = _reducer()
+    for start in range(0, 500, 7):
+        reducer.add_columns(*(column[start:start + 7] for column in columns))
+    assert _summary(whole) == _summary(chunked)
+    # Windows are aligned to multiples of the window length
+    assert whole[0].start_ns == 0 and whole[0].count == 67
+
+
+def test_out_of_order_batch_is_sorted():
+    timestamps, x, y, z = _columns(300)
+    reducer, ordered = _reducer()
+    reducer.add_columns(timestamps, x, y, z)
+    order = list(range(300))
+    random.Random(1).shuffle(order)
+    reducer, shuffled = _reducer()
+    reducer.add_columns(*([column[i] for i in order] for column in (timestamps, x, y, z)))
+    assert [(w.start_ns, w.count) for w in shuffled] == [(w.start_ns, w.count) for w in ordered]
+    for a, b in zip(shuffled, ordered):
+        assert a.mean == pytest.approx(b.mean)
+        assert a.energy == pytest.approx(b.energy)
+
+
+def test_late_samples_join_the_open_window():
+    reducer, windows = _reducer()
+    reducer.add_columns([0, SECOND_NS + 1], [0.0, 0.0], [0.0, 0.0], [1.0, 1.0])
+    reducer.add_columns([SECOND_NS // 2], [0.0], [0.0], [1.0])
+    reducer.flush()
+    assert [(w.start_ns, w.count) for w in windows] == [(0, 1), (SECOND_NS, 2)]
+
+
+def test_stats_and_activity():
+    reducer, windows = _reducer(modes=(AccelerometerReducer.STATS, AccelerometerReducer.ACTIVITY))
+    reducer.add_columns([0, STEP_NS, 2 * STEP_NS], [0.0, 0.0, 0.6], [0.0, 0.0, 0.0], [1.0, -1.0, 0.8])
+    reducer.flush()
+    window = windows[0]
+    assert window.mean == pytest.approx((0.2, 0.0, 0.8 / 3))
+    assert window.min == (0.0, 0.0, -1.0) and window.max == (0.6, 0.0, 1.0)
+    assert window.energy == pytest.approx(1.0)
+    # Every sample has a magnitude of 1 g
+    assert window.activity_count == pytest.approx(0.0)
+    assert window.lttb is None
+    assert set(window.as_dict()) == {"start_ns", "end_ns", "count", "mean", "min", "max", "energy", "activity_count"}
+
+
+def test_lttb_mode_keeps_the_endpoints():
+    reducer, windows = _reducer(modes=(AccelerometerReducer.LTTB,), lttb_points=10)
+    timestamps, x, y, z = _columns(100)
+    reducer.add_columns(timestamps, x, y, z)
+    reducer.flush()
+    points = windows[0].lttb
+    assert len(points) == 10
+    assert points[0] == (timestamps[0], math.hypot(x[0], y[0], z[0]))
+    assert points[-1][0] == timestamps[-1]
+    assert [t for t, _ in points] == sorted(t for t, _ in points)
+    assert windows[0].mean is None and windows[0].activity_count is None
+
+
+def test_raw_columns_on_demand():
+    reducer, windows = _reducer(raw_history=2)
+    reducer.capture_raw()
+    reducer.add_columns(*_columns(400))
+    assert windows[0].raw is not None and list(windows[0].raw["timestamp_ns"])[:2] == [0, STEP_NS]
+    assert windows[1].raw is None
+    # Only the two most recent windows are retained
+    assert reducer.get_raw(0) is None
+    assert len(reducer.get_raw(2 * SECOND_NS + 5)["x"]) == 100
+
+
+def test_lttb_and_activity_count():
+    assert lttb([0, 1], [0.0, 1.0], 5) == [0, 1]
+    with pytest.raises(ValueError):
+        lttb(list(range(10)), [0.0] * 10, 2)
+    values = [0.0] * 20
+    values[7] = 5.0
+    assert 7 in lttb(list(range(20)), values, 4)
+    assert activity_count([1.0, 1.05, 1.5, 0.4]) == pytest.approx((0.5 - 0.068) + (0.6 - 0.068))
+    assert MovementWindow(0, 1, 0).as_dict() == {"start_ns": 0, "end_ns": 1, "count": 0}
@@ -0,0 +1,88 @@
+# tests/test_core/test_samples.py
+import pytest
+
+from src.core.samples import CHARACTERISTIC_IDS, CharacteristicRegistry, Sample, SampleRingBuffer, SampleStore
+from src.devices.whoop.data_parser import WhoopDataParser
+from src.devices.whoop.protocol import WhoopProtocol
+
+BATTERY_UUID = WhoopProtocol.CHARACTERISTICS["BATTERY_LEVEL"]["uuid"]
+ACCEL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"]
+OPAQUE_UUID = "0000beef-0000-1000-8000-00805f9b34fb"
+
+
+def test_registry_ids_are_stable_across_case():
+    registry = CharacteristicRegistry()
+    first = registry.get_id("0000ABCD-0000-1000-8000-00805F9B34FB")
+    second = registry.get_id("0000abcd-0000-1000-8000-00805f9b34fb", "value")
+    other = registry.get_id(OPAQUE_UUID)
+    assert first == second == 0 and other == 1
+    assert len(registry) == 2
+    assert registry.uuid(first) == "0000abcd-0000-1000-8000-00805f9b34fb"
+    # The field is filled in once known and never replaced
+    assert registry.field(first) == "value"
+    registry.get_id("0000ABCD-0000-1000-8000-00805F9B34FB", "other")
+    assert registry.field(first) == "value"
+
+
+def test_sample_round_trips_through_the_shared_registry():
+    sample = WhoopDataParser.parse_sample(BATTERY_UUID.upper(), bytearray(b"\x50"), 7)
+    assert sample.char_id == CHARACTERISTIC_IDS.get_id(BATTERY_UUID)
+    assert sample.characteristic == BATTERY_UUID.lower()
+    assert sample.field == "battery_level"
+    assert isinstance(sample.raw, bytes)
+    assert sample.to_dict(include_raw=True) == {
+        "characteristic": BATTERY_UUID.lower(), "timestamp_ns": 7, "raw": "50", "battery_level": 80
+    }
+    unknown = WhoopDataParser.parse_sample(OPAQUE_UUID, b"\x01", 8)
+    assert unknown.value is None and unknown.to_dict() == {"characteristic": OPAQUE_UUID, "timestamp_ns": 8}
+
+
+def test_ring_buffer_wraps_around():
+    buffer = SampleRingBuffer(4, typecode='q')
+    for n in range(10):
+        buffer.append(n, n * 10)
+    assert len(buffer) == buffer.capacity == 4
+    columns = buffer.to_columns()
+    assert list(columns["timestamp_ns"]) == [6, 7, 8, 9]
+    assert list(columns["value_0"]) == [60, 70, 80, 90]
+
+
+def test_ring_buffer_partial_and_wide():
+    buffer = SampleRingBuffer(5, width=3)
+    for n in range(3):
+        buffer.append(n, (n, n + 0.5, -n))
+    assert len(buffer) == 3
+    columns = buffer.to_columns()
+    assert list(columns["value_1"]) == [0.5, 1.5, 2.5]
+    assert list(columns["value_2"]) == [0.0, -1.0, -2.0]
+    with pytest.raises(ValueError):
+        SampleRingBuffer(0)
+
+
+def test_store_keeps_numbers_in_ring_buffers_and_the_rest_as_samples():
+    store = SampleStore(capacity=3)
+    battery_id = CHARACTERISTIC_IDS.get_id(BATTERY_UUID, "battery_level")
+    accel_id = CHARACTERISTIC_IDS.get_id(ACCEL_UUID, "movement")
+    opaque_id = CHARACTERISTIC_IDS.get_id(OPAQUE_UUID)
+    for n in range(5):
+        store.add(Sample(n * 3, battery_id, b"", 80 - n))
+        store.add(Sample(n * 3 + 1, accel_id, b"", [n, 0.0, 1.0]))
+        store.add(Sample(n * 3 + 2, opaque_id, b"\x01", b"\x01"))
+    assert set(store.buffers) == {battery_id, accel_id}
+    assert store.buffers[battery_id].typecode == 'q'
+    assert len(store) == 9
+
+    rows = store.to_dicts()
+    assert [row["timestamp_ns"] for row in rows] == list(range(6, 15))
+    assert rows[0] == {"characteristic": BATTERY_UUID.lower(), "timestamp_ns": 6, "battery_level": 78}
+    assert rows[1]["movement"] == [2.0, 0.0, 1.0]
+
+
+def test_store_falls_back_for_values_that_do_not_fit():
+    store = SampleStore(capacity=4)
+    accel_id = CHARACTERISTIC_IDS.get_id(ACCEL_UUID, "movement")
+    store.add(Sample(1, accel_id, b"", [1.0, 2.0, 3.0]))
+    store.add(Sample(2, accel_id, b"", [1.0, 2.0]))
+    store.add(Sample(3, accel_id, b"", None))
+    assert len(store.buffers[accel_id]) == 1
+    assert [sample.timestamp_ns for sample in store.objects[accel_id]] == [2, 3]
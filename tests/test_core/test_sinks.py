@@ -0,0 +1,121 @@
+# tests/test_core/test_sinks.py
+import sqlite3
+import threading
+from fractions import Fraction
+
+import pytest
+
+from src.core.sinks import ColumnarFileSink, ColumnarReader, SampleSink, SQLiteSink, to_row
+from src.devices.whoop.data_parser import WhoopDataParser
+from src.protocols.ble.heart_rate import HEART_RATE_MEASUREMENT_UUID
+from src.protocols.ble.passive import ADVERTISEMENT_CHARACTERISTIC
+
+BATTERY_UUID = "00002a19-0000-1000-8000-00805f9b34fb"
+
+
+def test_row_keeps_every_advertisement_field():
+    advertisement = {
+        "characteristic": ADVERTISEMENT_CHARACTERISTIC,
+        "timestamp_ns": 5,
+        "address": "AA:BB:CC:DD:EE:FF",
+        "rssi": -60,
+        "heart_rate": 72,
+    }
+    assert to_row(advertisement) == (5, ADVERTISEMENT_CHARACTERISTIC, None, {
+        "address": "AA:BB:CC:DD:EE:FF", "rssi": -60, "heart_rate": 72
+    })
+
+
+def test_row_of_single_field_dict():
+    parsed = {"characteristic": BATTERY_UUID, "timestamp_ns": 5, "raw": "50", "battery_level": 80}
+    assert to_row(parsed) == (5, BATTERY_UUID, "battery_level", 80)
+    assert to_row({"battery_level": 80}) is None
+
+
+def test_row_of_parser_dict_matches_its_sample():
+    payload = bytes.fromhex("10480004")
+    parsed = WhoopDataParser.parse_characteristic_data(HEART_RATE_MEASUREMENT_UUID, payload)
+    parsed["timestamp_ns"] = 5
+    sample = WhoopDataParser.parse_sample(HEART_RATE_MEASUREMENT_UUID, payload, 5)
+
+    row = to_row(parsed, WhoopDataParser)
+    assert row == to_row(sample)
+    assert row[2] == "heart_rate_measurement"
+    assert row[3].heart_rate == 72
+    # Without the parser both decoded fields are kept
+    assert to_row(parsed)[2:] == (None, {"heart_rate_measurement": row[3], "heart_rate": 72})
+
+
+class _BlockingSink(SampleSink):
+    """Sink whose worker waits for `release` before every batch"""
+
+    def __init__(self, **kwargs):
+        super().__init__(flush_interval=0, **kwargs)
+        self.release = threading.Event()
+        self.written = []
+
+    def _open(self):
+        pass
+
+    def _write(self, rows):
+        self.release.wait(5)
+        self.written.extend(rows)
+
+    def _close(self):
+        pass
+
+
+def test_add_before_open_raises():
+    sink = _BlockingSink(batch_size=2)
+    sink.add_rows([(1, BATTERY_UUID, "battery_level", 80)])
+    with pytest.raises(RuntimeError, match="not open"):
+        sink.add_rows([(2, BATTERY_UUID, "battery_level", 80)])
+
+
+@pytest.mark.asyncio
+async def test_saturated_sink_drops_beyond_buffer():
+    sink = _BlockingSink(batch_size=2, max_pending=1, max_buffered=4)
+    await sink.open()
+    rows = [(n, BATTERY_UUID, "battery_level", n) for n in range(10)]
+    for row in rows:
+        sink.add_rows([row])
+    # One batch with the worker, four rows buffered, the rest dropped
+    assert len(sink._rows) == 4
+    assert sink.stats.rows_in == 10
+    assert sink.stats.rows_dropped == 4
+    sink.release.set()
+    await sink.close()
+    assert sink.written == rows[:6]
+    assert sink.stats.rows_written == 6
+
+
+@pytest.mark.asyncio
+async def test_columnar_round_trip(tmp_path):
+    path = str(tmp_path / "samples.col")
+    async with ColumnarFileSink(path, flush_interval=0) as sink:
+        sink.add_rows([(n, BATTERY_UUID, "battery_level", 80 - n) for n in range(10)])
+        sink.add({"characteristic": ADVERTISEMENT_CHARACTERISTIC, "timestamp_ns": 3, "address": "A", "rssi": -70})
+
+    reader = ColumnarReader(path)
+    assert list(reader.columns(BATTERY_UUID)["value"]) == [80.0 - n for n in range(10)]
+    assert reader.columns(ADVERTISEMENT_CHARACTERISTIC)["json"] == [{"address": "A", "rssi": -70}]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_characteristic_ids_survive_rolled_back_batch(tmp_path):
+    path = str(tmp_path / "samples.db")
+    async with SQLiteSink(path, flush_interval=0) as sink:
+        # SQLite cannot bind the value, failing the batch after its characteristic was inserted
+        sink.add_rows([(1, BATTERY_UUID, "battery_level", Fraction(1, 3))])
+        await sink.flush()
+        assert sink.stats.errors == 1
+
+        sink.add_rows([(2, BATTERY_UUID, "battery_level", 80)])
+        await sink.flush()
+        assert sink.stats.rows_written == 1
+
+    with sqlite3.connect(path) as db:
+        rows = db.execute(
+            "SELECT timestamp_ns, uuid, field, value FROM samples JOIN characteristics ON characteristics.id = char_id"
+        ).fetchall()
+    assert rows == [(2, BATTERY_UUID, "battery_level", 80.0)]
@@ -0,0 +1,71 @@
+# tests/test_devices/test_data_parser.py
+import random
+import struct
+
+import pytest
+
+from src.devices.whoop import data_parser
+from src.devices.whoop.data_parser import WhoopDataParser
+from src.devices.whoop.protocol import WhoopProtocol
+
+ACCEL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"]
+HRV_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_1"]["uuid"]
+
+rng = random.Random(2)
+ACCEL_PAYLOADS = [struct.pack("<hhh", *(rng.randint(-32768, 32767) for _ in range(3))) for _ in range(200)]
+# Notifications may carry extra bytes after the sample or be cut short
+ACCEL_PAYLOADS[5] += b"\x01\x02"
+ACCEL_PAYLOADS[7] = ACCEL_PAYLOADS[7][:4]
+ACCEL_PAYLOADS[9] = b""
+HRV_PAYLOADS = [struct.pack("<H", rng.randint(0, 65535)) for _ in range(200)]
+HRV_PAYLOADS[3] = HRV_PAYLOADS[3][:1]
+HRV_PAYLOADS[4] += b"\xff"
+
+numpy_modes = [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(data_parser.np is None, reason="numpy not installed")),
+]
+
+
+def _per_sample(uuid, field, payloads):
+    values = [WhoopDataParser.parse_characteristic_data(uuid, payload)[field] for payload in payloads]
+    return [value for value in values if value is not None]
+
+
+@pytest.mark.parametrize("use_numpy", numpy_modes)
+def test_accelerometer_batch_matches_per_sample(use_numpy):
+    columns = WhoopDataParser.parse_accelerometer_batch(ACCEL_PAYLOADS, use_numpy=use_numpy)
+    expected = _per_sample(ACCEL_UUID, "movement", ACCEL_PAYLOADS)
+    assert len(expected) == len(ACCEL_PAYLOADS) - 2
+    assert [list(sample) for sample in zip(columns["x"], columns["y"], columns["z"])] == expected
+
+
+@pytest.mark.parametrize("use_numpy", numpy_modes)
+def test_hrv_batch_matches_per_sample(use_numpy):
+    column = WhoopDataParser.parse_hrv_batch(HRV_PAYLOADS, use_numpy=use_numpy)["hrv"]
+    expected = _per_sample(HRV_UUID, "hrv", HRV_PAYLOADS)
+    assert len(expected) == len(HRV_PAYLOADS) - 1
+    assert list(column) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("use_numpy", numpy_modes)
+def test_concatenated_buffer_drops_trailing_partial_sample(use_numpy):
+    whole = [payload for payload in ACCEL_PAYLOADS if len(payload) == 6]
+    buffer = bytearray(b"".join(whole) + b"\x00\x01\x02")
+    columns = WhoopDataParser.parse_accelerometer_batch(memoryview(buffer), use_numpy=use_numpy)
+    assert list(columns["z"]) == [WhoopDataParser.parse_accelerometer(payload)[2] for payload in whole]
+    assert len(WhoopDataParser.parse_hrv_batch(b"\x01", use_numpy=use_numpy)["hrv"]) == 0
+
+
+@pytest.mark.parametrize("use_numpy", numpy_modes)
+def test_batch_decoders_are_dispatched_by_uuid(use_numpy):
+    columns = WhoopDataParser.parse_batch(ACCEL_UUID.upper(), iter(ACCEL_PAYLOADS[:3]), use_numpy=use_numpy)
+    assert list(columns["x"]) == [WhoopDataParser.parse_accelerometer(p)[0] for p in ACCEL_PAYLOADS[:3]]
+    with pytest.raises(ValueError):
+        WhoopDataParser.parse_batch(WhoopProtocol.CHARACTERISTICS["BATTERY_LEVEL"]["uuid"], [b"\x50"])
+
+
+@pytest.mark.skipif(data_parser.np is not None, reason="numpy installed")
+def test_numpy_mode_requires_numpy():
+    with pytest.raises(ImportError):
+        WhoopDataParser.parse_accelerometer_batch(ACCEL_PAYLOADS, use_numpy=True)
@@ -0,0 +1,61 @@
+# tests/test_devices/test_garmin.py
+import asyncio
+
+import pytest
+
+from src.devices.garmin.collector import GarminCollector
+from src.devices.garmin.fake import FakeGarminSensor
+from src.devices.garmin.protocol import GarminProtocol
+from src.protocols.ble.cycling_power import CyclingPowerMeasurement
+from src.protocols.ble.fake import FakeBleakClient
+
+
+async def _collect(sensor, **kwargs):
+    received = []
+    collector = GarminCollector(
+        device_address=sensor.address,
+        data_callback=lambda data_type, data: received.append((data_type, data)),
+        client_factory=lambda address, **kw: FakeBleakClient(sensor, **kw),
+        **kwargs
+    )
+    await collector.connect()
+    await collector.start_collection()
+    await asyncio.sleep(0.2)
+    await collector.stop_collection()
+    await collector.disconnect()
+    return received
+
+
+def _fast_sensor(address):
+    return FakeGarminSensor(address, notify_rates={
+        GarminProtocol.profile_measurement(profile): 100.0 for profile in GarminProtocol.PROFILES
+    })
+
+
+@pytest.mark.asyncio
+async def test_collects_only_selected_profiles():
+    received = await _collect(_fast_sensor("FA:KE:00:00:01:01"), profiles=("cycling_power",))
+
+    assert len(received) > 5
+    assert {data_type for data_type, _ in received} == {"garmin_data"}
+    for _, data in received:
+        assert isinstance(data["cycling_power"], CyclingPowerMeasurement)
+        assert not {"heart_rate_measurement", "running_speed_cadence", "cycling_speed_cadence"} & data.keys()
+    first = received[0][1]["cycling_power"]
+    assert first.pedal_power_balance == 50.0
+    assert 200 <= first.power < 300
+
+
+@pytest.mark.asyncio
+async def test_collects_every_profile():
+    received = await _collect(_fast_sensor("FA:KE:00:00:01:02"))
+
+    fields = set()
+    for _, data in received:
+        fields.update(data)
+    assert {"heart_rate_measurement", "running_speed_cadence", "cycling_speed_cadence", "cycling_power"} <= fields
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        GarminCollector(device_address="FA:KE:00:00:01:03", profiles=("rowing",))
@@ -0,0 +1,96 @@
+# tests/test_devices/test_history.py
+import random
+
+import pytest
+
+from src.devices.whoop import history
+from src.devices.whoop.fake import FakeHistoryServer, FakeWhoop
+from src.devices.whoop.history import HistoryError, HistoryOffload
+from src.protocols.ble.fake import FakeBleakClient
+
+
+def _strap(size=40_000, first_offset=0, **kwargs):
+    data = random.Random(25).randbytes(size)
+    device = FakeWhoop("FA:KE:00:00:00:25", notify_rates={}, mtu=247, connection_interval=0.001, seed=25, **kwargs)
+    server = FakeHistoryServer(data, first_offset=first_offset).attach(device)
+    return device, server, data
+
+
+async def _connect(device):
+    client = FakeBleakClient(device)
+    await client.connect()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_download_delivers_windows_in_order():
+    device, server, data = _strap(first_offset=1000)
+    chunks = []
+    async with HistoryOffload(await _connect(device), window=4096, pipeline_depth=4) as offload:
+        assert await offload.info() == (1000, 1000 + len(data))
+        received = await offload.download(on_chunk=lambda offset, view: chunks.append((offset, bytes(view))))
+
+    assert bytes(received) == data
+    assert [offset for offset, _ in chunks] == list(range(1000, 1000 + len(data), 4096))
+    assert b"".join(chunk for _, chunk in chunks) == data
+    assert offload.progress.next_offset == 1000 + len(data)
+    assert offload.progress.retries == 0
+
+
+@pytest.mark.asyncio
+async def test_download_rerequests_gaps_from_lost_notifications():
+    device, server, data = _strap(notification_loss=0.05)
+    async with HistoryOffload(await _connect(device), window=2048, timeout=0.1, max_retries=20) as offload:
+        received = await offload.download()
+
+    assert server.notifications_lost > 0
+    assert bytes(received) == data
+    assert offload.progress.retries > 0
+
+
+@pytest.mark.asyncio
+async def test_download_retries_lost_request():
+    device, server, data = _strap(size=8192)
+    serve = device.write_handlers[history.WRITE_UUID.lower()]
+    writes = []
+
+    def lose_first_read(client, payload, response):
+        writes.append(payload)
+        # The HISTORY_INFO query goes first, then the first READ is lost
+        if len(writes) != 2:
+            serve(client, payload, response)
+
+    device.write_handlers[history.WRITE_UUID.lower()] = lose_first_read
+    async with HistoryOffload(await _connect(device), window=4096, pipeline_depth=1, timeout=0.05) as offload:
+        received = await offload.download()
+
+    assert bytes(received) == data
+    assert offload.progress.retries == 1
+    assert offload.progress.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_download_resumes_after_link_drop():
+    device, server, data = _strap(size=160_000, drop_schedule=[0.05])
+    received = bytearray()
+    with pytest.raises(HistoryError) as raised:
+        async with HistoryOffload(await _connect(device), window=4096, timeout=0.1) as offload:
+            await offload.download(on_chunk=lambda offset, view: received.extend(view))
+
+    progress = raised.value.progress
+    assert 0 < progress.next_offset < len(data)
+    assert len(received) == progress.next_offset
+
+    async with HistoryOffload(await _connect(device), window=4096, timeout=0.1) as offload:
+        await offload.download(progress.next_offset, on_chunk=lambda offset, view: received.extend(view))
+    assert bytes(received) == data
+
+
+@pytest.mark.asyncio
+async def test_acknowledge_frees_history():
+    device, server, data = _strap(size=10_000)
+    async with HistoryOffload(await _connect(device)) as offload:
+        assert await offload.acknowledge(4000) == (4000, 10_000)
+        assert bytes(await offload.download()) == data[4000:]
+        with pytest.raises(HistoryError):
+            await offload.download(0)
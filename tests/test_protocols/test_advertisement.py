@@ -0,0 +1,69 @@
+# tests/test_protocols/test_advertisement.py
+import struct
+from collections import namedtuple
+from types import SimpleNamespace
+
+import pytest
+from bleak import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+from src.protocols.ble.advertisement import APPLE_COMPANY_ID, AdvertisementDecoder, StructParser
+
+DEVICE = BLEDevice("AA:BB:CC:DD:EE:FF", "Sensor", None)
+# bleak's WinRT backend passes (sender, _RawAdvData(adv, scan))
+RawAdvData = namedtuple("RawAdvData", ["adv", "scan"])
+
+
+def _advertisement(platform_data=(), **kwargs):
+    fields = dict(local_name=None, manufacturer_data={}, service_data={}, service_uuids=[],
+                  tx_power=None, rssi=-60, platform_data=platform_data)
+    fields.update(kwargs)
+    return AdvertisementData(**fields)
+
+
+@pytest.mark.parametrize("platform_data, expected", [
+    ((object(), {"kCBAdvDataIsConnectable": 1}, -60), True),
+    ((object(), {"kCBAdvDataIsConnectable": 0}, -60), False),
+    ((object(), {}, -60), None),
+    (("/org/bluez/hci0/dev_AA_BB", {"Address": "AA:BB:CC:DD:EE:FF", "Connected": False}), None),
+    ((object(), RawAdvData(SimpleNamespace(is_connectable=True), None)), True),
+    ((object(), RawAdvData(None, SimpleNamespace(is_connectable=False))), False),
+    ((object(), RawAdvData(SimpleNamespace(advertisement_type=0), None)), True),
+    ((object(), RawAdvData(SimpleNamespace(advertisement_type=3), None)), False),
+    ((object(), RawAdvData(None, SimpleNamespace(advertisement_type=4))), None),
+    ((), None),
+], ids=["cb-connectable", "cb-not-connectable", "cb-missing", "bluez", "winrt-flag", "winrt-scan-flag",
+        "winrt-type-connectable", "winrt-type-non-connectable", "winrt-scan-response-type", "none"])
+def test_connectable_per_backend(platform_data, expected):
+    decoded = AdvertisementDecoder().decode(DEVICE, _advertisement(platform_data))
+    assert decoded.is_connectable is expected
+
+
+def test_corebluetooth_dictionary():
+    ibeacon = struct.pack("<H", APPLE_COMPANY_ID) + b"\x02\x15" + bytes(range(16)) + struct.pack(">HHb", 1, 2, -59)
+    decoded = AdvertisementDecoder().decode(DEVICE, {
+        "kCBAdvDataServiceUUIDs": ["180F"],
+        "kCBAdvDataManufacturerData": ibeacon,
+        "kCBAdvDataServiceData": {"180f": b"\x55"},
+        "kCBAdvDataIsConnectable": True,
+    })
+    assert decoded.local_name == "Sensor"
+    assert decoded.service_uuids == ["0000180f-0000-1000-8000-00805f9b34fb"]
+    assert decoded.is_connectable is True
+    assert decoded.decoded == {
+        "ibeacon_uuid": bytes(range(16)).hex(), "ibeacon_major": 1, "ibeacon_minor": 2,
+        "ibeacon_measured_power": -59, "battery_level": 0x55,
+    }
+    assert AdvertisementDecoder().decode(DEVICE, {}).is_connectable is None
+
+
+def test_registered_parsers():
+    decoder = AdvertisementDecoder(
+        manufacturer_parsers={0x0087: StructParser("<Hb", ("counter", "temperature"), scale={"temperature": 0.5})}
+    )
+    decoded = decoder.decode(DEVICE, _advertisement(manufacturer_data={0x0087: b"\x05\x00\x2a", 0x0006: b"\x01"}))
+    assert decoded.decoded == {"counter": 5, "temperature": 21.0}
+    # Payloads too short for the layout are skipped
+    assert decoder.decode(DEVICE, _advertisement(manufacturer_data={0x0087: b"\x05"})).decoded == {}
+    with pytest.raises(ValueError):
+        StructParser("<H", ("a", "b"))
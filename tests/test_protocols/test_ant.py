@@ -0,0 +1,124 @@
+# tests/test_protocols/test_ant.py
+import asyncio
+
+import pytest
+
+from src.protocols.ant import messages, pages
+from src.protocols.ant.channel import ChannelConfig, ChannelId
+from src.protocols.ant.fake import FakeAntSensor, FakeAntStick
+from src.protocols.ant.framing import BurstAssembler, FrameParser, burst_packets
+from src.protocols.ant.node import AntNode
+from src.protocols.ant.transport import LoopbackTransport
+
+
+def test_frame_parser_skips_corrupted_frames():
+    frames = [messages.encode_data(messages.BROADCAST_DATA, n, bytes([n]) * 8) for n in range(6)]
+    corrupted = bytearray(frames[2])
+    corrupted[-1] ^= 0xFF
+    stream = b"".join(frames[:2]) + bytes(corrupted) + b"".join(frames[3:])
+
+    received = []
+    parser = FrameParser(lambda msg_id, payload: received.append((msg_id, bytes(payload))))
+    for offset in range(0, len(stream), 5):
+        parser.feed(stream[offset:offset + 5])
+
+    assert [payload[0] for _, payload in received] == [0, 1, 3, 4, 5]
+    assert all(msg_id == messages.BROADCAST_DATA for msg_id, _ in received)
+    assert parser.stats.checksum_errors == 1
+
+
+def test_burst_round_trip_and_abort():
+    data = bytes(range(100))
+    packets = list(burst_packets(3, data))
+    assert len(packets) == 13
+
+    assembler = BurstAssembler(capacity=16)
+    results = [assembler.add(sequence, chunk) for sequence, chunk in packets]
+    assert all(result is None for result in results[:-1])
+    assert bytes(results[-1]) == data + bytes(4)
+
+    # A lost packet aborts the transfer
+    for sequence, chunk in packets[:5] + packets[6:]:
+        assert assembler.add(sequence, chunk) is None
+    assert assembler.aborted == 1
+    assert assembler.completed == 1
+
+
+async def _node(sensors, speedup=20.0, max_channels=8):
+    host, device = LoopbackTransport.pair(64)
+    stick = FakeAntStick(device, sensors, max_channels=max_channels, speedup=speedup, seed=22)
+    node = AntNode(host, max_channels=max_channels, response_timeout=0.5)
+    await stick.start()
+    await node.start()
+    return node, stick
+
+
+@pytest.mark.asyncio
+async def test_channels_receive_their_own_sensor():
+    sensors = [
+        FakeAntSensor(101, pages.HEART_RATE),
+        FakeAntSensor(202, pages.BIKE_POWER),
+        FakeAntSensor(303, pages.BIKE_SPEED_CADENCE),
+    ]
+    node, stick = await _node(sensors)
+    received = {}
+
+    def on_data(channel, timestamp_ns, data, channel_id):
+        decoded = pages.decode_page(channel.config.device_type, data)
+        received.setdefault(channel.config.device_number, []).append(decoded)
+
+    try:
+        channels = [
+            await node.open_channel(ChannelConfig(sensor.channel_id.device_type, sensor.channel_id.device_number), on_data)
+            for sensor in sensors
+        ]
+        await asyncio.sleep(0.4)
+        assert await node.request_channel_id(channels[1]) == ChannelId(202, pages.BIKE_POWER, 1)
+        await node.close_channel(channels[0])
+        assert 0 not in node.channels
+    finally:
+        await node.stop()
+        await stick.stop()
+
+    assert set(received) == {101, 202, 303}
+    for pages_received in received.values():
+        assert len(pages_received) >= 3
+        assert all(page is not None for page in pages_received)
+    assert isinstance(received[101][0], pages.HeartRatePage)
+
+
+@pytest.mark.asyncio
+async def test_scan_mode_reports_each_device():
+    sensors = [FakeAntSensor(500 + n, pages.HEART_RATE) for n in range(4)]
+    node, stick = await _node(sensors)
+    seen = set()
+    try:
+        await node.open_scan_mode(
+            ChannelConfig(pages.HEART_RATE), lambda channel, timestamp_ns, data, channel_id: seen.add(channel_id)
+        )
+        await asyncio.sleep(0.4)
+    finally:
+        await node.stop()
+        await stick.stop()
+    assert seen == {sensor.channel_id for sensor in sensors}
+
+
+@pytest.mark.asyncio
+async def test_bursts_in_both_directions():
+    payload = bytes(range(60))
+    sensor = FakeAntSensor(7, pages.BIKE_POWER, burst=lambda n: payload, burst_every=2)
+    node, stick = await _node([sensor])
+    bursts = []
+    try:
+        channel = await node.open_channel(
+            ChannelConfig(pages.BIKE_POWER, 7), on_burst=lambda channel, data: bursts.append(bytes(data))
+        )
+        await node.send_burst(channel, b"host to sensor")
+        await asyncio.sleep(0.4)
+    finally:
+        await node.stop()
+        await stick.stop()
+
+    assert stick.received_bursts == [(channel.number, b"host to sensor" + bytes(2))]
+    assert bursts and all(burst == payload + bytes(4) for burst in bursts)
+    assert node.stats.bursts == len(bursts)
@@ -0,0 +1,124 @@
+# tests/test_protocols/test_collector.py
+import asyncio
+import struct
+
+import pytest
+
+from src.core.pipeline import BackpressurePolicy
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.data_parser import WhoopDataParser
+from src.devices.whoop.fake import FakeWhoop
+from src.devices.whoop.protocol import WhoopProtocol
+from src.protocols.ble.fake import FakeBleakClient
+
+ACCEL_UUID = WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_2"]["uuid"]
+
+
+class _CountingParser(WhoopDataParser):
+    lookups = 0
+
+    @classmethod
+    def get_decoder(cls, characteristic_uuid):
+        cls.lookups += 1
+        return super().get_decoder(characteristic_uuid)
+
+
+class _LambdaParser(WhoopDataParser):
+    # Compiled profile decoders are closures too, which cannot be pickled
+    DECODERS = {**WhoopDataParser.DECODERS, ACCEL_UUID.lower(): ("x", lambda data: struct.unpack_from("<h", data)[0])}
+
+
+@pytest.mark.asyncio
+async def test_block_policy_never_queues_callback_tasks():
+    device = FakeWhoop("FA:KE:00:00:00:03", notify_rates={ACCEL_UUID: 2000.0})
+    release = asyncio.Event()
+
+    async def slow_consumer(batch):
+        await release.wait()
+
+    collector = WhoopCollector(
+        device_address=device.address,
+        data_callback=lambda data_type, data: None,
+        queue_size=16,
+        backpressure=BackpressurePolicy.BLOCK,
+        client_factory=lambda address, **kwargs: FakeBleakClient(device, **kwargs)
+    )
+    await collector.connect()
+    await collector.start_collection()
+    collector.pipeline.consumer = slow_consumer
+    tasks_before = len(asyncio.all_tasks())
+    await asyncio.sleep(0.1)
+
+    # Notifications beyond the queue are dropped instead of waiting in tasks
+    assert not asyncio.iscoroutinefunction(next(iter(collector.client._callbacks.values())))
+    assert len(asyncio.all_tasks()) <= tasks_before
+    assert collector.pipeline.depth <= 16
+    assert collector.pipeline.stats.dropped > 0
+    release.set()
+    await collector.stop_collection()
+    await collector.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_queued_notifications_keep_their_decoder():
+    device = FakeWhoop("FA:KE:00:00:00:04", notify_rates={ACCEL_UUID: 500.0})
+    received = []
+    collector = WhoopCollector(
+        device_address=device.address,
+        data_callback=lambda data_type, data: received.append(data),
+        client_factory=lambda address, **kwargs: FakeBleakClient(device, **kwargs)
+    )
+    collector.PARSER = _CountingParser
+    await collector.connect()
+    await collector.start_collection()
+    await asyncio.sleep(0.2)
+    await collector.stop_collection()
+    await collector.disconnect()
+
+    assert len(received) > 50
+    # Parser dicts carry their arrival time
+    timestamps = [data["timestamp_ns"] for data in received]
+    assert timestamps == sorted(timestamps) and timestamps[0] > 0
+    # Resolved once per GATT handle on arrival, never again on the consumer
+    assert _CountingParser.lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_spilled_notifications_drop_unpicklable_decoder():
+    received = []
+    collector = WhoopCollector(
+        device_address="FA:KE:00:00:00:05",
+        data_callback=lambda data_type, data: received.append(data["x"]),
+        queue_size=4,
+        backpressure=BackpressurePolicy.SPILL
+    )
+    collector.PARSER = _LambdaParser
+    for n in range(50):
+        collector._handle_data(ACCEL_UUID, bytearray(struct.pack("<hhh", n, 0, 0)))
+    # Let the spill thread write the overflow before it is read back
+    await asyncio.sleep(0.05)
+    await collector.pipeline.start()
+    await collector.pipeline.stop()
+
+    assert collector.pipeline.stats.spilled > 0
+    assert collector.pipeline.stats.dropped == 0
+    assert received == list(range(50))
+
+
+def test_reduced_and_reassembled_output_without_callback():
+    received = []
+    collector = WhoopCollector(
+        device_address="FA:KE:00:00:00:06",
+        data_callback=lambda data_type, data: received.append(data),
+        queue_size=None,
+        reduce_movement=True,
+        reassemble_streams=True
+    )
+    for n in range(10):
+        collector._handle_data(ACCEL_UUID, bytearray(struct.pack("<hhh", n, 0, 0)))
+    # Detached consumers stop receiving windows and frames instead of failing
+    collector.data_callback = None
+    collector.reducer.flush()
+    reassembler = next(iter(collector.reassemblers.values()))
+    reassembler.on_frame(0, memoryview(b"frame"), None)
+    assert received == []
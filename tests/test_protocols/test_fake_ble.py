@@ -0,0 +1,101 @@
+# tests/test_protocols/test_fake_ble.py
+import asyncio
+
+import pytest
+
+from src.devices.whoop.fake import FakeWhoop
+from src.devices.whoop.protocol import WhoopProtocol
+from src.protocols.ble.fake import FakeAdapter, FakeBleakClient, FakeBleakScanner, FakeDevice
+
+CHARS = WhoopProtocol.CHARACTERISTICS
+HEART_RATE_UUID = CHARS["HEART_RATE"]["uuid"]
+
+
+def test_default_device_is_generic():
+    device = FakeDevice("FA:KE:00:00:00:01")
+    client = FakeBleakClient(device)
+    assert device.name is None
+    assert device.notify_rates == {} and device.advertised_services == []
+    assert [service.uuid[4:8] for service in client.services] == ["1800", "1801"]
+
+
+@pytest.mark.asyncio
+async def test_client_reads_writes_and_notifies():
+    writes = []
+    device = FakeWhoop(
+        "FA:KE:00:00:00:02",
+        notify_rates={HEART_RATE_UUID: 200.0},
+        write_handlers={CHARS["CUSTOM_WRITE"]["uuid"]: lambda client, data, response: writes.append((data, response))},
+        mtu=247
+    )
+    client = FakeBleakClient(device)
+    await client.connect()
+    assert client.mtu_size == 247
+    assert await client.read_gatt_char(CHARS["MANUFACTURER_NAME"]["uuid"]) == b"WHOOP Inc."
+
+    await client.write_gatt_char(CHARS["CUSTOM_WRITE"]["uuid"], b"\x01\x02", response=True)
+    assert writes == [(b"\x01\x02", True)]
+    with pytest.raises(ValueError):
+        await client.read_gatt_char(CHARS["CUSTOM_NOTIFY_2"]["uuid"])
+
+    received = []
+    await client.start_notify(HEART_RATE_UUID, lambda char, data: received.append((char.uuid, bytes(data))))
+    await asyncio.sleep(0.1)
+    await client.stop_notify(HEART_RATE_UUID)
+    count = len(received)
+    await asyncio.sleep(0.05)
+
+    assert count > 5 and len(received) == count
+    assert all(uuid == HEART_RATE_UUID for uuid, _ in received)
+    assert received[0][1] == device.payloads[HEART_RATE_UUID](0)
+    assert await client.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_service_filter_limits_discovery():
+    device = FakeWhoop("FA:KE:00:00:00:03")
+    client = FakeBleakClient(device, services=[WhoopProtocol.SERVICES["HEART_RATE_SERVICE"]])
+    await client.connect()
+    assert client.services.get_characteristic(HEART_RATE_UUID) is not None
+    assert client.services.get_characteristic(CHARS["CUSTOM_NOTIFY_2"]["uuid"]) is None
+
+
+@pytest.mark.asyncio
+async def test_drop_schedule_and_connect_failures():
+    device = FakeWhoop("FA:KE:00:00:00:04", drop_schedule=[0.02], connect_failures=1)
+    dropped = []
+    client = FakeBleakClient(device, disconnected_callback=dropped.append)
+    with pytest.raises(ConnectionError):
+        await client.connect()
+    await client.connect()
+    await asyncio.sleep(0.05)
+    assert dropped == [client]
+    assert not client.is_connected
+    assert device.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_scanner_filters_by_service_and_adapter_range():
+    adapter = FakeAdapter(seed=1)
+    adapter.populate(40, FakeWhoop.generate, advertise_interval=(0.01, 0.02))
+    whoops = {device.address for device in adapter.devices.values() if isinstance(device, FakeWhoop)}
+    assert len(whoops) == 4
+
+    seen = await FakeBleakScanner(adapter).discover(
+        timeout=0.1, return_adv=True, service_uuids=[WhoopProtocol.SERVICES["CUSTOM_SERVICE"]]
+    )
+    assert set(seen) == whoops
+    assert all(adv.local_name.startswith(WhoopProtocol.DEVICE_NAME_PREFIX) for _, adv in seen.values())
+
+    address = sorted(whoops)[0]
+    dropped = []
+    client = adapter.client_factory(address, disconnected_callback=dropped.append)
+    await client.connect()
+    adapter.remove(address)
+    assert dropped == [client]
+    with pytest.raises(ConnectionError):
+        await adapter.client_factory(address).connect()
+
+    seen = await FakeBleakScanner(adapter).discover(timeout=0.1)
+    assert address not in {device.address for device in seen}
+    assert len(seen) == len(adapter)
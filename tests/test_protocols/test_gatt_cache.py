@@ -0,0 +1,123 @@
+# tests/test_protocols/test_gatt_cache.py
+import json
+
+import pytest
+
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.fake import FakeWhoop
+from src.devices.whoop.protocol import WhoopProtocol
+from src.protocols.ble.fake import FakeBleakClient
+from src.protocols.ble.gatt_cache import GattProfile, GattProfileCache
+
+ADDRESS = "FA:KE:00:00:00:08"
+HEART_RATE_UUID = WhoopProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"]
+# Device information stays discoverable so the identity check passes
+SERVICE_UUIDS = [WhoopProtocol.SERVICES["DEVICE_INFO_SERVICE"], WhoopProtocol.SERVICES["HEART_RATE_SERVICE"]]
+
+
+def _profile(**kwargs):
+    fields = dict(
+        address=ADDRESS,
+        manufacturer="WHOOP Inc.",
+        service_uuids=SERVICE_UUIDS,
+        notify_characteristics=[(HEART_RATE_UUID, 12)],
+    )
+    fields.update(kwargs)
+    return GattProfile(**fields)
+
+
+def test_persistence_round_trip(tmp_path):
+    path = str(tmp_path / "gatt.json")
+    cache = GattProfileCache(path)
+    profile = _profile()
+    cache.put(profile)
+
+    reloaded = GattProfileCache(path)
+    assert len(reloaded) == 1 and ADDRESS.lower() in reloaded
+    assert reloaded.lookup(ADDRESS) == profile
+    assert isinstance(reloaded.lookup(ADDRESS).notify_characteristics[0], tuple)
+    assert not (tmp_path / "gatt.json.tmp").exists()
+
+    reloaded.invalidate(ADDRESS)
+    assert json.loads((tmp_path / "gatt.json").read_text()) == {}
+
+
+def test_unreadable_file_is_ignored(tmp_path):
+    path = tmp_path / "gatt.json"
+    path.write_text("{not json")
+    assert len(GattProfileCache(str(path))) == 0
+    assert len(GattProfileCache(str(tmp_path / "missing.json"))) == 0
+
+
+def test_identity_mismatch_invalidates():
+    cache = GattProfileCache()
+    cache.put(_profile(firmware="1.0"))
+    assert cache.get(ADDRESS, "WHOOP Inc.", "1.0") is not None
+    assert cache.get(ADDRESS, "WHOOP Inc.", "2.0") is None
+    assert ADDRESS not in cache
+
+
+def _collector(device, cache, clients):
+    def client_factory(address, **kwargs):
+        clients.append(kwargs.get("services"))
+        return FakeBleakClient(device, gatt_latency=0.05, **kwargs)
+
+    return WhoopCollector(
+        device_address=device.address,
+        data_callback=lambda data_type, data: None,
+        gatt_cache=cache,
+        client_factory=client_factory
+    )
+
+
+async def _session(collector):
+    assert await collector.connect()
+    assert await collector.start_collection()
+    await collector.stop_collection()
+    await collector.disconnect()
+    return collector.connection_metrics
+
+
+@pytest.mark.asyncio
+async def test_cached_profile_limits_discovery_and_subscribes_concurrently(tmp_path):
+    device = FakeWhoop(ADDRESS, notify_rates={})
+    cache = GattProfileCache(str(tmp_path / "gatt.json"))
+    clients = []
+
+    first = await _session(_collector(device, cache, clients))
+    profile = cache.lookup(ADDRESS)
+    assert not first["gatt_cache_hit"]
+    assert len(profile.notify_characteristics) == 6
+
+    collector = _collector(device, GattProfileCache(str(tmp_path / "gatt.json")), clients)
+    second = await _session(collector)
+    assert second["gatt_cache_hit"]
+    assert clients == [None, profile.service_uuids]
+    # Six subscriptions at 50 ms each overlap instead of taking 300 ms
+    assert second["subscribe_s"] < 0.2
+    assert collector.profile == profile
+
+
+@pytest.mark.asyncio
+async def test_service_mismatch_invalidates_and_rediscovers():
+    device = FakeWhoop(ADDRESS, notify_rates={})
+    cache = GattProfileCache()
+    cache.put(_profile(notify_characteristics=[(HEART_RATE_UUID, 999)]))
+    clients = []
+
+    collector = _collector(device, cache, clients)
+    metrics = await _session(collector)
+    assert not metrics["gatt_cache_hit"]
+    assert clients == [SERVICE_UUIDS, None]
+    handles = dict(cache.lookup(ADDRESS).notify_characteristics)
+    assert handles[HEART_RATE_UUID] != 999 and len(handles) == 6
+
+
+def test_matches_services():
+    device = FakeWhoop(ADDRESS)
+    services = list(FakeBleakClient(device).services)
+    handle = next(c.handle for s in services for c in s.characteristics if c.uuid == HEART_RATE_UUID)
+    assert _profile(notify_characteristics=[(HEART_RATE_UUID.upper(), handle)]).matches_services(services)
+    assert not _profile(notify_characteristics=[(HEART_RATE_UUID, handle + 1)]).matches_services(services)
+    assert not _profile(service_uuids=["0000ffff-0000-1000-8000-00805f9b34fb"],
+                        notify_characteristics=[]).matches_services(services)
@@ -0,0 +1,88 @@
+# tests/test_protocols/test_heart_rate.py
+import struct
+
+import pytest
+
+from src.core.analytics import OnlineAnalytics
+from src.devices.garmin.data_parser import GarminDataParser
+from src.devices.whoop.data_parser import WhoopDataParser
+from src.protocols.ble import heart_rate
+from src.protocols.ble.heart_rate import HeartRateMeasurement, RR_SCALE_MS
+
+
+@pytest.mark.parametrize("data, expected", [
+    # 8-bit value, no contact support
+    (bytes([0x00, 72]), HeartRateMeasurement(72)),
+    # 16-bit value
+    (bytes([0x01]) + struct.pack("<H", 301), HeartRateMeasurement(301)),
+    # Contact supported but not detected, then detected
+    (bytes([0x04, 60]), HeartRateMeasurement(60, sensor_contact=False)),
+    (bytes([0x06, 60]), HeartRateMeasurement(60, sensor_contact=True)),
+    # Energy expended ahead of the RR intervals
+    (bytes([0x18, 90]) + struct.pack("<HHH", 1234, 1024, 512),
+     HeartRateMeasurement(90, energy_expended=1234, rr_intervals=(1000.0, 500.0))),
+    # 16-bit value with contact and RR intervals
+    (bytes([0x17]) + struct.pack("<HHH", 150, 400, 410),
+     HeartRateMeasurement(150, sensor_contact=True, rr_intervals=(400 * RR_SCALE_MS, 410 * RR_SCALE_MS))),
+])
+def test_parse_measurement_flags(data, expected):
+    assert heart_rate.parse_heart_rate_measurement(data) == expected
+    assert heart_rate.parse_heart_rate(data) == expected.heart_rate
+
+
+def test_odd_trailing_byte_is_not_an_interval():
+    measurement = heart_rate.parse_heart_rate_measurement(bytes([0x10, 60]) + struct.pack("<H", 1024) + b"\x01")
+    assert measurement.rr_intervals == (1000.0,)
+
+
+@pytest.mark.parametrize("data", [b"", bytes([0x00]), bytes([0x01, 60]), bytes([0x08, 60, 1])])
+def test_truncated_payloads(data):
+    assert heart_rate.parse_heart_rate_measurement(data) is None
+
+
+def test_payloads_are_read_in_place():
+    data = bytes([0x10, 60]) + struct.pack("<HH", 1024, 2048)
+    for payload in (data, bytearray(data), memoryview(data)):
+        assert heart_rate.parse_heart_rate_measurement(payload).rr_intervals == (1000.0, 2000.0)
+
+
+@pytest.mark.parametrize("use_numpy", [False, pytest.param(True, marks=pytest.mark.skipif(
+    heart_rate.np is None, reason="numpy not installed"))])
+def test_batch_matches_single_decoding(use_numpy):
+    payloads = [
+        bytes([0x10, 60]) + struct.pack("<H", 1024),
+        bytes([0x00, 61]),
+        bytes([0x19]) + struct.pack("<HHHH", 300, 55, 512, 256),
+        bytes([0x00]),
+    ]
+    columns = heart_rate.parse_heart_rate_batch(payloads, use_numpy=use_numpy)
+    measurements = [heart_rate.parse_heart_rate_measurement(p) for p in payloads[:3]]
+
+    assert list(columns["heart_rate"]) == [m.heart_rate for m in measurements]
+    offsets = list(columns["rr_offsets"])
+    for i, measurement in enumerate(measurements):
+        assert tuple(columns["rr_intervals"][offsets[i]:offsets[i + 1]]) == pytest.approx(measurement.rr_intervals)
+
+
+@pytest.mark.parametrize("parser", [WhoopDataParser, GarminDataParser])
+def test_parser_dicts_keep_bare_heart_rate(parser):
+    data = bytes([0x10, 60]) + struct.pack("<H", 1024)
+    parsed = parser.parse_characteristic_data(heart_rate.HEART_RATE_MEASUREMENT_UUID, data)
+
+    assert parsed["heart_rate"] == 60
+    assert parsed["heart_rate_measurement"] == HeartRateMeasurement(60, rr_intervals=(1000.0,))
+
+    malformed = parser.parse_characteristic_data(heart_rate.HEART_RATE_MEASUREMENT_UUID, b"")
+    assert malformed["heart_rate"] is None and malformed["heart_rate_measurement"] is None
+
+
+def test_analytics_takes_rr_from_parser_dicts_and_samples():
+    data = bytes([0x10, 60]) + struct.pack("<H", 1024)
+    for record in (
+        WhoopDataParser.parse_characteristic_data(heart_rate.HEART_RATE_MEASUREMENT_UUID, data),
+        WhoopDataParser.parse_sample(heart_rate.HEART_RATE_MEASUREMENT_UUID, data, 1),
+    ):
+        analytics = OnlineAnalytics(windows=(60,))
+        analytics("data", record)
+        assert analytics.windows[0].heart_rate.mean == 60
+        assert analytics.windows[0].rr.mean == 1000.0
@@ -0,0 +1,102 @@
+# tests/test_protocols/test_passive.py
+import asyncio
+import struct
+
+import pytest
+
+from src.core.samples import Sample
+from src.protocols.ble.advertisement import APPLE_COMPANY_ID
+from src.protocols.ble.fake import FakeAdapter, FakeDevice
+from src.protocols.ble.passive import ADVERTISEMENT_CHARACTERISTIC, PassiveCollector
+from src.protocols.ble.scanner import BLEScanner, ScanFilter
+
+BEACON_UUID = bytes(range(16))
+
+
+def _ibeacon(major, minor=7):
+    return b"\x02\x15" + BEACON_UUID + struct.pack(">HHb", major, minor, -59)
+
+
+def _adapter():
+    adapter = FakeAdapter(seed=12)
+    beacon = adapter.add(FakeDevice("FA:KE:00:00:01:01", name="Beacon", advertise_interval=0.01,
+                                    manufacturer_data={APPLE_COMPANY_ID: _ibeacon(1)}))
+    # Nothing decodable in its advertisements
+    adapter.add(FakeDevice("FA:KE:00:00:01:02", name="Other", advertise_interval=0.01,
+                           manufacturer_data={0x0006: b"\x01\x02"}))
+    return adapter, beacon
+
+
+async def _collect(adapter, seconds, changes=(), **kwargs):
+    received = []
+    scanner = BLEScanner(scanner_factory=adapter.scanner_factory)
+    collector = PassiveCollector(lambda data_type, data: received.append(data), scanner=scanner, **kwargs)
+    assert await collector.connect()
+    assert await collector.start_collection()
+    for change in changes:
+        await asyncio.sleep(seconds)
+        change()
+    await asyncio.sleep(seconds)
+    await collector.disconnect()
+    assert not scanner.is_scanning
+    return collector, received
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("queue_size", [64, None], ids=["queued", "direct"])
+async def test_one_sample_per_changed_advertisement(queue_size):
+    adapter, beacon = _adapter()
+
+    def bump():
+        beacon.manufacturer_data = {APPLE_COMPANY_ID: _ibeacon(2)}
+
+    collector, received = await _collect(adapter, 0.1, changes=[bump], queue_size=queue_size)
+
+    assert [data["ibeacon_major"] for data in received] == [1, 2]
+    assert received[0]["characteristic"] == ADVERTISEMENT_CHARACTERISTIC
+    assert received[0]["address"] == beacon.address
+    assert received[0]["ibeacon_uuid"] == BEACON_UUID.hex()
+    assert isinstance(received[0]["rssi"], int)
+    stats = collector.stats
+    assert stats.samples == 2
+    # The undecodable device is filtered once, its repeats are duplicates
+    assert stats.filtered == 1
+    assert stats.duplicates > 10
+    assert stats.advertisements == stats.samples + stats.filtered + stats.duplicates
+
+
+@pytest.mark.asyncio
+async def test_scan_filter_and_compact_samples():
+    adapter, beacon = _adapter()
+    adapter.add(FakeDevice("FA:KE:00:00:01:03", name="Elsewhere", advertise_interval=0.01,
+                           manufacturer_data={APPLE_COMPANY_ID: _ibeacon(9)}))
+    collector, received = await _collect(
+        adapter, 0.1, scan_filter=ScanFilter(name_prefix="beac"), compact_samples=True
+    )
+
+    assert len(received) == 1
+    sample = received[0]
+    assert isinstance(sample, Sample)
+    assert sample.characteristic == ADVERTISEMENT_CHARACTERISTIC
+    assert sample.value["address"] == beacon.address and sample.value["ibeacon_minor"] == 7
+    assert collector.stats.filtered == 2
+
+
+@pytest.mark.asyncio
+async def test_shared_scan_is_left_running():
+    adapter, _ = _adapter()
+    scanner = BLEScanner(scanner_factory=adapter.scanner_factory)
+    await scanner.start()
+    received = []
+    collector = PassiveCollector(lambda data_type, data: received.append(data), scanner=scanner, queue_size=None)
+    assert await collector.connect()
+    assert await collector.start_collection()
+    await asyncio.sleep(0.05)
+    assert await collector.discover()
+    await collector.disconnect()
+    assert scanner.is_scanning
+    count = len(received)
+    await asyncio.sleep(0.05)
+    # Detached from the scanner once stopped
+    assert count == 1 and len(received) == count
+    await scanner.stop()
@@ -0,0 +1,123 @@
+# tests/test_protocols/test_profiles.py
+import random
+import struct
+
+import pytest
+
+from src.devices.garmin.data_parser import GarminDataParser
+from src.devices.garmin.protocol import GarminProtocol
+from src.devices.whoop.data_parser import WhoopDataParser
+from src.devices.whoop.protocol import WhoopProtocol
+from src.protocols.ble import heart_rate
+from src.protocols.ble.cycling_power import parse_cycling_power_measurement
+from src.protocols.ble.cycling_speed_cadence import parse_csc_measurement
+from src.protocols.ble.decoding import CharacteristicParser
+from src.protocols.ble.profiles import ProfileCache, ProfileError, validate_profile
+from src.protocols.ble.running_speed_cadence import parse_rsc_measurement
+
+# Characteristic name -> (field, hand-written decoder)
+WHOOP_DECODERS = {
+    "HEART_RATE": ("heart_rate_measurement", WhoopDataParser.parse_heart_rate_measurement),
+    "BATTERY_LEVEL": ("battery_level", WhoopDataParser.parse_battery_level),
+    "CUSTOM_NOTIFY_1": ("hrv", WhoopDataParser.parse_hrv),
+    "CUSTOM_NOTIFY_2": ("movement", WhoopDataParser.parse_accelerometer),
+    "CUSTOM_NOTIFY_3": ("custom_data_3", WhoopDataParser.parse_opaque),
+    "CUSTOM_NOTIFY_4": ("custom_data_4", WhoopDataParser.parse_opaque),
+}
+GARMIN_DECODERS = {
+    "HEART_RATE": ("heart_rate_measurement", heart_rate.parse_heart_rate_measurement),
+    "RSC_MEASUREMENT": ("running_speed_cadence", parse_rsc_measurement),
+    "CSC_MEASUREMENT": ("cycling_speed_cadence", parse_csc_measurement),
+    "CYCLING_POWER_MEASUREMENT": ("cycling_power", parse_cycling_power_measurement),
+    "BATTERY_LEVEL": ("battery_level", GarminDataParser.parse_battery_level),
+}
+
+_rng = random.Random(11)
+_CP_FLAGS = sorted({0, 0x1FFF, *(1 << bit for bit in range(13)), *(_rng.randrange(0x2000) for _ in range(64))})
+
+
+def _flag_payloads(flags_values, flags_format, size=24):
+    """A random payload per flags value, each long enough for every optional field"""
+    rng = random.Random(7)
+    return [struct.pack(flags_format, flags) + bytes(rng.randrange(256) for _ in range(size)) for flags in flags_values]
+
+
+# Characteristic name -> payloads covering every flag combination the hand-written decoder reads
+PAYLOADS = {
+    "HEART_RATE": _flag_payloads(range(32), "<B"),
+    "RSC_MEASUREMENT": _flag_payloads(range(8), "<B"),
+    "CSC_MEASUREMENT": _flag_payloads(range(4), "<B"),
+    "CYCLING_POWER_MEASUREMENT": _flag_payloads(_CP_FLAGS, "<H"),
+    "BATTERY_LEVEL": [bytes([90, 1])],
+    "CUSTOM_NOTIFY_1": [struct.pack("<HH", 723, 5)],
+    "CUSTOM_NOTIFY_2": [struct.pack("<hhhh", -16384, 8192, 32767, 1)],
+    "CUSTOM_NOTIFY_3": [bytes(range(20))],
+    "CUSTOM_NOTIFY_4": [b"\xaa\x00\x05"],
+}
+
+
+def _hand_written(decoders, protocol):
+    """Parser dispatching to the hand-written decoders"""
+    return type("HandWrittenParser", (CharacteristicParser,), {
+        "DECODERS": {protocol.CHARACTERISTICS[name]["uuid"]: entry for name, entry in decoders.items()},
+        "DERIVED_FIELDS": heart_rate.DERIVED_FIELDS,
+    })
+
+
+CASES = [
+    (WhoopProtocol, WhoopDataParser, WHOOP_DECODERS, name) for name in WHOOP_DECODERS
+] + [
+    (GarminProtocol, GarminDataParser, GARMIN_DECODERS, name) for name in GARMIN_DECODERS
+]
+
+
+@pytest.mark.parametrize("protocol, parser, decoders, name", CASES,
+                         ids=[f"{case[0].PROFILE.name}-{case[3]}" for case in CASES])
+def test_compiled_profile_matches_hand_written(protocol, parser, decoders, name):
+    uuid = protocol.CHARACTERISTICS[name]["uuid"]
+    reference = _hand_written(decoders, protocol)
+    # The device parser and the profile's own parser both dispatch to the compiled decoders
+    assert parser.get_decoder(uuid) == protocol.PROFILE.decoders[uuid]
+    for payload in PAYLOADS[name]:
+        # Every truncation as well, down to an empty payload
+        for size in range(len(payload) + 1):
+            data = bytearray(payload[:size])
+            expected = reference.parse_characteristic_data(uuid, data)
+            assert parser.parse_characteristic_data(uuid, data) == expected, data.hex()
+            assert protocol.PROFILE.parser.parse_characteristic_data(uuid, data) == expected, data.hex()
+
+
+def test_heart_rate_fields_follow_the_flags():
+    decode = WhoopProtocol.PROFILE.decoder("HEART_RATE")
+    measurement = decode(bytes([0x1F]) + struct.pack("<HHHH", 300, 12, 1024, 512))
+    assert measurement == heart_rate.HeartRateMeasurement(300, True, 12, (1000.0, 500.0))
+    assert decode(bytes([0x00, 61])) == heart_rate.HeartRateMeasurement(61)
+    # Contact detected without contact support is not reported
+    assert decode(bytes([0x02, 61])).sensor_contact is None
+    parsed = WhoopDataParser.parse_characteristic_data(WhoopProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"], b"\x01\x2c\x01")
+    assert parsed["heart_rate"] == 300
+    assert WhoopDataParser.parse_characteristic_data(WhoopProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"], b"\x01\x2c")["heart_rate"] is None
+
+
+def test_protocol_constants_come_from_the_profile():
+    for protocol in (WhoopProtocol, GarminProtocol):
+        profile = ProfileCache().load(protocol.PROFILE_PATH)
+        assert protocol.SERVICES == profile.services
+        assert protocol.CHARACTERISTICS == profile.characteristics
+    assert WhoopProtocol.DEVICE_NAME_PREFIX == "WHOOP"
+    assert WhoopProtocol.CHARACTERISTICS["CUSTOM_NOTIFY_3"]["uuid"] == "61080005-8d6d-82b8-614a-1c8cb0f8dcc6"
+
+
+def _profile(layout, **char):
+    return {"name": "test", "characteristics": {"C": dict({"uuid": "AB", "field": "f", "layout": layout}, **char)}}
+
+
+@pytest.mark.parametrize("spec", [
+    _profile({"type": "Unknown", "fields": [{"name": "x", "format": "B"}]}),
+    _profile({"type": "RSCMeasurement", "result": "list", "fields": [{"name": "x", "format": "B"}]}),
+    _profile({"result": "bytes", "fields": [{"name": "x", "format": "B"}]}),
+    _profile({"fields": [{"name": "x", "format": "B"}]}, derived="not an attribute"),
+], ids=["unknown_type", "type_without_dict", "bytes_with_fields", "bad_derived"])
+def test_invalid_result_options(spec):
+    with pytest.raises(ProfileError):
+        validate_profile(spec)
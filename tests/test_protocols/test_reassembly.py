@@ -0,0 +1,103 @@
+# tests/test_protocols/test_reassembly.py
+import random
+import zlib
+
+import pytest
+
+from src.protocols.ble.reassembly import FrameFormat, FrameReassembler, Packetizer, crc16_ccitt
+
+
+def _frames(count, seed=24, max_body=300):
+    rng = random.Random(seed)
+    return [(rng.randrange(4), rng.randbytes(rng.randint(0, max_body))) for _ in range(count)]
+
+
+def _packets(frame_format, frames, payload_size=20):
+    stream = b"".join(frame_format.encode(frame_type, body) for frame_type, body in frames)
+    return Packetizer(frame_format, payload_size).packets(stream)
+
+
+def _collect(frame_format, **kwargs):
+    delivered = []
+    reassembler = FrameReassembler(
+        frame_format, lambda frame_type, body, decoded: delivered.append((frame_type, bytes(body), decoded)), **kwargs
+    )
+    return reassembler, delivered
+
+
+@pytest.mark.parametrize("frame_format", [
+    FrameFormat(),
+    FrameFormat(crc=zlib.crc32),
+    FrameFormat(sequence_format="<H", crc=crc16_ccitt, crc_format="<H"),
+    FrameFormat(sequence_format=None, start_of_frame=None),
+], ids=["plain", "crc32", "crc16", "bare"])
+@pytest.mark.parametrize("payload_size", [20, 244])
+def test_round_trip(frame_format, payload_size):
+    frames = _frames(200)
+    reassembler, delivered = _collect(frame_format)
+    for packet in _packets(frame_format, frames, payload_size):
+        reassembler.feed(packet)
+
+    assert [(frame_type, body) for frame_type, body, _ in delivered] == frames
+    assert reassembler.pending == 0
+    assert reassembler.stats.frames == len(frames)
+
+
+def test_decoders_by_frame_type():
+    frame_format = FrameFormat()
+    frames = _frames(50)
+    reassembler, delivered = _collect(frame_format, decoders={0: len})
+    reassembler.register(1, bytes)
+    for packet in _packets(frame_format, frames):
+        reassembler.feed(packet)
+
+    for (frame_type, body), (_, _, decoded) in zip(frames, delivered):
+        assert decoded == {0: len(body), 1: body}.get(frame_type)
+    assert reassembler.stats.decoded_frames == sum(frame_type < 2 for frame_type, _ in frames)
+
+
+def test_sequence_gap_drops_the_partial_frame():
+    frame_format = FrameFormat(crc=zlib.crc32)
+    frames = _frames(100, max_body=80)
+    packets = _packets(frame_format, frames)
+    reassembler, delivered = _collect(frame_format)
+    lost = {10, 11, 40, 77}
+    for n, packet in enumerate(packets):
+        if n not in lost:
+            reassembler.feed(packet)
+
+    stats = reassembler.stats
+    assert stats.sequence_gaps == 3
+    assert stats.lost_packets == 4
+    # Every frame delivered is intact, the damaged ones are dropped
+    assert set((frame_type, body) for frame_type, body, _ in delivered) <= set(frames)
+    assert len(frames) - 8 <= len(delivered) < len(frames)
+
+
+def test_crc_error_resyncs_on_the_next_frame():
+    frame_format = FrameFormat(sequence_format=None, crc=zlib.crc32)
+    frames = _frames(3, max_body=40)
+    encoded = [bytearray(frame_format.encode(frame_type, body)) for frame_type, body in frames]
+    encoded[1][-1] ^= 0xFF
+    reassembler, delivered = _collect(frame_format)
+    reassembler.feed(b"\x00\x01garbage" + b"".join(encoded))
+
+    assert [(frame_type, body) for frame_type, body, _ in delivered] == [frames[0], frames[2]]
+    assert reassembler.stats.crc_errors >= 1
+
+
+def test_small_buffer_compacts_partial_frames():
+    frame_format = FrameFormat(max_body=300)
+    frames = _frames(100)
+    reassembler, delivered = _collect(frame_format, capacity=frame_format.max_frame)
+    for packet in _packets(frame_format, frames, 244):
+        reassembler.feed(packet)
+    assert [(frame_type, body) for frame_type, body, _ in delivered] == frames
+
+
+def test_oversized_body_is_rejected():
+    frame_format = FrameFormat(max_body=16)
+    with pytest.raises(ValueError):
+        frame_format.encode(0, bytes(17))
+    with pytest.raises(ValueError):
+        FrameReassembler(frame_format, lambda *args: None, capacity=8)
@@ -0,0 +1,88 @@
+# tests/test_protocols/test_reconnect.py
+import asyncio
+
+import pytest
+
+from src.core.reconnect import MAX_RECENT_GAPS, ReconnectPolicy, ReconnectStats
+from src.devices.whoop.collector import WhoopCollector
+from src.devices.whoop.fake import FakeWhoop
+from src.devices.whoop.protocol import WhoopProtocol
+from src.protocols.ble.fake import FakeBleakClient
+
+HEART_RATE_UUID = WhoopProtocol.CHARACTERISTICS["HEART_RATE"]["uuid"]
+
+
+def test_backoff_grows_and_is_capped():
+    policy = ReconnectPolicy(base_delay=0.1, max_delay=1.0, max_attempts=3, jitter=0.5)
+    for attempt, ceiling in enumerate((0.1, 0.2, 0.4, 0.8, 1.0, 1.0)):
+        assert ceiling / 2 <= policy.delay(attempt) <= ceiling
+    assert policy.should_retry(2) and not policy.should_retry(3)
+
+
+def test_stats_keep_recent_gaps_and_every_total():
+    stats = ReconnectStats()
+    for n in range(MAX_RECENT_GAPS + 10):
+        gap = stats.open_gap(n * 1_000_000_000)
+        stats.close_gap(gap, n * 1_000_000_000 + 500_000_000)
+    assert len(stats.gaps) == MAX_RECENT_GAPS
+    assert stats.gaps[0].start_ns == 10 * 1_000_000_000
+    assert stats.disconnects == stats.reconnects == MAX_RECENT_GAPS + 10
+    assert stats.total_gap_s == pytest.approx((MAX_RECENT_GAPS + 10) * 0.5)
+    assert len(stats.as_dict()["gaps"]) == MAX_RECENT_GAPS
+
+
+async def _collect(device, seconds, **kwargs):
+    received = []
+    collector = WhoopCollector(
+        device_address=device.address,
+        data_callback=lambda data_type, data: received.append(data),
+        auto_reconnect=True,
+        reconnect_policy=ReconnectPolicy(base_delay=0.01, max_delay=0.02, max_attempts=5),
+        client_factory=lambda address, **kw: FakeBleakClient(device, **kw),
+        **kwargs
+    )
+    assert await collector.connect()
+    assert await collector.start_collection()
+    await asyncio.sleep(seconds)
+    await collector.stop_collection()
+    await collector.disconnect()
+    return collector, received
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("queue_size", [1024, None], ids=["queued", "direct"])
+async def test_reconnect_records_closed_gaps(queue_size):
+    device = FakeWhoop("FA:KE:00:00:00:09", notify_rates={HEART_RATE_UUID: 100.0}, drop_schedule=[0.1, 0.1])
+    collector, received = await _collect(device, 0.5, queue_size=queue_size)
+
+    stats = collector.reconnect_stats
+    assert stats.disconnects == 2 and stats.reconnects == 2
+    assert all(gap.end_ns is not None and gap.duration_s > 0 for gap in stats.gaps)
+    assert stats.total_gap_s == pytest.approx(sum(gap.duration_s for gap in stats.gaps))
+    assert device.connections == 3
+    # Data keeps flowing after the last reconnect
+    assert len(received) > 30
+
+
+@pytest.mark.asyncio
+async def test_gap_stays_open_when_reconnecting_gives_up():
+    device = FakeWhoop("FA:KE:00:00:00:0A", notify_rates={HEART_RATE_UUID: 100.0}, drop_schedule=[0.05])
+    collector = WhoopCollector(
+        device_address=device.address,
+        data_callback=lambda data_type, data: None,
+        auto_reconnect=True,
+        reconnect_policy=ReconnectPolicy(base_delay=0.01, max_delay=0.01, max_attempts=3),
+        client_factory=lambda address, **kw: FakeBleakClient(device, **kw)
+    )
+    await collector.connect()
+    await collector.start_collection()
+    # The strap goes out of range for good once the link drops
+    device.connect_failures = 100
+    await asyncio.sleep(0.3)
+
+    stats = collector.reconnect_stats
+    assert stats.disconnects == 1 and stats.reconnects == 0
+    assert stats.failed_attempts == 3
+    assert stats.gaps[0].end_ns is None and stats.gaps[0].attempts == 3
+    assert not collector.is_connected
+    await collector.stop_collection()
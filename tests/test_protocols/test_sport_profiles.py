@@ -0,0 +1,104 @@
+# tests/test_protocols/test_sport_profiles.py
+import struct
+
+import pytest
+
+from src.protocols.ble import cycling_power as cp
+from src.protocols.ble.cycling_speed_cadence import CSCMeasurement, parse_csc_measurement, revolution_rate
+from src.protocols.ble.running_speed_cadence import RSCMeasurement, parse_rsc_measurement
+
+
+def _cp(flags, power, fields=b""):
+    return struct.pack("<Hh", flags, power) + fields
+
+
+# (payload, expected attributes) for every optional field of the Cycling Power Measurement
+CP_VECTORS = {
+    "power_only": (_cp(0, -5), {"power": -5}),
+    "offset_compensation": (_cp(cp.FLAG_OFFSET_COMPENSATION, 250), {"power": 250}),
+    "balance": (_cp(cp.FLAG_PEDAL_POWER_BALANCE, 250, b"\x65"), {"pedal_power_balance": 50.5}),
+    "balance_left": (_cp(cp.FLAG_PEDAL_POWER_BALANCE | cp.FLAG_PEDAL_POWER_BALANCE_LEFT, 250, b"\x64"),
+                     {"pedal_power_balance": 50.0, "flags": 0x0003}),
+    "accumulated_torque": (_cp(cp.FLAG_ACCUMULATED_TORQUE, 250, struct.pack("<H", 3200)),
+                           {"accumulated_torque": 100.0}),
+    "wheel": (_cp(cp.FLAG_WHEEL_REVOLUTIONS, 250, struct.pack("<IH", 0xFFFFFFFF, 2047)),
+              {"wheel_revolutions": 0xFFFFFFFF, "wheel_event_time": 2047}),
+    "crank": (_cp(cp.FLAG_CRANK_REVOLUTIONS, 250, struct.pack("<HH", 0xFFFF, 1024)),
+              {"crank_revolutions": 0xFFFF, "crank_event_time": 1024}),
+    "extreme_forces": (_cp(cp.FLAG_EXTREME_FORCES, 250, struct.pack("<hh", 300, -200)),
+                       {"extreme_forces": (300, -200)}),
+    "extreme_torques": (_cp(cp.FLAG_EXTREME_TORQUES, 250, struct.pack("<hh", 64, -32)),
+                        {"extreme_torques": (2.0, -1.0)}),
+    # Two little-endian 12-bit angles in three bytes, maximum in the low bits
+    "extreme_angles_max": (_cp(cp.FLAG_EXTREME_ANGLES, 250, b"\xff\x0f\x00"), {"extreme_angles": (0xFFF, 0)}),
+    "extreme_angles_min": (_cp(cp.FLAG_EXTREME_ANGLES, 250, b"\x00\xf0\xff"), {"extreme_angles": (0, 0xFFF)}),
+    "extreme_angles": (_cp(cp.FLAG_EXTREME_ANGLES, 250, b"\x67\x41\x0b"), {"extreme_angles": (359, 180)}),
+    "top_dead_spot": (_cp(cp.FLAG_TOP_DEAD_SPOT, 250, struct.pack("<H", 20)), {"dead_spot_angles": (20, None)}),
+    "bottom_dead_spot": (_cp(cp.FLAG_BOTTOM_DEAD_SPOT, 250, struct.pack("<H", 190)),
+                         {"dead_spot_angles": (None, 190)}),
+    "accumulated_energy": (_cp(cp.FLAG_ACCUMULATED_ENERGY, 250, struct.pack("<H", 1234)),
+                           {"accumulated_energy": 1234}),
+    "all_fields": (
+        _cp(0x0FFF, 400, b"\x64" + struct.pack("<HIHHHhhhh", 320, 7, 2048, 9, 1024, 500, -50, 96, -16)
+            + b"\x67\x41\x0b" + struct.pack("<HHH", 15, 195, 42)),
+        {"power": 400, "pedal_power_balance": 50.0, "accumulated_torque": 10.0, "wheel_revolutions": 7,
+         "wheel_event_time": 2048, "crank_revolutions": 9, "crank_event_time": 1024, "extreme_forces": (500, -50),
+         "extreme_torques": (3.0, -0.5), "extreme_angles": (359, 180), "dead_spot_angles": (15, 195),
+         "accumulated_energy": 42},
+    ),
+}
+
+
+@pytest.mark.parametrize("name", CP_VECTORS)
+def test_cycling_power_vectors(name):
+    payload, expected = CP_VECTORS[name]
+    measurement = cp.parse_cycling_power_measurement(payload)
+    fields = measurement.as_dict()
+    expected = dict({"power": 250, "flags": struct.unpack_from("<H", payload)[0]}, **expected)
+    for field, value in fields.items():
+        assert value == expected.get(field), field
+    # Truncating any present field invalidates the notification
+    assert cp.parse_cycling_power_measurement(payload[:-1]) is None
+
+
+def test_cycling_power_equality():
+    payload = CP_VECTORS["all_fields"][0]
+    assert cp.parse_cycling_power_measurement(payload) == cp.parse_cycling_power_measurement(bytearray(payload))
+    assert cp.parse_cycling_power_measurement(payload) != cp.parse_cycling_power_measurement(_cp(0, 400))
+
+
+@pytest.mark.parametrize("payload, expected", [
+    (b"\x00", CSCMeasurement()),
+    (b"\x01" + struct.pack("<IH", 0xFFFFFFFF, 0xFFFF), CSCMeasurement(0xFFFFFFFF, 0xFFFF)),
+    (b"\x02" + struct.pack("<HH", 300, 512), CSCMeasurement(crank_revolutions=300, crank_event_time=512)),
+    (b"\x03" + struct.pack("<IHHH", 1000, 2048, 300, 512), CSCMeasurement(1000, 2048, 300, 512)),
+], ids=["none", "wheel", "crank", "both"])
+def test_csc_vectors(payload, expected):
+    assert parse_csc_measurement(payload) == expected
+    assert parse_csc_measurement(payload[:-1]) is None
+
+
+def test_csc_rates_across_rollovers():
+    previous = CSCMeasurement(0xFFFFFFFE, 65000, 0xFFFF, 65000)
+    current = CSCMeasurement(3, 500, 1, 500)
+    wheel_rpm, crank_rpm = current.rates_since(previous)
+    # 1036 ticks of 1/1024 s
+    assert wheel_rpm == pytest.approx(5 * 1024 * 60 / 1036)
+    assert crank_rpm == pytest.approx(2 * 1024 * 60 / 1036)
+    assert revolution_rate(5, 100, 5, 100, 1 << 16) is None
+    assert CSCMeasurement(crank_revolutions=1, crank_event_time=1).rates_since(previous)[0] is None
+
+
+@pytest.mark.parametrize("payload, expected", [
+    (struct.pack("<BHB", 0x00, 768, 170), RSCMeasurement(3.0, 170)),
+    (struct.pack("<BHBH", 0x01, 512, 90, 110), RSCMeasurement(2.0, 90, stride_length=1.1)),
+    (struct.pack("<BHBI", 0x02, 256, 80, 12345), RSCMeasurement(1.0, 80, total_distance=1234.5)),
+    (struct.pack("<BHB", 0x04, 1024, 180), RSCMeasurement(4.0, 180, running=True)),
+    (struct.pack("<BHBHI", 0x07, 0xFFFF, 255, 0xFFFF, 0xFFFFFFFF),
+     RSCMeasurement(0xFFFF / 256, 255, 655.35, 0xFFFFFFFF / 10, True)),
+], ids=["speed_cadence", "stride", "distance", "running", "all_fields"])
+def test_rsc_vectors(payload, expected):
+    measurement = parse_rsc_measurement(payload)
+    assert measurement.as_dict() == pytest.approx(expected.as_dict())
+    assert measurement.running is expected.running
+    assert parse_rsc_measurement(payload[:-1]) is None
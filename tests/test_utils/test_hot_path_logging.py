@@ -0,0 +1,101 @@
+# tests/test_utils/test_hot_path_logging.py
+import logging
+import threading
+
+import pytest
+
+from src.utils.hot_path_logging import HOT_PATH_LOGGER, HotPathLog, install_queue_logging
+
+CHAR = "0000abcd-0000-1000-8000-00805f9b34fb"
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.messages = []
+        self.threads = []
+
+    def emit(self, record):
+        self.records.append(record)
+        self.messages.append(self.format(record))
+        self.threads.append(threading.current_thread())
+
+
+@pytest.fixture
+def capture():
+    logger = logging.getLogger(f"{HOT_PATH_LOGGER}.test")
+    handler = _Capture()
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    yield handler
+    logger.removeHandler(handler)
+    logger.setLevel(logging.NOTSET)
+
+
+def test_logs_one_packet_in_n(capture):
+    log = HotPathLog("test", logging.DEBUG, sample_every=10)
+    assert log.enabled
+    for n in range(35):
+        log.packet(CHAR, bytes([n]))
+    assert [record.args[2] for record in capture.records] == [10, 20, 30]
+    assert capture.messages[0] == f"Received data from {CHAR}: 09 (packet 10, 1 in 10 logged)"
+
+
+def test_preview_is_truncated_and_copied(capture):
+    log = HotPathLog("test", logging.DEBUG, sample_every=1, preview_bytes=4)
+    data = bytearray(range(16))
+    log.packet(CHAR, data)
+    data[0] = 0xFF
+    assert capture.messages == [f"Received data from {CHAR}: 00010203 (packet 1, 1 in 1 logged)"]
+
+
+def test_disabled_without_level(capture):
+    log = HotPathLog("test", sample_every=1)
+    assert not log.enabled
+    log.set_level(logging.INFO)
+    assert log.enabled
+    log.set_level(None)
+    assert not log.enabled
+    with pytest.raises(ValueError):
+        HotPathLog("test", sample_every=0)
+
+
+def test_follows_logger_level_changes(capture):
+    log = HotPathLog("test", logging.DEBUG, sample_every=1)
+    log.packet(CHAR, b"\x01")
+    log.logger.setLevel(logging.INFO)
+    log.packet(CHAR, b"\x02")
+    log.logger.setLevel(logging.DEBUG)
+    log.packet(CHAR, b"\x03")
+    assert [record.args[1].data for record in capture.records] == [b"\x01", b"\x03"]
+
+
+def test_queue_logging_formats_on_listener_thread():
+    logger = logging.getLogger(f"{HOT_PATH_LOGGER}.queued")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    handler = _Capture()
+    logger.addHandler(handler)
+    formatted = []
+
+    class _Payload:
+        def __str__(self):
+            formatted.append(threading.current_thread())
+            return "payload"
+
+    listener = install_queue_logging(logger.name)
+    try:
+        assert handler not in logger.handlers
+        logger.debug("value %s", _Payload())
+        # The message is still unformatted when the caller returns
+        assert formatted == [] or formatted[0] is not threading.current_thread()
+    finally:
+        listener.stop()
+        for queue_handler in list(logger.handlers):
+            logger.removeHandler(queue_handler)
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+    assert handler.messages == ["value payload"]
+    assert handler.threads[0] is not threading.current_thread()
+    assert formatted == handler.threads